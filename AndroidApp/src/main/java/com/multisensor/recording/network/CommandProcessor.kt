@@ -109,6 +109,15 @@ class CommandProcessor
                     return
                 }
 
+                // A scheduled start waits for the PC master start time
+                command.start_at_ms?.let { startAt ->
+                    val waitMs = syncClockManager.pcToDeviceTime(startAt) - System.currentTimeMillis()
+                    if (waitMs > 0) {
+                        logger.info("Scheduled start in ${waitMs}ms")
+                        delay(waitMs)
+                    }
+                }
+
                 // Start recording via RecordingService
                 val intent =
                     Intent(context, RecordingService::class.java).apply {
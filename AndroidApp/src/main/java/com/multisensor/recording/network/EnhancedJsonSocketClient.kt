@@ -990,6 +990,7 @@ class EnhancedJsonSocketClient @Inject constructor(
             when (message) {
                 is PreviewFrameMessage -> message.timestamp
                 is SensorDataMessage -> message.timestamp
+                is SensorBatchMessage -> message.timestamp
                 is SetStimulusTimeCommand -> message.time
                 is SyncTimeCommand -> message.pc_timestamp
                 else -> {
@@ -8,6 +8,8 @@ import kotlinx.coroutines.launch
 import java.io.File
 import java.io.FileInputStream
 import java.io.IOException
+import java.security.MessageDigest
+import java.util.zip.CRC32
 import javax.inject.Inject
 import javax.inject.Singleton
 
@@ -16,6 +18,10 @@ import javax.inject.Singleton
  *
  * Handles file transfer requests from PC server by reading files in chunks
  * and sending them via Base64-encoded JSON messages over the existing socket connection.
+ * When the PC offers the binary transfer mode, chunks are sent as raw binary
+ * frames instead, avoiding the Base64 and JSON overhead for large videos.
+ * Chunks carry a CRC32 and file_end the file's SHA-256, and a send_file
+ * request with an offset resumes an interrupted transfer.
  *
  * Based on 3_6_milestone.md specifications:
  * - Reads files in 64KB chunks
@@ -31,6 +37,7 @@ class FileTransferHandler
     ) {
         companion object {
             private const val CHUNK_SIZE = 65536 // 64KB chunks as specified in milestone
+            private const val BINARY_CHUNK_SIZE = 512 * 1024 // Raw binary chunks carry no encoding overhead
             private const val MAX_FILE_SIZE = 2L * 1024 * 1024 * 1024 // 2GB max file size
         }
 
@@ -54,7 +61,7 @@ class FileTransferHandler
 
             CoroutineScope(Dispatchers.IO).launch {
                 try {
-                    sendFile(command.filepath, command.filetype)
+                    sendFile(command.filepath, command.filetype, command.transferMode, command.offset)
                 } catch (e: Exception) {
                     logger.error("Error handling file transfer request", e)
                     sendErrorResponse("Failed to transfer file: ${e.message}")
@@ -67,10 +74,14 @@ class FileTransferHandler
          *
          * @param filepath Path to the file to send
          * @param filetype Optional file type descriptor
+         * @param transferMode Transfer mode offered by the PC, "binary" or null for Base64
+         * @param offset Byte to resume an interrupted transfer from
          */
         private suspend fun sendFile(
             filepath: String,
             filetype: String?,
+            transferMode: String? = null,
+            offset: Long = 0,
         ) {
             val file = File(filepath)
 
@@ -95,44 +106,84 @@ class FileTransferHandler
 
             logger.info("Starting file transfer: ${file.name} (${file.length()} bytes)")
 
+            sendFileChunks(file, transferMode == JsonSocketClient.FILE_TRANSFER_MODE_BINARY, offset)
+        }
+
+        /**
+         * Send file_info, the file chunks and file_end to the PC server
+         *
+         * All frames are written in order on this thread. Each chunk carries a
+         * CRC32 and file_end the SHA-256 of the whole file, so the PC can verify
+         * the file and resume an interrupted transfer from its partial copy.
+         *
+         * @param file The file to send
+         * @param binary Send chunks as raw binary frames instead of Base64 JSON
+         * @param offset Byte to resume from; the PC already has the bytes before it
+         */
+        private fun sendFileChunks(
+            file: File,
+            binary: Boolean,
+            offset: Long,
+        ) {
+            val client = jsonSocketClient ?: return
+            val startOffset = if (offset in 1..file.length()) offset else 0L
+            val digest = MessageDigest.getInstance("SHA-256")
+            val crc = CRC32()
+
             try {
-                // Send file info message
-                val fileInfoMessage =
-                    FileInfoMessage(
-                        name = file.name,
-                        size = file.length(),
-                    )
-                jsonSocketClient?.sendMessage(fileInfoMessage)
-                logger.debug("Sent file info for ${file.name}")
-
-                // Send file in chunks
                 FileInputStream(file).use { inputStream ->
-                    val buffer = ByteArray(CHUNK_SIZE)
+                    val buffer = ByteArray(if (binary) BINARY_CHUNK_SIZE else CHUNK_SIZE)
+
+                    // The whole-file checksum also covers the part the PC already has
+                    var skipped = 0L
+                    while (skipped < startOffset) {
+                        val toRead = minOf(buffer.size.toLong(), startOffset - skipped).toInt()
+                        val bytesRead = inputStream.read(buffer, 0, toRead)
+                        if (bytesRead == -1) throw IOException("File shorter than resume offset")
+                        digest.update(buffer, 0, bytesRead)
+                        skipped += bytesRead
+                    }
+
+                    val fileInfoMessage =
+                        FileInfoMessage(
+                            name = file.name,
+                            size = file.length(),
+                            transferMode = if (binary) JsonSocketClient.FILE_TRANSFER_MODE_BINARY else null,
+                            offset = startOffset,
+                            chunkChecksum = if (binary) JsonSocketClient.CHUNK_CHECKSUM_CRC32 else null,
+                        )
+                    if (!client.sendMessageNow(fileInfoMessage)) {
+                        throw IOException("Failed to send file info")
+                    }
+                    logger.debug("Sent file info for ${file.name} (offset $startOffset)")
+
                     var sequenceNumber = 1
-                    var totalBytesSent = 0L
+                    var totalBytesSent = startOffset
 
                     while (true) {
                         val bytesRead = inputStream.read(buffer)
                         if (bytesRead == -1) break // End of file
+                        if (bytesRead == 0) continue
 
-                        // Create chunk with actual bytes read (may be less than CHUNK_SIZE for last chunk)
-                        val chunkData =
-                            if (bytesRead == CHUNK_SIZE) {
-                                buffer
+                        digest.update(buffer, 0, bytesRead)
+                        crc.reset()
+                        crc.update(buffer, 0, bytesRead)
+
+                        val sent =
+                            if (binary) {
+                                client.sendBinaryChunk(buffer, bytesRead, crc.value)
                             } else {
-                                buffer.copyOf(bytesRead)
+                                client.sendMessageNow(
+                                    FileChunkMessage(
+                                        seq = sequenceNumber,
+                                        data = Base64.encodeToString(buffer, 0, bytesRead, Base64.NO_WRAP),
+                                        crc32 = crc.value,
+                                    ),
+                                )
                             }
-
-                        // Base64 encode the chunk
-                        val base64Data = Base64.encodeToString(chunkData, Base64.NO_WRAP)
-
-                        // Send chunk message
-                        val chunkMessage =
-                            FileChunkMessage(
-                                seq = sequenceNumber,
-                                data = base64Data,
-                            )
-                        jsonSocketClient?.sendMessage(chunkMessage)
+                        if (!sent) {
+                            throw IOException("Connection lost after $totalBytesSent bytes")
+                        }
 
                         totalBytesSent += bytesRead
                         sequenceNumber++
@@ -144,9 +195,8 @@ class FileTransferHandler
                         }
                     }
 
-                    // Send file end message
-                    val fileEndMessage = FileEndMessage(name = file.name)
-                    jsonSocketClient?.sendMessage(fileEndMessage)
+                    val sha256 = digest.digest().joinToString("") { "%02x".format(it) }
+                    client.sendMessageNow(FileEndMessage(name = file.name, sha256 = sha256))
 
                     logger.info("File transfer completed: ${file.name} ($totalBytesSent bytes, ${sequenceNumber - 1} chunks)")
                 }
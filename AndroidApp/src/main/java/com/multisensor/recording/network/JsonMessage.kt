@@ -1,5 +1,6 @@
 package com.multisensor.recording.network
 
+import org.json.JSONArray
 import org.json.JSONException
 import org.json.JSONObject
 
@@ -22,7 +23,16 @@ abstract class JsonMessage {
          */
         fun fromJson(jsonString: String): JsonMessage? =
             try {
-                val jsonObject = JSONObject(jsonString)
+                fromJsonObject(JSONObject(jsonString))
+            } catch (e: JSONException) {
+                null // Invalid JSON
+            }
+
+        /**
+         * Convert a decoded message of any wire encoding to its message object
+         */
+        fun fromJsonObject(jsonObject: JSONObject): JsonMessage? =
+            try {
                 val messageType = jsonObject.getString("type")
 
                 // Parse to specific message type based on type field
@@ -39,6 +49,7 @@ abstract class JsonMessage {
                     "hello" -> HelloMessage.fromJson(jsonObject)
                     "preview_frame" -> PreviewFrameMessage.fromJson(jsonObject)
                     "sensor_data" -> SensorDataMessage.fromJson(jsonObject)
+                    "sensor_batch" -> SensorBatchMessage.fromJson(jsonObject)
                     "status" -> StatusMessage.fromJson(jsonObject)
                     "ack" -> AckMessage.fromJson(jsonObject)
                     "file_info" -> FileInfoMessage.fromJson(jsonObject)
@@ -47,7 +58,7 @@ abstract class JsonMessage {
                     else -> null // Unknown message type
                 }
             } catch (e: JSONException) {
-                null // Invalid JSON
+                null // Missing or invalid fields
             }
 
         /**
@@ -73,6 +84,7 @@ data class StartRecordCommand(
     val record_video: Boolean = true,
     val record_thermal: Boolean = true,
     val record_shimmer: Boolean = false,
+    val start_at_ms: Long? = null, // PC master time to start at, for a scheduled start
 ) : JsonMessage() {
     override fun toJsonObject(): JSONObject =
         JSONObject().apply {
@@ -81,6 +93,7 @@ data class StartRecordCommand(
             put("record_video", record_video)
             put("record_thermal", record_thermal)
             put("record_shimmer", record_shimmer)
+            start_at_ms?.let { put("start_at_ms", it) }
         }
 
     companion object {
@@ -90,6 +103,7 @@ data class StartRecordCommand(
                 record_video = json.optBoolean("record_video", true),
                 record_thermal = json.optBoolean("record_thermal", true),
                 record_shimmer = json.optBoolean("record_shimmer", false),
+                start_at_ms = if (json.isNull("start_at_ms")) null else json.getLong("start_at_ms"),
             )
     }
 }
@@ -246,12 +260,16 @@ data class SendFileCommand(
     override val type: String = "send_file",
     val filepath: String,
     val filetype: String? = null,
+    val transferMode: String? = null, // "binary" if the PC accepts raw binary chunks
+    val offset: Long = 0, // Resume an interrupted transfer from this byte
 ) : JsonMessage() {
     override fun toJsonObject(): JSONObject =
         JSONObject().apply {
             put("type", type)
             put("filepath", filepath)
             filetype?.let { put("filetype", it) }
+            transferMode?.let { put("transfer_mode", it) }
+            if (offset > 0) put("offset", offset)
         }
 
     companion object {
@@ -259,6 +277,8 @@ data class SendFileCommand(
             SendFileCommand(
                 filepath = json.getString("filepath"),
                 filetype = if (json.has("filetype")) json.getString("filetype") else null,
+                transferMode = if (json.has("transfer_mode")) json.getString("transfer_mode") else null,
+                offset = json.optLong("offset", 0),
             )
     }
 }
@@ -296,12 +316,16 @@ data class HelloMessage(
     override val type: String = "hello",
     val device_id: String,
     val capabilities: List<String>,
+    val encodings: List<String> = emptyList(), // Wire encodings, in order of preference
 ) : JsonMessage() {
     override fun toJsonObject(): JSONObject =
         JSONObject().apply {
             put("type", type)
             put("device_id", device_id)
             put("capabilities", org.json.JSONArray(capabilities))
+            if (encodings.isNotEmpty()) {
+                put("encodings", org.json.JSONArray(encodings))
+            }
         }
 
     companion object {
@@ -311,9 +335,17 @@ data class HelloMessage(
             for (i in 0 until capabilitiesArray.length()) {
                 capabilities.add(capabilitiesArray.getString(i))
             }
+            val encodingsArray = json.optJSONArray("encodings")
+            val encodings = mutableListOf<String>()
+            if (encodingsArray != null) {
+                for (i in 0 until encodingsArray.length()) {
+                    encodings.add(encodingsArray.getString(i))
+                }
+            }
             return HelloMessage(
                 device_id = json.getString("device_id"),
                 capabilities = capabilities,
+                encodings = encodings,
             )
         }
     }
@@ -382,6 +414,88 @@ data class SensorDataMessage(
     }
 }
 
+/**
+ * Batch of sensor samples with one value array per channel.
+ * Each sample's time is baseTimestamp plus its entry in timestampDeltas (milliseconds).
+ */
+data class SensorBatchMessage(
+    override val type: String = "sensor_batch",
+    val timestamp: Long,
+    val baseTimestamp: Long,
+    val timestampDeltas: List<Long>,
+    val channels: Map<String, List<Double?>>,
+    val sampleRate: Double? = null,
+    val sensorId: String? = null,
+) : JsonMessage() {
+    override fun toJsonObject(): JSONObject =
+        JSONObject().apply {
+            put("type", type)
+            put("timestamp", timestamp)
+            put("base_timestamp", baseTimestamp)
+            put("timestamp_deltas", JSONArray(timestampDeltas))
+            val channelsJson = JSONObject()
+            channels.forEach { (name, values) ->
+                val valuesJson = JSONArray()
+                values.forEach { valuesJson.put(it ?: JSONObject.NULL) }
+                channelsJson.put(name, valuesJson)
+            }
+            put("channels", channelsJson)
+            sampleRate?.let { put("sample_rate", it) }
+            sensorId?.let { put("sensor_id", it) }
+        }
+
+    companion object {
+        /**
+         * Build a batch from per-sample timestamps and channel columns of equal length
+         */
+        fun fromSamples(
+            timestamps: List<Long>,
+            channels: Map<String, List<Double?>>,
+            sampleRate: Double? = null,
+            sensorId: String? = null,
+        ): SensorBatchMessage {
+            require(timestamps.isNotEmpty()) { "A sensor batch needs at least one sample" }
+            channels.forEach { (name, values) ->
+                require(values.size == timestamps.size) {
+                    "Channel $name has ${values.size} values for ${timestamps.size} timestamps"
+                }
+            }
+            val baseTimestamp = timestamps.first()
+            return SensorBatchMessage(
+                timestamp = timestamps.last(),
+                baseTimestamp = baseTimestamp,
+                timestampDeltas = timestamps.map { it - baseTimestamp },
+                channels = channels,
+                sampleRate = sampleRate,
+                sensorId = sensorId,
+            )
+        }
+
+        fun fromJson(json: JSONObject): SensorBatchMessage {
+            val deltasJson = json.getJSONArray("timestamp_deltas")
+            val deltas = List(deltasJson.length()) { deltasJson.getLong(it) }
+            val channelsJson = json.getJSONObject("channels")
+            val channels = mutableMapOf<String, List<Double?>>()
+            val names = channelsJson.keys()
+            while (names.hasNext()) {
+                val name = names.next()
+                val valuesJson = channelsJson.getJSONArray(name)
+                channels[name] = List(valuesJson.length()) {
+                    if (valuesJson.isNull(it)) null else valuesJson.getDouble(it)
+                }
+            }
+            return SensorBatchMessage(
+                timestamp = json.getLong("timestamp"),
+                baseTimestamp = json.getLong("base_timestamp"),
+                timestampDeltas = deltas,
+                channels = channels,
+                sampleRate = if (json.has("sample_rate")) json.getDouble("sample_rate") else null,
+                sensorId = if (json.has("sensor_id")) json.getString("sensor_id") else null,
+            )
+        }
+    }
+}
+
 /**
  * Device status update message
  */
@@ -449,12 +563,18 @@ data class FileInfoMessage(
     override val type: String = "file_info",
     val name: String,
     val size: Long,
+    val transferMode: String? = null, // "binary" if chunks follow as raw binary frames
+    val offset: Long = 0, // Byte the chunks start at when resuming
+    val chunkChecksum: String? = null, // "crc32" if binary chunks carry a CRC32 trailer
 ) : JsonMessage() {
     override fun toJsonObject(): JSONObject =
         JSONObject().apply {
             put("type", type)
             put("name", name)
             put("size", size)
+            transferMode?.let { put("transfer_mode", it) }
+            if (offset > 0) put("offset", offset)
+            chunkChecksum?.let { put("chunk_checksum", it) }
         }
 
     companion object {
@@ -462,6 +582,9 @@ data class FileInfoMessage(
             FileInfoMessage(
                 name = json.getString("name"),
                 size = json.getLong("size"),
+                transferMode = if (json.has("transfer_mode")) json.getString("transfer_mode") else null,
+                offset = json.optLong("offset", 0),
+                chunkChecksum = if (json.has("chunk_checksum")) json.getString("chunk_checksum") else null,
             )
     }
 }
@@ -473,12 +596,14 @@ data class FileChunkMessage(
     override val type: String = "file_chunk",
     val seq: Int,
     val data: String, // Base64 encoded chunk data
+    val crc32: Long? = null, // CRC32 of the decoded chunk
 ) : JsonMessage() {
     override fun toJsonObject(): JSONObject =
         JSONObject().apply {
             put("type", type)
             put("seq", seq)
             put("data", data)
+            crc32?.let { put("crc32", it) }
         }
 
     companion object {
@@ -486,6 +611,7 @@ data class FileChunkMessage(
             FileChunkMessage(
                 seq = json.getInt("seq"),
                 data = json.getString("data"),
+                crc32 = if (json.has("crc32")) json.getLong("crc32") else null,
             )
     }
 }
@@ -496,17 +622,20 @@ data class FileChunkMessage(
 data class FileEndMessage(
     override val type: String = "file_end",
     val name: String,
+    val sha256: String? = null, // Hex SHA-256 of the whole file
 ) : JsonMessage() {
     override fun toJsonObject(): JSONObject =
         JSONObject().apply {
             put("type", type)
             put("name", name)
+            sha256?.let { put("sha256", it) }
         }
 
     companion object {
         fun fromJson(json: JSONObject): FileEndMessage =
             FileEndMessage(
                 name = json.getString("name"),
+                sha256 = if (json.has("sha256")) json.getString("sha256") else null,
             )
     }
 }
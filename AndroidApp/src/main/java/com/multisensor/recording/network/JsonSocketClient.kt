@@ -10,6 +10,8 @@ import kotlinx.coroutines.Job
 import kotlinx.coroutines.cancel
 import kotlinx.coroutines.delay
 import kotlinx.coroutines.launch
+import org.json.JSONException
+import org.json.JSONObject
 import java.io.BufferedInputStream
 import java.io.BufferedOutputStream
 import java.io.IOException
@@ -48,10 +50,25 @@ class JsonSocketClient
         // Callback for incoming commands
         private var commandCallback: ((JsonMessage) -> Unit)? = null
 
+        // Serializes frames written from different coroutines
+        private val writeLock = Any()
+
+        // Wire encoding of outgoing messages, chosen by the PC's handshake_ack
+        @Volatile
+        private var wireEncoding = WireEncoding.JSON
+
         companion object {
             private const val RECONNECT_DELAY_MS = 5000L
             private const val CONNECTION_TIMEOUT_MS = 10000
             private const val LENGTH_HEADER_SIZE = 4 // 4-byte length prefix
+
+            // Length header bit marking a raw binary file chunk
+            private const val BINARY_FRAME_FLAG = 0x80000000.toInt()
+            private const val CRC32_TRAILER_SIZE = 4
+
+            const val BINARY_FILE_TRANSFER_CAPABILITY = "binary_file_transfer"
+            const val FILE_TRANSFER_MODE_BINARY = "binary"
+            const val CHUNK_CHECKSUM_CRC32 = "crc32"
         }
 
         /**
@@ -131,27 +148,101 @@ class JsonSocketClient
 
             connectionScope?.launch {
                 try {
-                    val jsonString = JsonMessage.toJson(message)
-                    val jsonBytes = jsonString.toByteArray(Charsets.UTF_8)
+                    writeMessage(message)
+                } catch (e: IOException) {
+                    logger.error("Error sending message", e)
+                    handleConnectionError()
+                }
+            }
+        }
+
+        /**
+         * Send JSON message on the calling thread.
+         * Unlike sendMessage, messages sent this way keep their order relative
+         * to binary chunks, which the file transfer protocol relies on.
+         *
+         * @return true if the message was written to the socket
+         */
+        fun sendMessageNow(message: JsonMessage): Boolean {
+            if (!isConnected) {
+                logger.warning("Cannot send message - not connected to server")
+                return false
+            }
+
+            return try {
+                writeMessage(message)
+                true
+            } catch (e: IOException) {
+                logger.error("Error sending message", e)
+                false
+            }
+        }
+
+        /**
+         * Send a raw binary file chunk on the calling thread.
+         * Only valid after a file_info message with transfer_mode "binary".
+         *
+         * @param crc32 CRC32 appended as a 4-byte trailer if file_info negotiated chunk checksums
+         * @return true if the chunk was written to the socket
+         */
+        fun sendBinaryChunk(
+            data: ByteArray,
+            length: Int,
+            crc32: Long? = null,
+        ): Boolean {
+            if (!isConnected) {
+                logger.warning("Cannot send file chunk - not connected to server")
+                return false
+            }
 
-                    // Create length-prefixed message
-                    val lengthHeader =
+            return try {
+                if (crc32 != null) {
+                    val trailer =
                         ByteBuffer
-                            .allocate(LENGTH_HEADER_SIZE)
+                            .allocate(CRC32_TRAILER_SIZE)
                             .order(ByteOrder.BIG_ENDIAN)
-                            .putInt(jsonBytes.size)
+                            .putInt(crc32.toInt())
                             .array()
+                    writeFrame((length + CRC32_TRAILER_SIZE) or BINARY_FRAME_FLAG, data, length, trailer)
+                } else {
+                    writeFrame(length or BINARY_FRAME_FLAG, data, length)
+                }
+                true
+            } catch (e: IOException) {
+                logger.error("Error sending file chunk", e)
+                false
+            }
+        }
 
-                    // Send length header followed by JSON payload
-                    outputStream?.write(lengthHeader)
-                    outputStream?.write(jsonBytes)
-                    outputStream?.flush()
+        private fun writeMessage(message: JsonMessage) {
+            val payload = WireEncoding.encode(message.toJsonObject(), wireEncoding)
+            writeFrame(payload.size, payload, payload.size)
+            logger.debug("Sent message: ${message.type} (${payload.size} bytes)")
+        }
 
-                    logger.debug("Sent message: ${message.type} (${jsonBytes.size} bytes)")
-                } catch (e: IOException) {
-                    logger.error("Error sending message", e)
-                    handleConnectionError()
-                }
+        /**
+         * Write one length-prefixed frame
+         */
+        private fun writeFrame(
+            header: Int,
+            payload: ByteArray,
+            length: Int,
+            trailer: ByteArray? = null,
+        ) {
+            val lengthHeader =
+                ByteBuffer
+                    .allocate(LENGTH_HEADER_SIZE)
+                    .order(ByteOrder.BIG_ENDIAN)
+                    .putInt(header)
+                    .array()
+
+            synchronized(writeLock) {
+                val stream = outputStream ?: throw IOException("Not connected")
+                // Send length header followed by payload
+                stream.write(lengthHeader)
+                stream.write(payload, 0, length)
+                trailer?.let { stream.write(it) }
+                stream.flush()
             }
         }
 
@@ -166,6 +257,7 @@ class JsonSocketClient
                 HelloMessage(
                     device_id = deviceId,
                     capabilities = capabilities,
+                    encodings = WireEncoding.SUPPORTED,
                 )
             sendMessage(helloMessage)
         }
@@ -223,6 +315,7 @@ class JsonSocketClient
 
                     inputStream = BufferedInputStream(socket?.getInputStream())
                     outputStream = BufferedOutputStream(socket?.getOutputStream())
+                    wireEncoding = WireEncoding.JSON
                     isConnected = true
 
                     logger.info("Connected to PC server at $serverIp:$serverPort")
@@ -232,7 +325,7 @@ class JsonSocketClient
                         deviceId =
                             android.os.Build.MODEL + "_" +
                                 getDeviceSerial().takeLast(4),
-                        capabilities = listOf("rgb_video", "thermal", "shimmer"),
+                        capabilities = listOf("rgb_video", "thermal", "shimmer", BINARY_FILE_TRANSFER_CAPABILITY),
                     )
 
                     // Start listening for incoming messages
@@ -290,15 +383,26 @@ class JsonSocketClient
                         bytesRead += read
                     }
 
-                    // Parse and process JSON message
-                    val jsonString = String(messageBytes, Charsets.UTF_8)
-                    val message = JsonMessage.fromJson(jsonString)
+                    // Parse and process the message in whichever encoding it was sent
+                    val messageObject =
+                        try {
+                            WireEncoding.decode(messageBytes)
+                        } catch (e: JSONException) {
+                            logger.warning("Failed to decode message: ${e.message}")
+                            continue
+                        }
 
+                    if (messageObject.optString("type") == "handshake_ack") {
+                        handleHandshakeAck(messageObject)
+                        continue
+                    }
+
+                    val message = JsonMessage.fromJsonObject(messageObject)
                     if (message != null) {
                         logger.debug("Received message: ${message.type}")
                         commandCallback?.invoke(message)
                     } else {
-                        logger.warning("Failed to parse JSON message: $jsonString")
+                        logger.warning("Failed to parse message: $messageObject")
                     }
                 }
             } catch (e: IOException) {
@@ -307,6 +411,15 @@ class JsonSocketClient
             }
         }
 
+        /**
+         * Switch outgoing messages to the wire encoding the PC chose
+         */
+        private fun handleHandshakeAck(ack: JSONObject) {
+            val encoding = ack.optString("encoding", WireEncoding.JSON)
+            wireEncoding = if (encoding in WireEncoding.SUPPORTED) encoding else WireEncoding.JSON
+            logger.info("Using $wireEncoding wire encoding")
+        }
+
         /**
          * Handle connection errors and initiate reconnection
          */
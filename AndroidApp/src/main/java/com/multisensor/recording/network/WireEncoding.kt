@@ -0,0 +1,126 @@
+package com.multisensor.recording.network
+
+import org.json.JSONArray
+import org.json.JSONException
+import org.json.JSONObject
+import org.msgpack.core.MessagePack
+import org.msgpack.core.MessagePacker
+import org.msgpack.core.MessageUnpacker
+import org.msgpack.value.ValueType
+
+/**
+ * Wire encodings for messages exchanged with the PC.
+ *
+ * Messages are built as JSONObjects following protocol/message_schema.json; the
+ * encoding only decides how they are serialized into a frame. JSON is the default.
+ * MessagePack is used once the PC names it in the handshake_ack answering the
+ * encodings listed in the hello message.
+ *
+ * Received frames are decoded by their first byte (a JSON object starts with '{',
+ * a MessagePack map with 0x80-0x8f, 0xde or 0xdf), so JSON frames sent before the
+ * switch are still understood.
+ */
+object WireEncoding {
+    const val JSON = "json"
+    const val MSGPACK = "msgpack"
+
+    /**
+     * Encodings this client supports, in order of preference
+     */
+    val SUPPORTED = listOf(MSGPACK, JSON)
+
+    /**
+     * Serialize a message in the given encoding
+     */
+    fun encode(
+        message: JSONObject,
+        encoding: String,
+    ): ByteArray =
+        when (encoding) {
+            MSGPACK ->
+                MessagePack.newDefaultBufferPacker().use { packer ->
+                    packValue(packer, message)
+                    packer.toByteArray()
+                }
+            else -> message.toString().toByteArray(Charsets.UTF_8)
+        }
+
+    /**
+     * Deserialize a message in whichever supported encoding it was sent
+     *
+     * @throws JSONException if the message is malformed or not an object
+     */
+    fun decode(
+        data: ByteArray,
+        length: Int = data.size,
+    ): JSONObject {
+        if (length == 0 || !isMessagePackMap(data[0])) {
+            return JSONObject(String(data, 0, length, Charsets.UTF_8))
+        }
+
+        return try {
+            MessagePack.newDefaultUnpacker(data, 0, length).use { unpacker ->
+                unpackValue(unpacker) as JSONObject
+            }
+        } catch (e: Exception) {
+            throw JSONException("Invalid MessagePack message: ${e.message}")
+        }
+    }
+
+    private fun isMessagePackMap(firstByte: Byte): Boolean {
+        val value = firstByte.toInt() and 0xFF
+        return value in 0x80..0x8F || value == 0xDE || value == 0xDF
+    }
+
+    private fun packValue(
+        packer: MessagePacker,
+        value: Any?,
+    ) {
+        when (value) {
+            null, JSONObject.NULL -> packer.packNil()
+            is JSONObject -> {
+                packer.packMapHeader(value.length())
+                for (key in value.keys()) {
+                    packer.packString(key)
+                    packValue(packer, value.get(key))
+                }
+            }
+            is JSONArray -> {
+                packer.packArrayHeader(value.length())
+                for (i in 0 until value.length()) {
+                    packValue(packer, value.get(i))
+                }
+            }
+            is String -> packer.packString(value)
+            is Boolean -> packer.packBoolean(value)
+            is Int, is Long, is Short, is Byte -> packer.packLong((value as Number).toLong())
+            is Number -> packer.packDouble(value.toDouble())
+            else -> packer.packString(value.toString())
+        }
+    }
+
+    private fun unpackValue(unpacker: MessageUnpacker): Any =
+        when (val valueType = unpacker.nextFormat.valueType) {
+            ValueType.NIL -> {
+                unpacker.unpackNil()
+                JSONObject.NULL
+            }
+            ValueType.BOOLEAN -> unpacker.unpackBoolean()
+            ValueType.INTEGER -> unpacker.unpackLong()
+            ValueType.FLOAT -> unpacker.unpackDouble()
+            ValueType.STRING -> unpacker.unpackString()
+            ValueType.ARRAY -> {
+                val size = unpacker.unpackArrayHeader()
+                JSONArray().apply {
+                    repeat(size) { put(unpackValue(unpacker)) }
+                }
+            }
+            ValueType.MAP -> {
+                val size = unpacker.unpackMapHeader()
+                JSONObject().apply {
+                    repeat(size) { put(unpacker.unpackString(), unpackValue(unpacker)) }
+                }
+            }
+            else -> throw JSONException("Unsupported MessagePack type: $valueType")
+        }
+}
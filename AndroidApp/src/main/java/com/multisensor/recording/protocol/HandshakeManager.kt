@@ -3,6 +3,8 @@ package com.multisensor.recording.protocol
 import android.content.Context
 import android.util.Log
 import com.multisensor.recording.config.CommonConstants
+import com.multisensor.recording.network.WireEncoding
+import org.json.JSONArray
 import org.json.JSONObject
 import java.io.OutputStream
 import java.net.Socket
@@ -13,6 +15,9 @@ import java.net.Socket
  * This class implements the handshake protocol described in to ensure
  * compatibility between Android and Python applications by exchanging protocol
  * version information at connection start.
+ *
+ * The handshake also lists the wire encodings this device supports; the
+ * acknowledgment names the one to use for the rest of the connection.
  */
 class HandshakeManager(
     private val context: Context,
@@ -109,8 +114,20 @@ class HandshakeManager(
             put("device_name", getDeviceName())
             put("app_version", CommonConstants.APP_VERSION)
             put("device_type", "android")
+            put("encodings", JSONArray(WireEncoding.SUPPORTED))
         }
 
+    /**
+     * Get the wire encoding chosen in a handshake acknowledgment.
+     *
+     * @param ackMessage JSON object containing handshake acknowledgment
+     * @return The negotiated encoding, or JSON if none was chosen or it is not supported
+     */
+    fun getNegotiatedEncoding(ackMessage: JSONObject): String {
+        val encoding = ackMessage.optString("encoding", WireEncoding.JSON)
+        return if (encoding in WireEncoding.SUPPORTED) encoding else WireEncoding.JSON
+    }
+
     /**
      * Get a human-readable device name.
      *
@@ -152,12 +169,14 @@ class HandshakeManager(
      * @param clientProtocolVersion Protocol version from client handshake
      * @param compatible Whether the versions are compatible
      * @param message Optional message about compatibility status
+     * @param encoding Negotiated wire encoding, if the client offered any
      * @return JSONObject containing handshake acknowledgment
      */
     fun createHandshakeAck(
         clientProtocolVersion: Int,
         compatible: Boolean,
         message: String = "",
+        encoding: String? = null,
     ): JSONObject =
         schemaManager.createMessage("handshake_ack").apply {
             put("protocol_version", CommonConstants.PROTOCOL_VERSION)
@@ -167,5 +186,6 @@ class HandshakeManager(
             if (message.isNotEmpty()) {
                 put("message", message)
             }
+            encoding?.let { put("encoding", it) }
         }
 }
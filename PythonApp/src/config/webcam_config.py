@@ -15,6 +15,8 @@ Milestone: 3.3 - Webcam Capture Integration (Advanced Configuration)
 import cv2
 import json
 import os
+import shutil
+import subprocess
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
@@ -37,6 +39,79 @@ class VideoCodec(Enum):
     X264 = "X264"
 
 
+class RecordingBackend(Enum):
+    """Video recording backends."""
+
+    OPENCV = "opencv"  # cv2.VideoWriter
+    FFMPEG = "ffmpeg"  # Raw frames piped to an ffmpeg subprocess
+
+
+# libx264/libx265 presets, fastest first; other encoders map these names to their own
+X264_PRESETS = (
+    "ultrafast", "superfast", "veryfast", "faster", "fast",
+    "medium", "slow", "slower", "veryslow", "placebo",
+)
+
+# NVENC takes p1 (fastest) to p7 (best quality) instead of the x264 names
+NVENC_PRESETS = {
+    "ultrafast": "p1", "superfast": "p1", "veryfast": "p2", "faster": "p3", "fast": "p3",
+    "medium": "p4", "slow": "p5", "slower": "p6", "veryslow": "p7", "placebo": "p7",
+}
+
+# Quick Sync has the x264 names from veryfast to veryslow
+QSV_PRESETS = {
+    "ultrafast": "veryfast", "superfast": "veryfast", "veryfast": "veryfast", "faster": "faster",
+    "fast": "fast", "medium": "medium", "slow": "slow", "slower": "slower",
+    "veryslow": "veryslow", "placebo": "veryslow",
+}
+
+
+class FFmpegCodec(Enum):
+    """Encoders usable with the ffmpeg recording backend."""
+
+    LIBX264 = "libx264"
+    LIBX265 = "libx265"
+    H264_NVENC = "h264_nvenc"
+    HEVC_NVENC = "hevc_nvenc"
+    H264_QSV = "h264_qsv"
+    H264_VAAPI = "h264_vaapi"
+
+    @property
+    def is_hardware(self) -> bool:
+        """Whether the encoder runs on a GPU or media engine."""
+        return self not in (FFmpegCodec.LIBX264, FFmpegCodec.LIBX265)
+
+    def encoder_preset(self, preset: str) -> Optional[str]:
+        """
+        Get the encoder's own name for a speed preset.
+
+        Presets are configured with the x264 names; NVENC also takes p1-p7.
+
+        Args:
+            preset (str): Configured preset
+
+        Returns:
+            Optional[str]: Preset to pass to the encoder, None if it takes no preset
+
+        Raises:
+            ValueError: If the encoder has no such preset
+        """
+        if self == FFmpegCodec.H264_VAAPI:
+            return None
+        if self in (FFmpegCodec.H264_NVENC, FFmpegCodec.HEVC_NVENC):
+            if preset in NVENC_PRESETS.values():
+                return preset
+            presets = NVENC_PRESETS
+        elif self == FFmpegCodec.H264_QSV:
+            presets = QSV_PRESETS
+        else:
+            presets = {name: name for name in X264_PRESETS}
+
+        if preset not in presets:
+            raise ValueError(f"Unknown preset {preset!r} for {self.value}")
+        return presets[preset]
+
+
 class ResolutionPreset(Enum):
     """Common resolution presets."""
 
@@ -70,6 +145,13 @@ class RecordingConfig:
     fps: int = 30
     quality: int = 80  # 0-100 quality scale
     file_format: str = "mp4"
+    backend: RecordingBackend = RecordingBackend.OPENCV
+    # ffmpeg backend settings
+    ffmpeg_codec: FFmpegCodec = FFmpegCodec.LIBX264
+    preset: str = "veryfast"
+    crf: int = 23  # Constant rate factor, lower is better quality
+    threads: int = 0  # 0 lets the encoder choose
+    lossless: bool = False
 
 
 @dataclass
@@ -349,6 +431,68 @@ class CodecValidator:
             except:
                 pass
 
+    _ffmpeg_codec_results: Dict[str, bool] = {}
+
+    @staticmethod
+    def find_ffmpeg(ffmpeg_path: str = "ffmpeg") -> Optional[str]:
+        """Get the full path of the ffmpeg executable, or None if not installed."""
+        return shutil.which(ffmpeg_path)
+
+    @staticmethod
+    def test_ffmpeg_codec(codec: FFmpegCodec,
+                          ffmpeg_path: str = "ffmpeg",
+                          preset: Optional[str] = None) -> bool:
+        """
+        Test if ffmpeg can encode with a codec.
+
+        Encodes a few frames of a generated test pattern without writing a
+        file, which also catches hardware encoders without a usable device.
+        Results are cached per executable, codec and preset.
+
+        Args:
+            codec (FFmpegCodec): Encoder to test
+            ffmpeg_path (str): ffmpeg executable
+            preset (Optional[str]): Preset to test the encoder with
+
+        Returns:
+            bool: True if the encoder works
+        """
+        executable = CodecValidator.find_ffmpeg(ffmpeg_path)
+        if not executable:
+            return False
+
+        encoder_preset = None
+        if preset is not None:
+            try:
+                encoder_preset = codec.encoder_preset(preset)
+            except ValueError as e:
+                print(f"[DEBUG_LOG] {e}")
+                return False
+        preset_args = ["-preset", encoder_preset] if encoder_preset else []
+
+        key = f"{executable}:{codec.value}:{encoder_preset or ''}"
+        if key not in CodecValidator._ffmpeg_codec_results:
+            try:
+                result = subprocess.run(
+                    [executable, "-hide_banner", "-loglevel", "error",
+                     "-f", "lavfi", "-i", "testsrc=size=256x256:rate=30",
+                     "-frames:v", "3", "-c:v", codec.value, *preset_args, "-f", "null", "-"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=20,
+                )
+                CodecValidator._ffmpeg_codec_results[key] = result.returncode == 0
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"[DEBUG_LOG] ffmpeg codec test failed for {codec.value}: {e}")
+                CodecValidator._ffmpeg_codec_results[key] = False
+
+        return CodecValidator._ffmpeg_codec_results[key]
+
+    @staticmethod
+    def get_available_ffmpeg_codecs(ffmpeg_path: str = "ffmpeg") -> List[FFmpegCodec]:
+        """Get list of encoders usable with the ffmpeg backend."""
+        if not CodecValidator.find_ffmpeg(ffmpeg_path):
+            return []
+        return [codec for codec in FFmpegCodec if CodecValidator.test_ffmpeg_codec(codec, ffmpeg_path)]
+
     @staticmethod
     def get_available_codecs() -> List[VideoCodec]:
         """Get list of available and working codecs."""
@@ -506,6 +650,28 @@ class WebcamConfigManager:
             bool: True if configuration was updated successfully
         """
         try:
+            # The ffmpeg encoder, preset and lossless mode are checked together
+            # before anything changes, since ffmpeg rejects a bad combination
+            # only once recording starts
+            recording = self.config.recording
+            ffmpeg_codec = recording.ffmpeg_codec
+            preset = str(kwargs.get("preset", recording.preset))
+            lossless = bool(kwargs.get("lossless", recording.lossless))
+
+            if "ffmpeg_codec" in kwargs:
+                requested = FFmpegCodec(kwargs["ffmpeg_codec"])
+                if CodecValidator.test_ffmpeg_codec(requested, preset=preset):
+                    ffmpeg_codec = requested
+                else:
+                    print(
+                        f"[DEBUG_LOG] ffmpeg encoder {requested.value} not available with preset "
+                        f"{preset}, keeping {ffmpeg_codec.value}"
+                    )
+
+            ffmpeg_codec.encoder_preset(preset)
+            if lossless and ffmpeg_codec.is_hardware:
+                raise ValueError(f"Lossless encoding is not supported with {ffmpeg_codec.value}")
+
             if "codec" in kwargs:
                 codec_value = kwargs["codec"]
                 if isinstance(codec_value, str):
@@ -544,6 +710,23 @@ class WebcamConfigManager:
             if "file_format" in kwargs:
                 self.config.recording.file_format = kwargs["file_format"]
 
+            recording.ffmpeg_codec = ffmpeg_codec
+            recording.preset = preset
+            recording.lossless = lossless
+
+            if "crf" in kwargs:
+                self.config.recording.crf = max(0, min(51, int(kwargs["crf"])))
+
+            if "threads" in kwargs:
+                self.config.recording.threads = max(0, int(kwargs["threads"]))
+
+            if "backend" in kwargs:
+                backend = RecordingBackend(kwargs["backend"])
+                if backend == RecordingBackend.FFMPEG and not CodecValidator.find_ffmpeg():
+                    print("[DEBUG_LOG] ffmpeg not found, using OpenCV recording backend")
+                    backend = RecordingBackend.OPENCV
+                self.config.recording.backend = backend
+
             self.save_config()
             print("[DEBUG_LOG] Recording configuration updated")
             return True
@@ -617,6 +800,12 @@ class WebcamConfigManager:
                     "fps": self.config.recording.fps,
                     "quality": self.config.recording.quality,
                     "file_format": self.config.recording.file_format,
+                    "backend": self.config.recording.backend.value,
+                    "ffmpeg_codec": self.config.recording.ffmpeg_codec.value,
+                    "preset": self.config.recording.preset,
+                    "crf": self.config.recording.crf,
+                    "threads": self.config.recording.threads,
+                    "lossless": self.config.recording.lossless,
                 },
                 "preview": asdict(self.config.preview),
                 "auto_detect_cameras": self.config.auto_detect_cameras,
@@ -662,6 +851,16 @@ class WebcamConfigManager:
                 self.config.recording.file_format = recording_dict.get(
                     "file_format", "mp4"
                 )
+                self.config.recording.backend = RecordingBackend(
+                    recording_dict.get("backend", "opencv")
+                )
+                self.config.recording.ffmpeg_codec = FFmpegCodec(
+                    recording_dict.get("ffmpeg_codec", "libx264")
+                )
+                self.config.recording.preset = recording_dict.get("preset", "veryfast")
+                self.config.recording.crf = recording_dict.get("crf", 23)
+                self.config.recording.threads = recording_dict.get("threads", 0)
+                self.config.recording.lossless = recording_dict.get("lossless", False)
 
                 # Load preview config
                 preview_dict = config_dict.get("preview", {})
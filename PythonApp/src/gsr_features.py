@@ -0,0 +1,345 @@
+"""
+GSR Feature Extraction - streaming tonic/phasic decomposition and SCR detection
+
+The streaming extractor is fed one skin conductance sample at a time from the
+Shimmer ingest path and keeps only a fixed amount of state, so every update is
+O(1) regardless of how long the session has been running:
+
+- the raw signal is smoothed with a first-order low-pass filter
+  (``smoothing_cutoff_hz``) to suppress sensor noise;
+- the tonic component (skin conductance level, SCL) is a second first-order
+  low-pass filter (``tonic_cutoff_hz``) of the smoothed signal, and the
+  phasic component is the smoothed signal minus the tonic component;
+- skin conductance responses (SCRs) are detected on the first derivative of
+  the smoothed signal: an onset is where the slope rises above
+  ``onset_slope`` and the peak is the last sample before the slope drops to
+  zero or below. Responses smaller than ``min_amplitude`` are discarded.
+
+Features are published every ``publish_interval`` seconds of sample time.
+``extract_gsr_features_batch`` implements the same model over a whole
+recording with vectorized filters and serves as the reference for the
+streaming implementation.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-03
+"""
+
+import csv
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+@dataclass
+class SCREvent:
+    """Skin conductance response detected in the smoothed GSR signal"""
+
+    onset_time: float
+    peak_time: float
+    onset_value: float
+    peak_value: float
+
+    @property
+    def amplitude(self) -> float:
+        """Rise from onset to peak in microsiemens"""
+        return self.peak_value - self.onset_value
+
+    @property
+    def rise_time(self) -> float:
+        """Time from onset to peak in seconds"""
+        return self.peak_time - self.onset_time
+
+
+@dataclass
+class GSRFeatures:
+    """Features published by the streaming extractor for one interval"""
+
+    timestamp: float
+    interval_seconds: float
+    samples: int
+    scl: float
+    phasic: float
+    phasic_max: float
+    scr_count: int
+    scr_amplitude_mean: Optional[float] = None
+    scr_rise_time_mean: Optional[float] = None
+    scr_events: List[SCREvent] = field(default_factory=list)
+
+
+def _low_pass_alpha(cutoff_hz: float, sampling_rate: float) -> float:
+    """Smoothing factor of a first-order low-pass filter"""
+    return 1.0 - math.exp(-2.0 * math.pi * cutoff_hz / sampling_rate)
+
+
+class StreamingGSRFeatureExtractor:
+    """
+    Incremental GSR decomposition and SCR detection for one device
+
+    Call ``update`` for every sample; it returns a GSRFeatures object when a
+    publish interval has elapsed and None otherwise.
+    """
+
+    def __init__(
+        self,
+        sampling_rate: float,
+        tonic_cutoff_hz: float = 0.05,
+        smoothing_cutoff_hz: float = 1.0,
+        onset_slope: float = 0.05,
+        min_amplitude: float = 0.01,
+        publish_interval: float = 1.0,
+    ):
+        """
+        Initialize the extractor
+
+        Args:
+            sampling_rate: Nominal sampling rate in Hz
+            tonic_cutoff_hz: Cutoff of the tonic (SCL) low-pass filter
+            smoothing_cutoff_hz: Cutoff of the noise smoothing filter
+            onset_slope: Slope in microsiemens/s that marks an SCR onset
+            min_amplitude: Smallest SCR amplitude in microsiemens to report
+            publish_interval: Seconds of sample time between published features
+        """
+        if sampling_rate <= 0:
+            raise ValueError("sampling_rate must be positive")
+
+        self.sampling_rate = float(sampling_rate)
+        self.tonic_cutoff_hz = tonic_cutoff_hz
+        self.smoothing_cutoff_hz = smoothing_cutoff_hz
+        self.onset_slope = onset_slope
+        self.min_amplitude = min_amplitude
+        self.publish_interval = publish_interval
+
+        self._smoothing_alpha = _low_pass_alpha(smoothing_cutoff_hz, self.sampling_rate)
+        self._tonic_alpha = _low_pass_alpha(tonic_cutoff_hz, self.sampling_rate)
+
+        # Filter state
+        self.smoothed: Optional[float] = None
+        self.tonic: Optional[float] = None
+        self.phasic = 0.0
+        self._previous_time = 0.0
+
+        # SCR detector state
+        self._rising = False
+        self._onset_time = 0.0
+        self._onset_value = 0.0
+
+        # Accumulators for the current publish interval
+        self._interval_start: Optional[float] = None
+        self._interval_samples = 0
+        self._interval_phasic_max = -math.inf
+        self._interval_events: List[SCREvent] = []
+
+        self.samples_processed = 0
+        self.latest_features: Optional[GSRFeatures] = None
+
+    def update(self, timestamp: float, conductance: Optional[float]) -> Optional[GSRFeatures]:
+        """
+        Process one sample
+
+        Args:
+            timestamp: Sample time in seconds
+            conductance: Skin conductance in microsiemens; None/NaN are skipped
+
+        Returns:
+            GSRFeatures when a publish interval completed, otherwise None
+        """
+        if conductance is None or conductance != conductance:
+            return None
+
+        if self.smoothed is None:
+            # Start the filters in steady state at the first sample
+            self.smoothed = self.tonic = float(conductance)
+            self._previous_time = timestamp
+            self._interval_start = timestamp
+        else:
+            previous = self.smoothed
+            self.smoothed = previous + self._smoothing_alpha * (conductance - previous)
+            self.tonic += self._tonic_alpha * (self.smoothed - self.tonic)
+            self.phasic = self.smoothed - self.tonic
+
+            slope = (self.smoothed - previous) * self.sampling_rate
+            if self._rising:
+                if slope <= 0.0:
+                    self._rising = False
+                    if previous - self._onset_value >= self.min_amplitude:
+                        self._interval_events.append(
+                            SCREvent(
+                                self._onset_time,
+                                self._previous_time,
+                                self._onset_value,
+                                previous,
+                            )
+                        )
+            elif slope > self.onset_slope:
+                self._rising = True
+                self._onset_time = self._previous_time
+                self._onset_value = previous
+            self._previous_time = timestamp
+
+        self.samples_processed += 1
+        self._interval_samples += 1
+        if self.phasic > self._interval_phasic_max:
+            self._interval_phasic_max = self.phasic
+
+        if timestamp - self._interval_start >= self.publish_interval:
+            return self._publish(timestamp)
+        return None
+
+    def _publish(self, timestamp: float) -> GSRFeatures:
+        """Summarize and reset the current publish interval"""
+        events = self._interval_events
+        features = GSRFeatures(
+            timestamp=timestamp,
+            interval_seconds=timestamp - self._interval_start,
+            samples=self._interval_samples,
+            scl=self.tonic,
+            phasic=self.phasic,
+            phasic_max=self._interval_phasic_max,
+            scr_count=len(events),
+            scr_amplitude_mean=(
+                sum(e.amplitude for e in events) / len(events) if events else None
+            ),
+            scr_rise_time_mean=(
+                sum(e.rise_time for e in events) / len(events) if events else None
+            ),
+            scr_events=events,
+        )
+
+        self._interval_start = timestamp
+        self._interval_samples = 0
+        self._interval_phasic_max = -math.inf
+        self._interval_events = []
+        self.latest_features = features
+        return features
+
+
+def _first_order_low_pass(x: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """Vectorized y[n] = y[n-1] + alpha * (x[n] - y[n-1]) with y[0] = initial"""
+    if SCIPY_AVAILABLE:
+        y, _ = lfilter([alpha], [1.0, alpha - 1.0], x[1:], zi=[(1.0 - alpha) * initial])
+        return np.concatenate(([initial], y))
+
+    y = np.empty_like(x)
+    y[0] = initial
+    for i in range(1, len(x)):
+        y[i] = y[i - 1] + alpha * (x[i] - y[i - 1])
+    return y
+
+
+def extract_gsr_features_batch(
+    timestamps: np.ndarray,
+    conductance: np.ndarray,
+    sampling_rate: float,
+    tonic_cutoff_hz: float = 0.05,
+    smoothing_cutoff_hz: float = 1.0,
+    onset_slope: float = 0.05,
+    min_amplitude: float = 0.01,
+) -> Dict[str, Any]:
+    """
+    Decompose a complete GSR recording and detect SCRs (reference implementation)
+
+    Uses the same model and parameters as StreamingGSRFeatureExtractor. Samples
+    with a NaN conductance are dropped first, as the streaming extractor skips
+    them.
+
+    Args:
+        timestamps: Sample times in seconds
+        conductance: Skin conductance in microsiemens
+        sampling_rate: Nominal sampling rate in Hz
+        tonic_cutoff_hz: Cutoff of the tonic (SCL) low-pass filter
+        smoothing_cutoff_hz: Cutoff of the noise smoothing filter
+        onset_slope: Slope in microsiemens/s that marks an SCR onset
+        min_amplitude: Smallest SCR amplitude in microsiemens to report
+
+    Returns:
+        Dict[str, Any]: "timestamps", "smoothed", "tonic" and "phasic" arrays
+        and the list of "scr_events"
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    conductance = np.asarray(conductance, dtype=np.float64)
+    valid = ~np.isnan(conductance)
+    timestamps = timestamps[valid]
+    conductance = conductance[valid]
+
+    result: Dict[str, Any] = {
+        "timestamps": timestamps,
+        "smoothed": conductance.copy(),
+        "tonic": conductance.copy(),
+        "phasic": np.zeros_like(conductance),
+        "scr_events": [],
+    }
+    if len(conductance) < 2:
+        return result
+
+    smoothed = _first_order_low_pass(
+        conductance, _low_pass_alpha(smoothing_cutoff_hz, sampling_rate), conductance[0]
+    )
+    tonic = _first_order_low_pass(
+        smoothed, _low_pass_alpha(tonic_cutoff_hz, sampling_rate), smoothed[0]
+    )
+    result.update(smoothed=smoothed, tonic=tonic, phasic=smoothed - tonic)
+
+    # slope[i] is the slope between samples i and i + 1. Label slopes that
+    # can start a response (+1) or end one (-1); the detector alternates
+    # between the two, so responses are the first sample of each run of equal
+    # labels, paired as (onset, peak).
+    slope = np.diff(smoothed) * sampling_rate
+    labels = np.where(slope > onset_slope, 1, np.where(slope <= 0.0, -1, 0))
+    positions = np.flatnonzero(labels)
+    labels = labels[positions]
+    run_starts = np.ones(len(labels), dtype=bool)
+    run_starts[1:] = labels[1:] != labels[:-1]
+    positions = positions[run_starts]
+    labels = labels[run_starts]
+    if len(labels) and labels[0] < 0:
+        positions = positions[1:]
+    onsets = positions[0::2]
+    peaks = positions[1::2]
+    onsets = onsets[: len(peaks)]
+
+    amplitudes = smoothed[peaks] - smoothed[onsets]
+    keep = amplitudes >= min_amplitude
+    events = [
+        SCREvent(float(t0), float(t1), float(v0), float(v1))
+        for t0, t1, v0, v1 in zip(
+            timestamps[onsets[keep]],
+            timestamps[peaks[keep]],
+            smoothed[onsets[keep]],
+            smoothed[peaks[keep]],
+        )
+    ]
+
+    result["scr_events"] = events
+    return result
+
+
+def load_gsr_csv(csv_path: Union[str, Path]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load timestamps and GSR conductance from a Shimmer CSV recording
+
+    Args:
+        csv_path: Path to a ``<device_id>_data.csv`` recording
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Timestamps and conductance (NaN where empty)
+    """
+    timestamps = []
+    conductance = []
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            if not row.get("timestamp"):
+                continue
+            timestamps.append(float(row["timestamp"]))
+            value = row.get("gsr_conductance")
+            conductance.append(float(value) if value else math.nan)
+    return np.array(timestamps, dtype=np.float64), np.array(conductance, dtype=np.float64)
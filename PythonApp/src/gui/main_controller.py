@@ -47,6 +47,7 @@ class MainController(QObject):
     preview_frame_received = pyqtSignal(str, str, str)  # device_id, frame_type, base64_data
     webcam_frame_ready = pyqtSignal(object)  # QPixmap
     sensor_data_received = pyqtSignal(str, dict)  # device_id, sensor_data
+    sensor_batch_received = pyqtSignal(str, dict)  # device_id, sensor_batch
     
     # Event Signals
     recording_started = pyqtSignal(str)  # session_id
@@ -124,6 +125,7 @@ class MainController(QObject):
         self._json_server.ack_received.connect(self._on_ack_received)
         self._json_server.preview_frame_received.connect(self._on_preview_frame_received)
         self._json_server.sensor_data_received.connect(self._on_sensor_data_received)
+        self._json_server.sensor_batch_received.connect(self._on_sensor_batch_received)
         self._json_server.notification_received.connect(self._on_notification_received)
         self._json_server.error_occurred.connect(self._on_server_error)
         
@@ -427,6 +429,10 @@ class MainController(QObject):
         """Handle sensor data."""
         self.sensor_data_received.emit(device_id, sensor_data)
     
+    def _on_sensor_batch_received(self, device_id: str, sensor_batch: dict):
+        """Handle a batch of sensor samples."""
+        self.sensor_batch_received.emit(device_id, sensor_batch)
+    
     def _on_notification_received(self, device_id: str, event_type: str, event_data: dict):
         """Handle device notifications."""
         self.logger.debug(f"Notification from {device_id}: {event_type}")
@@ -65,6 +65,7 @@ class MainWindow(QMainWindow):
         # Initialize network server with session manager integration
         self.json_server = JsonSocketServer(session_manager=self.session_manager)
         self.server_running = False
+        self.file_transfer_throughput = 0.0
 
         # Initialize webcam capture
         self.webcam_capture = WebcamCapture()
@@ -288,9 +289,16 @@ class MainWindow(QMainWindow):
         self.json_server.ack_received.connect(self.on_ack_received)
         self.json_server.preview_frame_received.connect(self.on_preview_frame_received)
         self.json_server.sensor_data_received.connect(self.on_sensor_data_received)
+        self.json_server.sensor_batch_received.connect(self.on_sensor_batch_received)
         self.json_server.notification_received.connect(self.on_notification_received)
         self.json_server.error_occurred.connect(self.on_server_error)
 
+        file_collector = self.json_server.file_collector
+        file_collector.transfer_progress.connect(self.on_file_transfer_progress)
+        file_collector.throughput_updated.connect(self.on_file_transfer_throughput)
+        file_collector.transfer_finished.connect(self.on_file_transfer_finished)
+        file_collector.collection_finished.connect(self.on_file_collection_finished)
+
         self.log_message("Server signals connected to GUI handlers")
 
     def connect_webcam_signals(self):
@@ -539,6 +547,16 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.log_message(f"Error processing sensor data from {device_id}: {e}")
 
+    def on_sensor_batch_received(self, device_id, sensor_batch):
+        """Handle a batch of sensor samples from device."""
+        timestamps = sensor_batch.get("timestamps", [])
+        if not timestamps:
+            return
+        # The device panel only shows the latest values, so update it once per batch
+        latest = {name: values[-1] for name, values in sensor_batch.get("channels", {}).items()}
+        latest["timestamp"] = timestamps[-1]
+        self.on_sensor_data_received(device_id, latest)
+
     def on_notification_received(self, device_id, event_type, event_data):
         """Handle notification from device."""
         self.log_message(f"Notification from {device_id}: {event_type} - {event_data}")
@@ -549,6 +567,35 @@ class MainWindow(QMainWindow):
         self.log_message(f"Server error for {device_id}: {error_message}")
         self.statusBar().showMessage(f"Error: {error_message}")
 
+    # File collection signal handlers
+    def on_file_transfer_progress(self, device_id, filename, received, total):
+        """Handle progress of a session file transfer."""
+        progress = received * 100.0 / total if total else 0.0
+        self.statusBar().showMessage(
+            f"Collecting {filename} from {device_id}: {progress:.0f}% "
+            f"({self.file_transfer_throughput / 1e6:.1f} MB/s)"
+        )
+
+    def on_file_transfer_throughput(self, bytes_per_second):
+        """Handle aggregate throughput of session file transfers."""
+        self.file_transfer_throughput = bytes_per_second
+
+    def on_file_transfer_finished(self, device_id, filename, success, error):
+        """Handle a finished session file transfer."""
+        if success:
+            self.log_message(f"Received {filename} from {device_id}")
+        else:
+            self.log_message(f"Failed to collect {filename} from {device_id}: {error}")
+
+    def on_file_collection_finished(self, completed, failed):
+        """Handle the end of session file collection."""
+        self.log_message(
+            f"File collection finished: {completed} files received, {failed} failed"
+        )
+        self.statusBar().showMessage(
+            f"File collection finished: {completed} received, {failed} failed"
+        )
+
     # Webcam signal handlers
     def on_webcam_frame_ready(self, pixmap):
         """Handle new frame from webcam for preview."""
@@ -1026,10 +1073,10 @@ class MainWindow(QMainWindow):
 
             if file_count > 0:
                 self.log_message(
-                    f"Initiated file collection for session {session_id}: {file_count} file requests sent"
+                    f"Initiated file collection for session {session_id}: {file_count} files queued"
                 )
                 self.statusBar().showMessage(
-                    f"Collecting session files... ({file_count} requests)"
+                    f"Collecting session files... ({file_count} queued)"
                 )
             else:
                 self.log_message(
@@ -24,12 +24,18 @@ import ntplib
 import socket
 import threading
 import time
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from typing import Dict, List, Optional, Callable, Set
 from concurrent.futures import ThreadPoolExecutor
 
 # Import existing modules
-from network.pc_server import PCServer, JsonMessage, StartRecordCommand, StopRecordCommand
+from network.pc_server import (
+    BroadcastResult,
+    PCServer,
+    JsonMessage,
+    StartRecordCommand,
+    StopRecordCommand,
+)
 from ntp_time_server import NTPTimeServer
 from utils.logging_config import get_logger
 
@@ -69,6 +75,7 @@ class RecordingSession:
     android_files: Dict[str, List[str]]  # device_id -> list of files
     is_active: bool
     sync_quality: float
+    dispatch_skew_ms: Dict[str, float] = field(default_factory=dict)  # device_id -> start command skew
 
 
 class MasterClockSynchronizer:
@@ -118,6 +125,7 @@ class MasterClockSynchronizer:
         # Configuration
         self.sync_tolerance_ms = 50.0  # Max allowed time difference
         self.quality_threshold = 0.8  # Minimum sync quality for recording
+        self.scheduled_start_margin = 0.25  # seconds added to the slowest device's latency
         
         # Setup server callbacks
         self.pc_server.add_device_callback(self._on_device_connected)
@@ -193,16 +201,23 @@ class MasterClockSynchronizer:
                                    target_devices: Optional[List[str]] = None,
                                    record_video: bool = True,
                                    record_thermal: bool = True,
-                                   record_shimmer: bool = False) -> bool:
+                                   record_shimmer: bool = False,
+                                   scheduled_start: bool = False) -> bool:
         """
         Start synchronized recording across all devices.
         
+        The start command is sent to all Android devices concurrently and
+        latency-aligned. With scheduled_start the command also carries a
+        master start time far enough ahead for the slowest device to receive
+        it, and devices start recording at that time rather than on receipt.
+        
         Args:
             session_id: Unique session identifier
             target_devices: Specific devices to record from (None = all connected)
             record_video: Record video from Android cameras
             record_thermal: Record thermal camera data
             record_shimmer: Record shimmer sensor data
+            scheduled_start: Start all devices at a common future master time
             
         Returns:
             bool: True if recording started successfully
@@ -232,8 +247,19 @@ class MasterClockSynchronizer:
                 self.logger.warning(f"Devices with poor sync quality: {poor_sync_devices}")
                 # Continue anyway, but log the warning
                 
+            # Send start recording commands to Android devices
+            android_devices = [d for d in target_devices 
+                             if d in self.connected_devices and 
+                             self.connected_devices[d].device_type == 'android']
+            latencies_ms = self._estimate_latencies(android_devices)
+            
             # Get master timestamp for synchronized start
             master_timestamp = self.get_master_timestamp()
+            start_at_ms = None
+            if scheduled_start:
+                slowest = max(latencies_ms.values(), default=0.0) / 1000.0
+                master_timestamp += 2 * slowest + self.scheduled_start_margin
+                start_at_ms = int(master_timestamp * 1000)
             
             # Create recording session
             session = RecordingSession(
@@ -248,25 +274,19 @@ class MasterClockSynchronizer:
             
             self.active_sessions[session_id] = session
             
-            # Send start recording commands to Android devices
-            android_devices = [d for d in target_devices 
-                             if d in self.connected_devices and 
-                             self.connected_devices[d].device_type == 'android']
-            
-            for device_id in android_devices:
+            if android_devices:
                 start_cmd = StartRecordCommand(
                     session_id=session_id,
                     record_video=record_video,
                     record_thermal=record_thermal,
-                    record_shimmer=record_shimmer
+                    record_shimmer=record_shimmer,
+                    start_at_ms=start_at_ms
                 )
                 start_cmd.timestamp = master_timestamp
                 
-                success = self.pc_server.send_message(device_id, start_cmd)
-                if not success:
-                    self.logger.error(f"Failed to send start command to {device_id}")
-                else:
-                    self.logger.info(f"Start recording command sent to {device_id}")
+                result = self.pc_server.dispatch_message(start_cmd, android_devices, latencies_ms)
+                session.dispatch_skew_ms = dict(result.dispatch_skew_ms)
+                self._log_dispatch("Start recording", result)
             
             # Notify webcam components via callbacks
             for callback in self.webcam_sync_callbacks:
@@ -319,15 +339,14 @@ class MasterClockSynchronizer:
                              if d in self.connected_devices and 
                              self.connected_devices[d].device_type == 'android']
             
-            for device_id in android_devices:
+            if android_devices:
                 stop_cmd = StopRecordCommand()
                 stop_cmd.timestamp = master_timestamp
                 
-                success = self.pc_server.send_message(device_id, stop_cmd)
-                if not success:
-                    self.logger.error(f"Failed to send stop command to {device_id}")
-                else:
-                    self.logger.info(f"Stop recording command sent to {device_id}")
+                result = self.pc_server.dispatch_message(
+                    stop_cmd, android_devices, self._estimate_latencies(android_devices)
+                )
+                self._log_dispatch("Stop recording", result)
             
             # Mark session as inactive
             session.is_active = False
@@ -344,6 +363,32 @@ class MasterClockSynchronizer:
             self.logger.error(f"Error stopping synchronized recording: {e}")
             return False
 
+    def _estimate_latencies(self, device_ids: List[str]) -> Dict[str, float]:
+        """
+        Estimate each device's one-way latency in ms for latency-aligned dispatch.
+        
+        A synchronized device's clock agrees with the master clock within the
+        sync tolerance, so the measured time offset of its messages is mostly
+        transmission latency. Devices that are not synchronized get no
+        estimate and are treated as having none.
+        """
+        latencies = {}
+        for device_id in device_ids:
+            status = self.connected_devices.get(device_id)
+            if status is not None and status.is_synchronized:
+                latencies[device_id] = max(0.0, status.time_offset_ms)
+        return latencies
+
+    def _log_dispatch(self, command_name: str, result: BroadcastResult):
+        """Log the outcome and per-device skew of a broadcast command."""
+        for device_id in result.failed:
+            self.logger.error(f"Failed to send {command_name.lower()} command to {device_id}")
+        for device_id, skew_ms in result.dispatch_skew_ms.items():
+            self.logger.info(f"{command_name} command sent to {device_id} (skew {skew_ms:.2f}ms)")
+        if result.success_count > 1:
+            self.logger.info(f"{command_name} dispatch skew across {result.success_count} "
+                           f"devices: {result.max_skew_ms:.2f}ms")
+
     def add_webcam_sync_callback(self, callback: Callable[[float], None]):
         """Add callback for webcam synchronization events."""
         self.webcam_sync_callbacks.append(callback)
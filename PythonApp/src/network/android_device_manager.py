@@ -30,8 +30,9 @@ import json
 from concurrent.futures import ThreadPoolExecutor
 
 from .pc_server import PCServer, JsonMessage, ConnectedDevice
+from protocol.sensor_batch import iter_sensor_batch
 from .pc_server import (
-    HelloMessage, StatusMessage, SensorDataMessage, AckMessage,
+    HelloMessage, StatusMessage, SensorDataMessage, SensorBatchMessage, AckMessage,
     StartRecordCommand, StopRecordCommand, FlashSyncCommand, BeepSyncCommand,
     FileInfoMessage, FileChunkMessage, FileEndMessage
 )
@@ -72,6 +73,21 @@ class ShimmerDataSample:
     raw_message: Optional[SensorDataMessage] = None
 
 
+@dataclass
+class ShimmerDataBatch:
+    """Batch of Shimmer sensor samples with one value list per channel"""
+    device_id: str
+    android_device_id: str
+    timestamps: List[float]
+    channels: Dict[str, List[Optional[float]]]
+    session_id: Optional[str] = None
+    sample_rate: Optional[float] = None
+    raw_message: Optional[SensorBatchMessage] = None
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
 @dataclass
 class SessionInfo:
     """Recording session information"""
@@ -110,6 +126,7 @@ class AndroidDeviceManager:
         
         # Data management
         self.data_callbacks: List[Callable[[ShimmerDataSample], None]] = []
+        self.batch_callbacks: List[Callable[[ShimmerDataBatch], None]] = []
         self.status_callbacks: List[Callable[[str, AndroidDevice], None]] = []
         self.session_callbacks: List[Callable[[SessionInfo], None]] = []
         
@@ -371,6 +388,10 @@ class AndroidDeviceManager:
         """Add callback for Shimmer data samples"""
         self.data_callbacks.append(callback)
     
+    def add_batch_callback(self, callback: Callable[[ShimmerDataBatch], None]) -> None:
+        """Add callback receiving each sensor_batch message as one ShimmerDataBatch"""
+        self.batch_callbacks.append(callback)
+    
     def add_status_callback(self, callback: Callable[[str, AndroidDevice], None]) -> None:
         """Add callback for device status updates"""
         self.status_callbacks.append(callback)
@@ -460,6 +481,8 @@ class AndroidDeviceManager:
                 self._process_status_message(device_id, message)
             elif isinstance(message, SensorDataMessage):
                 self._process_sensor_data(device_id, message)
+            elif isinstance(message, SensorBatchMessage):
+                self._process_sensor_batch(device_id, message)
             elif isinstance(message, FileInfoMessage):
                 self._process_file_info(device_id, message)
             elif isinstance(message, FileChunkMessage):
@@ -525,6 +548,53 @@ class AndroidDeviceManager:
             except Exception as e:
                 self.logger.error(f"Error in data callback: {e}")
     
+    def _process_sensor_batch(self, device_id: str, message: SensorBatchMessage) -> None:
+        """Process a batch of Shimmer sensor samples"""
+        device = self.android_devices[device_id]
+        timestamps = message.timestamps
+        if not timestamps:
+            return
+        device.data_samples_received += len(timestamps)
+        device.last_data_timestamp = timestamps[-1]
+        
+        data_batch = ShimmerDataBatch(
+            device_id=f"{device_id}:{message.sensor_id or 'shimmer'}",
+            android_device_id=device_id,
+            timestamps=timestamps,
+            channels=message.channels,
+            session_id=device.current_session_id,
+            sample_rate=message.sample_rate,
+            raw_message=message
+        )
+        
+        # Update session statistics
+        if self.current_session:
+            self.current_session.data_samples += len(timestamps)
+            self.current_session.shimmer_devices.add(data_batch.device_id)
+        
+        # Notify batch callbacks once per batch
+        for callback in self.batch_callbacks:
+            try:
+                callback(data_batch)
+            except Exception as e:
+                self.logger.error(f"Error in batch data callback: {e}")
+        
+        # Per-sample callbacks see the batch as individual samples
+        if self.data_callbacks:
+            for timestamp, values in iter_sensor_batch(timestamps, message.channels):
+                data_sample = ShimmerDataSample(
+                    timestamp=timestamp,
+                    device_id=data_batch.device_id,
+                    android_device_id=device_id,
+                    sensor_values={name: value for name, value in values.items() if value is not None},
+                    session_id=data_batch.session_id
+                )
+                for callback in self.data_callbacks:
+                    try:
+                        callback(data_sample)
+                    except Exception as e:
+                        self.logger.error(f"Error in data callback: {e}")
+    
     def _process_file_info(self, device_id: str, message: FileInfoMessage) -> None:
         """Process file transfer information"""
         device = self.android_devices[device_id]
@@ -12,6 +12,7 @@ Milestone: 4.1 - Device Communication Implementation
 """
 
 import json
+import select
 import socket
 import ssl
 import threading
@@ -39,6 +40,7 @@ class DeviceClient(QThread):
     - Status monitoring and error handling
     - Reconnection logic for dropped connections
     - Multi-device support with concurrent connections
+    - Pool of warm connections with TLS session resumption per device
     """
 
     # Signals for communicating with the main GUI thread
@@ -56,7 +58,8 @@ class DeviceClient(QThread):
         self.running = False
         self.server_socket: Optional[socket.socket] = None
         self.device_counter = 0
-        self._device_lock = threading.Lock()
+        # Reentrant: send and disconnect paths remove failed devices while holding it
+        self._device_lock = threading.RLock()
 
         # Network configuration
         self.server_port = 8080
@@ -77,6 +80,22 @@ class DeviceClient(QThread):
         self._ssl_context: Optional[ssl.SSLContext] = None
         self._ssl_certfile = None
         self._ssl_keyfile = None
+        self._ssl_client_context: Optional[ssl.SSLContext] = None
+        self._tls_sessions: Dict[str, ssl.SSLSession] = {}  # device IP -> last TLS session
+        
+        # Connection pool: warm connections released with keep_alive, by (ip, port)
+        self._pool_enabled = True
+        self._pool_idle_timeout = 60.0  # seconds
+        # TCP keepalive on device connections, so a device that dropped off the
+        # network without closing is detected within idle + interval * count seconds
+        self._keepalive_idle = 5  # seconds
+        self._keepalive_interval = 2  # seconds
+        self._keepalive_count = 3
+        self._connection_pool: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._pool_stats = {
+            "hits": 0, "misses": 0, "handshakes": 0, "handshake_time": 0.0,
+            "tls_resumed": 0, "reconnections": 0
+        }
         
         # Device capability management
         self._supported_capabilities = {
@@ -177,6 +196,17 @@ class DeviceClient(QThread):
             else:
                 self._ssl_context.verify_mode = ssl.CERT_NONE
                 
+            # Outgoing connections verify devices against the same CA and
+            # resume TLS sessions per device IP
+            self._ssl_client_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            self._ssl_client_context.check_hostname = False  # devices are addressed by IP
+            if ca_certs:
+                self._ssl_client_context.load_verify_locations(ca_certs)
+                self._ssl_client_context.verify_mode = ssl.CERT_REQUIRED
+            else:
+                self._ssl_client_context.verify_mode = ssl.CERT_NONE
+            self._tls_sessions.clear()
+                
             self._ssl_enabled = True
             self._ssl_certfile = certfile
             self._ssl_keyfile = keyfile
@@ -215,6 +245,9 @@ class DeviceClient(QThread):
         """
         Connect to a specific device using socket connection.
 
+        A warm connection left in the pool by disconnect_device(keep_alive=True)
+        is reused without a new TCP, TLS or protocol handshake.
+
         Args:
             device_ip (str): IP address of the device
             device_port (int): Port number for connection
@@ -227,26 +260,15 @@ class DeviceClient(QThread):
         )
 
         try:
-            # Create socket connection to device
-            device_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            device_socket.settimeout(self.connection_timeout)
-            device_socket.connect((device_ip, device_port))
-
-            # Perform handshake and authentication
-            handshake_data = {
-                "type": "handshake",
-                "client_type": "recording_controller",
-                "protocol_version": "1.0",
-                "timestamp": time.time(),
-            }
-
-            # Send handshake
-            handshake_message = json.dumps(handshake_data).encode("utf-8")
-            device_socket.send(handshake_message)
-
-            # Wait for handshake response
-            response = device_socket.recv(self.buffer_size)
-            response_data = json.loads(response.decode("utf-8"))
+            pool_key = (device_ip, device_port)
+            pooled = self._take_pooled_connection(pool_key)
+            if pooled:
+                self._pool_stats["hits"] += 1
+                device_socket = pooled["socket"]
+                response_data = pooled["handshake"]
+            else:
+                self._pool_stats["misses"] += 1
+                device_socket, response_data = self._open_connection(device_ip, device_port)
 
             if response_data.get("status") == "accepted":
                 # Register device in active connections
@@ -262,6 +284,8 @@ class DeviceClient(QThread):
                         "last_heartbeat": time.time(),
                         "device_info": response_data.get("device_info", {}),
                         "capabilities": response_data.get("capabilities", []),
+                        "pool_key": pool_key,
+                        "handshake": response_data,
                     }
 
                 # Emit connection signal
@@ -294,12 +318,170 @@ class DeviceClient(QThread):
             self.error_occurred.emit(f"Failed to connect to {device_ip}: {str(e)}")
             return False
 
-    def disconnect_device(self, device_index: int) -> None:
+    def _open_connection(self, device_ip: str, device_port: int) -> Tuple[socket.socket, Dict[str, Any]]:
+        """
+        Open a new connection to a device and perform the handshake.
+
+        With TLS enabled the last TLS session of the device IP is resumed,
+        which saves the certificate exchange on reconnects.
+
+        Args:
+            device_ip (str): IP address of the device
+            device_port (int): Port number for connection
+
+        Returns:
+            Tuple of the connected socket and the device's handshake response
+        """
+        started = time.perf_counter()
+        device_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            device_socket.settimeout(self.connection_timeout)
+            self._enable_keepalive(device_socket)
+            device_socket.connect((device_ip, device_port))
+
+            if self._ssl_enabled and self._ssl_client_context:
+                device_socket = self._ssl_client_context.wrap_socket(
+                    device_socket,
+                    server_hostname=device_ip,
+                    session=self._tls_sessions.get(device_ip),
+                )
+
+            # Perform handshake and authentication
+            handshake_data = {
+                "type": "handshake",
+                "client_type": "recording_controller",
+                "protocol_version": "1.0",
+                "timestamp": time.time(),
+            }
+
+            # Send handshake
+            handshake_message = json.dumps(handshake_data).encode("utf-8")
+            device_socket.send(handshake_message)
+
+            # Wait for handshake response
+            response = device_socket.recv(self.buffer_size)
+            response_data = json.loads(response.decode("utf-8"))
+        except Exception:
+            device_socket.close()
+            raise
+
+        if isinstance(device_socket, ssl.SSLSocket):
+            if device_socket.session_reused:
+                self._pool_stats["tls_resumed"] += 1
+            if device_socket.session is not None:
+                self._tls_sessions[device_ip] = device_socket.session
+        self._pool_stats["handshakes"] += 1
+        self._pool_stats["handshake_time"] += time.perf_counter() - started
+        return device_socket, response_data
+
+    def _enable_keepalive(self, device_socket: socket.socket) -> None:
+        """
+        Enable TCP keepalive probes on a device connection.
+
+        Without probes an idle connection to a device that lost the network
+        stays open, and a send on it succeeds into the kernel buffer.
+        """
+        try:
+            device_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                device_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self._keepalive_idle)
+            elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+                device_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, self._keepalive_idle)
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                device_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self._keepalive_interval)
+            if hasattr(socket, "TCP_KEEPCNT"):
+                device_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, self._keepalive_count)
+            if hasattr(socket, "SIO_KEEPALIVE_VALS"):  # Windows
+                device_socket.ioctl(
+                    socket.SIO_KEEPALIVE_VALS,
+                    (1, self._keepalive_idle * 1000, self._keepalive_interval * 1000),
+                )
+        except OSError as e:
+            print(f"[DEBUG_LOG] Could not enable TCP keepalive: {e}")
+
+    def _take_pooled_connection(self, pool_key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        """
+        Take the warm connection to a device from the pool, if it is still usable.
+
+        Args:
+            pool_key: (ip, port) of the device
+
+        Returns:
+            Pool entry with the socket and its handshake response, or None
+        """
+        with self._device_lock:
+            entry = self._connection_pool.pop(pool_key, None)
+        if entry is None:
+            return None
+        if (time.time() - entry["idle_since"] < self._pool_idle_timeout
+                and self._connection_alive(entry["socket"])):
+            return entry
+        try:
+            entry["socket"].close()
+        except Exception:
+            pass
+        return None
+
+    @staticmethod
+    def _connection_alive(device_socket: socket.socket) -> bool:
+        """
+        Check that an idle connection has not been closed by the device.
+
+        A device that closed the connection, or whose keepalive probes went
+        unanswered, leaves the socket readable or with a pending error. A
+        device that vanished less than the keepalive detection time ago
+        still passes; the broken connection then shows on the next receive.
+        """
+        try:
+            if device_socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+                return False
+            readable, _, _ = select.select([device_socket], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        # An idle connection only becomes readable when the device closed it
+        # or sent data that no one would read
+        return not readable
+
+    def _reconnect_device(self, device_index: int) -> bool:
+        """
+        Replace the broken connection of a device opened by connect_to_device.
+
+        Args:
+            device_index (int): Index of the device
+
+        Returns:
+            bool: True if the device accepted a new connection
+        """
+        device = self.devices.get(device_index)
+        if not device or not device.get("pool_key"):
+            return False
+        try:
+            device["socket"].close()
+        except Exception:
+            pass
+        try:
+            device_socket, response_data = self._open_connection(*device["pool_key"])
+        except Exception as e:
+            print(f"[DEBUG_LOG] Reconnect to device {device_index} failed: {e}")
+            return False
+        if response_data.get("status") != "accepted":
+            device_socket.close()
+            return False
+        device["socket"] = device_socket
+        device["handshake"] = response_data
+        device["last_heartbeat"] = time.time()
+        self._pool_stats["reconnections"] += 1
+        print(f"[DEBUG_LOG] Reconnected device {device_index}")
+        return True
+
+    def disconnect_device(self, device_index: int, keep_alive: bool = False) -> None:
         """
         Disconnect from a specific device and clean up resources.
 
         Args:
             device_index (int): Index of the device to disconnect
+            keep_alive (bool): Keep a connection opened by connect_to_device
+                warm in the pool, for the next connect_to_device to reuse
         """
         print(f"[DEBUG_LOG] Disconnecting device {device_index}")
 
@@ -307,6 +489,23 @@ class DeviceClient(QThread):
             if device_index in self.devices:
                 device = self.devices[device_index]
 
+                if keep_alive and self._pool_enabled and device.get("pool_key"):
+                    previous = self._connection_pool.get(device["pool_key"])
+                    if previous:
+                        try:
+                            previous["socket"].close()
+                        except Exception:
+                            pass
+                    self._connection_pool[device["pool_key"]] = {
+                        "socket": device["socket"],
+                        "handshake": device["handshake"],
+                        "idle_since": time.time(),
+                    }
+                    del self.devices[device_index]
+                    self.device_disconnected.emit(device_index)
+                    print(f"[DEBUG_LOG] Device {device_index} released to connection pool")
+                    return
+
                 try:
                     # Send disconnect notification to device
                     disconnect_message = {
@@ -383,10 +582,15 @@ class DeviceClient(QThread):
                     "require_ack": require_ack,
                 }
 
-                # Send command over socket connection
-                device_socket = device["socket"]
+                # Send command over socket connection; a connection broken
+                # by a network blip is reopened once, resuming TLS
                 json_data = json.dumps(message).encode("utf-8")
-                device_socket.send(json_data)
+                try:
+                    device["socket"].send(json_data)
+                except OSError:
+                    if not self._reconnect_device(device_index):
+                        raise
+                    device["socket"].send(json_data)
                 
                 # Track for acknowledgment if required
                 if require_ack:
@@ -492,6 +696,12 @@ class DeviceClient(QThread):
         with self._device_lock:
             for device_index in list(self.devices.keys()):
                 self.disconnect_device(device_index)
+            for entry in self._connection_pool.values():
+                try:
+                    entry["socket"].close()
+                except Exception:
+                    pass
+            self._connection_pool.clear()
 
         # Clean up server socket
         self._cleanup_server_socket()
@@ -571,6 +781,30 @@ class DeviceClient(QThread):
             "pending_acknowledgments": len(self._pending_acknowledgments),
             "ssl_enabled": self._ssl_enabled,
             "rate_limit_per_minute": self._max_requests_per_minute,
+            "connection_pool": self.get_pool_metrics(),
+        }
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """
+        Get connection pool statistics.
+
+        Returns:
+            Dict[str, Any]: Pool hit rate, idle connections, handshake count and
+            average time, TLS sessions resumed and reconnections
+        """
+        stats = self._pool_stats
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "idle_connections": len(self._connection_pool),
+            "handshakes": stats["handshakes"],
+            "average_handshake_ms": (
+                stats["handshake_time"] / stats["handshakes"] * 1000 if stats["handshakes"] else 0.0
+            ),
+            "tls_sessions_resumed": stats["tls_resumed"],
+            "reconnections": stats["reconnections"],
         }
         """
         Get list of currently connected devices with their information.
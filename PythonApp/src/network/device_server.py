@@ -12,22 +12,69 @@ Date: 2025-07-29
 Milestone: 3.2 - Device Connection Manager and Socket Server
 """
 
+import asyncio
 import base64
-import json
+import hashlib
 import os
+import queue
 import socket
 import struct
 import threading
 import time
+import zlib
 from PyQt5.QtCore import QThread, pyqtSignal
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Set, Tuple
 
 # Import centralized logging
 from utils.logging_config import get_logger
+from protocol.config_loader import get_config
+from protocol.handshake_manager import get_handshake_manager
+from protocol.sensor_batch import SENSOR_BATCH_TYPE, SensorBatchError, decode_sensor_batch
+from protocol.wire_encoding import ENCODING_JSON, decode_message, encode_message
+from .file_collection import (
+    CHUNK_CHECKSUM_CRC32,
+    FileCollectionScheduler,
+    FileTransferError,
+    discard_partial_file,
+    finalize_partial_file,
+    open_partial_file,
+    read_resume_offset,
+    save_partial_metadata,
+    split_crc32_trailer,
+)
+from .framing import (
+    BINARY_FRAME_FLAG,
+    MAX_FRAME_SIZE,
+    FrameReader,
+    InvalidFrameError,
+    pack_frame,
+    recv_exact,
+)
 
 # Set up logging
 logger = get_logger(__name__)
 
+# Largest accepted JSON message
+MAX_MESSAGE_SIZE = MAX_FRAME_SIZE
+
+# Server modes: one thread per client, or all clients on one asyncio event loop
+SERVER_MODE_THREADED = "threaded"
+SERVER_MODE_ASYNCIO = "asyncio"
+SERVER_MODES = (SERVER_MODE_THREADED, SERVER_MODE_ASYNCIO)
+
+# Devices advertising this capability in their hello message can send files
+# as raw binary frames; the server offers it in send_file and the device
+# confirms it in file_info
+BINARY_FILE_TRANSFER_CAPABILITY = "binary_file_transfer"
+FILE_TRANSFER_MODE_BINARY = "binary"
+
+# Bytes received between updates of a partial file's resume metadata
+PARTIAL_METADATA_INTERVAL = 64 * 1024 * 1024
+
+# First bytes of a newline-delimited JSON message. Length-prefixed messages
+# start with the high byte of the length, which is 0 below MAX_MESSAGE_SIZE.
+NEWLINE_PROTOCOL_FIRST_BYTES = b"{[ \t\r\n"
+
 
 class RemoteDevice:
     """
@@ -53,6 +100,8 @@ class RemoteDevice:
         self.client_socket = client_socket
         self.connected = True
         self.last_seen = time.time()
+        # Wire encoding of messages sent to the device
+        self.encoding = ENCODING_JSON
 
         # Device status information
         self.status = {
@@ -163,13 +212,131 @@ class RemoteDevice:
         )
 
 
+class AsyncClientConnection:
+    """
+    Socket-like handle for a client served by the asyncio event loop.
+
+    RemoteDevice keeps this object in place of a socket. send() and close()
+    may be called from any thread; the work is scheduled on the event loop,
+    which owns the underlying transport.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        writer: asyncio.StreamWriter,
+        client_addr: str,
+    ):
+        """
+        Initialize the connection handle.
+
+        Args:
+            loop: Event loop serving the client
+            writer: Stream writer of the client connection
+            client_addr: Client address string for logging
+        """
+        self.loop = loop
+        self.writer = writer
+        self.client_addr = client_addr
+        self.newline_framing = False
+
+    def send(self, data: bytes) -> int:
+        """
+        Queue raw bytes for sending to the client.
+
+        Args:
+            data: Already framed message bytes
+
+        Returns:
+            Number of bytes queued
+        """
+        self.loop.call_soon_threadsafe(self._write, data)
+        return len(data)
+
+    def send_payload(self, payload: bytes) -> int:
+        """
+        Frame a payload the way this client frames its messages and send it.
+
+        Args:
+            payload: Encoded message
+
+        Returns:
+            Number of bytes queued
+        """
+        if self.newline_framing:
+            return self.send(payload + b"\n")
+        return self.send(pack_frame(payload))
+
+    def close(self):
+        """Close the connection; safe to call more than once."""
+        try:
+            self.loop.call_soon_threadsafe(self.writer.close)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+    def _write(self, data: bytes):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class ClientContext:
+    """
+    State of one client connection, passed through the message handlers.
+
+    The device registered by the connection's hello message is kept here, so
+    handlers reach it without searching the devices by socket.
+    """
+
+    __slots__ = (
+        "client_socket",
+        "client_addr",
+        "reader",
+        "device",
+        "messages_received",
+        "bytes_received",
+    )
+
+    def __init__(self, client_socket, client_addr: str, reader: Optional[FrameReader] = None):
+        """
+        Initialize the connection context.
+
+        Args:
+            client_socket: Socket, or AsyncClientConnection, of the client
+            client_addr: Client address string
+            reader: Frame reader holding the connection's receive buffer
+        """
+        self.client_socket = client_socket
+        self.client_addr = client_addr
+        self.reader = reader
+        self.device: Optional[RemoteDevice] = None
+        self.messages_received = 0
+        self.bytes_received = 0
+
+    @property
+    def device_id(self) -> Optional[str]:
+        """ID of the device registered on this connection, if any."""
+        return self.device.device_id if self.device is not None else None
+
+    @property
+    def file_transfer_state(self) -> Optional[Dict[str, Any]]:
+        """State of the device's active file transfer, if any."""
+        return getattr(self.device, "file_transfer_state", None)
+
+
 class JsonSocketServer(QThread):
     """
     JSON Socket Server for Milestone 3.2 Device Connection Manager.
 
     Implements length-prefixed JSON message protocol for bidirectional communication
-    with Android devices on port 9000. Handles multiple device connections using
-    multi-threading and emits PyQt signals for thread-safe GUI updates.
+    with Android devices on port 9000 and emits PyQt signals for thread-safe GUI
+    updates.
+
+    In the "threaded" server mode every client is handled by its own thread. In
+    the "asyncio" mode all clients are served by one event loop running in the
+    server thread; length-prefixed and newline-delimited clients are told apart
+    by their first byte, and signals are queued to a dispatcher thread so slow
+    slots never stall the loop.
     """
 
     # Signals for GUI integration (thread-safe communication)
@@ -181,6 +348,9 @@ class JsonSocketServer(QThread):
         str, str, str
     )  # device_id, frame_type, base64_data
     sensor_data_received = pyqtSignal(str, dict)  # device_id, sensor_data
+    sensor_batch_received = pyqtSignal(
+        str, dict
+    )  # device_id, {"timestamps": [...], "channels": {name: [...]}, ...}
     notification_received = pyqtSignal(
         str, str, dict
     )  # device_id, event_type, event_data
@@ -192,6 +362,8 @@ class JsonSocketServer(QThread):
         port: int = 9000,
         use_newline_protocol: bool = False,
         session_manager=None,
+        server_mode: Optional[str] = None,
+        backlog: Optional[int] = None,
     ):
         """
         Initialize the JSON Socket Server.
@@ -201,32 +373,82 @@ class JsonSocketServer(QThread):
             port (int): Port number to listen on (default: 9000)
             use_newline_protocol (bool): Use newline-delimited JSON instead of length-prefixed (default: False)
             session_manager: SessionManager instance for session directory integration (default: None)
+            server_mode (str): "threaded" or "asyncio" (default: network.server_mode from config)
+            backlog (int): Listen backlog for pending connections (default: network.listen_backlog from config)
         """
         super().__init__()
         self.host = host
         self.port = port
         self.use_newline_protocol = use_newline_protocol
         self.session_manager = session_manager
+        self.server_mode = server_mode or get_config(
+            "network.server_mode", SERVER_MODE_ASYNCIO
+        )
+        if self.server_mode not in SERVER_MODES:
+            raise ValueError(f"Unknown server mode: {self.server_mode}")
+        self.backlog = int(
+            backlog if backlog is not None else get_config("network.listen_backlog", 128)
+        )
         self.server_socket: Optional[socket.socket] = None
         self.running = False
         self.devices: Dict[str, RemoteDevice] = {}  # device_id -> RemoteDevice mapping
         self.clients: Dict[str, socket.socket] = {}  # device_id -> client socket mapping
         self.client_threads: List[threading.Thread] = []
+        # client socket -> context of its connection
+        self._contexts: Dict[Any, ClientContext] = {}
+
+        # message type -> handler; all but hello need a registered device
+        self._message_handlers = {
+            "hello": self._handle_hello,
+            "status": self._handle_status,
+            "preview_frame": self._handle_preview_frame,
+            "sensor_data": self._handle_sensor_data,
+            SENSOR_BATCH_TYPE: self._handle_sensor_batch,
+            "notification": self._handle_notification,
+            "ack": self._handle_ack,
+            "file_info": self._handle_file_info,
+            "file_chunk": self._handle_file_chunk,
+            "file_end": self._handle_file_end,
+        }
+
+        # Asyncio mode state, owned by the event loop thread
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shutdown_event: Optional[asyncio.Event] = None
+        self._stop_requested = False
+        self._async_connections: Set[AsyncClientConnection] = set()
+        self._client_tasks: Set[asyncio.Task] = set()
+
+        # Signals emitted from the event loop go through this queue to the
+        # dispatcher thread; in threaded mode they are emitted directly
+        self._signal_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._signal_thread: Optional[threading.Thread] = None
+
+        # Schedules session file collection; GUI code connects to its
+        # progress and throughput signals
+        self.file_collector = FileCollectionScheduler(self)
 
         protocol_type = (
             "newline-delimited" if use_newline_protocol else "length-prefixed"
         )
         logger.info(
-            f"JsonSocketServer initialized for {host}:{port} using {protocol_type} JSON protocol"
+            f"JsonSocketServer initialized for {host}:{port} using {protocol_type} JSON protocol "
+            f"({self.server_mode} mode, backlog {self.backlog})"
         )
 
     def run(self):
         """Main server thread execution method."""
+        if self.server_mode == SERVER_MODE_ASYNCIO:
+            self._run_asyncio()
+        else:
+            self._run_threaded()
+
+    def _run_threaded(self):
+        """Accept clients and handle each one on its own thread."""
         try:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
+            self.server_socket.listen(self.backlog)
             self.running = True
 
             logger.info(f"JSON Socket server started on {self.host}:{self.port}")
@@ -234,6 +456,10 @@ class JsonSocketServer(QThread):
             while self.running:
                 try:
                     client_socket, address = self.server_socket.accept()
+                    # Forget threads of clients that have disconnected
+                    self.client_threads = [
+                        thread for thread in self.client_threads if thread.is_alive()
+                    ]
                     client_thread = threading.Thread(
                         target=self.handle_json_client,
                         args=(client_socket, address),
@@ -262,54 +488,56 @@ class JsonSocketServer(QThread):
             address: Address tuple (ip, port) of the connected client
         """
         client_addr = f"{address[0]}:{address[1]}"
-        device_id = None
+        reader = FrameReader(client_socket, MAX_MESSAGE_SIZE, allow_binary=True)
+        context = self._open_context(client_socket, client_addr, reader)
 
         logger.info(f"JSON client connected: {client_addr}")
 
         try:
             while self.running:
-                # Read 4-byte length header
-                length_data = self.recv_exact(client_socket, 4)
-                if not length_data:
-                    break
-
-                # Parse message length (big-endian)
-                message_length = struct.unpack(">I", length_data)[0]
-
-                if message_length <= 0 or message_length > 10 * 1024 * 1024:  # Max 10MB
-                    logger.error(f"Invalid message length: {message_length}")
-                    self.error_occurred.emit(
-                        device_id or client_addr,
-                        f"Invalid message length: {message_length}",
-                    )
+                # Read the next length-prefixed message into the reusable buffer
+                try:
+                    json_data = reader.read_frame()
+                except InvalidFrameError as e:
+                    logger.error(str(e))
+                    self.error_occurred.emit(context.device_id or client_addr, str(e))
                     break
-
-                # Read JSON payload
-                json_data = self.recv_exact(client_socket, message_length)
-                if not json_data:
+                if json_data is None:
                     break
+                context.bytes_received += len(json_data)
 
-                # Process JSON message
-                try:
-                    message = json.loads(json_data.decode("utf-8"))
-                    device_id = self.process_json_message(
-                        client_socket, client_addr, message
-                    )
+                if reader.binary:
+                    self.process_binary_chunk(client_socket, client_addr, json_data, context)
+                else:
+                    # Process message in the encoding it was sent in
+                    try:
+                        message = decode_message(json_data)
+                    except ValueError as e:
+                        logger.error(f"Message decode error from {client_addr}: {e}")
+                        self.error_occurred.emit(
+                            context.device_id or client_addr, f"Message decode error: {str(e)}"
+                        )
+                    else:
+                        self.process_json_message(client_socket, client_addr, message, context)
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON decode error from {client_addr}: {e}")
-                    self.error_occurred.emit(
-                        device_id or client_addr, f"JSON decode error: {str(e)}"
-                    )
+                # Hold off reading while file transfers exceed the bandwidth cap
+                delay = self._file_transfer_delay(context, len(json_data))
+                if delay:
+                    time.sleep(delay)
 
         except Exception as e:
             logger.error(f"JSON client handling error for {client_addr}: {e}")
             self.error_occurred.emit(
-                device_id or client_addr, f"Client handling error: {str(e)}"
+                context.device_id or client_addr, f"Client handling error: {str(e)}"
             )
         finally:
-            if device_id and device_id in self.devices:
+            self._close_context(context)
+            # A device that reconnected before this connection closed is
+            # already registered with its new socket
+            device_id = context.device_id
+            if device_id and self._owns_device(device_id, client_socket):
                 device = self.devices[device_id]
+                self._interrupt_file_transfer(device_id, device)
                 device.disconnect()
                 del self.devices[device_id]
                 if device_id in self.clients:
@@ -320,7 +548,7 @@ class JsonSocketServer(QThread):
                 client_socket.close()
             logger.info(f"JSON client disconnected: {client_addr}")
 
-    def recv_exact(self, sock: socket.socket, length: int) -> Optional[bytes]:
+    def recv_exact(self, sock: socket.socket, length: int) -> Optional[bytearray]:
         """
         Receive exactly 'length' bytes from socket.
 
@@ -331,16 +559,228 @@ class JsonSocketServer(QThread):
         Returns:
             Received data or None if connection closed
         """
-        data = b""
-        while len(data) < length:
-            chunk = sock.recv(length - len(data))
-            if not chunk:
-                return None
-            data += chunk
-        return data
+        return recv_exact(sock, length)
+
+    def _run_asyncio(self):
+        """Serve all clients on one asyncio event loop in the server thread."""
+        self._signal_thread = threading.Thread(
+            target=self._dispatch_signals, name="JsonSocketServerSignals", daemon=True
+        )
+        self._signal_thread.start()
+        self._loop = asyncio.new_event_loop()
+
+        try:
+            self._loop.run_until_complete(self._serve_async())
+        except Exception as e:
+            logger.error(f"JSON socket server error: {e}")
+            self._emit(self.error_occurred, "server", f"Server error: {str(e)}")
+        finally:
+            self.running = False
+            self._loop.close()
+            self._loop = None
+            self._shutdown_event = None
+            self._stop_requested = False
+
+            # Deliver the remaining signals before the dispatcher exits
+            self._signal_queue.put(None)
+            self._signal_thread.join(timeout=5.0)
+            self._signal_thread = None
+            self.cleanup()
+
+    async def _serve_async(self):
+        """Run the asyncio server until stop_server() is called."""
+        self._shutdown_event = asyncio.Event()
+        if self._stop_requested:
+            self._shutdown_event.set()
+
+        server = await asyncio.start_server(
+            self._handle_async_client,
+            self.host,
+            self.port,
+            backlog=self.backlog,
+            limit=MAX_MESSAGE_SIZE + 1,
+            reuse_address=True,
+        )
+        self.running = True
+        logger.info(
+            f"JSON Socket server started on {self.host}:{self.port} (asyncio mode)"
+        )
+
+        try:
+            await self._shutdown_event.wait()
+        finally:
+            server.close()
+            for connection in list(self._async_connections):
+                connection.writer.close()
+            if self._client_tasks:
+                await asyncio.wait(self._client_tasks, timeout=2.0)
+            await server.wait_closed()
+
+    async def _handle_async_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """
+        Handle one client connection on the event loop.
+
+        Args:
+            reader: Stream reader of the client connection
+            writer: Stream writer of the client connection
+        """
+        address = writer.get_extra_info("peername") or ("unknown", 0)
+        client_addr = f"{address[0]}:{address[1]}"
+        connection = AsyncClientConnection(asyncio.get_running_loop(), writer, client_addr)
+        context = self._open_context(connection, client_addr)
+        task = asyncio.current_task()
+        self._async_connections.add(connection)
+        self._client_tasks.add(task)
+
+        logger.info(f"JSON client connected: {client_addr}")
+
+        try:
+            first_byte = await reader.read(1)
+            if first_byte:
+                connection.newline_framing = first_byte in NEWLINE_PROTOCOL_FIRST_BYTES
+                if connection.newline_framing:
+                    messages = self._read_newline_messages(reader, first_byte)
+                else:
+                    messages = self._read_length_prefixed_messages(reader, first_byte)
+
+                async for json_data, binary in messages:
+                    context.bytes_received += len(json_data)
+                    if binary:
+                        # Disk writes run off the event loop so a slow disk
+                        # does not stall other clients
+                        await connection.loop.run_in_executor(
+                            None,
+                            self.process_binary_chunk,
+                            connection,
+                            client_addr,
+                            json_data,
+                            context,
+                        )
+                    else:
+                        try:
+                            message = decode_message(json_data)
+                        except ValueError as e:
+                            logger.error(f"Message decode error from {client_addr}: {e}")
+                            self._emit(
+                                self.error_occurred,
+                                context.device_id or client_addr,
+                                f"Message decode error: {str(e)}",
+                            )
+                            continue
+                        self.process_json_message(connection, client_addr, message, context)
+
+                    # Hold off reading while file transfers exceed the bandwidth cap
+                    delay = self._file_transfer_delay(context, len(json_data))
+                    if delay:
+                        await asyncio.sleep(delay)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # Client closed the connection, possibly mid-message
+            pass
+        except InvalidFrameError as e:
+            logger.error(f"{e} from {client_addr}")
+            self._emit(self.error_occurred, context.device_id or client_addr, str(e))
+        except Exception as e:
+            logger.error(f"JSON client handling error for {client_addr}: {e}")
+            self._emit(
+                self.error_occurred,
+                context.device_id or client_addr,
+                f"Client handling error: {str(e)}",
+            )
+        finally:
+            self._close_context(context)
+            device_id = context.device_id
+            if device_id and self._owns_device(device_id, connection):
+                self._interrupt_file_transfer(device_id, self.devices[device_id])
+                self.devices[device_id].disconnect()
+                del self.devices[device_id]
+                self.clients.pop(device_id, None)
+                self._emit(self.device_disconnected, device_id)
+                logger.info(f"Device {device_id} disconnected")
+            writer.close()
+            self._async_connections.discard(connection)
+            self._client_tasks.discard(task)
+            logger.info(f"JSON client disconnected: {client_addr}")
+
+    async def _read_length_prefixed_messages(
+        self, reader: asyncio.StreamReader, first_byte: bytes
+    ) -> AsyncIterator[Tuple[bytes, bool]]:
+        """
+        Yield the payloads of length-prefixed frames until the client disconnects.
+
+        Args:
+            reader: Stream reader of the client connection
+            first_byte: Byte already read to detect the framing
+
+        Yields:
+            Tuple of the payload and whether it is a binary file chunk
+
+        Raises:
+            InvalidFrameError: If a message length is out of range
+        """
+        header = first_byte + await reader.readexactly(3)
+        while True:
+            message_length = struct.unpack(">I", header)[0]
+            binary = bool(message_length & BINARY_FRAME_FLAG)
+            message_length &= ~BINARY_FRAME_FLAG
+            if message_length <= 0 or message_length > MAX_MESSAGE_SIZE:
+                raise InvalidFrameError(f"Invalid message length: {message_length}")
+            yield await reader.readexactly(message_length), binary
+            header = await reader.readexactly(4)
+
+    async def _read_newline_messages(
+        self, reader: asyncio.StreamReader, first_byte: bytes
+    ) -> AsyncIterator[Tuple[bytes, bool]]:
+        """
+        Yield newline-delimited messages until the client disconnects.
+
+        Args:
+            reader: Stream reader of the client connection
+            first_byte: Byte already read to detect the framing
+
+        Yields:
+            Tuple of the message and False, as newline clients send JSON only
+        """
+        line = first_byte + await reader.readline()
+        while line:
+            line = line.strip()
+            if line:
+                yield line, False
+            line = await reader.readline()
+
+    def _emit(self, signal, *args):
+        """
+        Emit a signal, through the dispatcher thread when one is running.
+
+        Args:
+            signal: Bound pyqtSignal to emit
+            *args: Signal arguments
+        """
+        if self._signal_thread is not None:
+            self._signal_queue.put((signal, args))
+        else:
+            signal.emit(*args)
+
+    def _dispatch_signals(self):
+        """Emit queued signals until the end-of-queue marker is received."""
+        while True:
+            item = self._signal_queue.get()
+            if item is None:
+                break
+            signal, args = item
+            try:
+                signal.emit(*args)
+            except Exception as e:
+                logger.error(f"Error emitting server signal: {e}")
 
     def process_json_message(
-        self, client_socket: socket.socket, client_addr: str, message: Dict[str, Any]
+        self,
+        client_socket: socket.socket,
+        client_addr: str,
+        message: Dict[str, Any],
+        context: Optional[ClientContext] = None,
     ) -> Optional[str]:
         """
         Process incoming JSON message and emit appropriate signals.
@@ -349,236 +789,540 @@ class JsonSocketServer(QThread):
             client_socket: Socket object for the client
             client_addr: Client address string
             message: Parsed JSON message dictionary
+            context: Connection context; looked up from client_socket if omitted
 
         Returns:
             Device ID if available, None otherwise
         """
+        if context is None:
+            context = self._get_context(client_socket, client_addr)
+        device = self._resolve_device(context)
+        context.messages_received += 1
+
         message_type = message.get("type", "unknown")
         logger.debug(f"Received JSON message from {client_addr}: {message_type}")
 
-        if message_type == "hello":
-            device_id = message.get("device_id", client_addr)
-            capabilities = message.get("capabilities", [])
+        handler = self._message_handlers.get(message_type)
+        if handler is None:
+            logger.warning(
+                f"Unknown message type '{message_type}' from {context.device_id or client_addr}"
+            )
+        elif device is not None or message_type == "hello":
+            handler(context, message)
 
-            # Create RemoteDevice object and store it
-            remote_device = RemoteDevice(device_id, capabilities, client_socket)
-            self.devices[device_id] = remote_device
-            self.clients[device_id] = client_socket
+        return context.device_id
 
-            # Emit device connected signal
-            self.device_connected.emit(device_id, capabilities)
+    def _handle_hello(self, context: ClientContext, message: Dict[str, Any]):
+        """Register the device introducing itself on this connection."""
+        client_socket = context.client_socket
+        device_id = message.get("device_id", context.client_addr)
+        capabilities = message.get("capabilities", [])
 
-            logger.info(
-                f"Device registered: {device_id} with capabilities: {capabilities}"
-            )
-            return device_id
+        # A reconnecting device replaces its previous connection
+        previous = self.devices.get(device_id)
+        if previous is not None and previous.client_socket is not client_socket:
+            self._interrupt_file_transfer(device_id, previous)
 
-        elif message_type == "status":
-            device_id = self.find_device_id(client_socket)
-            if device_id and device_id in self.devices:
-                device = self.devices[device_id]
-                status_data = {
-                    "battery": message.get("battery"),
-                    "storage": message.get("storage"),
-                    "temperature": message.get("temperature"),
-                    "recording": message.get("recording", False),
-                    "connected": message.get("connected", True),
-                    "timestamp": message.get("timestamp"),
-                }
-                device.update_status(status_data)
-                device.increment_message_count("received")
-                self.status_received.emit(device_id, status_data)
-                logger.debug(f"Status update from {device_id}: {status_data}")
-
-        elif message_type == "preview_frame":
-            device_id = self.find_device_id(client_socket)
-            if device_id:
-                frame_type = message.get("frame_type", "rgb")  # 'rgb' or 'thermal'
-                frame_data = message.get("frame_data", "")
-
-                if frame_data:
-                    self.preview_frame_received.emit(device_id, frame_type, frame_data)
-                    logger.debug(
-                        f"Preview frame received from {device_id}: {frame_type}"
+        # Create RemoteDevice object and store it
+        remote_device = RemoteDevice(device_id, capabilities, client_socket)
+        self.devices[device_id] = remote_device
+        self.clients[device_id] = client_socket
+        context.device = remote_device
+
+        # Devices listing wire encodings are told which one to use
+        if "encodings" in message:
+            self._negotiate_encoding(remote_device, message["encodings"])
+
+        # Emit device connected signal
+        self._emit(self.device_connected, device_id, capabilities)
+
+        logger.info(
+            f"Device registered: {device_id} with capabilities: {capabilities}"
+        )
+
+        # Resume file transfers interrupted by an earlier disconnect
+        self.file_collector.on_device_connected(device_id)
+
+    def _handle_status(self, context: ClientContext, message: Dict[str, Any]):
+        """Update the device status."""
+        device = context.device
+        status_data = {
+            "battery": message.get("battery"),
+            "storage": message.get("storage"),
+            "temperature": message.get("temperature"),
+            "recording": message.get("recording", False),
+            "connected": message.get("connected", True),
+            "timestamp": message.get("timestamp"),
+        }
+        device.update_status(status_data)
+        device.increment_message_count("received")
+        self._emit(self.status_received, device.device_id, status_data)
+        logger.debug(f"Status update from {device.device_id}: {status_data}")
+
+    def _handle_preview_frame(self, context: ClientContext, message: Dict[str, Any]):
+        """Forward a preview frame to the GUI."""
+        device_id = context.device_id
+        frame_type = message.get("frame_type", "rgb")  # 'rgb' or 'thermal'
+        frame_data = message.get("frame_data", "")
+
+        if frame_data:
+            self._emit(self.preview_frame_received, device_id, frame_type, frame_data)
+            logger.debug(f"Preview frame received from {device_id}: {frame_type}")
+        else:
+            logger.warning(f"Empty frame data from {device_id}")
+
+    def _handle_sensor_data(self, context: ClientContext, message: Dict[str, Any]):
+        """Forward a single sensor sample to the GUI."""
+        sensor_data = {
+            "gsr": message.get("gsr"),
+            "ppg": message.get("ppg"),
+            "accelerometer": message.get("accelerometer"),
+            "gyroscope": message.get("gyroscope"),
+            "magnetometer": message.get("magnetometer"),
+            "timestamp": message.get("timestamp"),
+        }
+        self._emit(self.sensor_data_received, context.device_id, sensor_data)
+        logger.debug(f"Sensor data from {context.device_id}")
+
+    def _handle_sensor_batch(self, context: ClientContext, message: Dict[str, Any]):
+        """Forward a batch of sensor samples to the GUI as one signal."""
+        device_id = context.device_id
+        try:
+            timestamps, channels = decode_sensor_batch(message)
+        except SensorBatchError as e:
+            logger.warning(f"Invalid sensor batch from {device_id}: {e}")
+            self._emit(self.error_occurred, device_id, f"Invalid sensor batch: {e}")
+            return
+
+        sensor_batch = {
+            "timestamps": timestamps,
+            "channels": channels,
+            "sample_rate": message.get("sample_rate"),
+            "sensor_id": message.get("sensor_id"),
+        }
+        self._emit(self.sensor_batch_received, device_id, sensor_batch)
+        logger.debug(f"Sensor batch of {len(timestamps)} samples from {device_id}")
+
+    def _handle_notification(self, context: ClientContext, message: Dict[str, Any]):
+        """Forward a device notification to the GUI."""
+        event_type = message.get("event_type", "unknown")
+        event_data = message.get("event_data", {})
+        self._emit(self.notification_received, context.device_id, event_type, event_data)
+        logger.info(f"Notification from {context.device_id}: {event_type}")
+
+    def _handle_ack(self, context: ClientContext, message: Dict[str, Any]):
+        """Forward a command acknowledgment to the GUI and the file collector."""
+        device_id = context.device_id
+        cmd = message.get("cmd", "")
+        status = message.get("status", "unknown")
+        success = status == "ok"
+        error_message = message.get("message", "")
+        self._emit(self.ack_received, device_id, cmd, success, error_message)
+        logger.debug(f"ACK from {device_id} for {cmd}: {status}")
+        if cmd == "send_file" and not success:
+            self.file_collector.on_request_failed(device_id, error_message)
+
+    def _handle_file_info(self, context: ClientContext, message: Dict[str, Any]):
+        """Start receiving a file announced by the device."""
+        device = context.device
+        device_id = device.device_id
+        filename = message.get("name", "unknown")
+        filesize = message.get("size", 0)
+        transfer_mode = message.get("transfer_mode", "base64")
+        offset = int(message.get("offset", 0))
+
+        # Initialize file transfer state
+        device.file_transfer_state = {
+            "filename": filename,
+            "expected_size": filesize,
+            "received_bytes": offset,
+            "file_handle": None,
+            "chunks_received": 0,
+            "transfer_mode": transfer_mode,
+            "chunk_checksum": message.get("chunk_checksum"),
+            "digest": hashlib.sha256(),
+            "final_path": None,
+            "metadata_saved_bytes": offset,
+            "error": None,
+            "resumable": True,
+        }
+
+        # Create session directory and open file for writing
+        session_dir = self.get_session_directory()
+        if session_dir:
+            filepath = os.path.join(session_dir, f"{device_id}_{filename}")
+            try:
+                # Binary chunks are written as received, unbuffered
+                file_handle = open_partial_file(
+                    filepath,
+                    filesize,
+                    offset,
+                    device.file_transfer_state["digest"],
+                    buffering=0 if transfer_mode == FILE_TRANSFER_MODE_BINARY else -1,
+                    metadata={"name": filename, "device_id": device_id},
+                )
+                device.file_transfer_state["file_handle"] = file_handle
+                device.file_transfer_state["final_path"] = filepath
+                if offset:
+                    logger.info(
+                        f"Resuming file {filename} from {device_id} at {offset}/{filesize} bytes"
                     )
                 else:
-                    logger.warning(f"Empty frame data from {device_id}")
-
-        elif message_type == "sensor_data":
-            device_id = self.find_device_id(client_socket)
-            if device_id:
-                sensor_data = {
-                    "gsr": message.get("gsr"),
-                    "ppg": message.get("ppg"),
-                    "accelerometer": message.get("accelerometer"),
-                    "gyroscope": message.get("gyroscope"),
-                    "magnetometer": message.get("magnetometer"),
-                    "timestamp": message.get("timestamp"),
-                }
-                self.sensor_data_received.emit(device_id, sensor_data)
-                logger.debug(f"Sensor data from {device_id}")
-
-        elif message_type == "notification":
-            device_id = self.find_device_id(client_socket)
-            if device_id:
-                event_type = message.get("event_type", "unknown")
-                event_data = message.get("event_data", {})
-                self.notification_received.emit(device_id, event_type, event_data)
-                logger.info(f"Notification from {device_id}: {event_type}")
-
-        elif message_type == "ack":
-            device_id = self.find_device_id(client_socket)
-            if device_id:
-                cmd = message.get("cmd", "")
-                status = message.get("status", "unknown")
-                success = status == "ok"
-                error_message = message.get("message", "")
-                self.ack_received.emit(device_id, cmd, success, error_message)
-                logger.debug(f"ACK from {device_id} for {cmd}: {status}")
-
-        elif message_type == "file_info":
-            device_id = self.find_device_id(client_socket)
-            if device_id and device_id in self.devices:
-                device = self.devices[device_id]
-                filename = message.get("name", "unknown")
-                filesize = message.get("size", 0)
-
-                # Initialize file transfer state
-                device.file_transfer_state = {
-                    "filename": filename,
-                    "expected_size": filesize,
-                    "received_bytes": 0,
-                    "file_handle": None,
-                    "chunks_received": 0,
-                }
-
-                # Create session directory and open file for writing
-                session_dir = self.get_session_directory()
-                if session_dir:
-                    filepath = os.path.join(session_dir, f"{device_id}_{filename}")
-                    try:
-                        device.file_transfer_state["file_handle"] = open(filepath, "wb")
-                        logger.info(
-                            f"Started receiving file {filename} from {device_id} ({filesize} bytes)"
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to create file {filepath}: {e}")
-                        device.file_transfer_state = None
-                else:
-                    logger.error(f"No session directory available for file transfer")
-                    device.file_transfer_state = None
+                    logger.info(
+                        f"Started receiving file {filename} from {device_id} ({filesize} bytes)"
+                    )
+                self.file_collector.on_transfer_started(
+                    device_id, filename, offset, filesize
+                )
+            except FileTransferError as e:
+                # Chunks are dropped until file_end reports the failure
+                logger.error(str(e))
+                discard_partial_file(filepath)
+                device.file_transfer_state["error"] = str(e)
+                device.file_transfer_state["resumable"] = False
+            except Exception as e:
+                logger.error(f"Failed to create file {filepath}: {e}")
+                device.file_transfer_state = None
+        else:
+            logger.error(f"No session directory available for file transfer")
+            device.file_transfer_state = None
+
+    def _handle_file_chunk(self, context: ClientContext, message: Dict[str, Any]):
+        """Append a base64 file chunk to the active transfer."""
+        device_id = context.device_id
+        state = context.file_transfer_state
+        if not state:
+            logger.warning(f"Received file chunk from {device_id} without file_info")
+            return
+
+        base64_data = message.get("data", "")
+        try:
+            # Decode Base64 data
+            chunk_data = base64.b64decode(base64_data)
 
-        elif message_type == "file_chunk":
-            device_id = self.find_device_id(client_socket)
-            if device_id and device_id in self.devices:
-                device = self.devices[device_id]
-                if (
-                    hasattr(device, "file_transfer_state")
-                    and device.file_transfer_state
-                ):
-                    seq = message.get("seq", 0)
-                    base64_data = message.get("data", "")
+            crc32 = message.get("crc32")
+            if state.get("error"):
+                # Transfer already failed; file_end reports it
+                pass
+            elif crc32 is not None and zlib.crc32(chunk_data) != crc32:
+                self._fail_file_transfer(
+                    state, f"Chunk {message.get('seq', 0)} checksum mismatch"
+                )
+            else:
+                self._write_file_chunk(device_id, state, chunk_data)
 
-                    try:
-                        # Decode Base64 data
-                        chunk_data = base64.b64decode(base64_data)
-
-                        # Write chunk to file
-                        if device.file_transfer_state["file_handle"]:
-                            device.file_transfer_state["file_handle"].write(chunk_data)
-                            device.file_transfer_state["received_bytes"] += len(
-                                chunk_data
-                            )
-                            device.file_transfer_state["chunks_received"] += 1
-
-                            # Log progress periodically
-                            if seq % 100 == 0:
-                                progress = (
-                                    device.file_transfer_state["received_bytes"]
-                                    * 100.0
-                                    / device.file_transfer_state["expected_size"]
-                                )
-                                logger.debug(
-                                    f"File transfer progress from {device_id}: {progress:.1f}% "
-                                    f"({device.file_transfer_state['received_bytes']}/{device.file_transfer_state['expected_size']} bytes)"
-                                )
-
-                    except Exception as e:
-                        logger.error(
-                            f"Error processing file chunk from {device_id}: {e}"
-                        )
+        except Exception as e:
+            logger.error(f"Error processing file chunk from {device_id}: {e}")
+
+    def _handle_file_end(self, context: ClientContext, message: Dict[str, Any]):
+        """Verify and complete the active transfer and acknowledge it."""
+        device = context.device
+        device_id = device.device_id
+        state = context.file_transfer_state
+        if not state:
+            logger.warning(f"Received file_end from {device_id} without active transfer")
+            return
+
+        filename = message.get("name", "unknown")
+        error = state.get("error")
+        resumable = state.get("resumable", True)
+
+        try:
+            # Close file handle
+            if state["file_handle"]:
+                state["file_handle"].close()
+
+            # Verify file size and checksum
+            expected_size = state["expected_size"]
+            received_size = state["received_bytes"]
+            chunks_received = state["chunks_received"]
+            expected_sha256 = message.get("sha256")
+            digest = state.get("digest")
+
+            if not error and received_size != expected_size:
+                error = (
+                    f"File transfer size mismatch: expected {expected_size}, "
+                    f"received {received_size} bytes"
+                )
+                # A short file can be completed later, a long one is corrupt
+                resumable = received_size < expected_size
+            elif (
+                not error
+                and expected_sha256
+                and digest is not None
+                and digest.hexdigest() != expected_sha256.lower()
+            ):
+                error = f"File transfer checksum mismatch: {filename} from {device_id}"
+                resumable = False
+
+            final_path = state.get("final_path")
+            if final_path:
+                if not error:
+                    finalize_partial_file(final_path)
+                elif resumable:
+                    self._save_partial_transfer(state)
                 else:
-                    logger.warning(
-                        f"Received file chunk from {device_id} without file_info"
-                    )
+                    discard_partial_file(final_path)
 
-        elif message_type == "file_end":
-            device_id = self.find_device_id(client_socket)
-            if device_id and device_id in self.devices:
-                device = self.devices[device_id]
-                if (
-                    hasattr(device, "file_transfer_state")
-                    and device.file_transfer_state
-                ):
-                    filename = message.get("name", "unknown")
+            if not error:
+                logger.info(
+                    f"File transfer completed successfully: {filename} from {device_id} "
+                    f"({received_size} bytes, {chunks_received} chunks)"
+                )
+            else:
+                logger.error(error)
 
-                    try:
-                        # Close file handle
-                        if device.file_transfer_state["file_handle"]:
-                            device.file_transfer_state["file_handle"].close()
-
-                        # Verify file size
-                        expected_size = device.file_transfer_state["expected_size"]
-                        received_size = device.file_transfer_state["received_bytes"]
-                        chunks_received = device.file_transfer_state["chunks_received"]
-
-                        if received_size == expected_size:
-                            logger.info(
-                                f"File transfer completed successfully: {filename} from {device_id} "
-                                f"({received_size} bytes, {chunks_received} chunks)"
-                            )
+            # Send acknowledgment
+            ack_message = {
+                "type": "file_received",
+                "name": filename,
+                "status": "error" if error else "ok",
+            }
+            self.send_command(device_id, ack_message)
 
-                            # Send acknowledgment
-                            ack_message = {
-                                "type": "file_received",
-                                "name": filename,
-                                "status": "ok",
-                            }
-                            self.send_command(device_id, ack_message)
-                        else:
-                            logger.error(
-                                f"File transfer size mismatch: expected {expected_size}, "
-                                f"received {received_size} bytes"
-                            )
+            # Clean up transfer state
+            device.file_transfer_state = None
 
-                            # Send error acknowledgment
-                            ack_message = {
-                                "type": "file_received",
-                                "name": filename,
-                                "status": "error",
-                            }
-                            self.send_command(device_id, ack_message)
+        except Exception as e:
+            error = f"Error finalizing file transfer from {device_id}: {e}"
+            logger.error(error)
+            device.file_transfer_state = None
 
-                        # Clean up transfer state
-                        device.file_transfer_state = None
+        self.file_collector.on_transfer_finished(
+            device_id, filename, not error, error or "", resumable
+        )
 
-                    except Exception as e:
-                        logger.error(
-                            f"Error finalizing file transfer from {device_id}: {e}"
-                        )
-                        device.file_transfer_state = None
-                else:
-                    logger.warning(
-                        f"Received file_end from {device_id} without active transfer"
-                    )
+    def process_binary_chunk(
+        self,
+        client_socket: socket.socket,
+        client_addr: str,
+        data: bytes,
+        context: Optional[ClientContext] = None,
+    ) -> bool:
+        """
+        Write a binary file chunk straight to the file of the active transfer.
 
-        else:
-            device_id = self.find_device_id(client_socket)
+        Binary chunks follow a file_info message that accepted the binary
+        transfer mode; the file_end message then completes the transfer as for
+        base64 file_chunk messages.
+
+        Args:
+            client_socket: Socket object for the client
+            client_addr: Client address string
+            data: Raw chunk bytes, followed by a CRC32 trailer if file_info
+                negotiated chunk checksums
+            context: Connection context; looked up from client_socket if omitted
+
+        Returns:
+            True if the chunk was written, False otherwise
+        """
+        if context is None:
+            context = self._get_context(client_socket, client_addr)
+        self._resolve_device(context)
+        device_id = context.device_id
+        state = context.file_transfer_state
+        if not state or state.get("transfer_mode") != FILE_TRANSFER_MODE_BINARY:
+            logger.warning(
+                f"Received binary file chunk from {device_id or client_addr} without binary file_info"
+            )
+            return False
+        if state.get("error"):
+            return False
+
+        if state.get("chunk_checksum") == CHUNK_CHECKSUM_CRC32:
+            try:
+                data, crc32 = split_crc32_trailer(data)
+            except FileTransferError as e:
+                self._fail_file_transfer(state, str(e))
+                return False
+            if zlib.crc32(data) != crc32:
+                self._fail_file_transfer(
+                    state, f"Chunk {state['chunks_received'] + 1} checksum mismatch"
+                )
+                return False
+
+        return self._write_file_chunk(device_id, state, data)
+
+    def _write_file_chunk(self, device_id: str, state: Dict[str, Any], data) -> bool:
+        """
+        Append a verified chunk to the file of a transfer.
+
+        Args:
+            device_id: Device sending the file
+            state: File transfer state of the device
+            data: Chunk bytes
+
+        Returns:
+            True if the chunk was written, False otherwise
+        """
+        file_handle = state["file_handle"]
+        if file_handle:
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[file_handle.write(view) :]
+            except OSError as e:
+                self._fail_file_transfer(
+                    state, f"Error writing file chunk from {device_id}: {e}"
+                )
+                return False
+
+        digest = state.get("digest")
+        if digest is not None:
+            digest.update(data)
+        state["received_bytes"] += len(data)
+        state["chunks_received"] += 1
+
+        # Record progress so a restart after a crash loses little data
+        if (
+            state.get("final_path")
+            and state["received_bytes"] - state["metadata_saved_bytes"]
+            >= PARTIAL_METADATA_INTERVAL
+        ):
+            self._save_partial_transfer(state)
+
+        if state["chunks_received"] % 100 == 0 and state["expected_size"]:
+            logger.debug(
+                f"File transfer progress from {device_id}: "
+                f"{state['received_bytes'] * 100.0 / state['expected_size']:.1f}% "
+                f"({state['received_bytes']}/{state['expected_size']} bytes)"
+            )
+        self.file_collector.on_chunk_received(
+            device_id,
+            state["filename"],
+            state["received_bytes"],
+            state["expected_size"],
+            len(data),
+        )
+        return True
+
+    def _save_partial_transfer(self, state: Dict[str, Any]):
+        """Flush a partial file and record how much of it was received."""
+        file_handle = state["file_handle"]
+        if file_handle and not file_handle.closed:
+            file_handle.flush()
+        save_partial_metadata(
+            state["final_path"],
+            {
+                "name": state["filename"],
+                "size": state["expected_size"],
+                "received_bytes": state["received_bytes"],
+            },
+        )
+        state["metadata_saved_bytes"] = state["received_bytes"]
+
+    def _fail_file_transfer(
+        self, state: Dict[str, Any], error: str, resumable: bool = True
+    ):
+        """
+        Stop writing a transfer after an error; file_end reports the failure.
+
+        The data received before the error stays in the partial file, so a
+        retry resumes after it.
+        """
+        logger.error(error)
+        state["error"] = error
+        state["resumable"] = resumable
+
+    def _interrupt_file_transfer(self, device_id: str, device: "RemoteDevice"):
+        """Keep the partial file of a transfer cut off by a disconnect."""
+        state = getattr(device, "file_transfer_state", None)
+        if state:
+            try:
+                if state.get("final_path") and not state.get("error"):
+                    self._save_partial_transfer(state)
+                if state["file_handle"]:
+                    state["file_handle"].close()
+            except OSError as e:
+                logger.error(f"Error saving partial file from {device_id}: {e}")
             logger.warning(
-                f"Unknown message type '{message_type}' from {device_id or client_addr}"
+                f"File transfer of {state['filename']} from {device_id} interrupted "
+                f"at {state['received_bytes']}/{state['expected_size']} bytes"
             )
+            device.file_transfer_state = None
+        self.file_collector.on_device_disconnected(device_id)
 
-        return self.find_device_id(client_socket)
+    def _file_transfer_delay(self, context: ClientContext, nbytes: int) -> float:
+        """
+        Seconds to pause reading from a device to honour the bandwidth cap.
+
+        Args:
+            context: Context of the connection the data was received on
+            nbytes: Size of the received frame
+
+        Returns:
+            Delay in seconds, 0 unless the device is sending a file
+        """
+        if not context.file_transfer_state:
+            return 0.0
+        return self.file_collector.throttle(nbytes)
+
+    def _negotiate_encoding(self, device: "RemoteDevice", offered_encodings):
+        """
+        Choose a device's wire encoding and acknowledge it.
+
+        The acknowledgment itself is sent as JSON; the device switches to the
+        negotiated encoding when it receives it.
+
+        Args:
+            device: Newly registered device
+            offered_encodings: Encodings listed in the device's hello
+        """
+        handshake_manager = get_handshake_manager()
+        if getattr(device.client_socket, "newline_framing", False):
+            # Binary encodings may contain the newline delimiter
+            encoding = ENCODING_JSON
+        else:
+            encoding = handshake_manager.negotiate_encoding(offered_encodings)
+
+        ack = handshake_manager.create_handshake_ack(True, encoding=encoding)
+        self.send_command(device.device_id, ack)
+        device.encoding = encoding
+        logger.info(f"Device {device.device_id} uses {encoding} wire encoding")
+
+    def _owns_device(self, device_id: str, client_socket) -> bool:
+        """Whether device_id is registered with this client connection."""
+        device = self.devices.get(device_id)
+        return device is not None and device.client_socket is client_socket
+
+    def _open_context(self, client_socket, client_addr: str, reader=None) -> ClientContext:
+        """Create and register the context of a new client connection."""
+        context = ClientContext(client_socket, client_addr, reader)
+        self._contexts[client_socket] = context
+        return context
+
+    def _close_context(self, context: ClientContext):
+        """Forget the context of a closed client connection."""
+        if self._contexts.get(context.client_socket) is context:
+            del self._contexts[context.client_socket]
+
+    def _get_context(self, client_socket, client_addr: Optional[str]) -> ClientContext:
+        """Get the context of a client connection, creating one if needed."""
+        context = self._contexts.get(client_socket)
+        if context is None:
+            context = self._open_context(client_socket, client_addr or "")
+        return context
+
+    def _resolve_device(self, context: ClientContext) -> Optional[RemoteDevice]:
+        """
+        Get the device registered on a connection.
+
+        A device replaced by a reconnect or removed on disconnect is dropped
+        from the context. A connection without a device is matched against
+        devices registered without a hello message, which keeps callers that
+        fill self.devices directly working.
+        """
+        device = context.device
+        if device is not None:
+            if self.devices.get(device.device_id) is not device:
+                device = context.device = None
+        else:
+            client_socket = context.client_socket
+            for candidate in self.devices.values():
+                if candidate.client_socket is client_socket:
+                    device = context.device = candidate
+                    break
+        return device
 
     def find_device_id(self, client_socket: socket.socket) -> Optional[str]:
         """
@@ -590,10 +1334,11 @@ class JsonSocketServer(QThread):
         Returns:
             Device ID if found, None otherwise
         """
-        for device_id, device in self.devices.items():
-            if device.client_socket == client_socket:
-                return device_id
-        return None
+        context = self._contexts.get(client_socket)
+        if context is None:
+            context = ClientContext(client_socket, "")
+        device = self._resolve_device(context)
+        return device.device_id if device is not None else None
 
     def send_command(self, device_id: str, command_dict: Dict[str, Any]) -> bool:
         """
@@ -612,11 +1357,14 @@ class JsonSocketServer(QThread):
 
         try:
             device = self.devices[device_id]
-            json_data = json.dumps(command_dict).encode("utf-8")
+            payload = encode_message(command_dict, device.encoding)
 
-            # Send length header (4 bytes, big-endian) followed by JSON data
-            length_header = struct.pack(">I", len(json_data))
-            device.client_socket.send(length_header + json_data)
+            if isinstance(device.client_socket, AsyncClientConnection):
+                # Framed to match the client and written by the event loop
+                device.client_socket.send_payload(payload)
+            else:
+                # Send length header (4 bytes, big-endian) followed by the message
+                device.client_socket.send(pack_frame(payload))
 
             # Update device statistics
             device.increment_message_count("sent")
@@ -628,7 +1376,7 @@ class JsonSocketServer(QThread):
 
         except Exception as e:
             logger.error(f"Error sending command to {device_id}: {e}")
-            self.error_occurred.emit(device_id, f"Command send error: {str(e)}")
+            self._emit(self.error_occurred, device_id, f"Command send error: {str(e)}")
             return False
 
     def broadcast_command(self, command_dict: Dict[str, Any]) -> int:
@@ -684,6 +1432,20 @@ class JsonSocketServer(QThread):
         logger.info("Stopping JSON socket server...")
         self.running = False
 
+        if self.server_mode == SERVER_MODE_ASYNCIO:
+            # The event loop closes the connections; each client handler
+            # then emits device_disconnected for its device
+            self._stop_requested = True
+            loop, shutdown_event = self._loop, self._shutdown_event
+            if loop is not None and shutdown_event is not None:
+                try:
+                    loop.call_soon_threadsafe(shutdown_event.set)
+                except RuntimeError:
+                    # Event loop already closed
+                    pass
+            logger.info("JSON socket server stop requested")
+            return
+
         if self.server_socket:
             try:
                 self.server_socket.close()
@@ -743,7 +1505,7 @@ class JsonSocketServer(QThread):
             return None
 
     def request_file_from_device(
-        self, device_id: str, filepath: str, filetype: str = None
+        self, device_id: str, filepath: str, filetype: str = None, offset: int = 0
     ) -> bool:
         """
         Request a file from a specific device - Milestone 3.6
@@ -752,6 +1514,7 @@ class JsonSocketServer(QThread):
             device_id: Target device identifier
             filepath: Path to file on device
             filetype: Optional file type descriptor
+            offset: Byte offset to resume an interrupted transfer from
 
         Returns:
             True if request sent successfully, False otherwise
@@ -766,6 +1529,10 @@ class JsonSocketServer(QThread):
                 "filepath": filepath,
                 "filetype": filetype,
             }
+            if BINARY_FILE_TRANSFER_CAPABILITY in self.devices[device_id].capabilities:
+                send_file_command["transfer_mode"] = FILE_TRANSFER_MODE_BINARY
+            if offset:
+                send_file_command["offset"] = offset
 
             success = self.send_command(device_id, send_file_command)
             if success:
@@ -785,37 +1552,53 @@ class JsonSocketServer(QThread):
         """
         Request all session files from all connected devices - Milestone 3.6
 
+        Files are queued on the file collector, which runs the transfers
+        within its concurrency and bandwidth limits and resumes interrupted
+        ones; see its signals for progress.
+
         Args:
             session_id: Session identifier
 
         Returns:
-            Number of devices that received file requests
+            Number of file requests queued
         """
-        success_count = 0
+        queued = 0
 
-        for device_id, device in self.devices.items():
+        for device_id, device in list(self.devices.items()):
             try:
                 # Determine expected files based on device capabilities
                 expected_files = self.get_expected_files_for_device(
                     device_id, session_id, device.capabilities
                 )
 
-                # Request each expected file
                 for filepath in expected_files:
-                    if self.request_file_from_device(device_id, filepath):
-                        success_count += 1
-                        # Add small delay between requests to avoid overwhelming the device
-                        import time
-
-                        time.sleep(0.1)
+                    self.file_collector.add_job(device_id, filepath)
+                    queued += 1
 
             except Exception as e:
                 logger.error(f"Error requesting files from device {device_id}: {e}")
 
+        started = self.file_collector.schedule()
         logger.info(
-            f"Requested session files from {success_count} device file combinations"
+            f"Queued {queued} session files for collection ({started} transfers started)"
         )
-        return success_count
+        return queued
+
+    def get_resume_offset(self, device_id: str, filename: str) -> int:
+        """
+        Bytes already received of an interrupted transfer of a file.
+
+        Args:
+            device_id: Device holding the file
+            filename: File name as announced in file_info
+
+        Returns:
+            Offset to request the file from, 0 to start over
+        """
+        session_dir = self.get_session_directory()
+        if not session_dir:
+            return 0
+        return read_resume_offset(os.path.join(session_dir, f"{device_id}_{filename}"))
 
     def get_expected_files_for_device(
         self, device_id: str, session_id: str, capabilities: List[str]
@@ -16,10 +16,10 @@ Date: 2025-01-15
 """
 
 import base64
-import json
+import itertools
 import queue
+import re
 import socket
-import struct
 import threading
 import time
 from collections import defaultdict, deque
@@ -32,6 +32,9 @@ from PyQt5.QtCore import QThread, pyqtSignal, QTimer, QMutex, QMutexLocker
 
 # Import centralized logging
 from utils.logging_config import get_logger
+from protocol.handshake_manager import get_handshake_manager
+from protocol.wire_encoding import ENCODING_JSON, decode_message, encode_message
+from .framing import FRAME_HEADER, FrameReader, FrameWriter, pack_frame, recv_exact
 
 # Set up logging
 logger = get_logger(__name__)
@@ -54,6 +57,37 @@ class ConnectionState(Enum):
     ERROR = auto()
 
 
+# A preview frame's type field, as it appears near the start of the frame in
+# each wire encoding. Devices put "type" first, so the frame can be recognised
+# without decoding a payload of several hundred KB.
+PREVIEW_FRAME_PEEK_SIZE = 128
+_JSON_PREVIEW_TYPE = re.compile(rb'"type"\s*:\s*"preview_frame"')
+_BINARY_PREVIEW_TYPES = (
+    b"\xa4type\xadpreview_frame",  # MessagePack fixstr keys
+    b"\x64type\x6dpreview_frame",  # CBOR text strings
+)
+
+
+def is_preview_frame(frame) -> bool:
+    """
+    Check whether an undecoded message frame is a preview_frame message.
+
+    Only the first PREVIEW_FRAME_PEEK_SIZE bytes are inspected, so a preview
+    frame whose type field comes later is not recognised and is rate limited
+    after decoding instead.
+
+    Args:
+        frame: Frame payload as returned by FrameReader.read_frame()
+
+    Returns:
+        True if the frame's type field says preview_frame
+    """
+    head = bytes(frame[:PREVIEW_FRAME_PEEK_SIZE])
+    if head[:1] == b"{":
+        return _JSON_PREVIEW_TYPE.search(head) is not None
+    return any(marker in head for marker in _BINARY_PREVIEW_TYPES)
+
+
 @dataclass
 class NetworkMessage:
     """Enhanced message structure with metadata."""
@@ -87,6 +121,14 @@ class ConnectionStats:
     packet_loss_rate: float = 0.0
     ping_count: int = 0
     pong_count: int = 0
+    preview_frames_dropped: int = 0  # over the frame rate, dropped before decoding
+    preview_frames_decoded: int = 0
+    preview_frames_rendered: int = 0  # taken from the latest-frame slot
+    backpressure_waits: int = 0  # flushes cut short by a full send buffer
+    # Queue latency samples in ms per MessagePriority name
+    queue_latency: Dict[str, deque] = field(
+        default_factory=lambda: defaultdict(lambda: deque(maxlen=100))
+    )
 
 
 class EnhancedRemoteDevice:
@@ -95,19 +137,25 @@ class EnhancedRemoteDevice:
     """
 
     def __init__(self, device_id: str, capabilities: List[str], 
-                 client_socket: socket.socket, address: Tuple[str, int]):
+                 client_socket: socket.socket, address: Tuple[str, int],
+                 frame_reader: Optional[FrameReader] = None):
         """Initialize enhanced remote device."""
         self.device_id = device_id
         self.capabilities = capabilities
         self.client_socket = client_socket
+        self.frame_reader = frame_reader or FrameReader(client_socket)
+        self.frame_writer = FrameWriter(client_socket)
         self.address = address
         self.state = ConnectionState.CONNECTED
+        # Wire encoding of messages sent to the device, set by the handshake
+        self.encoding = ENCODING_JSON
         
         # Thread safety
         self.mutex = QMutex()
         
-        # Message queuing
+        # Message queuing; the sequence number keeps FIFO order within a priority
         self.outbound_queue = queue.PriorityQueue()
+        self._queue_sequence = itertools.count()
         self.pending_acks = {}  # message_id -> (timestamp, callback)
         
         # Statistics and monitoring
@@ -122,6 +170,9 @@ class EnhancedRemoteDevice:
         self.streaming_quality = 'medium'  # low, medium, high
         self.max_frame_rate = 15  # fps for preview streaming
         self.last_frame_time = 0.0
+        # Newest decoded preview frame not yet taken for display:
+        # (frame_type, image_bytes, metadata)
+        self.latest_preview_frame: Optional[Tuple[str, bytes, Dict[str, Any]]] = None
         
         # Buffer management
         self.send_buffer_size = 64 * 1024  # 64KB
@@ -148,6 +199,24 @@ class EnhancedRemoteDevice:
             return True
         return False
 
+    def store_preview_frame(self, frame_type: str, image_bytes: bytes,
+                            metadata: Dict[str, Any]) -> bool:
+        """Replace the latest preview frame; returns True if no frame was waiting."""
+        with QMutexLocker(self.mutex):
+            was_empty = self.latest_preview_frame is None
+            self.latest_preview_frame = (frame_type, image_bytes, metadata)
+            self.stats.preview_frames_decoded += 1
+            return was_empty
+
+    def take_preview_frame(self) -> Optional[Tuple[str, bytes, Dict[str, Any]]]:
+        """Take the latest preview frame for display, emptying the slot."""
+        with QMutexLocker(self.mutex):
+            frame = self.latest_preview_frame
+            if frame is not None:
+                self.latest_preview_frame = None
+                self.stats.preview_frames_rendered += 1
+            return frame
+
     def adapt_streaming_quality(self, network_latency: float, error_rate: float):
         """Adapt streaming quality based on network conditions."""
         with QMutexLocker(self.mutex):
@@ -164,16 +233,33 @@ class EnhancedRemoteDevice:
     def queue_message(self, message: NetworkMessage):
         """Queue message for sending with priority handling."""
         priority_value = message.priority.value
-        self.outbound_queue.put((priority_value, time.time(), message))
+        self.outbound_queue.put((priority_value, next(self._queue_sequence), time.time(), message))
 
     def get_next_message(self, timeout: float = 0.1) -> Optional[NetworkMessage]:
         """Get next message from queue."""
         try:
-            _, _, message = self.outbound_queue.get(timeout=timeout)
+            _, _, _, message = self.outbound_queue.get(timeout=timeout)
             return message
         except queue.Empty:
             return None
 
+    def get_next_messages(self, timeout: float = 0.1,
+                          max_messages: int = 64) -> List[Tuple[float, NetworkMessage]]:
+        """Wait for a message, then take every queued one up to max_messages, highest priority first."""
+        entries = []
+        try:
+            entries.append(self.outbound_queue.get(timeout=timeout))
+            while len(entries) < max_messages:
+                entries.append(self.outbound_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return [(queued_at, message) for _, _, queued_at, message in entries]
+
+    def record_queue_latency(self, priority: MessagePriority, latency: float):
+        """Record how long a message waited between queueing and being written, in ms."""
+        with QMutexLocker(self.mutex):
+            self.stats.queue_latency[priority.name].append(latency)
+
     def update_latency(self, latency: float):
         """Update latency statistics with advanced metrics."""
         with QMutexLocker(self.mutex):
@@ -228,7 +314,8 @@ class EnhancedRemoteDevice:
                 "state": self.state.name,
                 "capabilities": self.capabilities,
                 "address": f"{self.address[0]}:{self.address[1]}",
-                "is_alive": self.is_alive(),
+                # self.mutex is held, and is_alive() would lock it again
+                "is_alive": (time.time() - self.last_heartbeat) < self.heartbeat_timeout,
                 "streaming_quality": self.streaming_quality,
                 "stats": {
                     "messages_sent": self.stats.messages_sent,
@@ -245,6 +332,22 @@ class EnhancedRemoteDevice:
                     "pong_count": self.stats.pong_count,
                     "connection_duration": round(time.time() - self.stats.connected_at, 1),
                     "latency_samples": len(self.stats.latency_samples)
+                },
+                "preview": {
+                    "max_frame_rate": self.max_frame_rate,
+                    "frames_dropped": self.stats.preview_frames_dropped,
+                    "frames_decoded": self.stats.preview_frames_decoded,
+                    "frames_rendered": self.stats.preview_frames_rendered
+                },
+                "sender": {
+                    "syscalls_per_message": round(
+                        self.frame_writer.syscalls / max(1, self.frame_writer.frames_written), 3
+                    ),
+                    "backpressure_waits": self.stats.backpressure_waits,
+                    "queue_latency_ms": {
+                        priority: round(sum(samples) / len(samples), 2)
+                        for priority, samples in self.stats.queue_latency.items() if samples
+                    }
                 }
             }
 
@@ -273,6 +376,11 @@ class EnhancedDeviceServer(QThread):
     message_failed = pyqtSignal(str, dict, str)  # device_id, message, error
     
     # Preview streaming
+    # Emitted when a device's preview slot fills; GUI code fetches the newest
+    # frame with take_preview_frame(device_id)
+    preview_frame_ready = pyqtSignal(str)  # device_id
+    # Newest frame of the slot, taken by the server while this signal has
+    # receivers; do not also call take_preview_frame()
     preview_frame_received = pyqtSignal(str, str, bytes, dict)  # device_id, frame_type, data, metadata
     streaming_quality_changed = pyqtSignal(str, str)  # device_id, new_quality
     
@@ -306,6 +414,9 @@ class EnhancedDeviceServer(QThread):
         self.client_handlers: Dict[str, threading.Thread] = {}
         self.connection_pool = []
         
+        # Preview frames reach preview_frame_received from the latest-frame slot
+        self.preview_frame_ready.connect(self._deliver_preview_frame)
+        
         # Heartbeat system
         self.heartbeat_timer = QTimer()
         self.heartbeat_timer.timeout.connect(self.send_heartbeats)
@@ -328,6 +439,11 @@ class EnhancedDeviceServer(QThread):
         self.enable_compression = True
         self.compression_threshold = 1024  # bytes
         
+        # Outbound coalescing: messages queued by the time the sender wakes
+        # up are written with one vectored send
+        self.max_coalesced_messages = 64
+        self.send_wait_timeout = 0.1  # seconds to wait for send buffer space
+        
         logger.info(f"Enhanced Device Server initialized: {host}:{port}")
 
     def start_server(self):
@@ -430,7 +546,8 @@ class EnhancedDeviceServer(QThread):
         
         try:
             # Wait for handshake message
-            handshake_msg = self.receive_message(client_socket, timeout=10.0)
+            frame_reader = FrameReader(client_socket)
+            handshake_msg = self.receive_message(frame_reader, timeout=10.0)
             if not handshake_msg or handshake_msg.get('type') != 'handshake':
                 logger.warning(f"Invalid handshake from {client_addr}")
                 return
@@ -443,14 +560,17 @@ class EnhancedDeviceServer(QThread):
                 return
             
             # Create enhanced device
-            device = EnhancedRemoteDevice(device_id, capabilities, client_socket, address)
+            device = EnhancedRemoteDevice(
+                device_id, capabilities, client_socket, address, frame_reader
+            )
             
             # Register device
             with QMutexLocker(self.devices_mutex):
                 self.devices[device_id] = device
                 self.client_handlers[device_id] = threading.current_thread()
             
-            # Send handshake acknowledgment
+            # Send handshake acknowledgment, naming the wire encoding if the
+            # device offered any
             ack_msg = {
                 'type': 'handshake_ack',
                 'protocol_version': 1,
@@ -459,7 +579,16 @@ class EnhancedDeviceServer(QThread):
                 'compatible': True,
                 'timestamp': time.time()
             }
-            self.send_message(device, ack_msg, MessagePriority.CRITICAL)
+            encoding = ENCODING_JSON
+            if 'encodings' in handshake_msg:
+                encoding = get_handshake_manager().negotiate_encoding(handshake_msg['encodings'])
+                ack_msg['encoding'] = encoding
+            # Sent before the sender thread starts, so the acknowledgment is
+            # the first message and still JSON
+            self.send_message_immediate(
+                device, NetworkMessage('handshake_ack', ack_msg, MessagePriority.CRITICAL)
+            )
+            device.encoding = encoding
             
             # Emit connection signal
             self.device_connected.emit(device_id, device.get_status_summary())
@@ -487,15 +616,32 @@ class EnhancedDeviceServer(QThread):
         """Main message receiving loop for a device."""
         while self.running and device.state == ConnectionState.CONNECTED:
             try:
-                message = self.receive_message(device.client_socket, timeout=1.0)
-                if not message:
+                frame = self.receive_frame(device.frame_reader, timeout=1.0)
+                if frame is None:
+                    if device.frame_reader.closed:
+                        break
                     continue
                 
                 # Update device statistics
                 device.stats.messages_received += 1
+                device.stats.bytes_received += len(frame)
                 device.last_heartbeat = time.time()
                 device.reset_error_count()
                 
+                # Over-rate preview frames are dropped before they are decoded
+                peeked_preview = is_preview_frame(frame)
+                if peeked_preview and not self._admit_preview_frame(device):
+                    continue
+                
+                try:
+                    message = decode_message(frame)
+                except ValueError as e:
+                    logger.error(f"Message decode error from {device.device_id}: {e}")
+                    continue
+                if (not peeked_preview and message.get('type') == 'preview_frame'
+                        and not self._admit_preview_frame(device)):
+                    continue
+                
                 # Process message
                 self.process_message(device, message)
                 
@@ -511,87 +657,112 @@ class EnhancedDeviceServer(QThread):
                     break
 
     def message_sender_loop(self, device: EnhancedRemoteDevice):
-        """Message sending loop for a device."""
+        """
+        Message sending loop for a device.
+        
+        Every message queued when the loop wakes up is written in one
+        vectored send, highest priority first. When the socket send buffer is
+        full the loop waits at most send_wait_timeout and leaves new messages
+        in the priority queue, so a slow device cannot stall the thread and a
+        later command still overtakes queued low priority messages.
+        """
+        writer = device.frame_writer
+        in_flight: List[Tuple[float, NetworkMessage, int]] = []
         while self.running and device.state == ConnectionState.CONNECTED:
             try:
-                message = device.get_next_message(timeout=0.5)
-                if not message:
+                if not in_flight:
+                    batch = device.get_next_messages(
+                        timeout=0.5, max_messages=self.max_coalesced_messages
+                    )
+                    for queued_at, message in batch:
+                        try:
+                            payload = encode_message(message.payload, device.encoding)
+                        except Exception as e:
+                            logger.error(f"Failed to encode message for {device.device_id}: {e}")
+                            self.message_failed.emit(device.device_id, message.payload, str(e))
+                            continue
+                        writer.add(payload)
+                        in_flight.append((queued_at, message, FRAME_HEADER.size + len(payload)))
+                    if not in_flight:
+                        continue
+                
+                if not writer.flush(timeout=self.send_wait_timeout):
+                    device.stats.backpressure_waits += 1
                     continue
                 
-                # Send message
-                success = self.send_message_immediate(device, message)
-                if success:
+                sent_at = time.time()
+                for queued_at, message, frame_size in in_flight:
+                    device.record_queue_latency(message.priority, (sent_at - queued_at) * 1000)
                     device.stats.messages_sent += 1
-                    device.reset_error_count()
+                    device.stats.bytes_sent += frame_size
                     self.message_sent.emit(device.device_id, message.payload)
-                else:
-                    device.increment_error_count()
-                    self.message_failed.emit(device.device_id, message.payload, "Send failed")
-                    
-                    if device.should_reconnect():
-                        break
+                in_flight = []
+                device.reset_error_count()
                         
             except Exception as e:
                 logger.error(f"Send error for {device.device_id}: {e}")
                 device.increment_error_count()
+                for _, message, _ in in_flight:
+                    self.message_failed.emit(device.device_id, message.payload, "Send failed")
+                in_flight = []
+                writer.clear()
+                if device.should_reconnect():
+                    break
 
     def send_message_immediate(self, device: EnhancedRemoteDevice, message: NetworkMessage) -> bool:
         """Send message immediately to device."""
         try:
-            # Serialize message
-            json_data = json.dumps(message.payload).encode('utf-8')
+            # Serialize message in the negotiated encoding
+            payload = encode_message(message.payload, device.encoding)
             
             # Apply compression if needed
-            if self.enable_compression and len(json_data) > self.compression_threshold:
+            if self.enable_compression and len(payload) > self.compression_threshold:
                 # Note: Compression implementation would go here
                 pass
             
             # Send with length prefix
-            length_header = struct.pack('>I', len(json_data))
-            device.client_socket.sendall(length_header + json_data)
+            frame = pack_frame(payload)
+            device.client_socket.sendall(frame)
             
-            device.stats.bytes_sent += len(length_header) + len(json_data)
+            device.stats.bytes_sent += len(frame)
             return True
             
         except Exception as e:
             logger.error(f"Failed to send message to {device.device_id}: {e}")
             return False
 
-    def receive_message(self, sock: socket.socket, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
-        """Receive message with timeout."""
-        sock.settimeout(timeout)
+    def receive_message(self, reader: FrameReader, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Receive message with timeout; a frame cut off by the timeout is resumed on the next call."""
+        data = self.receive_frame(reader, timeout)
+        if data is None:
+            return None
         try:
-            # Read length header
-            length_data = self.recv_exact(sock, 4)
-            if not length_data:
-                return None
-            
-            message_length = struct.unpack('>I', length_data)[0]
-            if message_length <= 0 or message_length > 10 * 1024 * 1024:  # 10MB max
-                raise ValueError(f"Invalid message length: {message_length}")
-            
-            # Read message
-            json_data = self.recv_exact(sock, message_length)
-            if not json_data:
-                return None
-            
-            return json.loads(json_data.decode('utf-8'))
-            
+            return decode_message(data)
+        except Exception as e:
+            logger.error(f"Receive message error: {e}")
+            return None
+
+    def receive_frame(self, reader: FrameReader, timeout: float = 1.0) -> Optional[memoryview]:
+        """Receive an undecoded frame, valid until the next read from the same reader."""
+        reader.sock.settimeout(timeout)
+        try:
+            return reader.read_frame()
         except socket.timeout:
             return None
         except Exception as e:
             logger.error(f"Receive message error: {e}")
             return None
 
-    def recv_exact(self, sock: socket.socket, length: int) -> Optional[bytes]:
+    def _admit_preview_frame(self, device: EnhancedRemoteDevice) -> bool:
+        """Apply the device's preview frame rate, counting dropped frames."""
+        if device.should_send_frame():
+            return True
+        device.stats.preview_frames_dropped += 1
+        return False
+
+    def recv_exact(self, sock: socket.socket, length: int) -> Optional[bytearray]:
         """Receive exactly 'length' bytes."""
-        data = b""
-        while len(data) < length:
-            chunk = sock.recv(length - len(data))
-            if not chunk:
-                return None
-            data += chunk
-        return data
+        return recv_exact(sock, length)
 
     def process_message(self, device: EnhancedRemoteDevice, message: Dict[str, Any]):
         """Process received message with enhanced handling."""
@@ -611,17 +782,21 @@ class EnhancedDeviceServer(QThread):
             self.handle_preview_frame(device, message)
         elif msg_type == 'ack':
             self.handle_acknowledgment(device, message)
-        elif msg_type == 'sensor_data':
+        elif msg_type in ('sensor_data', 'sensor_batch'):
             self.handle_sensor_data(device, message)
         else:
             # Generic message handling
             self.message_received.emit(device.device_id, message)
 
     def handle_preview_frame(self, device: EnhancedRemoteDevice, message: Dict[str, Any]):
-        """Handle preview frame with adaptive quality."""
-        if not device.should_send_frame():
-            return  # Rate limiting
+        """
+        Handle preview frame with adaptive quality.
         
+        Rate limiting is applied by message_receiver_loop before decoding. The
+        frame replaces the device's latest-frame slot, and preview_frame_ready
+        is emitted only when the slot was empty, so a slow GUI renders the
+        newest frame instead of working through a queue of stale ones.
+        """
         frame_type = message.get('frame_type', 'rgb')
         image_data = message.get('image_data', '')
         width = message.get('width', 0)
@@ -638,7 +813,8 @@ class EnhancedDeviceServer(QThread):
                 'timestamp': message.get('timestamp', time.time())
             }
             
-            self.preview_frame_received.emit(device.device_id, frame_type, image_bytes, metadata)
+            if device.store_preview_frame(frame_type, image_bytes, metadata):
+                self.preview_frame_ready.emit(device.device_id)
             
             # Adapt quality based on network conditions
             error_rate = device.stats.error_count / max(1, device.stats.messages_received)
@@ -647,6 +823,36 @@ class EnhancedDeviceServer(QThread):
         except Exception as e:
             logger.error(f"Preview frame processing error: {e}")
 
+    def take_preview_frame(self, device_id: str) -> Optional[Tuple[str, bytes, Dict[str, Any]]]:
+        """Take the newest preview frame of a device for display, if one is waiting."""
+        with QMutexLocker(self.devices_mutex):
+            device = self.devices.get(device_id)
+        if not device:
+            return None
+        return device.take_preview_frame()
+
+    def _deliver_preview_frame(self, device_id: str):
+        """Emit preview_frame_received with the newest frame of a device's slot."""
+        # Runs on the server's thread; frames replaced meanwhile are skipped
+        if not self.receivers(self.preview_frame_received):
+            return
+        frame = self.take_preview_frame(device_id)
+        if frame is not None:
+            frame_type, image_bytes, metadata = frame
+            self.preview_frame_received.emit(device_id, frame_type, image_bytes, metadata)
+
+    def get_preview_statistics(self) -> Dict[str, Dict[str, int]]:
+        """Get dropped, decoded and rendered preview frame counts per device."""
+        with QMutexLocker(self.devices_mutex):
+            return {
+                device_id: {
+                    "dropped": device.stats.preview_frames_dropped,
+                    "decoded": device.stats.preview_frames_decoded,
+                    "rendered": device.stats.preview_frames_rendered,
+                }
+                for device_id, device in self.devices.items()
+            }
+
     def handle_heartbeat(self, device: EnhancedRemoteDevice, message: Dict[str, Any]):
         """Handle heartbeat message."""
         # Send heartbeat response
@@ -866,7 +1072,7 @@ class EnhancedDeviceServer(QThread):
         self.message_received.emit(device.device_id, message)
 
     def handle_sensor_data(self, device: EnhancedRemoteDevice, message: Dict[str, Any]):
-        """Handle sensor data message."""
+        """Handle sensor data message; a sensor_batch is forwarded whole as one message."""
         self.message_received.emit(device.device_id, message)
 
     def send_message(self, device: EnhancedRemoteDevice, message_data: Dict[str, Any], 
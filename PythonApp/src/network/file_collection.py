@@ -0,0 +1,605 @@
+"""
+Session File Collection - resumable, checksummed, scheduled file transfers
+
+After a recording the PC pulls the session files from every device. This
+module provides the pieces JsonSocketServer uses for that:
+
+- partial files: data is received into ``<file>.partial`` next to a
+  ``<file>.partial.json`` sidecar recording the expected size and the bytes
+  received so far. Only a verified file is renamed to its final name, and an
+  interrupted transfer restarts from the received offset instead of from the
+  beginning;
+- checksums: chunks may carry a CRC32 (a ``crc32`` field of file_chunk
+  messages, or a 4-byte trailer of binary chunks) and file_end may carry the
+  SHA-256 of the whole file, which the server computes while writing;
+- FileCollectionScheduler: queues file requests and keeps at most
+  ``max_concurrent_transfers`` running overall and
+  ``max_transfers_per_device`` per device, shares a global bandwidth cap
+  between the transfers, retries interrupted transfers when their device
+  reconnects (failing them when it does not return in time), and reports
+  progress and throughput through Qt signals.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-05
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from protocol.config_loader import get_config
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PARTIAL_SUFFIX = ".partial"
+PARTIAL_METADATA_SUFFIX = ".partial.json"
+
+# Per-chunk checksum negotiated in file_info
+CHUNK_CHECKSUM_CRC32 = "crc32"
+CRC32_TRAILER_SIZE = 4
+
+# Job states
+JOB_PENDING = "pending"
+JOB_ACTIVE = "active"
+JOB_INTERRUPTED = "interrupted"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Minimum seconds between progress signals of one transfer
+PROGRESS_INTERVAL = 0.25
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class FileTransferError(Exception):
+    """Raised when a transfer cannot be started or resumed as requested."""
+
+
+def partial_file_path(final_path: str) -> str:
+    """Path of the file a transfer is received into."""
+    return final_path + PARTIAL_SUFFIX
+
+
+def _metadata_path(final_path: str) -> str:
+    return final_path + PARTIAL_METADATA_SUFFIX
+
+
+def save_partial_metadata(final_path: str, metadata: Dict[str, Any]):
+    """
+    Write the sidecar of a partial file.
+
+    Args:
+        final_path: Final path of the file being received
+        metadata: Transfer metadata, at least "size" and "received_bytes"
+    """
+    with open(_metadata_path(final_path), "w") as f:
+        json.dump(metadata, f)
+
+
+def read_resume_offset(final_path: str, expected_size: Optional[int] = None) -> int:
+    """
+    Number of bytes of a partial file a transfer can resume from.
+
+    Args:
+        final_path: Final path of the file being received
+        expected_size: Size announced by the device; a partial file of a
+            file with a different size is not resumed
+
+    Returns:
+        Resume offset, 0 if there is nothing to resume
+    """
+    partial_path = partial_file_path(final_path)
+    if not os.path.exists(partial_path):
+        return 0
+
+    offset = os.path.getsize(partial_path)
+    try:
+        with open(_metadata_path(final_path)) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        metadata = {}
+
+    size = metadata.get("size")
+    if expected_size is not None and size is not None and size != expected_size:
+        return 0
+    # Data written after the sidecar was last saved has not been verified
+    if "received_bytes" in metadata:
+        offset = min(offset, metadata["received_bytes"])
+    if size is not None:
+        offset = min(offset, size)
+    return offset
+
+
+def open_partial_file(
+    final_path: str,
+    expected_size: int,
+    offset: int,
+    digest=None,
+    buffering: int = -1,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> BinaryIO:
+    """
+    Open the partial file of a transfer for writing at ``offset``.
+
+    When resuming, the already received data is fed to ``digest`` so the
+    whole-file checksum covers it.
+
+    Args:
+        final_path: Final path of the file being received
+        expected_size: Size announced by the device
+        offset: Offset the device sends from
+        digest: Optional hashlib object updated with the existing data
+        buffering: Buffering passed to open()
+        metadata: Extra sidecar fields
+
+    Returns:
+        File object positioned at ``offset``
+
+    Raises:
+        FileTransferError: If fewer than ``offset`` bytes can be resumed
+    """
+    partial_path = partial_file_path(final_path)
+    if offset > 0:
+        available = read_resume_offset(final_path, expected_size)
+        if available < offset:
+            raise FileTransferError(
+                f"Cannot resume {os.path.basename(final_path)} at {offset} bytes, "
+                f"{available} bytes available"
+            )
+        file_handle = open(partial_path, "r+b", buffering=buffering)
+        if digest is not None:
+            remaining = offset
+            while remaining:
+                block = file_handle.read(min(_HASH_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        file_handle.seek(offset)
+        file_handle.truncate()
+    else:
+        file_handle = open(partial_path, "wb", buffering=buffering)
+
+    save_partial_metadata(
+        final_path,
+        dict(metadata or {}, size=expected_size, received_bytes=offset),
+    )
+    return file_handle
+
+
+def finalize_partial_file(final_path: str):
+    """Move a verified partial file to its final path and drop the sidecar."""
+    os.replace(partial_file_path(final_path), final_path)
+    discard_partial_metadata(final_path)
+
+
+def discard_partial_metadata(final_path: str):
+    """Remove the sidecar of a partial file, if any."""
+    try:
+        os.remove(_metadata_path(final_path))
+    except FileNotFoundError:
+        pass
+
+
+def discard_partial_file(final_path: str):
+    """Remove a partial file that cannot be resumed, with its sidecar."""
+    try:
+        os.remove(partial_file_path(final_path))
+    except FileNotFoundError:
+        pass
+    discard_partial_metadata(final_path)
+
+
+def split_crc32_trailer(data) -> Tuple[Any, int]:
+    """
+    Split a binary chunk into its payload and big-endian CRC32 trailer.
+
+    Raises:
+        FileTransferError: If the chunk is too short to hold a trailer
+    """
+    if len(data) <= CRC32_TRAILER_SIZE:
+        raise FileTransferError(f"Binary chunk of {len(data)} bytes has no payload")
+    split = len(data) - CRC32_TRAILER_SIZE
+    return data[:split], int.from_bytes(data[split:], "big")
+
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by all transfers.
+
+    Callers reserve bandwidth for the bytes they just received and wait for
+    the returned delay before reading more; TCP flow control then slows the
+    sending device down.
+    """
+
+    def __init__(self, bytes_per_second: float = 0.0, burst_seconds: float = 0.25):
+        """
+        Initialize the limiter.
+
+        Args:
+            bytes_per_second: Bandwidth cap, 0 for unlimited
+            burst_seconds: Seconds of bandwidth that may be used at once
+        """
+        self.bytes_per_second = float(bytes_per_second)
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._next_free = time.monotonic()
+
+    def reserve(self, nbytes: int) -> float:
+        """
+        Account for ``nbytes`` and return how long the caller should wait.
+
+        Args:
+            nbytes: Bytes just received
+
+        Returns:
+            Delay in seconds, 0 if the transfer is within the cap
+        """
+        if self.bytes_per_second <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            # Unused bandwidth accumulates for at most burst_seconds
+            start = max(self._next_free, now - self.burst_seconds)
+            self._next_free = start + nbytes / self.bytes_per_second
+            return max(0.0, self._next_free - now)
+
+
+@dataclass
+class FileCollectionJob:
+    """One file to collect from a device"""
+
+    device_id: str
+    filepath: str
+    filetype: Optional[str] = None
+    status: str = JOB_PENDING
+    attempts: int = 0
+    received_bytes: int = 0
+    total_bytes: int = 0
+    error: str = ""
+
+    @property
+    def filename(self) -> str:
+        """Name the device announces in file_info"""
+        return os.path.basename(self.filepath)
+
+
+class FileCollectionScheduler(QObject):
+    """
+    Schedules session file requests across devices.
+
+    JsonSocketServer owns one scheduler and reports transfer events to it.
+    Signals are emitted from server threads; connect GUI slots with the
+    default (queued) connection.
+    """
+
+    # device_id, filename, received bytes, total bytes (Python ints, files may exceed 2 GB)
+    transfer_progress = pyqtSignal(str, str, object, object)
+    # bytes per second across all transfers
+    throughput_updated = pyqtSignal(float)
+    # device_id, filename, success, error message
+    transfer_finished = pyqtSignal(str, str, bool, str)
+    # completed, failed
+    collection_finished = pyqtSignal(int, int)
+
+    def __init__(
+        self,
+        server,
+        max_concurrent_transfers: Optional[int] = None,
+        max_transfers_per_device: Optional[int] = None,
+        bandwidth_limit_mbps: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        reconnect_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            server: JsonSocketServer used to request files
+            max_concurrent_transfers: Transfers running at once over all devices
+                (default: network.file_collection.max_concurrent_transfers)
+            max_transfers_per_device: Transfers running at once per device; a
+                device connection carries one file at a time, so keep this at 1
+                unless devices open a connection per transfer
+                (default: network.file_collection.max_transfers_per_device)
+            bandwidth_limit_mbps: Global bandwidth cap in megabits per second,
+                0 for unlimited (default: network.file_collection.bandwidth_limit_mbps)
+            max_retries: Restarts of a failed or interrupted transfer
+                (default: network.file_collection.max_retries)
+            reconnect_timeout: Seconds a disconnected device's jobs wait for it
+                to return before they fail
+                (default: network.file_collection.reconnect_timeout_seconds)
+        """
+        super().__init__()
+        self.server = server
+        self.max_concurrent_transfers = int(
+            max_concurrent_transfers
+            if max_concurrent_transfers is not None
+            else get_config("network.file_collection.max_concurrent_transfers", 4)
+        )
+        self.max_transfers_per_device = int(
+            max_transfers_per_device
+            if max_transfers_per_device is not None
+            else get_config("network.file_collection.max_transfers_per_device", 1)
+        )
+        if self.max_concurrent_transfers < 1 or self.max_transfers_per_device < 1:
+            raise ValueError("Transfer concurrency limits must be at least 1")
+        if bandwidth_limit_mbps is None:
+            bandwidth_limit_mbps = get_config(
+                "network.file_collection.bandwidth_limit_mbps", 0
+            )
+        self.max_retries = int(
+            max_retries
+            if max_retries is not None
+            else get_config("network.file_collection.max_retries", 3)
+        )
+        self.reconnect_timeout = float(
+            reconnect_timeout
+            if reconnect_timeout is not None
+            else get_config("network.file_collection.reconnect_timeout_seconds", 60)
+        )
+        self.limiter = BandwidthLimiter(float(bandwidth_limit_mbps) * 1e6 / 8)
+
+        self.jobs: List[FileCollectionJob] = []
+        self._lock = threading.RLock()
+        self._throughput_bytes = 0
+        self._throughput_start = time.monotonic()
+        self._progress_times: Dict[Tuple[str, str], float] = {}
+        # device_id -> timer failing its jobs if it does not (re)connect
+        self._reconnect_timers: Dict[str, threading.Timer] = {}
+
+    def add_job(
+        self, device_id: str, filepath: str, filetype: Optional[str] = None
+    ) -> FileCollectionJob:
+        """
+        Queue a file for collection; call schedule() to start transfers.
+
+        Args:
+            device_id: Device holding the file
+            filepath: Path of the file on the device
+            filetype: Optional file type descriptor
+        """
+        job = FileCollectionJob(device_id, filepath, filetype)
+        with self._lock:
+            self.jobs.append(job)
+        return job
+
+    def schedule(self) -> int:
+        """
+        Start pending jobs up to the concurrency limits.
+
+        Returns:
+            Number of transfers started
+        """
+        started = 0
+        with self._lock:
+            active = [job for job in self.jobs if job.status == JOB_ACTIVE]
+            per_device: Dict[str, int] = {}
+            for job in active:
+                per_device[job.device_id] = per_device.get(job.device_id, 0) + 1
+
+            for job in self.jobs:
+                if len(active) >= self.max_concurrent_transfers:
+                    break
+                if job.status != JOB_PENDING:
+                    continue
+                if per_device.get(job.device_id, 0) >= self.max_transfers_per_device:
+                    continue
+                # The server reports a disconnect before it drops the device
+                if (
+                    job.device_id in self._reconnect_timers
+                    or job.device_id not in self.server.devices
+                ):
+                    self._await_device(job.device_id)
+                    continue
+                if self._start_job(job):
+                    active.append(job)
+                    per_device[job.device_id] = per_device.get(job.device_id, 0) + 1
+                    started += 1
+
+            self._check_finished()
+        return started
+
+    def _start_job(self, job: FileCollectionJob) -> bool:
+        offset = self.server.get_resume_offset(job.device_id, job.filename)
+        job.attempts += 1
+        job.status = JOB_ACTIVE
+        job.received_bytes = offset
+        if offset:
+            logger.info(f"Resuming {job.filename} from {job.device_id} at {offset} bytes")
+        if self.server.request_file_from_device(
+            job.device_id, job.filepath, job.filetype, offset=offset
+        ):
+            return True
+        self._retry_or_fail(job, "File request could not be sent")
+        return False
+
+    def _find_job(self, device_id: str, filename: str) -> Optional[FileCollectionJob]:
+        for job in self.jobs:
+            if (
+                job.status == JOB_ACTIVE
+                and job.device_id == device_id
+                and job.filename == filename
+            ):
+                return job
+        return None
+
+    def _retry_or_fail(self, job: FileCollectionJob, error: str):
+        job.error = error
+        if job.attempts <= self.max_retries:
+            job.status = JOB_PENDING
+            logger.warning(
+                f"Retrying {job.filename} from {job.device_id} "
+                f"(attempt {job.attempts} failed: {error})"
+            )
+        else:
+            job.status = JOB_FAILED
+            logger.error(f"Failed to collect {job.filename} from {job.device_id}: {error}")
+            self.transfer_finished.emit(job.device_id, job.filename, False, error)
+
+    def _check_finished(self):
+        if not self.jobs:
+            return
+        if any(
+            job.status in (JOB_PENDING, JOB_ACTIVE, JOB_INTERRUPTED) for job in self.jobs
+        ):
+            return
+        completed = sum(1 for job in self.jobs if job.status == JOB_COMPLETED)
+        failed = len(self.jobs) - completed
+        self.jobs = []
+        for timer in self._reconnect_timers.values():
+            timer.cancel()
+        self._reconnect_timers.clear()
+        logger.info(f"File collection finished: {completed} completed, {failed} failed")
+        self.collection_finished.emit(completed, failed)
+
+    def on_transfer_started(
+        self, device_id: str, filename: str, offset: int, total_bytes: int
+    ):
+        """Called by the server when a file_info message starts a transfer."""
+        with self._lock:
+            job = self._find_job(device_id, filename)
+            if job:
+                job.received_bytes = offset
+                job.total_bytes = total_bytes
+
+    def on_chunk_received(
+        self, device_id: str, filename: str, received_bytes: int, total_bytes: int, nbytes: int
+    ):
+        """Called by the server for every chunk written to disk."""
+        now = time.monotonic()
+        with self._lock:
+            self._throughput_bytes += nbytes
+            job = self._find_job(device_id, filename)
+            if job:
+                job.received_bytes = received_bytes
+            key = (device_id, filename)
+            if now - self._progress_times.get(key, 0.0) < PROGRESS_INTERVAL:
+                return
+            self._progress_times[key] = now
+
+            elapsed = now - self._throughput_start
+            throughput = self._throughput_bytes / elapsed if elapsed > 0 else 0.0
+            if elapsed >= PROGRESS_INTERVAL:
+                self._throughput_bytes = 0
+                self._throughput_start = now
+
+        self.transfer_progress.emit(device_id, filename, received_bytes, total_bytes)
+        if elapsed >= PROGRESS_INTERVAL:
+            self.throughput_updated.emit(throughput)
+
+    def on_transfer_finished(
+        self, device_id: str, filename: str, success: bool, error: str = "", resumable: bool = True
+    ):
+        """
+        Called by the server after file_end.
+
+        Args:
+            device_id: Device that sent the file
+            filename: Name from file_info
+            success: Whether the file was complete and verified
+            error: Reason of a failure
+            resumable: Whether the partial file is kept for a retry
+        """
+        with self._lock:
+            self._progress_times.pop((device_id, filename), None)
+            job = self._find_job(device_id, filename)
+            if job is None:
+                return
+            if success:
+                job.status = JOB_COMPLETED
+                job.error = ""
+                self.transfer_progress.emit(
+                    device_id, filename, job.received_bytes, job.total_bytes
+                )
+                self.transfer_finished.emit(device_id, filename, True, "")
+            else:
+                if not resumable:
+                    job.received_bytes = 0
+                self._retry_or_fail(job, error)
+        self.schedule()
+
+    def on_request_failed(self, device_id: str, error: str):
+        """Called by the server when a device rejects a send_file request."""
+        with self._lock:
+            for job in self.jobs:
+                if job.status == JOB_ACTIVE and job.device_id == device_id:
+                    # The device could not read the file; retrying will not help
+                    job.attempts = self.max_retries + 1
+                    self._retry_or_fail(job, error or "Device rejected the file request")
+                    break
+        self.schedule()
+
+    def _await_device(self, device_id: str):
+        """Fail the device's waiting jobs unless it connects within reconnect_timeout."""
+        if device_id in self._reconnect_timers:
+            return
+        timer = threading.Timer(self.reconnect_timeout, self._reconnect_expired, (device_id,))
+        timer.daemon = True
+        self._reconnect_timers[device_id] = timer
+        timer.start()
+
+    def _reconnect_expired(self, device_id: str):
+        with self._lock:
+            # A device that connected meanwhile has cancelled or replaced the timer
+            if self._reconnect_timers.get(device_id) is not threading.current_thread():
+                return
+            del self._reconnect_timers[device_id]
+            error = f"Device did not reconnect within {self.reconnect_timeout:g}s"
+            for job in self.jobs:
+                if job.device_id == device_id and job.status in (JOB_PENDING, JOB_INTERRUPTED):
+                    job.status = JOB_FAILED
+                    job.error = error
+                    logger.error(f"Failed to collect {job.filename} from {device_id}: {error}")
+                    self.transfer_finished.emit(device_id, job.filename, False, error)
+        self.schedule()
+
+    def on_device_disconnected(self, device_id: str):
+        """Called by the server when a device disconnects."""
+        with self._lock:
+            waiting = False
+            for job in self.jobs:
+                if job.device_id != device_id:
+                    continue
+                if job.status == JOB_ACTIVE:
+                    # The interrupted attempt counts toward max_retries
+                    if job.attempts > self.max_retries:
+                        self._retry_or_fail(job, "Device disconnected")
+                    else:
+                        job.status = JOB_INTERRUPTED
+                        logger.warning(
+                            f"Transfer of {job.filename} interrupted at {job.received_bytes} bytes"
+                        )
+                waiting = waiting or job.status in (JOB_PENDING, JOB_INTERRUPTED)
+            if waiting:
+                self._await_device(device_id)
+        self.schedule()
+
+    def on_device_connected(self, device_id: str):
+        """Called by the server when a device (re)connects."""
+        with self._lock:
+            timer = self._reconnect_timers.pop(device_id, None)
+            if timer:
+                timer.cancel()
+            for job in self.jobs:
+                if job.status == JOB_INTERRUPTED and job.device_id == device_id:
+                    job.status = JOB_PENDING
+        self.schedule()
+
+    def throttle(self, nbytes: int) -> float:
+        """Reserve bandwidth for received transfer bytes; returns the delay to wait."""
+        return self.limiter.reserve(nbytes)
+
+    def get_status(self) -> Dict[str, int]:
+        """Number of queued jobs by state."""
+        with self._lock:
+            status: Dict[str, int] = {}
+            for job in self.jobs:
+                status[job.status] = status.get(job.status, 0) + 1
+            return status
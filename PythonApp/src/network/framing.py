@@ -0,0 +1,347 @@
+"""
+Length-Prefixed Framing for Device Socket Connections
+
+Every device connection on port 9000 carries messages framed as a 4-byte
+big-endian length followed by the payload. This module is the single
+implementation of that framing used by JsonSocketServer, EnhancedDeviceServer
+and PCServer.
+
+Connections that negotiated binary file transfer may also carry raw binary
+frames, whose length header has BINARY_FRAME_FLAG set. JSON frames never set
+it because MAX_FRAME_SIZE is far below 2 GiB, so both kinds can be
+interleaved on one connection.
+
+FrameReader receives frames with ``recv_into`` into a buffer that is reused
+for every frame of a connection, so a 5 MB preview frame is received without
+the repeated ``bytes`` concatenation (and quadratic copying) of a naive
+``data += chunk`` loop. Frames larger than ``retain_size`` get a one-off
+buffer of exactly their size, so one large file chunk does not pin megabytes
+of memory for the rest of the connection.
+
+FrameWriter is the sending counterpart: frames queued between two flushes
+go out together in one vectored ``sendmsg`` call, header and payload buffers
+included, without first being copied into one bytes object.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-04
+"""
+
+import select
+import socket
+import struct
+from collections import deque
+from typing import Optional
+
+# 4-byte big-endian payload length
+FRAME_HEADER = struct.Struct(">I")
+
+# Largest accepted frame payload
+MAX_FRAME_SIZE = 10 * 1024 * 1024
+
+# Length header bit marking a raw binary frame
+BINARY_FRAME_FLAG = 0x80000000
+
+# Per-connection buffer sizes
+INITIAL_BUFFER_SIZE = 256 * 1024
+DEFAULT_RETAIN_SIZE = 1024 * 1024
+
+# Most buffers passed to one sendmsg call; POSIX guarantees IOV_MAX >= 16 and
+# Linux, macOS and Android allow 1024
+MAX_SEND_BUFFERS = 512
+
+# Flag for a send that returns what fits in the send buffer instead of waiting
+_SEND_NONBLOCKING = getattr(socket, "MSG_DONTWAIT", 0)
+
+
+class InvalidFrameError(ValueError):
+    """Raised when a peer sends a frame length outside the accepted range."""
+
+
+def pack_frame(payload: bytes) -> bytes:
+    """
+    Prefix a payload with its 4-byte big-endian length.
+
+    Args:
+        payload: Encoded message
+
+    Returns:
+        Framed message ready for sendall()
+    """
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def pack_binary_frame_header(length: int) -> bytes:
+    """
+    Build the length header of a raw binary frame.
+
+    Args:
+        length: Payload length in bytes
+
+    Returns:
+        4-byte header to send before the payload
+    """
+    return FRAME_HEADER.pack(BINARY_FRAME_FLAG | length)
+
+
+def recv_exact(sock: socket.socket, length: int) -> Optional[bytearray]:
+    """
+    Receive exactly ``length`` bytes into a newly allocated buffer.
+
+    For repeated reads on one connection use FrameReader, which reuses its
+    buffer.
+
+    Args:
+        sock: Socket to receive from
+        length: Number of bytes to receive
+
+    Returns:
+        Received data or None if the connection was closed first
+    """
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    received = 0
+    while received < length:
+        count = sock.recv_into(view[received:])
+        if not count:
+            return None
+        received += count
+    return buffer
+
+
+class FrameReader:
+    """
+    Reads length-prefixed frames from one blocking socket.
+
+    Each recv_into() call fills as much of the reader's buffer as the socket
+    has available, so a burst of small frames costs one system call rather
+    than two per frame. The returned frame is a memoryview into that buffer
+    and is only valid until the next call to read_frame(); decode it (for
+    example with ``str(frame, "utf-8")``) or copy it before reading again.
+
+    If the socket has a timeout and it expires in the middle of a frame, the
+    bytes received so far are kept and the next read_frame() call continues
+    the same frame.
+
+    With ``allow_binary`` the reader also accepts binary frames and sets
+    ``binary`` to tell the caller which kind of frame was returned.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        max_frame_size: int = MAX_FRAME_SIZE,
+        retain_size: int = DEFAULT_RETAIN_SIZE,
+        allow_binary: bool = False,
+    ):
+        """
+        Initialize the reader.
+
+        Args:
+            sock: Connected socket to read from
+            max_frame_size: Largest accepted payload length
+            retain_size: Largest buffer kept between frames
+            allow_binary: Accept frames with BINARY_FRAME_FLAG set
+        """
+        self.sock = sock
+        self.max_frame_size = max_frame_size
+        self.retain_size = max(retain_size, FRAME_HEADER.size)
+        self.allow_binary = allow_binary
+        self.closed = False
+        # Whether the last frame returned was a binary frame
+        self.binary = False
+
+        self._buffer = bytearray(min(INITIAL_BUFFER_SIZE, self.retain_size))
+        self._view = memoryview(self._buffer)
+        # Received but not yet returned bytes are self._buffer[_start:_end]
+        self._start = 0
+        self._end = 0
+        # Frame larger than the retained buffer, received into its own buffer
+        self._large_frame: Optional[memoryview] = None
+        self._large_received = 0
+
+    def read_frame(self) -> Optional[memoryview]:
+        """
+        Receive the next frame payload.
+
+        Returns:
+            Payload view, or None if the connection was closed
+
+        Raises:
+            InvalidFrameError: If the frame length is zero or too large
+            socket.timeout: If the socket timeout expired; the partial frame is kept
+        """
+        if self._large_frame is None:
+            if not self._ensure(FRAME_HEADER.size):
+                return None
+            length = FRAME_HEADER.unpack_from(self._buffer, self._start)[0]
+            binary = self.allow_binary and length & BINARY_FRAME_FLAG
+            if binary:
+                length &= ~BINARY_FRAME_FLAG
+            if length <= 0 or length > self.max_frame_size:
+                raise InvalidFrameError(f"Invalid message length: {length}")
+            self.binary = bool(binary)
+
+            end = FRAME_HEADER.size + length
+            if end > len(self._buffer) and end > self.retain_size:
+                self._start_large_frame(length)
+            else:
+                if end > len(self._buffer):
+                    self._grow(min(max(end, 2 * len(self._buffer)), self.retain_size))
+                if not self._ensure(end):
+                    return None
+                start = self._start + FRAME_HEADER.size
+                self._start += end
+                return self._view[start : start + length]
+
+        frame = self._large_frame
+        while self._large_received < len(frame):
+            count = self.sock.recv_into(frame[self._large_received :])
+            if not count:
+                self.closed = True
+                return None
+            self._large_received += count
+        self._large_frame = None
+        return frame
+
+    def _ensure(self, length: int) -> bool:
+        """Receive until at least ``length`` unread bytes are buffered."""
+        available = self._end - self._start
+        if available >= length:
+            return True
+
+        if self._start + length > len(self._buffer):
+            # Move the unread bytes to the front to make room
+            self._view[:available] = self._view[self._start : self._end]
+            self._start = 0
+            self._end = available
+
+        while self._end - self._start < length:
+            count = self.sock.recv_into(self._view[self._end :])
+            if not count:
+                self.closed = True
+                return False
+            self._end += count
+        return True
+
+    def _grow(self, size: int):
+        """Replace the buffer with a larger one holding the unread bytes."""
+        available = self._end - self._start
+        # Earlier frames may still reference the old buffer, so it is replaced
+        # rather than resized in place
+        buffer = bytearray(size)
+        buffer[:available] = self._view[self._start : self._end]
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._start = 0
+        self._end = available
+
+    def _start_large_frame(self, length: int):
+        """Move the header and any buffered payload into a one-off frame buffer."""
+        self._start += FRAME_HEADER.size
+        buffered = min(self._end - self._start, length)
+        frame = memoryview(bytearray(length))
+        frame[:buffered] = self._view[self._start : self._start + buffered]
+        self._start += buffered
+        self._large_frame = frame
+        self._large_received = buffered
+
+
+class FrameWriter:
+    """
+    Writes length-prefixed frames to one socket, several frames per system call.
+
+    add() only queues a frame. flush() writes all queued frames with as few
+    sendmsg() calls as the socket accepts; on platforms without sendmsg the
+    buffers are joined and sent with send().
+
+    With a flush timeout the writer never blocks longer than that waiting for
+    send buffer space. Whatever the socket did not accept stays queued, and
+    the next flush() continues from there, so frames are never interleaved.
+    """
+
+    def __init__(self, sock: socket.socket, max_buffers: int = MAX_SEND_BUFFERS):
+        """
+        Initialize the writer.
+
+        Args:
+            sock: Connected socket to write to
+            max_buffers: Most buffers passed to one sendmsg call
+        """
+        self.sock = sock
+        self.max_buffers = max(2, max_buffers)
+        self._buffers = deque()
+        self.pending_bytes = 0
+        # Counters for monitoring
+        self.syscalls = 0
+        self.frames_written = 0
+        self._frame_ends = deque()  # pending_bytes position at the end of each frame
+        self._written = 0
+
+    def add(self, payload: bytes):
+        """
+        Queue one frame.
+
+        Args:
+            payload: Encoded message; must not be modified until it is flushed
+        """
+        self._buffers.append(FRAME_HEADER.pack(len(payload)))
+        self._buffers.append(memoryview(payload))
+        self.pending_bytes += FRAME_HEADER.size + len(payload)
+        self._frame_ends.append(self._written + self.pending_bytes)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write queued frames.
+
+        Args:
+            timeout: Longest wait for send buffer space in seconds, or None
+                to use the socket's own blocking behaviour
+
+        Returns:
+            True if every queued frame was written, False if the send buffer
+            stayed full for the whole timeout
+
+        Raises:
+            OSError: If the connection failed
+        """
+        while self._buffers:
+            if timeout is not None:
+                _, writable, _ = select.select([], [self.sock], [], timeout)
+                if not writable:
+                    return False
+            # A blocking socket would otherwise wait until every byte is sent
+            flags = _SEND_NONBLOCKING if timeout is not None else 0
+            buffers = [self._buffers[i] for i in range(min(len(self._buffers), self.max_buffers))]
+            try:
+                if hasattr(self.sock, "sendmsg"):
+                    sent = self.sock.sendmsg(buffers, [], flags)
+                else:
+                    sent = self.sock.send(b"".join(buffers), flags)
+            except BlockingIOError:
+                sent = 0
+            self.syscalls += 1
+            self._consume(sent)
+        return True
+
+    def clear(self):
+        """Discard queued frames, e.g. after the connection failed mid-write."""
+        self._buffers.clear()
+        self._frame_ends.clear()
+        self._written += self.pending_bytes
+        self.pending_bytes = 0
+
+    def _consume(self, sent: int):
+        """Drop ``sent`` bytes from the front of the queued buffers."""
+        self.pending_bytes -= sent
+        self._written += sent
+        while sent:
+            first = self._buffers[0]
+            if len(first) <= sent:
+                sent -= len(first)
+                self._buffers.popleft()
+            else:
+                self._buffers[0] = memoryview(first)[sent:]
+                sent = 0
+        while self._frame_ends and self._frame_ends[0] <= self._written:
+            self._frame_ends.popleft()
+            self.frames_written += 1
@@ -22,14 +22,40 @@ import asyncio
 import json
 import logging
 import socket
-import struct
 import time
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from typing import Dict, List, Optional, Callable, Any, Set
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+from protocol.handshake_manager import get_handshake_manager
+from protocol.sensor_batch import SENSOR_BATCH_TYPE, decode_sensor_batch
+from protocol.wire_encoding import ENCODING_JSON, decode_message, encode_message
+from .framing import FrameReader, InvalidFrameError, pack_frame, recv_exact
+
+
+# Time between scheduling a broadcast and its first send, so every sender
+# thread is waiting on the deadline before it passes
+BROADCAST_LEAD_TIME = 0.005  # seconds
+
+
+@dataclass
+class BroadcastResult:
+    """Outcome of PCServer.dispatch_message"""
+    dispatch_times: Dict[str, float] = field(default_factory=dict)  # device_id -> time sent
+    dispatch_skew_ms: Dict[str, float] = field(default_factory=dict)  # device_id -> skew
+    failed: List[str] = field(default_factory=list)
+    
+    @property
+    def success_count(self) -> int:
+        return len(self.dispatch_times)
+    
+    @property
+    def max_skew_ms(self) -> float:
+        """Spread between the earliest and latest device"""
+        return max(self.dispatch_skew_ms.values(), default=0.0)
+
 
 @dataclass
 class ConnectedDevice:
@@ -41,6 +67,7 @@ class ConnectedDevice:
     status: Dict[str, Any]
     socket: socket.socket
     address: tuple
+    encoding: str = ENCODING_JSON
 
 
 @dataclass
@@ -65,30 +92,45 @@ class JsonMessage:
     def from_json(cls, json_str: str) -> Optional['JsonMessage']:
         """Parse JSON string to message object"""
         try:
-            data = json.loads(json_str)
-            message_type = data.get('type')
-            
-            # Route to appropriate message class based on type
-            if message_type == 'hello':
-                return HelloMessage.from_dict(data)
-            elif message_type == 'status':
-                return StatusMessage.from_dict(data)
-            elif message_type == 'sensor_data':
-                return SensorDataMessage.from_dict(data)
-            elif message_type == 'ack':
-                return AckMessage.from_dict(data)
-            elif message_type == 'file_info':
-                return FileInfoMessage.from_dict(data)
-            elif message_type == 'file_chunk':
-                return FileChunkMessage.from_dict(data)
-            elif message_type == 'file_end':
-                return FileEndMessage.from_dict(data)
-            else:
-                # Generic message for unknown types
-                return JsonMessage(type=message_type, **{k: v for k, v in data.items() if k != 'type'})
+            return JsonMessage._from_data(json.loads(json_str))
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             logging.error(f"Error parsing JSON message: {e}")
             return None
+    
+    @classmethod
+    def from_payload(cls, payload) -> Optional['JsonMessage']:
+        """Parse a received frame in any supported wire encoding to message object"""
+        try:
+            return JsonMessage._from_data(decode_message(payload))
+        except (ValueError, KeyError, TypeError) as e:
+            logging.error(f"Error parsing message: {e}")
+            return None
+    
+    @staticmethod
+    def _from_data(data: Dict[str, Any]) -> 'JsonMessage':
+        """Build the message object for a decoded message"""
+        message_type = data.get('type')
+        
+        # Route to appropriate message class based on type
+        if message_type == 'hello':
+            return HelloMessage.from_dict(data)
+        elif message_type == 'status':
+            return StatusMessage.from_dict(data)
+        elif message_type == 'sensor_data':
+            return SensorDataMessage.from_dict(data)
+        elif message_type == SENSOR_BATCH_TYPE:
+            return SensorBatchMessage.from_dict(data)
+        elif message_type == 'ack':
+            return AckMessage.from_dict(data)
+        elif message_type == 'file_info':
+            return FileInfoMessage.from_dict(data)
+        elif message_type == 'file_chunk':
+            return FileChunkMessage.from_dict(data)
+        elif message_type == 'file_end':
+            return FileEndMessage.from_dict(data)
+        else:
+            # Generic message for unknown types
+            return JsonMessage(type=message_type, **{k: v for k, v in data.items() if k != 'type'})
 
 
 @dataclass
@@ -96,6 +138,7 @@ class HelloMessage(JsonMessage):
     """Device introduction message"""
     device_id: str = ""
     capabilities: List[str] = None
+    encodings: Optional[List[str]] = None  # Wire encodings the device supports
     
     def __post_init__(self):
         if not hasattr(self, 'type') or not self.type:
@@ -110,6 +153,7 @@ class HelloMessage(JsonMessage):
             type=data.get('type', 'hello'),
             device_id=data.get('device_id', ''),
             capabilities=data.get('capabilities', []),
+            encodings=data.get('encodings'),
             timestamp=data.get('timestamp')
         )
 
@@ -170,6 +214,45 @@ class SensorDataMessage(JsonMessage):
         )
 
 
+@dataclass
+class SensorBatchMessage(JsonMessage):
+    """Batch of sensor samples with one value array per channel"""
+    base_timestamp: float = 0.0
+    timestamp_deltas: List[float] = None  # Offset of each sample from base_timestamp
+    channels: Dict[str, List[Optional[float]]] = None
+    sample_rate: Optional[float] = None
+    sensor_id: Optional[str] = None
+    
+    def __post_init__(self):
+        if not hasattr(self, 'type') or not self.type:
+            self.type = SENSOR_BATCH_TYPE
+        super().__post_init__()
+        if self.timestamp_deltas is None:
+            self.timestamp_deltas = []
+        if self.channels is None:
+            self.channels = {}
+    
+    @property
+    def timestamps(self) -> List[float]:
+        """Timestamp of every sample in the batch"""
+        base_timestamp = self.base_timestamp
+        return [base_timestamp + delta for delta in self.timestamp_deltas]
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SensorBatchMessage':
+        # Rejects batches whose channels and timestamps differ in length
+        decode_sensor_batch(data)
+        return cls(
+            type=data.get('type', SENSOR_BATCH_TYPE),
+            base_timestamp=data['base_timestamp'],
+            timestamp_deltas=data['timestamp_deltas'],
+            channels=data['channels'],
+            sample_rate=data.get('sample_rate'),
+            sensor_id=data.get('sensor_id'),
+            timestamp=data.get('timestamp')
+        )
+
+
 @dataclass
 class AckMessage(JsonMessage):
     """Acknowledgment message"""
@@ -262,6 +345,7 @@ class StartRecordCommand(JsonMessage):
     record_video: bool = True
     record_thermal: bool = True
     record_shimmer: bool = False
+    start_at_ms: Optional[int] = None  # Master time to start at, for a scheduled start
     
     def __post_init__(self):
         super().__post_init__()
@@ -323,6 +407,12 @@ class PCServer:
         self.server_thread: Optional[threading.Thread] = None
         self.client_threads: Dict[str, threading.Thread] = {}
         self.thread_pool = ThreadPoolExecutor(max_workers=10)
+        # One sender per device, so a broadcast reaches every socket at once;
+        # grown by dispatch_message when more sends are in flight than senders
+        self.broadcast_pool = ThreadPoolExecutor(max_workers=10, thread_name_prefix="PCServerBroadcast")
+        self._broadcast_pool_size = 10
+        self._broadcast_sends = 0  # sends submitted and not yet finished
+        self._broadcast_lock = threading.Lock()
         
         # Callbacks
         self.message_callbacks: List[Callable[[str, JsonMessage], None]] = []
@@ -391,6 +481,7 @@ class PCServer:
             
             # Shutdown thread pool
             self.thread_pool.shutdown(wait=True)
+            self.broadcast_pool.shutdown(wait=True)
             
             self.logger.info("PC server stopped successfully")
             
@@ -405,12 +496,10 @@ class PCServer:
         
         try:
             device = self.connected_devices[device_id]
-            json_data = message.to_json()
-            json_bytes = json_data.encode('utf-8')
+            payload = encode_message(message.to_dict(), device.encoding)
             
             # Send length-prefixed message
-            length_header = struct.pack('>I', len(json_bytes))
-            device.socket.sendall(length_header + json_bytes)
+            device.socket.sendall(pack_frame(payload))
             
             self.logger.debug(f"Sent message to {device_id}: {message.type}")
             return True
@@ -422,11 +511,120 @@ class PCServer:
     
     def broadcast_message(self, message: JsonMessage) -> int:
         """Broadcast message to all connected devices"""
-        success_count = 0
-        for device_id in list(self.connected_devices.keys()):
-            if self.send_message(device_id, message):
-                success_count += 1
-        return success_count
+        return self.dispatch_message(message).success_count
+    
+    def dispatch_message(self, message: JsonMessage,
+                         device_ids: Optional[List[str]] = None,
+                         latencies_ms: Optional[Dict[str, float]] = None) -> BroadcastResult:
+        """
+        Send one message to several devices concurrently.
+        
+        The message is encoded once per wire encoding rather than once per
+        device, and each device's send runs on its own broadcast thread, so
+        the last device is not delayed by the sends to all the others. The
+        broadcast pool is grown to one thread per send in flight, so a send
+        never queues behind another device's and misses its time.
+        
+        With latencies_ms, sends are latency-aligned: a device with a lower
+        one-way latency is sent to later, by the difference to the slowest
+        device, so the message arrives everywhere at about the same time.
+        
+        Args:
+            message: Message to send
+            device_ids: Devices to send to (None = all connected)
+            latencies_ms: Estimated one-way latency per device in ms
+            
+        Returns:
+            BroadcastResult with the time each device was sent to and its
+            skew: estimated arrival time (send time plus latency) relative
+            to the earliest device, which without latencies is the dispatch
+            skew
+        """
+        if device_ids is None:
+            device_ids = list(self.connected_devices.keys())
+        latencies_ms = latencies_ms or {}
+        result = BroadcastResult()
+        
+        targets = []
+        frames: Dict[str, bytes] = {}  # encoding -> framed message
+        data = message.to_dict()
+        for device_id in device_ids:
+            device = self.connected_devices.get(device_id)
+            if device is None:
+                self.logger.error(f"Device not connected: {device_id}")
+                result.failed.append(device_id)
+                continue
+            if device.encoding not in frames:
+                frames[device.encoding] = pack_frame(encode_message(data, device.encoding))
+            targets.append((device_id, device))
+        if not targets:
+            return result
+        
+        slowest_ms = max(latencies_ms.get(device_id, 0.0) for device_id, _ in targets)
+        pool = self._reserve_broadcast_senders(len(targets))
+        try:
+            start = time.perf_counter() + BROADCAST_LEAD_TIME
+            futures = {
+                device_id: pool.submit(
+                    self._send_frame_at,
+                    device,
+                    frames[device.encoding],
+                    start + (slowest_ms - latencies_ms.get(device_id, 0.0)) / 1000.0,
+                )
+                for device_id, device in targets
+            }
+            
+            for device_id, future in futures.items():
+                try:
+                    result.dispatch_times[device_id] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error sending message to {device_id}: {e}")
+                    self._disconnect_device(device_id)
+                    result.failed.append(device_id)
+        finally:
+            with self._broadcast_lock:
+                self._broadcast_sends -= len(targets)
+        
+        arrivals = {
+            device_id: sent_at + latencies_ms.get(device_id, 0.0) / 1000.0
+            for device_id, sent_at in result.dispatch_times.items()
+        }
+        if arrivals:
+            earliest = min(arrivals.values())
+            result.dispatch_skew_ms = {
+                device_id: (arrival - earliest) * 1000.0 for device_id, arrival in arrivals.items()
+            }
+        self.logger.debug(f"Dispatched {message.type} to {result.success_count} devices, "
+                          f"skew {result.max_skew_ms:.2f}ms")
+        return result
+    
+    def _reserve_broadcast_senders(self, count: int) -> ThreadPoolExecutor:
+        """Get the broadcast pool, grown to a sender for each send in flight"""
+        with self._broadcast_lock:
+            self._broadcast_sends += count
+            if self._broadcast_sends > self._broadcast_pool_size:
+                self.logger.info(f"Growing broadcast pool from {self._broadcast_pool_size} "
+                                 f"to {self._broadcast_sends} senders")
+                # Sends already submitted finish on the old pool
+                previous_pool = self.broadcast_pool
+                self.broadcast_pool = ThreadPoolExecutor(
+                    max_workers=self._broadcast_sends, thread_name_prefix="PCServerBroadcast"
+                )
+                self._broadcast_pool_size = self._broadcast_sends
+                previous_pool.shutdown(wait=False)
+            return self.broadcast_pool
+    
+    @staticmethod
+    def _send_frame_at(device: ConnectedDevice, frame: bytes, deadline: float) -> float:
+        """Send a frame at a time.perf_counter() deadline; returns the time it was sent"""
+        remaining = deadline - time.perf_counter()
+        if remaining > 0.002:
+            time.sleep(remaining - 0.002)
+        # Spin for the last moment, which sleep() cannot hit precisely
+        while time.perf_counter() < deadline:
+            pass
+        device.socket.sendall(frame)
+        return time.time()
     
     def get_connected_devices(self) -> Dict[str, ConnectedDevice]:
         """Get copy of connected devices"""
@@ -477,27 +675,20 @@ class PCServer:
         device_id = None
         try:
             client_socket.settimeout(30.0)  # 30 second timeout
+            reader = FrameReader(client_socket, self.max_message_size)
             
             while self.is_running:
-                # Read length header (4 bytes)
-                length_data = self._recv_exact(client_socket, 4)
-                if not length_data:
-                    break
-                
-                message_length = struct.unpack('>I', length_data)[0]
-                
-                if message_length <= 0 or message_length > self.max_message_size:
-                    self.logger.error(f"Invalid message length: {message_length}")
+                # Read the next length-prefixed message into the reusable buffer
+                try:
+                    message_data = reader.read_frame()
+                except InvalidFrameError as e:
+                    self.logger.error(str(e))
                     break
-                
-                # Read message data
-                message_data = self._recv_exact(client_socket, message_length)
-                if not message_data:
+                if message_data is None:
                     break
                 
-                # Parse JSON message
-                json_string = message_data.decode('utf-8')
-                message = JsonMessage.from_json(json_string)
+                # Parse message in the encoding it was sent in
+                message = JsonMessage.from_payload(message_data)
                 
                 if not message:
                     self.logger.warning(f"Failed to parse message from {address}")
@@ -519,6 +710,15 @@ class PCServer:
                     self.connected_devices[device_id] = device
                     self.client_threads[device_id] = threading.current_thread()
                     
+                    # Devices listing wire encodings are told which one to use;
+                    # the acknowledgment itself is JSON
+                    if message.encodings is not None:
+                        handshake_manager = get_handshake_manager()
+                        encoding = handshake_manager.negotiate_encoding(message.encodings)
+                        ack = handshake_manager.create_handshake_ack(True, encoding=encoding)
+                        client_socket.sendall(pack_frame(encode_message(ack)))
+                        device.encoding = encoding
+                    
                     self.logger.info(f"Device registered: {device_id} with capabilities: {message.capabilities}")
                     
                     # Notify callbacks
@@ -557,15 +757,9 @@ class PCServer:
                 except:
                     pass
     
-    def _recv_exact(self, sock: socket.socket, length: int) -> Optional[bytes]:
+    def _recv_exact(self, sock: socket.socket, length: int) -> Optional[bytearray]:
         """Receive exact number of bytes"""
-        data = b''
-        while len(data) < length:
-            chunk = sock.recv(length - len(data))
-            if not chunk:
-                return None
-            data += chunk
-        return data
+        return recv_exact(sock, length)
     
     def _disconnect_device(self, device_id: str) -> None:
         """Disconnect and clean up device"""
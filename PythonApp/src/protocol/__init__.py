@@ -7,6 +7,8 @@ communication between Python PC application and Android devices.
 Modules:
     schema_utils: JSON schema validation and message utilities
     config_loader: Shared configuration loading and management
+    wire_encoding: JSON, MessagePack and CBOR message encodings
+    sensor_batch: Columnar sensor_batch messages
 """
 
 from .config_loader import (
@@ -35,6 +37,23 @@ from .schema_utils import (
     create_message,
     create_command_message,
 )
+from .wire_encoding import (
+    ENCODING_CBOR,
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    MessageDecodeError,
+    UnsupportedEncodingError,
+    available_encodings,
+    decode_message,
+    encode_message,
+)
+from .sensor_batch import (
+    SENSOR_BATCH_TYPE,
+    SensorBatchError,
+    create_sensor_batch,
+    decode_sensor_batch,
+    iter_sensor_batch,
+)
 
 __version__ = "1.0.0"
 __all__ = [
@@ -62,4 +81,19 @@ __all__ = [
     "get_calibration_error_threshold",
     "reload_config",
     "validate_config",
+    # Wire encodings
+    "ENCODING_JSON",
+    "ENCODING_MSGPACK",
+    "ENCODING_CBOR",
+    "MessageDecodeError",
+    "UnsupportedEncodingError",
+    "available_encodings",
+    "encode_message",
+    "decode_message",
+    # Sensor batches
+    "SENSOR_BATCH_TYPE",
+    "SensorBatchError",
+    "create_sensor_batch",
+    "decode_sensor_batch",
+    "iter_sensor_batch",
 ]
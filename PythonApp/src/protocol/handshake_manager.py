@@ -4,16 +4,22 @@ HandshakeManager for Python - handles initial handshake with version checking.
 This module implements the handshake protocol described in Milestone 6 to ensure
 compatibility between Android and Python applications by exchanging protocol
 version information at connection start.
+
+The handshake also negotiates the wire encoding of the connection: the client
+lists the encodings it supports and the acknowledgment names the one both
+sides will use from then on, JSON unless both support MessagePack or CBOR.
+The handshake and its acknowledgment are always sent as JSON.
 """
 
 import json
 import logging
 import platform
 import socket
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from .config_loader import get_config_manager
 from .schema_utils import get_schema_manager
+from .wire_encoding import ENCODING_JSON, ENCODINGS, is_encoding_available
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,7 @@ class HandshakeManager:
         self.schema_manager = get_schema_manager()
         self.protocol_version = self.config_manager.get("protocol_version", 1)
         self.app_version = self.config_manager.get("version", "1.0.0")
+        self.encodings = self._get_supported_encodings()
 
     def send_handshake(self, sock: socket.socket) -> bool:
         """
@@ -103,8 +110,61 @@ class HandshakeManager:
             logger.error(error_msg)
             return False, error_msg
 
+    def negotiate_encoding(self, offered_encodings: Optional[List[str]]) -> str:
+        """
+        Choose the wire encoding for a connection.
+
+        Args:
+            offered_encodings: Encodings listed in the client's handshake
+
+        Returns:
+            The first of this side's supported encodings that the client
+            offered, or JSON if there is none
+        """
+        if not isinstance(offered_encodings, list):
+            return ENCODING_JSON
+
+        for encoding in self.encodings:
+            if encoding in offered_encodings:
+                return encoding
+        return ENCODING_JSON
+
+    def get_ack_encoding(self, ack_message: Dict[str, Any]) -> str:
+        """
+        Get the wire encoding chosen by the peer in a handshake acknowledgment.
+
+        Args:
+            ack_message: Dictionary containing handshake acknowledgment
+
+        Returns:
+            The negotiated encoding, or JSON if none was chosen or this side
+            does not support the one named
+        """
+        encoding = ack_message.get("encoding", ENCODING_JSON)
+        return encoding if encoding in self.encodings else ENCODING_JSON
+
+    def create_handshake_ack(
+        self, compatible: bool, message: str = "", encoding: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a handshake acknowledgment for a server to send.
+
+        Args:
+            compatible: Whether the protocol versions are compatible
+            message: Optional message about compatibility status
+            encoding: Negotiated wire encoding, if the client offered any
+
+        Returns:
+            Dictionary containing handshake acknowledgment
+        """
+        return self._create_handshake_ack(compatible, message, encoding)
+
     def send_handshake_ack(
-        self, sock: socket.socket, compatible: bool, message: str = ""
+        self,
+        sock: socket.socket,
+        compatible: bool,
+        message: str = "",
+        encoding: Optional[str] = None,
     ) -> bool:
         """
         Send handshake acknowledgment message.
@@ -113,12 +173,13 @@ class HandshakeManager:
             sock: Connected socket to send acknowledgment through
             compatible: Whether the protocol versions are compatible
             message: Optional message about compatibility status
+            encoding: Negotiated wire encoding, if the client offered any
 
         Returns:
             True if acknowledgment was sent successfully, False otherwise
         """
         try:
-            ack_message = self._create_handshake_ack(compatible, message)
+            ack_message = self._create_handshake_ack(compatible, message, encoding)
             message_json = json.dumps(ack_message)
 
             logger.info(f"Sending handshake ack: {message_json}")
@@ -198,10 +259,11 @@ class HandshakeManager:
             device_name=self._get_device_name(),
             app_version=self.app_version,
             device_type="pc",
+            encodings=self.encodings,
         )
 
     def _create_handshake_ack(
-        self, compatible: bool, message: str = ""
+        self, compatible: bool, message: str = "", encoding: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create handshake acknowledgment message.
@@ -209,6 +271,7 @@ class HandshakeManager:
         Args:
             compatible: Whether the protocol versions are compatible
             message: Optional message about compatibility status
+            encoding: Negotiated wire encoding, if the client offered any
 
         Returns:
             Dictionary containing handshake acknowledgment
@@ -222,9 +285,27 @@ class HandshakeManager:
 
         if message:
             ack_data["message"] = message
+        if encoding:
+            ack_data["encoding"] = encoding
 
         return self.schema_manager.create_message("handshake_ack", **ack_data)
 
+    def _get_supported_encodings(self) -> List[str]:
+        """
+        Get the wire encodings this side accepts, in order of preference.
+
+        Returns:
+            Configured encodings whose library is installed, always
+            including JSON
+        """
+        configured = self.config_manager.get("network.encodings", list(ENCODINGS))
+        encodings = [
+            encoding for encoding in configured if is_encoding_available(encoding)
+        ]
+        if ENCODING_JSON not in encodings:
+            encodings.append(ENCODING_JSON)
+        return encodings
+
     def _get_device_name(self) -> str:
         """
         Get a human-readable device name.
@@ -281,10 +362,20 @@ def process_handshake(handshake_message: Dict[str, Any]) -> Tuple[bool, str]:
 
 
 def send_handshake_ack(
-    sock: socket.socket, compatible: bool, message: str = ""
+    sock: socket.socket,
+    compatible: bool,
+    message: str = "",
+    encoding: Optional[str] = None,
 ) -> bool:
     """Send handshake acknowledgment using the global manager."""
-    return get_handshake_manager().send_handshake_ack(sock, compatible, message)
+    return get_handshake_manager().send_handshake_ack(
+        sock, compatible, message, encoding
+    )
+
+
+def negotiate_encoding(offered_encodings: Optional[List[str]]) -> str:
+    """Choose a connection's wire encoding using the global manager."""
+    return get_handshake_manager().negotiate_encoding(offered_encodings)
 
 
 def process_handshake_ack(ack_message: Dict[str, Any]) -> bool:
@@ -10,7 +10,7 @@ import json
 import logging
 import os
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 
 try:
     from jsonschema import ValidationError, Draft7Validator
@@ -26,6 +26,9 @@ logger = logging.getLogger(__name__)
 class SchemaManager:
     """Manages the unified JSON message schema for protocol validation."""
 
+    # Validation statistics key shared by all types the schema does not define
+    UNKNOWN_TYPE_KEY = "<unknown>"
+
     def __init__(self, schema_path: Optional[str] = None):
         """
         Initialize the schema manager.
@@ -36,6 +39,13 @@ class SchemaManager:
         self.schema_path = schema_path or self._get_default_schema_path()
         self.schema: Optional[Dict[str, Any]] = None
         self.validator: Optional[Any] = None
+        # Validators compiled once per message type, selected by the type field
+        self.type_validators: Dict[str, Any] = {}
+        self.known_types: Set[str] = set()
+        # Validate only one in every N messages of these types
+        self.sample_rates: Dict[str, int] = {}
+        self._sample_counters: Dict[str, int] = {}
+        self.validation_stats: Dict[str, Dict[str, int]] = {}
         self._load_schema()
 
     def _get_default_schema_path(self) -> str:
@@ -51,8 +61,14 @@ class SchemaManager:
             with open(self.schema_path, "r", encoding="utf-8") as f:
                 self.schema = json.load(f)
 
+            self.known_types = {
+                message_type
+                for message_type in map(self._branch_message_type, self.schema.get("oneOf", []))
+                if message_type is not None
+            }
             if JSONSCHEMA_AVAILABLE:
                 self.validator = Draft7Validator(self.schema)
+                self.type_validators = self._build_type_validators()
 
             logger.info(f"Successfully loaded message schema from {self.schema_path}")
 
@@ -66,6 +82,93 @@ class SchemaManager:
             logger.error(f"Error loading schema: {e}")
             raise
 
+    def _build_type_validators(self) -> Dict[str, Any]:
+        """
+        Compile a validator for each oneOf branch of the schema.
+
+        Validating against the whole schema checks a message against every
+        branch of the oneOf; a branch validator only checks its own type.
+
+        Returns:
+            Dictionary mapping message type to its validator
+        """
+        definitions = self.schema.get("definitions", {})
+        validators = {}
+
+        for message_def in self.schema.get("oneOf", []):
+            message_type = self._branch_message_type(message_def)
+            if message_type is None:
+                continue
+            # Branches refer to #/definitions, so they keep the root definitions
+            branch_schema = dict(message_def, definitions=definitions)
+            validators[message_type] = Draft7Validator(branch_schema)
+
+        return validators
+
+    @staticmethod
+    def _branch_message_type(message_def: Dict[str, Any]) -> Optional[str]:
+        """Get the type const of a oneOf branch, if it has one."""
+        for part in message_def.get("allOf", []):
+            type_def = part.get("properties", {}).get("type", {})
+            if "const" in type_def:
+                return type_def["const"]
+        return None
+
+    def set_sample_rate(self, message_type: str, every_n: int) -> None:
+        """
+        Validate only one in every N messages of a high-rate message type.
+
+        Args:
+            message_type: The message type to sample
+            every_n: Validate every Nth message; 1 validates every message
+        """
+        if every_n < 1:
+            raise ValueError("every_n must be at least 1")
+        if every_n == 1:
+            self.sample_rates.pop(message_type, None)
+        else:
+            self.sample_rates[message_type] = every_n
+        self._sample_counters.pop(message_type, None)
+
+    def get_validation_statistics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get per message type counts of validated and sampled out messages.
+
+        Returns:
+            Dictionary mapping message type to its validated and skipped counts
+        """
+        return {
+            message_type: dict(stats)
+            for message_type, stats in self.validation_stats.items()
+        }
+
+    def _should_validate(self, message_type: Any) -> bool:
+        """
+        Count the message and decide whether sampling selects it.
+
+        Types the schema does not define, including non-string types, are
+        always validated and counted under one shared key, so a peer sending
+        arbitrary types cannot grow the statistics.
+        """
+        known = isinstance(message_type, str) and message_type in self.known_types
+        stats_key = message_type if known else self.UNKNOWN_TYPE_KEY
+        stats = self.validation_stats.get(stats_key)
+        if stats is None:
+            stats = self.validation_stats.setdefault(
+                stats_key, {"validated": 0, "skipped": 0}
+            )
+
+        every_n = self.sample_rates.get(message_type) if known else None
+        if every_n:
+            count = self._sample_counters.get(message_type, 0)
+            self._sample_counters[message_type] = count + 1
+            if count % every_n:
+                stats["skipped"] += 1
+                return False
+
+        stats["validated"] += 1
+        return True
+
     def reload_schema(self) -> None:
         """Reload the schema from file (useful for development)."""
         self._load_schema()
@@ -100,10 +203,17 @@ class SchemaManager:
             logger.error("Message missing required 'timestamp' field")
             return False
 
+        message_type = message["type"]
+        if not self._should_validate(message_type):
+            return True
+
         # Use jsonschema if available for comprehensive validation
         if JSONSCHEMA_AVAILABLE and self.validator:
+            # Unknown and non-string types fall back to the full schema, which rejects them
+            validator = (self.type_validators.get(message_type, self.validator)
+                         if isinstance(message_type, str) else self.validator)
             try:
-                self.validator.validate(message)
+                validator.validate(message)
                 return True
             except ValidationError as e:
                 logger.error(f"Schema validation failed: {e.message}")
@@ -150,6 +260,9 @@ class SchemaManager:
             return "pattern_type" in message and "pattern_size" in message
         elif message_type == "calibration_result":
             return "success" in message
+        elif message_type == "sensor_batch":
+            required_fields = ["base_timestamp", "timestamp_deltas", "channels"]
+            return all(field in message for field in required_fields)
         else:
             logger.warning(f"Unknown message type: {message_type}")
             return True  # Allow unknown types for extensibility
@@ -167,14 +280,10 @@ class SchemaManager:
         message_types = []
 
         # Extract message types from oneOf schema structure
-        if "oneOf" in self.schema:
-            for message_def in self.schema["oneOf"]:
-                if "allOf" in message_def:
-                    for part in message_def["allOf"]:
-                        if "properties" in part and "type" in part["properties"]:
-                            type_def = part["properties"]["type"]
-                            if "const" in type_def:
-                                message_types.append(type_def["const"])
+        for message_def in self.schema.get("oneOf", []):
+            message_type = self._branch_message_type(message_def)
+            if message_type is not None:
+                message_types.append(message_type)
 
         return message_types
 
@@ -246,6 +355,13 @@ class SchemaManager:
                 "timestamp": 0,
                 "success": False,
             },
+            "sensor_batch": {
+                "type": "sensor_batch",
+                "timestamp": 0,
+                "base_timestamp": 0,
+                "timestamp_deltas": [0],
+                "channels": {"gsr": [0.0]},
+            },
         }
 
         return templates.get(message_type, {"type": message_type, "timestamp": 0})
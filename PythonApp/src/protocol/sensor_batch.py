@@ -0,0 +1,122 @@
+"""
+Batched sensor data messages.
+
+A ``sensor_data`` message carries a single sample, so at Shimmer rates the
+per-message framing and encoding overhead costs more than the data itself. A
+``sensor_batch`` message carries N consecutive samples of one device in
+columnar form: ``base_timestamp`` is the time of the first sample,
+``timestamp_deltas`` holds each sample's offset from it (same unit, so the
+first delta is 0), and ``channels`` maps every channel name to an array of N
+values. Vector sensors are flattened into one channel per axis
+(``accelerometer_x``...), and a missing value is sent as null.
+
+Deltas are relative to the base rather than to the previous sample, so
+rounding on the sender never accumulates along the batch.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+SENSOR_BATCH_TYPE = "sensor_batch"
+
+
+class SensorBatchError(ValueError):
+    """Raised when a sensor_batch message is inconsistent."""
+
+
+def create_sensor_batch(
+    timestamps: Sequence[float],
+    channels: Dict[str, Sequence[Optional[float]]],
+    timestamp: Optional[float] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Build a sensor_batch message from per-sample timestamps and channel columns.
+
+    Args:
+        timestamps: Timestamp of every sample, in milliseconds
+        channels: Values of every sample per channel name
+        timestamp: Message creation time (default: time of the last sample)
+        **kwargs: Additional message fields, e.g. sample_rate or sensor_id
+
+    Returns:
+        Message dictionary
+
+    Raises:
+        SensorBatchError: If there are no samples or a channel has the wrong length
+    """
+    count = len(timestamps)
+    if not count:
+        raise SensorBatchError("A sensor batch needs at least one sample")
+    for name, values in channels.items():
+        if len(values) != count:
+            raise SensorBatchError(
+                f"Channel {name} has {len(values)} values for {count} timestamps"
+            )
+
+    base_timestamp = timestamps[0]
+    return {
+        "type": SENSOR_BATCH_TYPE,
+        "timestamp": timestamps[-1] if timestamp is None else timestamp,
+        "base_timestamp": base_timestamp,
+        "timestamp_deltas": [t - base_timestamp for t in timestamps],
+        "channels": {name: list(values) for name, values in channels.items()},
+        **kwargs,
+    }
+
+
+def decode_sensor_batch(
+    message: Dict[str, Any]
+) -> Tuple[List[float], Dict[str, List[Optional[float]]]]:
+    """
+    Get the sample timestamps and channel columns of a sensor_batch message.
+
+    Args:
+        message: Decoded sensor_batch message
+
+    Returns:
+        (timestamps, channels) with one timestamp and one value per channel
+        for every sample
+
+    Raises:
+        SensorBatchError: If fields are missing or channel lengths differ
+    """
+    try:
+        base_timestamp = message["base_timestamp"]
+        deltas = message["timestamp_deltas"]
+        channels = message["channels"]
+    except KeyError as e:
+        raise SensorBatchError(f"Sensor batch without {e.args[0]}") from e
+
+    count = len(deltas)
+    for name, values in channels.items():
+        if len(values) != count:
+            raise SensorBatchError(
+                f"Channel {name} has {len(values)} values for {count} timestamps"
+            )
+
+    return [base_timestamp + delta for delta in deltas], channels
+
+
+def iter_sensor_batch(
+    timestamps: List[float], channels: Dict[str, List[Optional[float]]]
+) -> Iterator[Tuple[float, Dict[str, Optional[float]]]]:
+    """
+    Iterate over the samples of a decoded batch for per-sample consumers.
+
+    Args:
+        timestamps: Sample timestamps from decode_sensor_batch()
+        channels: Channel columns from decode_sensor_batch()
+
+    Yields:
+        (timestamp, {channel: value}) per sample
+    """
+    names = list(channels)
+    if names:
+        rows = zip(*(channels[name] for name in names))
+    else:
+        rows = [()] * len(timestamps)
+    for timestamp, values in zip(timestamps, rows):
+        yield timestamp, dict(zip(names, values))
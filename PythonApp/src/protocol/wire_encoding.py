@@ -0,0 +1,159 @@
+"""
+Wire encodings for device messages.
+
+Messages are dictionaries in the JSON data model described by
+protocol/message_schema.json; the wire encoding only decides how a message
+is serialized into a frame, so the schema and its validation apply the same
+way whichever encoding carried the message. JSON is the default and is
+understood by every peer. MessagePack and CBOR are optional (the ``msgpack``
+and ``cbor2`` packages) and are used on a connection only when both sides
+offered them in the handshake.
+
+The encodings are told apart by the first byte of a message: JSON objects
+start with ``{`` or whitespace, MessagePack maps with 0x80-0x8f, 0xde or
+0xdf, and CBOR maps with 0xa0-0xbb or 0xbf. decode_message() relies on this,
+so a peer that switches encoding after the handshake acknowledgment never
+leaves the receiver unable to decode the JSON messages sent before it.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-05
+"""
+
+import json
+from typing import Any, Dict, List
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import cbor2
+
+    CBOR_AVAILABLE = True
+except ImportError:
+    CBOR_AVAILABLE = False
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+ENCODING_CBOR = "cbor"
+
+# All encodings in order of preference; JSON is always the fallback
+ENCODINGS = (ENCODING_MSGPACK, ENCODING_CBOR, ENCODING_JSON)
+
+# First byte of a MessagePack map: fixmap, map 16, map 32
+_MSGPACK_MAP_FIRST_BYTES = frozenset(range(0x80, 0x90)) | {0xDE, 0xDF}
+
+# First byte of a CBOR map: lengths 0-23, 1-8 byte lengths, indefinite length
+_CBOR_MAP_FIRST_BYTES = frozenset(range(0xA0, 0xBC)) | {0xBF}
+
+
+class UnsupportedEncodingError(ValueError):
+    """Raised for an unknown encoding or one whose library is not installed."""
+
+
+class MessageDecodeError(ValueError):
+    """Raised when a message cannot be decoded in its detected encoding."""
+
+
+def is_encoding_available(encoding: str) -> bool:
+    """
+    Check whether messages can be encoded and decoded in an encoding.
+
+    Args:
+        encoding: Encoding name
+
+    Returns:
+        True if the encoding is known and its library is installed
+    """
+    if encoding == ENCODING_JSON:
+        return True
+    if encoding == ENCODING_MSGPACK:
+        return MSGPACK_AVAILABLE
+    if encoding == ENCODING_CBOR:
+        return CBOR_AVAILABLE
+    return False
+
+
+def available_encodings() -> List[str]:
+    """
+    Get the encodings usable in this installation.
+
+    Returns:
+        Encoding names in order of preference, always ending with JSON
+    """
+    return [encoding for encoding in ENCODINGS if is_encoding_available(encoding)]
+
+
+def detect_encoding(data) -> str:
+    """
+    Determine the encoding of a message from its first byte.
+
+    Args:
+        data: Encoded message (bytes, bytearray or memoryview)
+
+    Returns:
+        Encoding name; JSON for anything that is not a binary map
+    """
+    if not len(data):
+        return ENCODING_JSON
+    first_byte = data[0]
+    if first_byte in _MSGPACK_MAP_FIRST_BYTES:
+        return ENCODING_MSGPACK
+    if first_byte in _CBOR_MAP_FIRST_BYTES:
+        return ENCODING_CBOR
+    return ENCODING_JSON
+
+
+def encode_message(message: Dict[str, Any], encoding: str = ENCODING_JSON) -> bytes:
+    """
+    Serialize a message.
+
+    Args:
+        message: Message dictionary in the JSON data model
+        encoding: Encoding negotiated for the connection
+
+    Returns:
+        Encoded message, ready to be framed
+
+    Raises:
+        UnsupportedEncodingError: If the encoding is not available
+    """
+    if encoding == ENCODING_JSON:
+        return json.dumps(message).encode("utf-8")
+    if encoding == ENCODING_MSGPACK and MSGPACK_AVAILABLE:
+        return msgpack.packb(message)
+    if encoding == ENCODING_CBOR and CBOR_AVAILABLE:
+        return cbor2.dumps(message)
+    raise UnsupportedEncodingError(f"Unsupported wire encoding: {encoding}")
+
+
+def decode_message(data) -> Any:
+    """
+    Deserialize a message in whichever supported encoding it was sent.
+
+    Args:
+        data: Encoded message (bytes, bytearray or memoryview)
+
+    Returns:
+        Decoded message, normally a dictionary
+
+    Raises:
+        UnsupportedEncodingError: If the message uses an unavailable encoding
+        ValueError: If the message is malformed (json.JSONDecodeError for
+            JSON, MessageDecodeError for the binary encodings)
+    """
+    encoding = detect_encoding(data)
+    if encoding == ENCODING_JSON:
+        return json.loads(str(data, "utf-8"))
+    if not is_encoding_available(encoding):
+        raise UnsupportedEncodingError(f"Unsupported wire encoding: {encoding}")
+
+    try:
+        if encoding == ENCODING_MSGPACK:
+            return msgpack.unpackb(data)
+        return cbor2.loads(data)
+    except Exception as e:
+        raise MessageDecodeError(f"Invalid {encoding} message: {e}") from e
@@ -16,6 +16,7 @@ Milestone: 3.8 - Session Metadata Logging and Review
 import json
 import os
 import threading
+import time
 from PyQt5.QtCore import QObject, pyqtSignal
 from datetime import datetime
 from pathlib import Path
@@ -32,6 +33,12 @@ class SessionLogger(QObject):
     - UI update signals for live feedback
     - Session lifecycle management
     - Thread-safe logging operations
+
+    In journal mode events are appended to a JSON Lines write-ahead file
+    (``<session_id>_journal.jsonl``) and fsynced in groups, so the cost of
+    logging an event no longer grows with session length. The canonical
+    ``<session_id>_log.json`` is only materialized at session start, at
+    ``end_session`` and when ``materialize_session_log`` is called.
     """
 
     # Qt signals for UI updates
@@ -40,12 +47,23 @@ class SessionLogger(QObject):
     session_ended = pyqtSignal(str, float)  # Session ID, duration
     error_logged = pyqtSignal(str, str)  # Error type, message
 
-    def __init__(self, base_sessions_dir: str = "recordings"):
+    def __init__(
+        self,
+        base_sessions_dir: str = "recordings",
+        journal_mode: bool = False,
+        journal_flush_interval: float = 1.0,
+        journal_batch_size: int = 100,
+    ):
         """
         Initialize session logger.
 
         Args:
             base_sessions_dir (str): Base directory for all session recordings
+            journal_mode (bool): Append events to a JSON Lines journal instead of
+                rewriting the full session log on every event
+            journal_flush_interval (float): Maximum seconds between journal fsyncs
+            journal_batch_size (int): Number of pending journal events that forces
+                an immediate fsync
         """
         super().__init__()
         self.base_sessions_dir = Path(base_sessions_dir)
@@ -53,7 +71,18 @@ class SessionLogger(QObject):
         self.log_file_path: Optional[Path] = None
         self.events: List[Dict] = []
         self.session_start_time: Optional[datetime] = None
-        self.lock = threading.Lock()  # Thread safety for logging operations
+        # Re-entrant: start_session/end_session call log_event while holding it
+        self.lock = threading.RLock()  # Thread safety for logging operations
+
+        # Journal (write-ahead log) settings and state
+        self.journal_mode = journal_mode
+        self.journal_flush_interval = max(0.0, journal_flush_interval)
+        self.journal_batch_size = max(1, journal_batch_size)
+        self.journal_file_path: Optional[Path] = None
+        self._journal_file = None
+        self._journal_pending = 0
+        self._journal_last_sync = 0.0
+        self._journal_stop_event: Optional[threading.Event] = None
 
         # Ensure base directory exists
         self.base_sessions_dir.mkdir(parents=True, exist_ok=True)
@@ -116,6 +145,9 @@ class SessionLogger(QObject):
             self.log_file_path = session_folder / f"{session_id}_log.json"
             self.events = []
 
+            if self.journal_mode:
+                self._open_journal(session_folder / f"{session_id}_journal.jsonl")
+
             # Log session start event
             self.log_event(
                 "session_start",
@@ -173,8 +205,11 @@ class SessionLogger(QObject):
             self.events.append(event_entry)
             self.current_session["events"] = self.events
 
-            # Flush to disk immediately for robustness
-            self._flush_to_disk()
+            # Persist immediately for robustness
+            if self._journal_file is not None:
+                self._append_to_journal(event_entry)
+            else:
+                self._flush_to_disk()
 
             # Generate human-readable message for UI
             ui_message = self._format_event_for_ui(event_entry)
@@ -323,6 +358,8 @@ class SessionLogger(QObject):
 
             # Final flush to disk
             self._flush_to_disk()
+            if self._journal_file is not None:
+                self._close_journal(remove=self._is_log_materialized())
 
             session_id = self.current_session["session"]
             completed_session = self.current_session.copy()
@@ -352,12 +389,40 @@ class SessionLogger(QObject):
         """Check if a session is currently active."""
         return self.current_session is not None
 
+    def materialize_session_log(self) -> Optional[Path]:
+        """
+        Write the complete session log JSON on demand.
+
+        In journal mode this commits any pending journal entries and rewrites
+        the canonical session log; otherwise it is equivalent to a normal flush.
+
+        Returns:
+            Path: Path to the session log file, or None if no active session
+        """
+        with self.lock:
+            if not self.current_session:
+                return None
+            self._commit_journal()
+            self._flush_to_disk()
+            return self.log_file_path
+
     def _flush_to_disk(self) -> None:
         """Write current session data to disk (thread-safe)."""
         if not self.current_session or not self.log_file_path:
             return
 
         try:
+            if self.journal_mode:
+                # Write to a temporary file and swap it in, so a crash during
+                # materialization never leaves a truncated log behind
+                temp_path = self.log_file_path.with_suffix(".json.tmp")
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.current_session, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.log_file_path)
+                return
+
             # Write complete JSON structure
             with open(self.log_file_path, "w", encoding="utf-8") as f:
                 json.dump(self.current_session, f, indent=2, ensure_ascii=False)
@@ -366,6 +431,90 @@ class SessionLogger(QObject):
         except Exception as e:
             print(f"[DEBUG_LOG] Error writing session log to disk: {e}")
 
+    def _is_log_materialized(self) -> bool:
+        """Check that the session log on disk holds every logged event."""
+        try:
+            with open(self.log_file_path, "r", encoding="utf-8") as f:
+                return len(json.load(f).get("events", [])) == len(self.events)
+        except Exception:
+            return False
+
+    def _open_journal(self, journal_path: Path) -> None:
+        """Open the append-only event journal and start the group-commit thread."""
+        try:
+            self._journal_file = open(journal_path, "a", encoding="utf-8")
+        except Exception as e:
+            print(f"[DEBUG_LOG] Error opening session journal, falling back: {e}")
+            self._journal_file = None
+            return
+
+        self.journal_file_path = journal_path
+        self._journal_pending = 0
+        self._journal_last_sync = time.monotonic()
+
+        # Each session gets its own stop event so a lingering thread from a
+        # previous session can never touch the new journal
+        stop_event = threading.Event()
+        self._journal_stop_event = stop_event
+        threading.Thread(
+            target=self._journal_flush_loop, args=(stop_event,), daemon=True
+        ).start()
+
+    def _append_to_journal(self, event_entry: Dict) -> None:
+        """Append one event as a JSON line, committing when the batch is full."""
+        try:
+            self._journal_file.write(
+                json.dumps(event_entry, ensure_ascii=False, separators=(",", ":"))
+                + "\n"
+            )
+            self._journal_pending += 1
+            if (
+                self._journal_pending >= self.journal_batch_size
+                or time.monotonic() - self._journal_last_sync
+                >= self.journal_flush_interval
+            ):
+                self._commit_journal()
+        except Exception as e:
+            print(f"[DEBUG_LOG] Error writing session journal: {e}")
+
+    def _commit_journal(self) -> None:
+        """Flush and fsync pending journal entries (group commit)."""
+        if self._journal_file is None or self._journal_pending == 0:
+            return
+
+        try:
+            self._journal_file.flush()
+            os.fsync(self._journal_file.fileno())
+        except Exception as e:
+            print(f"[DEBUG_LOG] Error syncing session journal: {e}")
+        self._journal_pending = 0
+        self._journal_last_sync = time.monotonic()
+
+    def _journal_flush_loop(self, stop_event: threading.Event) -> None:
+        """Commit pending journal entries at least every flush interval."""
+        while not stop_event.wait(self.journal_flush_interval or 0.1):
+            with self.lock:
+                if stop_event.is_set():
+                    break
+                self._commit_journal()
+
+    def _close_journal(self, remove: bool = False) -> None:
+        """Commit and close the journal, optionally deleting it afterwards."""
+        if self._journal_stop_event:
+            self._journal_stop_event.set()
+            self._journal_stop_event = None
+
+        self._commit_journal()
+        try:
+            self._journal_file.close()
+            if remove and self.journal_file_path:
+                self.journal_file_path.unlink()
+        except Exception as e:
+            print(f"[DEBUG_LOG] Error closing session journal: {e}")
+
+        self._journal_file = None
+        self.journal_file_path = None
+
     def _format_event_for_ui(self, event_entry: Dict) -> str:
         """Format event entry for human-readable UI display."""
         event_type = event_entry.get("event", "unknown")
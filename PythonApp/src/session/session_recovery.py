@@ -428,6 +428,33 @@ class SessionRecoveryManager(QObject):
         except Exception:
             return True  # Assume incomplete if I can't read it
 
+    def load_journal_events(self, journal_file: Path) -> List[Dict]:
+        """
+        Read events from a SessionLogger JSON Lines journal.
+
+        Reading stops at the first line that cannot be parsed, which is the
+        torn tail left behind when the process died mid-write.
+
+        Args:
+            journal_file (Path): Path to the ``*_journal.jsonl`` file
+
+        Returns:
+            List[Dict]: Events in the order they were logged
+        """
+        events = []
+        with open(journal_file, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if isinstance(event, dict):
+                    events.append(event)
+        return events
+
     def recover_session(self, log_file: Path) -> Optional[Dict]:
         """Recover an incomplete session by adding missing end information."""
         try:
@@ -435,11 +462,39 @@ class SessionRecoveryManager(QObject):
                 session_data = json.load(f)
 
             session_id = session_data.get("session", "unknown")
+            recovery_details = "Added missing end_time and session_end event"
+
+            # Journal-mode sessions keep their events in a write-ahead journal;
+            # it is the authoritative event list when present
+            journal_file = log_file.with_name(
+                log_file.name.replace("_log.json", "_journal.jsonl")
+            )
+            if journal_file != log_file and journal_file.exists():
+                journal_events = self.load_journal_events(journal_file)
+                if journal_events:
+                    session_data["events"] = journal_events
+                    calibration_files = session_data.get("calibration_files", [])
+                    for event in journal_events:
+                        filename = event.get("file")
+                        if (
+                            event.get("event") == "calibration_capture"
+                            and filename
+                            and filename not in calibration_files
+                        ):
+                            calibration_files.append(filename)
+                    session_data["calibration_files"] = calibration_files
+                    recovery_details = (
+                        f"Rebuilt {len(journal_events)} events from journal; "
+                        + recovery_details
+                    )
 
             # Add end_time if missing
             if not session_data.get("end_time"):
                 # Use file modification time as approximate end time
-                end_time = datetime.fromtimestamp(log_file.stat().st_mtime)
+                last_write = log_file.stat().st_mtime
+                if journal_file.exists():
+                    last_write = max(last_write, journal_file.stat().st_mtime)
+                end_time = datetime.fromtimestamp(last_write)
                 session_data["end_time"] = end_time.isoformat()
 
                 # Calculate duration if start_time exists
@@ -484,7 +539,7 @@ class SessionRecoveryManager(QObject):
                 "session_id": session_id,
                 "log_file": str(log_file),
                 "recovery_time": session_data["recovery_time"],
-                "recovery_details": "Added missing end_time and session_end event",
+                "recovery_details": recovery_details,
             }
 
             self.log_recovery_event(
@@ -18,23 +18,42 @@ Author: Multi-Sensor Recording System
 Date: 2025-01-16 (Enhanced for rock-solid integration)
 """
 
-import csv
 import logging
+import math
 import os
 import queue
 import sys
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Callable, Any, Set, Union
 from enum import Enum
 
+import numpy as np
+
 # Import network components for Android integration
 from network.android_device_manager import AndroidDeviceManager, ShimmerDataSample
 from network.pc_server import PCServer
+from protocol.config_loader import get_config
+from gsr_features import GSRFeatures, StreamingGSRFeatureExtractor
+from shimmer_recording import (
+    COMPRESSION_GZIP,
+    COMPRESSION_NONE,
+    COMPRESSION_ZSTD,
+    CSV_COMPRESSION_SUFFIXES,
+    ColumnarSampleWriter,
+    CsvSampleWriter,
+    RECORDING_COMPRESSIONS,
+    RECORDING_FORMAT_COLUMNAR,
+    RECORDING_FORMAT_CSV,
+    RECORDING_FORMATS,
+    RecordingWriterStage,
+    ZSTD_AVAILABLE,
+)
+from shimmer_ring_buffer import SampleRingBuffer
 
 # Add pyshimmer library to path
 sys.path.append(
@@ -115,6 +134,10 @@ class ShimmerStatus:
     # Error tracking
     last_error: Optional[str] = None
     connection_attempts: int = 0
+
+    # Ingest pipeline health
+    ingest_backlog: int = 0
+    samples_dropped: int = 0
     
     def __post_init__(self):
         if self.enabled_channels is None:
@@ -122,39 +145,317 @@ class ShimmerStatus:
 
 
 @dataclass
+class IngestStats:
+    """Per-device counters for the multiplexed ingest queue
+
+    Each counter has a single writer: ``enqueued``/``dropped`` are only updated
+    by the device's producer thread and ``processed``/``peak_backlog`` only by
+    the processing thread, so no per-sample locking is required.
+    """
+
+    enqueued: int = 0
+    dropped: int = 0
+    processed: int = 0
+    peak_backlog: int = 0
+
+    @property
+    def backlog(self) -> int:
+        """Samples queued for this device but not yet processed"""
+        return max(0, self.enqueued - self.processed)
+
+
 class ShimmerSample:
-    """Enhanced data sample from Shimmer sensor"""
+    """
+    Enhanced data sample from Shimmer sensor
+
+    Samples are created for every reading at kHz rates, so the class uses
+    ``__slots__`` instead of a per-instance ``__dict__`` and keeps the system
+    receive time as epoch seconds (``system_timestamp``). The ISO formatted
+    ``system_time`` string is only built, and then cached, when it is read.
+    """
+
+    __slots__ = (
+        "timestamp",
+        "device_id",
+        "connection_type",
+        "android_device_id",
+        "gsr_conductance",
+        "ppg_a13",
+        "accel_x",
+        "accel_y",
+        "accel_z",
+        "gyro_x",
+        "gyro_y",
+        "gyro_z",
+        "mag_x",
+        "mag_y",
+        "mag_z",
+        "ecg",
+        "emg",
+        "battery_percentage",
+        "signal_strength",
+        "raw_data",
+        "session_id",
+        "_system_timestamp",
+        "_system_time",
+    )
+
+    # Public fields in the order of the former dataclass definition
+    FIELDS = (
+        "timestamp",
+        "system_time",
+        "device_id",
+        "connection_type",
+        "android_device_id",
+        "gsr_conductance",
+        "ppg_a13",
+        "accel_x",
+        "accel_y",
+        "accel_z",
+        "gyro_x",
+        "gyro_y",
+        "gyro_z",
+        "mag_x",
+        "mag_y",
+        "mag_z",
+        "ecg",
+        "emg",
+        "battery_percentage",
+        "signal_strength",
+        "raw_data",
+        "session_id",
+    )
+
+    # Fields that can be set from a sensor name -> value mapping
+    SENSOR_FIELDS = frozenset(FIELDS[FIELDS.index("gsr_conductance"):FIELDS.index("signal_strength")])
+
+    def __init__(
+        self,
+        timestamp: float,
+        system_time: Optional[str] = None,
+        device_id: str = "",
+        connection_type: ConnectionType = ConnectionType.SIMULATION,
+        android_device_id: Optional[str] = None,
+        gsr_conductance: Optional[float] = None,
+        ppg_a13: Optional[float] = None,
+        accel_x: Optional[float] = None,
+        accel_y: Optional[float] = None,
+        accel_z: Optional[float] = None,
+        gyro_x: Optional[float] = None,
+        gyro_y: Optional[float] = None,
+        gyro_z: Optional[float] = None,
+        mag_x: Optional[float] = None,
+        mag_y: Optional[float] = None,
+        mag_z: Optional[float] = None,
+        ecg: Optional[float] = None,
+        emg: Optional[float] = None,
+        battery_percentage: Optional[int] = None,
+        signal_strength: Optional[float] = None,
+        raw_data: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        system_timestamp: Optional[float] = None,
+    ):
+        self.timestamp = timestamp
+        self.device_id = device_id
+
+        # Connection information
+        self.connection_type = connection_type
+        self.android_device_id = android_device_id
+
+        # Sensor data
+        self.gsr_conductance = gsr_conductance
+        self.ppg_a13 = ppg_a13
+        self.accel_x = accel_x
+        self.accel_y = accel_y
+        self.accel_z = accel_z
+        self.gyro_x = gyro_x
+        self.gyro_y = gyro_y
+        self.gyro_z = gyro_z
+        self.mag_x = mag_x
+        self.mag_y = mag_y
+        self.mag_z = mag_z
+        self.ecg = ecg
+        self.emg = emg
+
+        # Device status
+        self.battery_percentage = battery_percentage
+        self.signal_strength = signal_strength
+
+        # Raw data for advanced processing
+        self.raw_data = raw_data
+        self.session_id = session_id
+
+        # System receive time: epoch seconds, ISO string formatted on demand
+        if system_timestamp is None and system_time is None:
+            system_timestamp = timestamp
+        self._system_timestamp = system_timestamp
+        self._system_time = system_time
+
+    @property
+    def system_time(self) -> Optional[str]:
+        """ISO formatted system receive time, formatted on first access"""
+        if self._system_time is None and self._system_timestamp is not None:
+            try:
+                self._system_time = datetime.fromtimestamp(
+                    self._system_timestamp
+                ).isoformat()
+            except (OverflowError, OSError, ValueError):
+                return None
+        return self._system_time
+
+    @system_time.setter
+    def system_time(self, value: Optional[str]) -> None:
+        self._system_time = value
+        self._system_timestamp = None
+
+    @property
+    def system_timestamp(self) -> Optional[float]:
+        """System receive time as epoch seconds"""
+        if self._system_timestamp is None and self._system_time is not None:
+            try:
+                self._system_timestamp = datetime.fromisoformat(
+                    str(self._system_time)
+                ).timestamp()
+            except ValueError:
+                return None
+        return self._system_timestamp
+
+    @system_timestamp.setter
+    def system_timestamp(self, value: Optional[float]) -> None:
+        self._system_timestamp = value
+        self._system_time = None
+
+    def set_sensor_values(self, values: Dict[str, Any]) -> None:
+        """Set sensor fields from a name -> value mapping, ignoring unknown names"""
+        for name, value in values.items():
+            if name in self.SENSOR_FIELDS:
+                if name == "battery_percentage" and value is not None:
+                    value = int(value)
+                setattr(self, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the sample as a dict in recording field order"""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{self.__class__.__name__}({fields})"
+
+
+# Numeric channels delivered to batch subscribers, in block row order
+SAMPLE_BATCH_CHANNELS = ("timestamp", "system_timestamp") + tuple(
+    name
+    for name in ShimmerSample.FIELDS[ShimmerSample.FIELDS.index("gsr_conductance"):]
+    if name not in ("raw_data", "session_id")
+)
+
+
+class ShimmerSampleBatch:
+    """
+    Block of consecutive samples from one device, stored per channel
+
+    ``channels`` maps each name in SAMPLE_BATCH_CHANNELS to a float64 array
+    of length ``len(batch)``; missing values are NaN. All channel arrays are
+    views into one contiguous ``(n_channels, n)`` array owned by the batch.
+    """
+
+    __slots__ = ("device_id", "connection_type", "session_id", "data", "channels")
+
+    def __init__(
+        self,
+        device_id: str,
+        connection_type: ConnectionType,
+        session_id: Optional[str],
+        data: np.ndarray,
+    ):
+        self.device_id = device_id
+        self.connection_type = connection_type
+        self.session_id = session_id
+        self.data = data
+        self.channels: Dict[str, np.ndarray] = {
+            name: data[i] for i, name in enumerate(SAMPLE_BATCH_CHANNELS)
+        }
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    def __getitem__(self, channel: str) -> np.ndarray:
+        return self.channels[channel]
 
-    timestamp: float
-    system_time: str
-    device_id: str
-    
-    # Connection information
-    connection_type: ConnectionType = ConnectionType.SIMULATION
-    android_device_id: Optional[str] = None
-    
-    # Sensor data
-    gsr_conductance: Optional[float] = None
-    ppg_a13: Optional[float] = None
-    accel_x: Optional[float] = None
-    accel_y: Optional[float] = None
-    accel_z: Optional[float] = None
-    gyro_x: Optional[float] = None
-    gyro_y: Optional[float] = None
-    gyro_z: Optional[float] = None
-    mag_x: Optional[float] = None
-    mag_y: Optional[float] = None
-    mag_z: Optional[float] = None
-    ecg: Optional[float] = None
-    emg: Optional[float] = None
-    
-    # Device status
-    battery_percentage: Optional[int] = None
-    signal_strength: Optional[float] = None
-    
-    # Raw data for advanced processing
-    raw_data: Optional[Dict[str, Any]] = None
-    session_id: Optional[str] = None
+
+class _BatchSubscription:
+    """
+    Accumulates samples per device for one batch callback
+
+    Only the data processing thread touches the buffers, so no locking is
+    needed. A device's batch is delivered when it holds ``max_batch`` samples,
+    when its oldest sample has waited ``max_latency`` seconds, or when the
+    connection type or session id changes.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[ShimmerSampleBatch], None],
+        max_batch: int,
+        max_latency: float,
+        logger: logging.Logger,
+    ):
+        self.callback = callback
+        self.max_batch = max(1, int(max_batch))
+        self.max_latency = max(0.0, max_latency)
+        self.logger = logger
+        # device_id -> [block, rows, first_arrival, connection_type, session_id]
+        self._buffers: Dict[str, list] = {}
+
+    def add(self, sample: ShimmerSample, row: List[Any], now: float) -> None:
+        """Buffer one sample given its precomputed channel row"""
+        buffer = self._buffers.get(sample.device_id)
+        if buffer is None:
+            block = np.empty((len(SAMPLE_BATCH_CHANNELS), self.max_batch), dtype=np.float64)
+            buffer = [block, 0, now, sample.connection_type, sample.session_id]
+            self._buffers[sample.device_id] = buffer
+        elif buffer[1] and (
+            buffer[3] is not sample.connection_type or buffer[4] != sample.session_id
+        ):
+            self._deliver(sample.device_id, buffer)
+
+        if not buffer[1]:
+            buffer[2] = now
+            buffer[3] = sample.connection_type
+            buffer[4] = sample.session_id
+
+        # None becomes NaN on assignment into the float64 block
+        buffer[0][:, buffer[1]] = row
+        buffer[1] += 1
+        if buffer[1] >= self.max_batch:
+            self._deliver(sample.device_id, buffer)
+
+    def poll(self, now: float) -> None:
+        """Deliver batches whose oldest sample exceeded the latency bound"""
+        for device_id, buffer in self._buffers.items():
+            if buffer[1] and now - buffer[2] >= self.max_latency:
+                self._deliver(device_id, buffer)
+
+    def flush(self) -> None:
+        """Deliver all partially filled batches"""
+        for device_id, buffer in self._buffers.items():
+            if buffer[1]:
+                self._deliver(device_id, buffer)
+
+    def _deliver(self, device_id: str, buffer: list) -> None:
+        data = buffer[0][:, : buffer[1]].copy()
+        buffer[1] = 0
+        try:
+            self.callback(ShimmerSampleBatch(device_id, buffer[3], buffer[4], data))
+        except Exception as e:
+            self.logger.error(f"Error in batch data callback: {e}")
 
 
 @dataclass
@@ -210,17 +511,29 @@ class ShimmerManager:
         self.android_device_manager: Optional[AndroidDeviceManager] = None
         self.android_shimmer_mapping: Dict[str, str] = {}  # android_device_id -> shimmer_device_id
 
-        # Data management
-        self.data_queues: Dict[str, queue.Queue] = {}
-        self.csv_writers: Dict[str, csv.DictWriter] = {}
-        self.csv_files: Dict[str, Any] = {}
+        # Data management - one multiplexed ingest queue shared by all devices
+        self.ingest_queue_size = 65536
+        self.ingest_batch_size = 512
+        self.ingest_queue: queue.Queue = queue.Queue(maxsize=self.ingest_queue_size)
+        self.ingest_stats: Dict[str, IngestStats] = {}
+
+        # Recording - samples are collected per device and handed to the
+        # writer stage in blocks of up to recording_block_size samples, at
+        # least every recording_block_interval seconds
+        self.recording_writer: Optional[RecordingWriterStage] = None
+        self.recording_queue_size = 1024
+        self.recording_block_size = 1024
+        self.recording_block_interval = 0.25
+        self.recording_metrics: Optional[Dict[str, Any]] = None
+        self.pending_records: Dict[str, List[ShimmerSample]] = {}
+        self.pending_records_since = 0.0
+        self.recording_lock = threading.Lock()
 
         # Threading and synchronization
         self.is_initialized = False
         self.is_recording = False
         self.is_streaming = False
         self.data_processing_thread: Optional[threading.Thread] = None
-        self.file_writing_thread: Optional[threading.Thread] = None
         self.stop_event = threading.Event()
         self.thread_pool = ThreadPoolExecutor(max_workers=8)
 
@@ -230,6 +543,8 @@ class ShimmerManager:
 
         # Callbacks
         self.data_callbacks: List[Callable[[ShimmerSample], None]] = []
+        self.batch_subscriptions: List[_BatchSubscription] = []
+        self.gsr_feature_callbacks: List[Callable[[str, GSRFeatures], None]] = []
         self.status_callbacks: List[Callable[[str, ShimmerStatus], None]] = []
         
         # Enhanced callbacks for Android integration
@@ -241,6 +556,15 @@ class ShimmerManager:
         self.data_buffer_size = 1000
         self.connection_timeout = 30.0
         self.android_server_port = 9000
+        self.recording_format = self._load_recording_format()
+        self.recording_compression = self._load_recording_compression()
+        self.columnar_chunk_size = 4096
+        # Seconds of recent samples kept per device for get_window(); 0 disables
+        self.ring_buffer_seconds = 30.0
+        self.ring_buffers: Dict[str, SampleRingBuffer] = {}
+        # Seconds of sample time between published GSR features; 0 disables
+        self.gsr_feature_interval = 1.0
+        self.gsr_feature_extractors: Dict[str, StreamingGSRFeatureExtractor] = {}
 
         # Data validation
         self.sensor_ranges = {
@@ -276,7 +600,8 @@ class ShimmerManager:
             self.connected_devices.clear()
             self.device_configurations.clear()
             self.device_status.clear()
-            self.data_queues.clear()
+            self.ingest_stats.clear()
+            self.ingest_queue = queue.Queue(maxsize=self.ingest_queue_size)
 
             # Initialize Android integration if enabled
             if self.enable_android_integration:
@@ -451,7 +776,7 @@ class ShimmerManager:
                     connection_type=connection_type
                 )
                 
-                self.data_queues[device_id] = queue.Queue(maxsize=self.data_buffer_size)
+                self.ingest_stats[device_id] = IngestStats()
                 self.logger.info(f"Simulated connection to {device_id}")
                 return True
 
@@ -509,8 +834,8 @@ class ShimmerManager:
                             connection_type=connection_type
                         )
                     
-                    # Initialize data queue
-                    self.data_queues[device_id] = queue.Queue(maxsize=self.data_buffer_size)
+                    # Register with the ingest pipeline
+                    self.ingest_stats[device_id] = IngestStats()
                     
                     self.logger.info(f"Successfully connected to Shimmer device {device_id} via Bluetooth")
                     return True
@@ -569,7 +894,7 @@ class ShimmerManager:
             # Map Android device to Shimmer device
             self.android_shimmer_mapping[android_device_id] = shimmer_device_id
             
-            self.data_queues[shimmer_device_id] = queue.Queue(maxsize=self.data_buffer_size)
+            self.ingest_stats[shimmer_device_id] = IngestStats()
             
             self.logger.info(f"Connected to Shimmer via Android device: {android_device_id}")
             return True
@@ -837,10 +1162,19 @@ class ShimmerManager:
             if not session_dir:
                 return False
 
-            # Initialize CSV files for each device
+            # Initialize recording files for each device
+            self.recording_writer = RecordingWriterStage(
+                queue_size=self.recording_queue_size, logger=self.logger
+            )
             for device_id in self.device_status:
-                if not self._initialize_csv_file(device_id, session_dir):
-                    self.logger.error(f"Failed to initialize CSV file for {device_id}")
+                if self.recording_format == RECORDING_FORMAT_COLUMNAR:
+                    initialized = self._initialize_columnar_writer(device_id, session_dir)
+                else:
+                    initialized = self._initialize_csv_file(device_id, session_dir)
+                if not initialized:
+                    self.logger.error(f"Failed to initialize recording for {device_id}")
+                    self.recording_writer.close()
+                    self.recording_writer = None
                     return False
 
             # Start streaming if not already started
@@ -872,16 +1206,26 @@ class ShimmerManager:
 
             self.logger.info("Stopping recording...")
 
-            # Close CSV files
-            for device_id, writer in self.csv_writers.items():
-                if device_id in self.csv_files:
-                    self.csv_files[device_id].close()
-                    self.logger.info(f"Closed CSV file for {device_id}")
-
-            self.csv_writers.clear()
-            self.csv_files.clear()
+            # Hand the last samples to the writer stage, then let it drain
+            # and close every recording file
+            with self.recording_lock:
+                self.is_recording = False
+                self._submit_pending_records()
+
+            recording_writer = self.recording_writer
+            self.recording_writer = None
+            if recording_writer:
+                recording_writer.close()
+                self.recording_metrics = recording_writer.get_metrics()
+                for device_id, sink in recording_writer.sinks.items():
+                    self.logger.info(
+                        f"Closed recording for {device_id}: {sink.samples_written} samples"
+                    )
+                if self.recording_metrics["samples_dropped"]:
+                    self.logger.error(
+                        f"Recording writer dropped {self.recording_metrics['samples_dropped']} samples"
+                    )
 
-            self.is_recording = False
             self.current_session_id = None
             self.session_start_time = None
 
@@ -899,12 +1243,118 @@ class ShimmerManager:
         Returns:
             Dict[str, ShimmerStatus]: Status information for each device
         """
+        for device_id, status in self.device_status.items():
+            stats = self.ingest_stats.get(device_id)
+            if stats:
+                status.ingest_backlog = stats.backlog
+                status.samples_dropped = stats.dropped
         return self.device_status.copy()
 
+    def get_ingest_statistics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get ingest pipeline counters for all devices
+
+        Returns:
+            Dict[str, Dict[str, int]]: Enqueued, processed, dropped, backlog and
+            peak backlog sample counts per device
+        """
+        return {
+            device_id: {
+                "enqueued": stats.enqueued,
+                "processed": stats.processed,
+                "dropped": stats.dropped,
+                "backlog": stats.backlog,
+                "peak_backlog": stats.peak_backlog,
+            }
+            for device_id, stats in list(self.ingest_stats.items())
+        }
+
+    def get_recording_statistics(self) -> Optional[Dict[str, Any]]:
+        """
+        Get metrics of the recording writer stage
+
+        Returns the live metrics while recording and those of the last
+        recording afterwards: queue depth, dropped samples, write latency and
+        bytes written per second.
+        """
+        recording_writer = self.recording_writer
+        if recording_writer:
+            return recording_writer.get_metrics()
+        return self.recording_metrics
+
     def add_data_callback(self, callback: Callable[[ShimmerSample], None]) -> None:
-        """Add callback for real-time data processing"""
+        """Add callback for real-time data processing, invoked once per sample"""
         self.data_callbacks.append(callback)
 
+    def add_batch_callback(
+        self,
+        callback: Callable[[ShimmerSampleBatch], None],
+        max_batch: int = 256,
+        max_latency_ms: float = 100.0,
+    ) -> None:
+        """
+        Add callback receiving per-device sample batches as NumPy arrays
+
+        The callback is invoked from the data processing thread with a
+        ShimmerSampleBatch once a device has ``max_batch`` samples buffered or
+        its oldest buffered sample is ``max_latency_ms`` old, whichever comes
+        first. Prefer this over add_data_callback for plots and feature
+        extraction at full sensor rate.
+
+        Args:
+            callback: Function receiving a ShimmerSampleBatch
+            max_batch: Maximum number of samples per delivered batch
+            max_latency_ms: Maximum time a sample waits before delivery
+        """
+        subscription = _BatchSubscription(
+            callback, max_batch, max_latency_ms / 1000.0, self.logger
+        )
+        # Replace rather than mutate so the processing thread can iterate safely
+        self.batch_subscriptions = self.batch_subscriptions + [subscription]
+
+    def add_gsr_feature_callback(
+        self, callback: Callable[[str, GSRFeatures], None]
+    ) -> None:
+        """
+        Add callback for live GSR features
+
+        The callback receives the device id and a GSRFeatures summary (tonic
+        level, phasic component, detected SCRs) every gsr_feature_interval
+        seconds of sample time, from the data processing thread.
+        """
+        self.gsr_feature_callbacks.append(callback)
+
+    def get_gsr_features(self, device_id: str) -> Optional[GSRFeatures]:
+        """Get the most recently published GSR features of a device"""
+        extractor = self.gsr_feature_extractors.get(device_id)
+        return extractor.latest_features if extractor else None
+
+    def get_window(
+        self, device_id: str, channel: str, seconds: float, copy: bool = False
+    ) -> np.ndarray:
+        """
+        Get the most recent samples of one device channel
+
+        Reads the per-device ring buffer maintained by the data processing
+        thread without locking. See SampleRingBuffer.get_window for when a
+        read-only view rather than a copy is returned.
+
+        Args:
+            device_id: Device identifier
+            channel: Channel name from SAMPLE_BATCH_CHANNELS
+            seconds: Window length in seconds, ending at the newest sample
+            copy: Always return an independent copy
+
+        Returns:
+            np.ndarray: Channel values oldest first (empty if no data yet)
+        """
+        ring_buffer = self.ring_buffers.get(device_id)
+        if ring_buffer is None:
+            if channel not in SAMPLE_BATCH_CHANNELS:
+                raise ValueError(f"Unknown ring buffer channel: {channel}")
+            return np.empty(0, dtype=np.float64)
+        return ring_buffer.get_window(channel, seconds, copy=copy)
+
     def add_status_callback(
         self, callback: Callable[[str, ShimmerStatus], None]
     ) -> None:
@@ -932,7 +1382,7 @@ class ShimmerManager:
             # Convert to ShimmerSample format
             shimmer_sample = ShimmerSample(
                 timestamp=sample.timestamp,
-                system_time=datetime.fromtimestamp(sample.timestamp).isoformat(),
+                system_timestamp=sample.timestamp,
                 device_id=shimmer_device_id,
                 connection_type=ConnectionType.ANDROID_MEDIATED,
                 android_device_id=sample.android_device_id,
@@ -940,45 +1390,12 @@ class ShimmerManager:
             )
             
             # Map sensor values
-            for sensor_name, value in sample.sensor_values.items():
-                if sensor_name == 'gsr_conductance':
-                    shimmer_sample.gsr_conductance = value
-                elif sensor_name == 'ppg_a13':
-                    shimmer_sample.ppg_a13 = value
-                elif sensor_name == 'accel_x':
-                    shimmer_sample.accel_x = value
-                elif sensor_name == 'accel_y':
-                    shimmer_sample.accel_y = value
-                elif sensor_name == 'accel_z':
-                    shimmer_sample.accel_z = value
-                elif sensor_name == 'gyro_x':
-                    shimmer_sample.gyro_x = value
-                elif sensor_name == 'gyro_y':
-                    shimmer_sample.gyro_y = value
-                elif sensor_name == 'gyro_z':
-                    shimmer_sample.gyro_z = value
-                elif sensor_name == 'mag_x':
-                    shimmer_sample.mag_x = value
-                elif sensor_name == 'mag_y':
-                    shimmer_sample.mag_y = value
-                elif sensor_name == 'mag_z':
-                    shimmer_sample.mag_z = value
-                elif sensor_name == 'battery_percentage':
-                    shimmer_sample.battery_percentage = int(value) if value is not None else None
+            shimmer_sample.set_sensor_values(sample.sensor_values)
             
             # Validate data
             if self._validate_sample_data(shimmer_sample):
-                # Add to data queue for processing
-                if shimmer_device_id in self.data_queues:
-                    try:
-                        self.data_queues[shimmer_device_id].put_nowait(shimmer_sample)
-                    except queue.Full:
-                        # Remove oldest sample and add new one
-                        try:
-                            self.data_queues[shimmer_device_id].get_nowait()
-                            self.data_queues[shimmer_device_id].put_nowait(shimmer_sample)
-                        except queue.Empty:
-                            pass
+                # Add to ingest queue for processing
+                self._enqueue_sample(shimmer_device_id, shimmer_sample)
             else:
                 self.logger.warning(f"Invalid data sample from {shimmer_device_id}")
                 
@@ -1221,27 +1638,28 @@ class ShimmerManager:
             # Convert pyshimmer data to our standard format
             sample = self._convert_pyshimmer_data(device_id, data)
             if sample:
-                # Add to data queue
-                if device_id in self.data_queues:
-                    try:
-                        self.data_queues[device_id].put_nowait(sample)
-                        
-                        # Update device status
-                        if device_id in self.device_status:
-                            self.device_status[device_id].last_data_received = datetime.now()
-                            self.device_status[device_id].samples_received += 1
-                            
-                    except queue.Full:
-                        self.logger.warning(f"Data queue full for device {device_id}")
-                
-                # Write to file if recording
-                if self.is_recording and device_id in self.recording_files:
-                    self._write_sample_to_file(device_id, sample)
+                # Add to ingest queue; recording happens in the processing loop
+                if self._enqueue_sample(device_id, sample):
+                    # Update device status
+                    if device_id in self.device_status:
+                        self.device_status[device_id].last_data_timestamp = sample.timestamp
                     
         except Exception as e:
             self.logger.error(f"Error processing Shimmer data for {device_id}: {e}")
     
-    def _convert_pyshimmer_data(self, device_id: str, data) -> Optional[Dict[str, Any]]:
+    # pyshimmer DataPacket attribute -> ShimmerSample field
+    _PYSHIMMER_CHANNEL_FIELDS = (
+        ("gsr", "gsr_conductance"),
+        ("ppg", "ppg_a13"),
+        ("accel_x", "accel_x"),
+        ("accel_y", "accel_y"),
+        ("accel_z", "accel_z"),
+        ("gyro_x", "gyro_x"),
+        ("gyro_y", "gyro_y"),
+        ("gyro_z", "gyro_z"),
+    )
+    
+    def _convert_pyshimmer_data(self, device_id: str, data) -> Optional[ShimmerSample]:
         """
         Convert pyshimmer data packet to our standard sample format.
         
@@ -1250,39 +1668,25 @@ class ShimmerManager:
             data: Raw data from pyshimmer DataPacket
             
         Returns:
-            Standardized sample dictionary or None if conversion fails
+            ShimmerSample or None if conversion fails
         """
         try:
             # This would depend on the actual pyshimmer data format
             # For now, provide a framework that can be adjusted when the library is available
-            
-            sample = {
-                'device_id': device_id,
-                'timestamp': datetime.now().isoformat(),
-                'sample_number': getattr(data, 'packet_id', 0),
-                'channels': {}
-            }
+            timestamp = time.time()
+            sample = ShimmerSample(
+                timestamp=timestamp,
+                system_timestamp=timestamp,
+                device_id=device_id,
+                connection_type=ConnectionType.DIRECT_BLUETOOTH,
+                session_id=self.current_session_id,
+            )
             
             # Extract channel data based on what's available in the data packet
-            if hasattr(data, 'gsr') and data.gsr is not None:
-                sample['channels']['GSR'] = data.gsr
-            
-            if hasattr(data, 'ppg') and data.ppg is not None:
-                sample['channels']['PPG_A13'] = data.ppg
-            
-            if hasattr(data, 'accel_x') and data.accel_x is not None:
-                sample['channels']['Accel_X'] = data.accel_x
-            if hasattr(data, 'accel_y') and data.accel_y is not None:
-                sample['channels']['Accel_Y'] = data.accel_y  
-            if hasattr(data, 'accel_z') and data.accel_z is not None:
-                sample['channels']['Accel_Z'] = data.accel_z
-            
-            if hasattr(data, 'gyro_x') and data.gyro_x is not None:
-                sample['channels']['Gyro_X'] = data.gyro_x
-            if hasattr(data, 'gyro_y') and data.gyro_y is not None:
-                sample['channels']['Gyro_Y'] = data.gyro_y
-            if hasattr(data, 'gyro_z') and data.gyro_z is not None:
-                sample['channels']['Gyro_Z'] = data.gyro_z
+            for attribute, field_name in self._PYSHIMMER_CHANNEL_FIELDS:
+                value = getattr(data, attribute, None)
+                if value is not None:
+                    setattr(sample, field_name, value)
             
             return sample
             
@@ -1305,8 +1709,6 @@ class ShimmerManager:
             self.stop_event.set()
             if self.data_processing_thread and self.data_processing_thread.is_alive():
                 self.data_processing_thread.join(timeout=5.0)
-            if self.file_writing_thread and self.file_writing_thread.is_alive():
-                self.file_writing_thread.join(timeout=5.0)
 
             # Cleanup Android integration
             if self.android_device_manager:
@@ -1344,7 +1746,7 @@ class ShimmerManager:
             self.connected_devices.clear()
             self.device_configurations.clear()
             self.device_status.clear()
-            self.data_queues.clear()
+            self.ingest_stats.clear()
             self.android_shimmer_mapping.clear()
 
             self.is_initialized = False
@@ -1425,38 +1827,11 @@ class ShimmerManager:
     def _initialize_csv_file(self, device_id: str, session_dir: Path) -> bool:
         """Initialize CSV file for a device with comprehensive sensor data"""
         try:
-            csv_file_path = session_dir / f"{device_id}_data.csv"
-            csv_file = open(csv_file_path, "w", newline="")
-
-            fieldnames = [
-                "timestamp",
-                "system_time",
-                "device_id",
-                "connection_type",
-                "android_device_id",
-                "session_id",
-                "gsr_conductance",
-                "ppg_a13",
-                "accel_x",
-                "accel_y",
-                "accel_z",
-                "gyro_x",
-                "gyro_y",
-                "gyro_z",
-                "mag_x",
-                "mag_y",
-                "mag_z",
-                "ecg",
-                "emg",
-                "battery_percentage",
-                "signal_strength",
-            ]
-
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-            writer.writeheader()
-
-            self.csv_files[device_id] = csv_file
-            self.csv_writers[device_id] = writer
+            suffix = CSV_COMPRESSION_SUFFIXES[self.recording_compression]
+            csv_file_path = session_dir / f"{device_id}_data.csv{suffix}"
+            self.recording_writer.add_sink(
+                device_id, CsvSampleWriter(csv_file_path, self.recording_compression)
+            )
 
             self.logger.info(f"Initialized CSV file for {device_id}: {csv_file_path}")
             return True
@@ -1465,6 +1840,57 @@ class ShimmerManager:
             self.logger.error(f"Error initializing CSV file for {device_id}: {e}")
             return False
 
+    def _initialize_columnar_writer(self, device_id: str, session_dir: Path) -> bool:
+        """Initialize chunked columnar recording for a device"""
+        try:
+            recording_dir = session_dir / f"{device_id}_data_columnar"
+            self.recording_writer.add_sink(
+                device_id,
+                ColumnarSampleWriter(recording_dir, chunk_size=self.columnar_chunk_size),
+            )
+
+            self.logger.info(f"Initialized columnar recording for {device_id}: {recording_dir}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error initializing columnar recording for {device_id}: {e}")
+            return False
+
+    def _load_recording_format(self) -> str:
+        """Read the Shimmer recording format from the shared configuration"""
+        try:
+            recording_format = get_config(
+                "session.shimmer_recording_format", RECORDING_FORMAT_CSV
+            )
+        except Exception:
+            return RECORDING_FORMAT_CSV
+
+        if recording_format not in RECORDING_FORMATS:
+            self.logger.warning(
+                f"Unknown Shimmer recording format '{recording_format}', using CSV"
+            )
+            return RECORDING_FORMAT_CSV
+        return recording_format
+
+    def _load_recording_compression(self) -> str:
+        """Read the CSV recording compression from the shared configuration"""
+        try:
+            compression = get_config(
+                "session.shimmer_recording_compression", COMPRESSION_NONE
+            )
+        except Exception:
+            return COMPRESSION_NONE
+
+        if compression not in RECORDING_COMPRESSIONS:
+            self.logger.warning(
+                f"Unknown Shimmer recording compression '{compression}', writing uncompressed CSV"
+            )
+            return COMPRESSION_NONE
+        if compression == COMPRESSION_ZSTD and not ZSTD_AVAILABLE:
+            self.logger.warning("zstandard not available, using gzip for Shimmer recordings")
+            return COMPRESSION_GZIP
+        return compression
+
     def _start_background_threads(self) -> None:
         """Start background processing threads"""
         self.stop_event.clear()
@@ -1475,56 +1901,188 @@ class ShimmerManager:
         self.data_processing_thread.daemon = True
         self.data_processing_thread.start()
 
-        self.file_writing_thread = threading.Thread(
-            target=self._file_writing_loop, name="ShimmerFileWriting"
-        )
-        self.file_writing_thread.daemon = True
-        self.file_writing_thread.start()
+    def _enqueue_sample(self, device_id: str, sample: Any) -> bool:
+        """
+        Hand a sample to the processing thread via the multiplexed ingest queue
+
+        When the queue is full the new sample is dropped and counted rather than
+        blocking the producer (Bluetooth callback, network thread or simulator).
+
+        Returns:
+            bool: True if the sample was queued
+        """
+        stats = self.ingest_stats.get(device_id)
+        if stats is None:
+            return False
+
+        # Count before queueing so the processing thread never sees a negative backlog
+        stats.enqueued += 1
+        try:
+            self.ingest_queue.put_nowait((device_id, sample))
+            return True
+        except queue.Full:
+            stats.enqueued -= 1
+            stats.dropped += 1
+            if stats.dropped == 1 or stats.dropped % 1000 == 0:
+                self.logger.warning(
+                    f"Ingest queue full - dropped {stats.dropped} samples from {device_id}"
+                )
+            return False
 
     def _data_processing_loop(self) -> None:
-        """Background thread for processing incoming data"""
+        """Background thread for processing incoming data
+
+        Blocks on the shared ingest queue and drains whatever has accumulated in
+        batches, so samples are handled as soon as they arrive without polling.
+        """
+        ingest_queue = self.ingest_queue
         while not self.stop_event.is_set():
             try:
-                # Process data from all device queues
-                for device_id, data_queue in self.data_queues.items():
+                subscriptions = self.batch_subscriptions
+                timeout = 0.1
+                if subscriptions:
+                    # Wake up often enough to honour the batch latency bounds
+                    timeout = max(0.001, min(timeout, *(sub.max_latency / 2 for sub in subscriptions)))
+                try:
+                    batch = [ingest_queue.get(timeout=timeout)]
+                except queue.Empty:
+                    # Pick up a queue replaced by initialize()
+                    ingest_queue = self.ingest_queue
+                    self._poll_batch_subscriptions()
+                    self._submit_due_records()
+                    continue
+
+                while len(batch) < self.ingest_batch_size:
                     try:
-                        # Non-blocking queue check
-                        sample = data_queue.get_nowait()
-                        self._process_data_sample(sample)
+                        batch.append(ingest_queue.get_nowait())
                     except queue.Empty:
-                        continue
-                    except Exception as e:
-                        self.logger.error(f"Error processing data for {device_id}: {e}")
+                        break
 
-                time.sleep(0.01)  # Small delay to prevent busy waiting
+                self._process_sample_batch(batch)
+                self._poll_batch_subscriptions()
 
             except Exception as e:
                 self.logger.error(f"Error in data processing loop: {e}")
                 time.sleep(1.0)
 
-    def _file_writing_loop(self) -> None:
-        """Background thread for writing data to files"""
-        while not self.stop_event.is_set():
+        # Deliver whatever is still buffered for batch subscribers
+        for subscription in self.batch_subscriptions:
+            subscription.flush()
+
+    def _process_sample_batch(self, batch: List[tuple]) -> None:
+        """Process a batch of (device_id, sample) entries from the ingest queue"""
+        subscriptions = self.batch_subscriptions
+        ring_buffers = self.ring_buffers if self.ring_buffer_seconds > 0 else None
+        extractors = self.gsr_feature_extractors if self.gsr_feature_interval > 0 else None
+        now = time.perf_counter()
+        for device_id, sample in batch:
             try:
-                if self.is_recording:
-                    # File writing is handled in _process_data_sample
-                    # This thread could be used for periodic file flushing
-                    for csv_file in self.csv_files.values():
-                        csv_file.flush()
-
-                time.sleep(1.0)  # Flush every second
+                self._process_data_sample(sample)
+                if extractors is not None and sample.gsr_conductance is not None:
+                    extractor = extractors.get(sample.device_id)
+                    if extractor is None:
+                        extractor = self._create_gsr_feature_extractor(sample.device_id)
+                    features = extractor.update(sample.timestamp, sample.gsr_conductance)
+                    if features is not None:
+                        self._publish_gsr_features(sample.device_id, features)
+                if subscriptions or ring_buffers is not None:
+                    row = [getattr(sample, name) for name in SAMPLE_BATCH_CHANNELS]
+                    if ring_buffers is not None:
+                        ring_buffer = ring_buffers.get(sample.device_id)
+                        if ring_buffer is None:
+                            ring_buffer = self._create_ring_buffer(sample.device_id)
+                        ring_buffer.append(row)
+                    for subscription in subscriptions:
+                        subscription.add(sample, row, now)
+            except Exception as e:
+                self.logger.error(f"Error processing data for {device_id}: {e}")
+
+            stats = self.ingest_stats.get(device_id)
+            if stats:
+                backlog = stats.backlog
+                if backlog > stats.peak_backlog:
+                    stats.peak_backlog = backlog
+                stats.processed += 1
+
+        self._submit_due_records()
+
+    def _submit_due_records(self) -> None:
+        """Submit collected samples once the oldest has waited a block interval"""
+        if (
+            self.pending_records
+            and time.monotonic() - self.pending_records_since >= self.recording_block_interval
+        ):
+            with self.recording_lock:
+                self._submit_pending_records()
+
+    def _submit_pending_records(self) -> None:
+        """Hand collected samples to the writer stage (recording_lock must be held)"""
+        pending = self.pending_records
+        if not pending:
+            return
+        self.pending_records = {}
+        if self.recording_writer:
+            for device_id, samples in pending.items():
+                self.recording_writer.submit(device_id, samples)
+
+    def _create_ring_buffer(self, device_id: str) -> SampleRingBuffer:
+        """Allocate the ring buffer of a device for its current sampling rate"""
+        sampling_rate = self.default_sampling_rate
+        status = self.device_status.get(device_id)
+        if status and status.sampling_rate:
+            sampling_rate = status.sampling_rate
+        # Leave some room for devices running slightly faster than configured
+        capacity = math.ceil(self.ring_buffer_seconds * sampling_rate * 1.1)
+        ring_buffer = SampleRingBuffer(SAMPLE_BATCH_CHANNELS, capacity)
+        self.ring_buffers[device_id] = ring_buffer
+        return ring_buffer
+
+    def _create_gsr_feature_extractor(self, device_id: str) -> StreamingGSRFeatureExtractor:
+        """Create the GSR feature extractor of a device for its sampling rate"""
+        sampling_rate = self.default_sampling_rate
+        status = self.device_status.get(device_id)
+        if status and status.sampling_rate:
+            sampling_rate = status.sampling_rate
+        extractor = StreamingGSRFeatureExtractor(
+            sampling_rate, publish_interval=self.gsr_feature_interval
+        )
+        self.gsr_feature_extractors[device_id] = extractor
+        return extractor
 
+    def _publish_gsr_features(self, device_id: str, features: GSRFeatures) -> None:
+        """Hand published GSR features to the feature callbacks"""
+        for callback in self.gsr_feature_callbacks:
+            try:
+                callback(device_id, features)
             except Exception as e:
-                self.logger.error(f"Error in file writing loop: {e}")
-                time.sleep(1.0)
+                self.logger.error(f"Error in GSR feature callback: {e}")
+
+    def _poll_batch_subscriptions(self) -> None:
+        """Deliver batches that reached their latency bound"""
+        subscriptions = self.batch_subscriptions
+        if subscriptions:
+            now = time.perf_counter()
+            for subscription in subscriptions:
+                subscription.poll(now)
 
     def _process_data_sample(self, sample: ShimmerSample) -> None:
         """Process a single data sample"""
         try:
-            # Write to CSV if recording
-            if self.is_recording and sample.device_id in self.csv_writers:
-                writer = self.csv_writers[sample.device_id]
-                writer.writerow(asdict(sample))
+            # Collect for the recording writer stage if recording
+            if self.is_recording:
+                with self.recording_lock:
+                    if self.is_recording:
+                        pending = self.pending_records.get(sample.device_id)
+                        if pending is None:
+                            if not self.pending_records:
+                                self.pending_records_since = time.monotonic()
+                            self.pending_records[sample.device_id] = [sample]
+                        else:
+                            pending.append(sample)
+                            if len(pending) >= self.recording_block_size:
+                                del self.pending_records[sample.device_id]
+                                if self.recording_writer:
+                                    self.recording_writer.submit(sample.device_id, pending)
 
             # Update device status
             if sample.device_id in self.device_status:
@@ -1547,27 +2105,28 @@ class ShimmerManager:
         """Start simulated data streaming for testing"""
 
         def simulate_data():
-            while not self.stop_event.is_set() and self.is_streaming:
+            status = self.device_status.get(device_id)
+            sampling_rate = self.default_sampling_rate
+            if status and status.sampling_rate:
+                sampling_rate = status.sampling_rate
+            sample_interval = 1.0 / sampling_rate
+            next_sample_time = time.perf_counter()
+
+            while not self.stop_event.is_set():
                 try:
-                    if (
-                        device_id in self.device_status
-                        and self.device_status[device_id].is_streaming
-                    ):
-                        sample = self._generate_simulated_sample(device_id)
-                        if device_id in self.data_queues:
-                            try:
-                                self.data_queues[device_id].put_nowait(sample)
-                            except queue.Full:
-                                # Remove oldest sample and add new one
-                                try:
-                                    self.data_queues[device_id].get_nowait()
-                                    self.data_queues[device_id].put_nowait(sample)
-                                except queue.Empty:
-                                    pass
-
-                    time.sleep(
-                        1.0 / self.default_sampling_rate
-                    )  # Simulate sampling rate
+                    status = self.device_status.get(device_id)
+                    if not status or not status.is_streaming:
+                        break
+
+                    sample = self._generate_simulated_sample(device_id)
+                    self._enqueue_sample(device_id, sample)
+
+                    # Pace against a deadline so the average rate matches the
+                    # configured sampling rate despite sleep() granularity
+                    next_sample_time += sample_interval
+                    delay = next_sample_time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
 
                 except Exception as e:
                     self.logger.error(
@@ -1583,7 +2142,6 @@ class ShimmerManager:
         import random
 
         timestamp = time.time()
-        system_time = datetime.now().isoformat()
 
         # Simulate realistic sensor values
         gsr_conductance = random.uniform(0.1, 10.0)  # microsiemens
@@ -1595,7 +2153,7 @@ class ShimmerManager:
 
         return ShimmerSample(
             timestamp=timestamp,
-            system_time=system_time,
+            system_timestamp=timestamp,
             device_id=device_id,
             gsr_conductance=gsr_conductance,
             ppg_a13=ppg_a13,
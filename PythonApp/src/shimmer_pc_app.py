@@ -31,7 +31,7 @@ import argparse
 # Add the src directory to the path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from shimmer_manager import ShimmerManager, ShimmerSample, ShimmerStatus, ConnectionType, DeviceState
+from shimmer_manager import ShimmerManager, ShimmerSampleBatch, ShimmerStatus, ConnectionType, DeviceState
 from network.android_device_manager import AndroidDeviceManager, ShimmerDataSample
 
 
@@ -83,7 +83,7 @@ class ShimmerPCApplication:
             )
             
             # Setup callbacks
-            self.shimmer_manager.add_data_callback(self._on_shimmer_data)
+            self.shimmer_manager.add_batch_callback(self._on_shimmer_data, max_batch=256, max_latency_ms=100)
             self.shimmer_manager.add_status_callback(self._on_status_update)
             self.shimmer_manager.add_android_device_callback(self._on_android_device_event)
             self.shimmer_manager.add_connection_state_callback(self._on_connection_state_change)
@@ -267,24 +267,25 @@ class ShimmerPCApplication:
             'devices_recording': sum(1 for status in shimmer_devices.values() if status.is_recording)
         }
     
-    def _on_shimmer_data(self, sample: ShimmerSample) -> None:
-        """Handle incoming Shimmer data"""
-        self.data_samples_received += 1
+    def _on_shimmer_data(self, batch: ShimmerSampleBatch) -> None:
+        """Handle a batch of incoming Shimmer data from one device"""
+        previous_total = self.data_samples_received
+        self.data_samples_received += len(batch)
         
         # Update device statistics
-        if sample.device_id not in self.device_stats:
-            self.device_stats[sample.device_id] = {
+        if batch.device_id not in self.device_stats:
+            self.device_stats[batch.device_id] = {
                 'samples_received': 0,
                 'last_timestamp': None,
-                'connection_type': sample.connection_type.value
+                'connection_type': batch.connection_type.value
             }
         
-        stats = self.device_stats[sample.device_id]
-        stats['samples_received'] += 1
-        stats['last_timestamp'] = sample.timestamp
+        stats = self.device_stats[batch.device_id]
+        stats['samples_received'] += len(batch)
+        stats['last_timestamp'] = float(batch['timestamp'][-1])
         
         # Log interesting data
-        if self.data_samples_received % 100 == 0:
+        if self.data_samples_received // 100 > previous_total // 100:
             self.logger.debug(f"Received {self.data_samples_received} samples total")
     
     def _on_status_update(self, device_id: str, status: ShimmerStatus) -> None:
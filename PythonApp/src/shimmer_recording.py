@@ -0,0 +1,657 @@
+"""
+Shimmer Recording Backends - CSV schema and chunked columnar binary storage
+
+This module holds the on-disk formats used by ShimmerManager when recording
+sensor sessions. CSV remains the default; the columnar backend buffers samples
+into preallocated NumPy column blocks and writes them as chunked ``.npy`` files
+which can be memory-mapped for analysis, avoiding a dict allocation and float
+stringification per sample.
+
+Columnar layout (one directory per device, ``<device_id>_data_columnar/``):
+
+- ``manifest.json``: format name/version, numeric column names, and one entry
+  per chunk with its file name, row count, first/last ``timestamp`` and the
+  string fields (device_id, connection_type, ...) shared by all its rows.
+- ``chunk_NNNNNN.npy``: float64 array of shape ``(n_columns, rows)``. Each row
+  of the array is one contiguous column, so ``np.load(path, mmap_mode="r")[i]``
+  maps a single channel without reading the others. Missing values are NaN and
+  ``system_time`` is stored as epoch seconds.
+
+Chunks are written atomically and the manifest is rewritten after every chunk,
+so a crash loses at most the samples buffered in the current block.
+``convert_columnar_to_csv`` turns a columnar recording back into the CSV schema
+so downstream tools keep working.
+
+Both backends are driven by a RecordingWriterStage: a dedicated writer thread
+fed with blocks of samples over a bounded queue, so slow disks or compression
+never stall the thread that processes live data. CSV files can optionally be
+compressed on the fly with gzip or zstd (the latter needs ``zstandard``).
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-02
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Field order of the Shimmer CSV recording format
+SHIMMER_CSV_FIELDNAMES = [
+    "timestamp",
+    "system_time",
+    "device_id",
+    "connection_type",
+    "android_device_id",
+    "session_id",
+    "gsr_conductance",
+    "ppg_a13",
+    "accel_x",
+    "accel_y",
+    "accel_z",
+    "gyro_x",
+    "gyro_y",
+    "gyro_z",
+    "mag_x",
+    "mag_y",
+    "mag_z",
+    "ecg",
+    "emg",
+    "battery_percentage",
+    "signal_strength",
+]
+
+# Fields stored once per chunk rather than per sample
+COLUMNAR_STRING_FIELDS = ["device_id", "connection_type", "android_device_id", "session_id"]
+
+# Fields stored as float64 columns, in chunk row order
+COLUMNAR_NUMERIC_FIELDS = [
+    name for name in SHIMMER_CSV_FIELDNAMES if name not in COLUMNAR_STRING_FIELDS
+]
+
+_SYSTEM_TIME_INDEX = COLUMNAR_NUMERIC_FIELDS.index("system_time")
+
+# Numeric fields written back as integers by the CSV converter
+COLUMNAR_INTEGER_FIELDS = {"battery_percentage"}
+
+COLUMNAR_FORMAT_NAME = "shimmer-columnar-npy"
+COLUMNAR_FORMAT_VERSION = 1
+COLUMNAR_MANIFEST_NAME = "manifest.json"
+
+RECORDING_FORMAT_CSV = "csv"
+RECORDING_FORMAT_COLUMNAR = "columnar"
+RECORDING_FORMATS = (RECORDING_FORMAT_CSV, RECORDING_FORMAT_COLUMNAR)
+
+COMPRESSION_NONE = "none"
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+RECORDING_COMPRESSIONS = (COMPRESSION_NONE, COMPRESSION_GZIP, COMPRESSION_ZSTD)
+CSV_COMPRESSION_SUFFIXES = {
+    COMPRESSION_NONE: "",
+    COMPRESSION_GZIP: ".gz",
+    COMPRESSION_ZSTD: ".zst",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _system_time_to_epoch(system_time: Any) -> float:
+    """Convert an ISO formatted system time (or epoch seconds) to epoch seconds"""
+    if system_time is None:
+        return math.nan
+    if isinstance(system_time, (int, float)):
+        return float(system_time)
+    try:
+        return datetime.fromisoformat(str(system_time)).timestamp()
+    except ValueError:
+        return math.nan
+
+
+def _string_value(value: Any) -> Optional[str]:
+    """Render a per-chunk string field the way csv.DictWriter would"""
+    return None if value is None else str(value)
+
+
+class ColumnarSampleWriter:
+    """
+    Chunked columnar writer for one device's Shimmer samples
+
+    Samples are copied into a preallocated ``(n_columns, chunk_size)`` float64
+    block; when the block is full (or a per-chunk string field changes) it is
+    written as one ``.npy`` chunk and the manifest is updated.
+    """
+
+    # Periodic flushes would only produce short chunks
+    flush_periodically = False
+
+    def __init__(self, output_dir: Union[str, Path], chunk_size: int = 4096):
+        """
+        Initialize the writer and create the recording directory
+
+        Args:
+            output_dir: Directory that receives the manifest and chunk files
+            chunk_size: Number of samples per chunk
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = max(1, int(chunk_size))
+
+        self._block = np.empty(
+            (len(COLUMNAR_NUMERIC_FIELDS), self.chunk_size), dtype=np.float64
+        )
+        self._rows = 0
+        self._chunk_strings: Optional[Dict[str, Optional[str]]] = None
+        self._chunks: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.samples_written = 0
+        self.bytes_written = 0
+
+        self._write_manifest()
+
+    def append(self, sample: Any) -> None:
+        """
+        Append one sample (any object exposing the ShimmerSample fields)
+
+        Args:
+            sample: Sample to buffer
+        """
+        strings = {
+            name: _string_value(getattr(sample, name, None))
+            for name in COLUMNAR_STRING_FIELDS
+        }
+        values = [
+            getattr(sample, name, None)
+            for name in COLUMNAR_NUMERIC_FIELDS
+            if name != "system_time"
+        ]
+        # Prefer the epoch receive time so the ISO string is never formatted
+        system_timestamp = getattr(sample, "system_timestamp", None)
+        if system_timestamp is None:
+            system_timestamp = _system_time_to_epoch(getattr(sample, "system_time", None))
+        values.insert(_SYSTEM_TIME_INDEX, system_timestamp)
+
+        with self._lock:
+            if self._closed:
+                return
+            if self._rows and strings != self._chunk_strings:
+                self._write_chunk()
+            if not self._rows:
+                self._chunk_strings = strings
+
+            # None becomes NaN on assignment into the float64 block
+            self._block[:, self._rows] = values
+            self._rows += 1
+
+            if self._rows >= self.chunk_size:
+                self._write_chunk()
+
+    def write_samples(self, samples: Sequence[Any]) -> None:
+        """Append a block of samples"""
+        for sample in samples:
+            self.append(sample)
+
+    def flush(self) -> None:
+        """Write any buffered samples as a (possibly short) chunk"""
+        with self._lock:
+            if self._rows:
+                self._write_chunk()
+
+    def close(self) -> None:
+        """Flush buffered samples and finalize the manifest"""
+        with self._lock:
+            if self._closed:
+                return
+            if self._rows:
+                self._write_chunk()
+            self._closed = True
+            self._write_manifest()
+
+    def _write_chunk(self) -> None:
+        """Persist the current block as the next chunk (lock must be held)"""
+        rows = self._rows
+        chunk_index = len(self._chunks)
+        chunk_name = f"chunk_{chunk_index:06d}.npy"
+        chunk_path = self.output_dir / chunk_name
+        temp_path = self.output_dir / f".{chunk_name}.tmp"
+
+        data = np.ascontiguousarray(self._block[:, :rows])
+        with open(temp_path, "wb") as f:
+            np.save(f, data)
+        os.replace(temp_path, chunk_path)
+
+        timestamps = self._block[0, :rows]
+        self._chunks.append(
+            {
+                "index": chunk_index,
+                "file": chunk_name,
+                "rows": rows,
+                "first_timestamp": float(timestamps[0]),
+                "last_timestamp": float(timestamps[-1]),
+                **(self._chunk_strings or {}),
+            }
+        )
+
+        self.samples_written += rows
+        self.bytes_written += chunk_path.stat().st_size
+        self._rows = 0
+        self._chunk_strings = None
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        """Atomically rewrite the manifest describing all chunks"""
+        manifest = {
+            "format": COLUMNAR_FORMAT_NAME,
+            "version": COLUMNAR_FORMAT_VERSION,
+            "columns": COLUMNAR_NUMERIC_FIELDS,
+            "dtype": "float64",
+            "string_fields": COLUMNAR_STRING_FIELDS,
+            "chunk_size": self.chunk_size,
+            "complete": self._closed,
+            "total_rows": self.samples_written,
+            "chunks": self._chunks,
+        }
+        manifest_path = self.output_dir / COLUMNAR_MANIFEST_NAME
+        temp_path = self.output_dir / f".{COLUMNAR_MANIFEST_NAME}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, manifest_path)
+
+
+class CsvSampleWriter:
+    """
+    Writes samples to a Shimmer CSV file, optionally compressed
+
+    ``bytes_written`` counts bytes that reached the file, i.e. after
+    compression.
+    """
+
+    flush_periodically = True
+
+    def __init__(self, csv_path: Union[str, Path], compression: str = COMPRESSION_NONE):
+        """
+        Open the file and write the header
+
+        Args:
+            csv_path: Output path; the compression suffix is not added here
+            compression: One of RECORDING_COMPRESSIONS
+        """
+        if compression not in RECORDING_COMPRESSIONS:
+            raise ValueError(f"Unknown recording compression: {compression}")
+        if compression == COMPRESSION_ZSTD and not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression requires the zstandard package")
+
+        self.csv_path = Path(csv_path)
+        self.compression = compression
+        self._raw = open(self.csv_path, "wb")
+        if compression == COMPRESSION_GZIP:
+            self._compressed = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        elif compression == COMPRESSION_ZSTD:
+            self._compressed = zstandard.ZstdCompressor(level=3).stream_writer(
+                self._raw, closefd=False
+            )
+        else:
+            self._compressed = None
+        self._text = io.TextIOWrapper(
+            self._compressed or self._raw, encoding="utf-8", newline=""
+        )
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(SHIMMER_CSV_FIELDNAMES)
+        self._closed = False
+
+        self.samples_written = 0
+
+    @property
+    def bytes_written(self) -> int:
+        """Bytes written to the file so far"""
+        return self._raw.tell() if not self._raw.closed else self.csv_path.stat().st_size
+
+    def write_samples(self, samples: Sequence[Any]) -> None:
+        """Write a block of samples in CSV field order"""
+        self._writer.writerows(
+            [getattr(sample, name, None) for name in SHIMMER_CSV_FIELDNAMES]
+            for sample in samples
+        )
+        self.samples_written += len(samples)
+
+    def flush(self) -> None:
+        """Push buffered rows (and a compressed block) to the file"""
+        if self._closed:
+            return
+        self._text.flush()
+        if self._compressed is not None:
+            self._compressed.flush()
+        self._raw.flush()
+
+    def close(self) -> None:
+        """Finish the compressed stream and close the file"""
+        if self._closed:
+            return
+        self._closed = True
+        self._text.flush()
+        self._text.detach()
+        if self._compressed is not None:
+            self._compressed.close()
+        self._raw.close()
+
+
+@dataclass
+class RecordingWriterStats:
+    """Counters of a RecordingWriterStage (each has a single writer thread)"""
+
+    blocks_submitted: int = 0
+    blocks_dropped: int = 0
+    samples_dropped: int = 0
+    blocks_written: int = 0
+    samples_written: int = 0
+    write_errors: int = 0
+    peak_queue_depth: int = 0
+    total_write_seconds: float = 0.0
+    total_latency_seconds: float = 0.0
+    max_latency_seconds: float = 0.0
+
+
+class RecordingWriterStage:
+    """
+    Dedicated writer thread for Shimmer recordings
+
+    The data processing thread submits blocks of samples per device with
+    ``submit``, which never blocks: when the bounded queue is full the block is
+    dropped and counted. The writer thread writes each block to the device's
+    sink (CsvSampleWriter or ColumnarSampleWriter) and flushes all sinks every
+    ``flush_interval`` seconds.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        queue_size: int = 1024,
+        flush_interval: float = 1.0,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize the stage and start its writer thread
+
+        Args:
+            queue_size: Maximum number of queued blocks
+            flush_interval: Seconds between flushes of all sinks
+            logger: Logger for write errors
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.flush_interval = flush_interval
+        self.stats = RecordingWriterStats()
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._sinks: Dict[str, Any] = {}
+        self._started_at = time.monotonic()
+        self._closed = False
+
+        self._thread = threading.Thread(
+            target=self._run, name="ShimmerRecordingWriter", daemon=True
+        )
+        self._thread.start()
+
+    def add_sink(self, device_id: str, sink: Any) -> None:
+        """Register the sink that receives the blocks of a device"""
+        self._sinks[device_id] = sink
+
+    @property
+    def sinks(self) -> Dict[str, Any]:
+        """Registered sinks by device id"""
+        return dict(self._sinks)
+
+    def submit(self, device_id: str, samples: List[Any]) -> bool:
+        """
+        Queue a block of samples for writing without blocking
+
+        Returns:
+            bool: False if the block was dropped because the queue is full
+        """
+        stats = self.stats
+        try:
+            self._queue.put_nowait((device_id, samples, time.monotonic()))
+        except queue.Full:
+            stats.blocks_dropped += 1
+            stats.samples_dropped += len(samples)
+            if stats.blocks_dropped == 1 or stats.blocks_dropped % 100 == 0:
+                self.logger.error(
+                    f"Recording writer queue full - dropped {stats.samples_dropped} samples"
+                )
+            return False
+
+        stats.blocks_submitted += 1
+        depth = self._queue.qsize()
+        if depth > stats.peak_queue_depth:
+            stats.peak_queue_depth = depth
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write everything still queued, then close all sinks"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((None, self._STOP, 0.0))
+        self._thread.join(timeout)
+        for device_id, sink in list(self._sinks.items()):
+            try:
+                sink.close()
+            except Exception as e:
+                self.logger.error(f"Error closing recording for {device_id}: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, write latency and throughput of the stage"""
+        stats = self.stats
+        bytes_written = 0
+        for sink in list(self._sinks.values()):
+            try:
+                bytes_written += sink.bytes_written
+            except Exception:
+                pass
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        blocks = max(stats.blocks_written, 1)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "peak_queue_depth": stats.peak_queue_depth,
+            "blocks_submitted": stats.blocks_submitted,
+            "blocks_written": stats.blocks_written,
+            "blocks_dropped": stats.blocks_dropped,
+            "samples_written": stats.samples_written,
+            "samples_dropped": stats.samples_dropped,
+            "write_errors": stats.write_errors,
+            "avg_write_ms": stats.total_write_seconds / blocks * 1000.0,
+            "avg_latency_ms": stats.total_latency_seconds / blocks * 1000.0,
+            "max_latency_ms": stats.max_latency_seconds * 1000.0,
+            "bytes_written": bytes_written,
+            "bytes_per_second": bytes_written / elapsed,
+        }
+
+    def _run(self) -> None:
+        """Writer thread: write queued blocks and flush periodically"""
+        stats = self.stats
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                device_id, samples, submitted_at = self._queue.get(
+                    timeout=max(0.0, next_flush - time.monotonic())
+                )
+            except queue.Empty:
+                device_id = None
+                samples = None
+
+            if samples is self._STOP:
+                break
+
+            if samples is not None:
+                sink = self._sinks.get(device_id)
+                started = time.monotonic()
+                try:
+                    if sink is None:
+                        raise KeyError(f"no recording sink for {device_id}")
+                    sink.write_samples(samples)
+                    stats.samples_written += len(samples)
+                except Exception as e:
+                    stats.write_errors += 1
+                    self.logger.error(f"Error writing recording for {device_id}: {e}")
+                finished = time.monotonic()
+                stats.blocks_written += 1
+                stats.total_write_seconds += finished - started
+                latency = finished - submitted_at
+                stats.total_latency_seconds += latency
+                if latency > stats.max_latency_seconds:
+                    stats.max_latency_seconds = latency
+
+            if time.monotonic() >= next_flush:
+                self._flush_sinks()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def _flush_sinks(self) -> None:
+        for device_id, sink in list(self._sinks.items()):
+            if not getattr(sink, "flush_periodically", True):
+                continue
+            try:
+                sink.flush()
+            except Exception as e:
+                self.logger.error(f"Error flushing recording for {device_id}: {e}")
+
+
+def read_columnar_manifest(recording_dir: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read and check the manifest of a columnar recording
+
+    Args:
+        recording_dir: Columnar recording directory
+
+    Returns:
+        Dict[str, Any]: Parsed manifest
+    """
+    manifest_path = Path(recording_dir) / COLUMNAR_MANIFEST_NAME
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != COLUMNAR_FORMAT_NAME:
+        raise ValueError(f"Not a Shimmer columnar recording: {recording_dir}")
+    if manifest.get("version", 0) > COLUMNAR_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported columnar format version {manifest.get('version')}"
+        )
+    return manifest
+
+
+def iter_columnar_chunks(
+    recording_dir: Union[str, Path], mmap: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the chunks of a columnar recording
+
+    Args:
+        recording_dir: Columnar recording directory
+        mmap: Memory-map chunk files instead of reading them into memory
+
+    Yields:
+        Dict[str, Any]: Chunk manifest entry with the loaded array under "data"
+    """
+    recording_dir = Path(recording_dir)
+    manifest = read_columnar_manifest(recording_dir)
+    for chunk in manifest["chunks"]:
+        data = np.load(recording_dir / chunk["file"], mmap_mode="r" if mmap else None)
+        yield {**chunk, "data": data}
+
+
+def load_columnar_recording(recording_dir: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """
+    Load all numeric columns of a columnar recording
+
+    Args:
+        recording_dir: Columnar recording directory
+
+    Returns:
+        Dict[str, np.ndarray]: One concatenated float64 array per column
+    """
+    manifest = read_columnar_manifest(recording_dir)
+    chunks = [chunk["data"] for chunk in iter_columnar_chunks(recording_dir)]
+    columns = manifest["columns"]
+    if not chunks:
+        return {name: np.empty(0, dtype=np.float64) for name in columns}
+
+    data = np.concatenate(chunks, axis=1)
+    return {name: data[i] for i, name in enumerate(columns)}
+
+
+def convert_columnar_to_csv(
+    recording_dir: Union[str, Path], csv_path: Optional[Union[str, Path]] = None
+) -> Path:
+    """
+    Convert a columnar recording to the Shimmer CSV schema
+
+    Args:
+        recording_dir: Columnar recording directory
+        csv_path: Output CSV path; defaults to ``<device_id>_data.csv`` next to
+            the recording directory
+
+    Returns:
+        Path: Path of the written CSV file
+    """
+    recording_dir = Path(recording_dir)
+    manifest = read_columnar_manifest(recording_dir)
+    columns = manifest["columns"]
+
+    if csv_path is None:
+        name = recording_dir.name
+        if name.endswith("_columnar"):
+            name = name[: -len("_columnar")]
+        csv_path = recording_dir.parent / f"{name}.csv"
+    csv_path = Path(csv_path)
+
+    rows_written = 0
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SHIMMER_CSV_FIELDNAMES)
+
+        for chunk in iter_columnar_chunks(recording_dir):
+            # tolist() yields Python floats, which csv renders like the CSV backend
+            column_values = dict(zip(columns, chunk["data"].tolist()))
+            for name in COLUMNAR_INTEGER_FIELDS:
+                column_values[name] = [
+                    None if math.isnan(v) else int(v) for v in column_values[name]
+                ]
+            column_values["system_time"] = [
+                None if math.isnan(v) else datetime.fromtimestamp(v).isoformat()
+                for v in column_values["system_time"]
+            ]
+
+            for row_index in range(chunk["rows"]):
+                row = []
+                for name in SHIMMER_CSV_FIELDNAMES:
+                    if name in COLUMNAR_STRING_FIELDS:
+                        value = chunk.get(name)
+                    else:
+                        value = column_values[name][row_index]
+                        if isinstance(value, float) and math.isnan(value):
+                            value = None
+                    row.append("" if value is None else value)
+                writer.writerow(row)
+            rows_written += chunk["rows"]
+
+    logger.info(f"Converted {rows_written} samples from {recording_dir} to {csv_path}")
+    return csv_path
@@ -0,0 +1,153 @@
+"""
+Shimmer Ring Buffer - bounded per-channel history of recent sensor samples
+
+ShimmerManager keeps one SampleRingBuffer per device so live views and
+analytics can ask for "the last N seconds" of a channel without collecting
+their own lists from data callbacks.
+
+All channels of a device share one preallocated ``(n_channels, capacity)``
+float64 block. The data processing thread is the only writer; any number of
+threads may read. Instead of a lock, the writer publishes a monotonically
+increasing sample count after each row is written, and readers use it to find
+the window and to detect whether the samples they copied were overwritten in
+the meantime (in which case the read is retried).
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-03
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+
+class SampleRingBuffer:
+    """
+    Fixed-capacity ring buffer of samples for a single device
+
+    The first channel must be ``timestamp`` (seconds, non-decreasing); it is
+    used to translate window lengths in seconds into sample counts.
+    """
+
+    def __init__(self, channels: Sequence[str], capacity: int):
+        """
+        Initialize the buffer
+
+        Args:
+            channels: Channel names in row order, starting with "timestamp"
+            capacity: Number of samples kept per channel
+        """
+        if not channels or channels[0] != "timestamp":
+            raise ValueError("The first ring buffer channel must be 'timestamp'")
+
+        self.channels = tuple(channels)
+        self.capacity = max(1, int(capacity))
+        self._channel_index: Dict[str, int] = {
+            name: i for i, name in enumerate(self.channels)
+        }
+        # One spare slot so the sample being written never overlaps a window
+        self._slots = self.capacity + 1
+        self._data = np.full((len(self.channels), self._slots), np.nan)
+        # Total number of samples ever written; only the writer updates it
+        self._written = 0
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    @property
+    def total_written(self) -> int:
+        """Number of samples appended since the buffer was created"""
+        return self._written
+
+    def append(self, row: Sequence[Any]) -> None:
+        """
+        Append one sample (writer thread only)
+
+        Args:
+            row: One value per channel in channel order; None is stored as NaN
+        """
+        self._data[:, self._written % self._slots] = row
+        # Publish only after the row is complete
+        self._written += 1
+
+    def get_window(
+        self, channel: str, seconds: float, copy: bool = False
+    ) -> np.ndarray:
+        """
+        Return the samples of one channel from the last ``seconds``
+
+        The window ends at the newest sample and covers samples whose timestamp
+        is within ``seconds`` of it, limited to the buffer capacity. When the
+        window does not wrap around the end of the buffer and ``copy`` is
+        False, a read-only view into the buffer is returned; it stays valid
+        until the writer has appended another ``capacity - len(window)``
+        samples. Otherwise one contiguous copy is returned.
+
+        Args:
+            channel: Channel name
+            seconds: Window length in seconds
+            copy: Always return an independent copy
+
+        Returns:
+            np.ndarray: Channel values, oldest first
+        """
+        row = self._channel_index.get(channel)
+        if row is None:
+            raise ValueError(f"Unknown ring buffer channel: {channel}")
+
+        while True:
+            end = self._written
+            start = self._window_start(end, seconds)
+            if start >= end:
+                return np.empty(0, dtype=np.float64)
+
+            first = start % self._slots
+            last = end % self._slots or self._slots
+            if first < last:
+                window = self._data[row, first:last]
+                if copy:
+                    window = window.copy()
+                else:
+                    window = window.view()
+                    window.flags.writeable = False
+            else:
+                window = np.concatenate(
+                    (self._data[row, first:], self._data[row, :last])
+                )
+
+            # Retry if the writer may have reached the oldest slot while we
+            # were reading (the sample being written is not yet counted)
+            if self._written - start < self._slots:
+                return window
+
+    def get_latest(self, channel: str) -> Optional[float]:
+        """Return the newest value of a channel, or None if empty"""
+        row = self._channel_index.get(channel)
+        if row is None:
+            raise ValueError(f"Unknown ring buffer channel: {channel}")
+        end = self._written
+        if not end:
+            return None
+        value = float(self._data[row, (end - 1) % self._slots])
+        return None if math.isnan(value) else value
+
+    def _window_start(self, end: int, seconds: float) -> int:
+        """Find the logical index of the first sample inside the window"""
+        oldest = max(0, end - self.capacity)
+        if end <= oldest:
+            return end
+
+        timestamps = self._data[0]
+        slots = self._slots
+        threshold = timestamps[(end - 1) % slots] - seconds
+
+        # Binary search over logical indexes for the first timestamp > threshold
+        low, high = oldest, end - 1
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[middle % slots] > threshold:
+                high = middle
+            else:
+                low = middle + 1
+        return low
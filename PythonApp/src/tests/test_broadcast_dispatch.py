@@ -0,0 +1,149 @@
+"""
+Tests for concurrent, latency-aligned broadcast of device commands
+
+Covers PCServer.dispatch_message sending one encoded message to every
+device, latency alignment and skew reporting, and the scheduled start of
+MasterClockSynchronizer.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import socket
+import sys
+import time
+import unittest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from master_clock_synchronizer import MasterClockSynchronizer, SyncStatus
+from network.framing import FrameReader
+from network.pc_server import ConnectedDevice, PCServer, StartRecordCommand
+from protocol.wire_encoding import ENCODING_MSGPACK, available_encodings, decode_message
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class BroadcastTestCase(unittest.TestCase):
+    """Connects fake devices to a PCServer that is not listening"""
+
+    def setUp(self):
+        self.server = PCServer(port=_free_port())
+        self.device_sockets = {}
+
+    def tearDown(self):
+        self.server.broadcast_pool.shutdown(wait=True)
+        self.server.thread_pool.shutdown(wait=False)
+        for device_socket in self.device_sockets.values():
+            device_socket.close()
+
+    def _connect(self, device_id, encoding="json"):
+        device_socket, server_socket = socket.socketpair()
+        device_socket.settimeout(5)
+        self.device_sockets[device_id] = device_socket
+        self.server.connected_devices[device_id] = ConnectedDevice(
+            device_id=device_id, capabilities=[], connection_time=time.time(),
+            last_heartbeat=time.time(), status={}, socket=server_socket,
+            address=("127.0.0.1", 0), encoding=encoding,
+        )
+
+    def _receive(self, device_id):
+        return decode_message(FrameReader(self.device_sockets[device_id]).read_frame())
+
+
+class TestDispatchMessage(BroadcastTestCase):
+    """Test suite for PCServer.dispatch_message"""
+
+    def test_all_devices_receive(self):
+        """Every device gets the message in its own encoding, failures are reported"""
+        encoding = ENCODING_MSGPACK if ENCODING_MSGPACK in available_encodings() else "json"
+        for index in range(4):
+            self._connect(f"phone-{index}", encoding if index % 2 else "json")
+
+        result = self.server.dispatch_message(
+            StartRecordCommand(session_id="s1"), ["phone-0", "phone-1", "phone-2", "phone-3", "gone"]
+        )
+        self.assertEqual(result.success_count, 4)
+        self.assertEqual(result.failed, ["gone"])
+        self.assertEqual(set(result.dispatch_skew_ms), set(result.dispatch_times))
+        self.assertEqual(min(result.dispatch_skew_ms.values()), 0.0)
+        for index in range(4):
+            self.assertEqual(self._receive(f"phone-{index}")["session_id"], "s1")
+        self.assertEqual(self.server.broadcast_message(StartRecordCommand(session_id="s2")), 4)
+
+    def test_latency_aligned(self):
+        """A device with lower latency is sent to later by the difference"""
+        self._connect("near")
+        self._connect("far")
+        result = self.server.dispatch_message(
+            StartRecordCommand(session_id="s1"), latencies_ms={"near": 0.0, "far": 30.0}
+        )
+        gap_ms = (result.dispatch_times["near"] - result.dispatch_times["far"]) * 1000
+        self.assertGreater(gap_ms, 25.0)
+        self.assertLess(result.max_skew_ms, 5.0)
+
+    def test_more_devices_than_senders(self):
+        """Sends to more devices than the pool's threads do not queue behind each other"""
+        pool_size = self.server.broadcast_pool._max_workers
+        for index in range(pool_size + 2):
+            self._connect(f"near-{index}")
+        self._connect("far")
+
+        # The near devices' senders wait 30ms, so a far send queued behind them would go last
+        latencies_ms = {device_id: 0.0 for device_id in self.device_sockets}
+        latencies_ms["far"] = 30.0
+        result = self.server.dispatch_message(StartRecordCommand(session_id="s1"), latencies_ms=latencies_ms)
+        self.assertEqual(result.success_count, pool_size + 3)
+        near_sent = min(sent_at for device_id, sent_at in result.dispatch_times.items() if device_id != "far")
+        self.assertGreater((near_sent - result.dispatch_times["far"]) * 1000, 20.0)
+        self.assertGreaterEqual(self.server.broadcast_pool._max_workers, pool_size + 3)
+        self.assertEqual(self.server._broadcast_sends, 0)
+
+        self.assertEqual(self.server.broadcast_message(StartRecordCommand(session_id="s2")), pool_size + 3)
+
+
+class TestScheduledStart(BroadcastTestCase):
+    """Test MasterClockSynchronizer start commands"""
+
+    def setUp(self):
+        super().setUp()
+        self.synchronizer = MasterClockSynchronizer(ntp_port=_free_port())
+        self.synchronizer.pc_server = self.server
+        for device_id, offset_ms in (("phone-1", 10.0), ("phone-2", 40.0)):
+            self._connect(device_id)
+            self.synchronizer.connected_devices[device_id] = SyncStatus(
+                device_id=device_id, device_type="android", is_synchronized=True,
+                time_offset_ms=offset_ms, last_sync_time=time.time(), sync_quality=1.0,
+                recording_active=False, frame_count=0,
+            )
+
+    def tearDown(self):
+        self.synchronizer.thread_pool.shutdown(wait=False)
+        super().tearDown()
+
+    def test_scheduled_start(self):
+        """Devices are told a common start time beyond the slowest device's latency"""
+        before = time.time()
+        self.assertTrue(self.synchronizer.start_synchronized_recording("s1", scheduled_start=True))
+
+        session = self.synchronizer.get_active_sessions()["s1"]
+        self.assertGreaterEqual(session.start_timestamp, before + 0.08 + 0.25)
+        self.assertEqual(set(session.dispatch_skew_ms), {"phone-1", "phone-2"})
+        for device_id in ("phone-1", "phone-2"):
+            message = self._receive(device_id)
+            self.assertEqual(message["start_at_ms"], int(session.start_timestamp * 1000))
+
+    def test_immediate_start(self):
+        """Without scheduled_start devices start on receipt"""
+        self.assertTrue(self.synchronizer.start_synchronized_recording("s1"))
+        self.assertIsNone(self._receive("phone-1")["start_at_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
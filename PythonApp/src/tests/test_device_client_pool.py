@@ -0,0 +1,183 @@
+"""
+Tests for the DeviceClient connection pool
+
+Covers reusing warm connections released with keep_alive, discarding pooled
+connections the device closed, reconnecting a broken connection on
+send_command, and TLS session resumption.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import json
+import os
+import select
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from PyQt5.QtCore import QCoreApplication
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network.device_client import DeviceClient
+
+
+class FakeDevice:
+    """Accepts DeviceClient handshakes and records received commands"""
+
+    def __init__(self, ssl_context=None):
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        self.ssl_context = ssl_context
+        self.connections = []
+        self.commands = []
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        try:
+            if self.ssl_context:
+                connection = self.ssl_context.wrap_socket(connection, server_side=True)
+            self.connections.append(connection)
+            json.loads(connection.recv(4096))
+            connection.sendall(json.dumps({"status": "accepted", "capabilities": ["recording"]}).encode())
+            while True:
+                data = connection.recv(4096)
+                if not data:
+                    break
+                message = json.loads(data)
+                if message["type"] == "command":
+                    self.commands.append(message["command"])
+        except (OSError, ValueError):
+            pass
+
+    def close_connections(self):
+        """Close the device side of every connection, sending a FIN to the client"""
+        for connection in self.connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            connection.close()
+
+    def close(self):
+        self.listener.close()
+        self.close_connections()
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test suite for DeviceClient connection reuse"""
+
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.client = DeviceClient()
+        self.device = FakeDevice()
+
+    def tearDown(self):
+        self.client.stop_client()
+        self.device.close()
+
+    def test_keep_alive_reuse(self):
+        """A connection released with keep_alive is reused without a new handshake"""
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+        self.client.disconnect_device(0, keep_alive=True)
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+        self.assertTrue(self.client.send_command(1, "START", require_ack=False))
+
+        metrics = self.client.get_pool_metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"], metrics["handshakes"]), (1, 1, 1))
+        self.assertEqual(metrics["hit_rate"], 0.5)
+        self.assertEqual(len(self.device.connections), 1)
+
+    def test_closed_connection_not_reused(self):
+        """A pooled connection closed by the device is replaced"""
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+        self.client.disconnect_device(0, keep_alive=True)
+        pooled = next(iter(self.client._connection_pool.values()))["socket"]
+        self.device.close_connections()
+        # Wait for the FIN to reach the client
+        readable, _, _ = select.select([pooled], [], [], 2)
+        self.assertTrue(readable)
+
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+        self.assertEqual(self.client.get_pool_metrics()["hits"], 0)
+        self.assertEqual(len(self.device.connections), 2)
+
+    def test_keepalive_enabled(self):
+        """Device connections send keepalive probes to detect half-open connections"""
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+        device_socket = self.client.devices[0]["socket"]
+        self.assertTrue(device_socket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            self.assertEqual(
+                device_socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE),
+                self.client._keepalive_idle,
+            )
+
+    def test_send_command_reconnects(self):
+        """A command on a broken connection is sent over a new one"""
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+        self.client.devices[0]["socket"].close()
+
+        self.assertTrue(self.client.send_command(0, "STOP", require_ack=False))
+        deadline = time.time() + 5
+        while not self.device.commands and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.device.commands, ["STOP"])
+        self.assertEqual(self.client.get_pool_metrics()["reconnections"], 1)
+
+
+@unittest.skipUnless(shutil.which("openssl"), "openssl is needed to create a test certificate")
+class TestTlsSessionResumption(unittest.TestCase):
+    """Test TLS session resumption of new connections"""
+
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.directory = tempfile.mkdtemp()
+        self.certfile = os.path.join(self.directory, "cert.pem")
+        self.keyfile = os.path.join(self.directory, "key.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-subj", "/CN=127.0.0.1", "-keyout", self.keyfile, "-out", self.certfile],
+            check=True, capture_output=True,
+        )
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(self.certfile, self.keyfile)
+        self.device = FakeDevice(server_context)
+        self.client = DeviceClient()
+        self.assertTrue(self.client.configure_ssl(self.certfile, self.keyfile))
+
+    def tearDown(self):
+        self.client.stop_client()
+        self.device.close()
+        shutil.rmtree(self.directory)
+
+    def test_session_resumed(self):
+        """The second connection to a device IP resumes the first TLS session"""
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+        self.client.disconnect_device(0)
+        self.assertTrue(self.client.connect_to_device("127.0.0.1", self.device.port))
+
+        metrics = self.client.get_pool_metrics()
+        self.assertEqual(metrics["handshakes"], 2)
+        self.assertEqual(metrics["tls_sessions_resumed"], 1)
+        self.assertGreater(metrics["average_handshake_ms"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+"""
+Tests for JsonSocketServer per-connection contexts
+
+Covers the device registered by a hello message being carried on the
+connection's ClientContext, the message dispatch table, and a reconnecting
+device leaving its old connection without a device.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import Mock
+
+from PyQt5.QtCore import Qt
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network.device_server import ClientContext, JsonSocketServer, RemoteDevice
+
+
+class TestClientContext(unittest.TestCase):
+    """Test device lookup through ClientContext"""
+
+    def setUp(self):
+        self.server = JsonSocketServer(host="127.0.0.1", port=0)
+        self.statuses = []
+        self.server.status_received.connect(
+            lambda device_id, status: self.statuses.append(device_id), Qt.DirectConnection
+        )
+
+    def tearDown(self):
+        self.server.cleanup()
+
+    def _open(self, addr):
+        client_socket = Mock()
+        return self.server._open_context(client_socket, addr)
+
+    def test_hello_binds_device_to_context(self):
+        """Messages after hello reach the device registered on the connection"""
+        context = self._open("10.0.0.2:5000")
+        self.assertIsNone(context.device_id)
+
+        self.server.process_json_message(
+            context.client_socket, context.client_addr,
+            {"type": "hello", "device_id": "phone", "capabilities": []}, context,
+        )
+        self.assertIs(context.device, self.server.devices["phone"])
+        self.assertEqual(self.server.find_device_id(context.client_socket), "phone")
+
+        self.server.process_json_message(
+            context.client_socket, context.client_addr, {"type": "status", "battery": 80}, context
+        )
+        self.assertEqual(self.statuses, ["phone"])
+        self.assertEqual(context.messages_received, 2)
+
+    def test_messages_before_hello_are_ignored(self):
+        """Only hello is handled on a connection without a device"""
+        context = self._open("10.0.0.2:5000")
+        result = self.server.process_json_message(
+            context.client_socket, context.client_addr, {"type": "status"}, context
+        )
+        self.assertIsNone(result)
+        self.assertEqual(self.statuses, [])
+
+    def test_reconnect_clears_old_context(self):
+        """A device reconnecting on a new socket is no longer found on the old one"""
+        hello = {"type": "hello", "device_id": "phone", "capabilities": []}
+        old = self._open("10.0.0.2:5000")
+        new = self._open("10.0.0.2:5001")
+        self.server.process_json_message(old.client_socket, old.client_addr, hello, old)
+        self.server.process_json_message(new.client_socket, new.client_addr, hello, new)
+
+        self.server.process_json_message(old.client_socket, old.client_addr, {"type": "status"}, old)
+        self.assertIsNone(old.device)
+        self.assertEqual(self.statuses, [])
+        self.assertIsNone(self.server.find_device_id(old.client_socket))
+        self.assertEqual(self.server.find_device_id(new.client_socket), "phone")
+
+    def test_device_registered_without_hello(self):
+        """Devices added to server.devices directly are found by their socket"""
+        client_socket = Mock()
+        self.server.devices["tablet"] = RemoteDevice("tablet", [], client_socket)
+        self.server.process_json_message(client_socket, "10.0.0.3:5000", {"type": "status"})
+        self.assertEqual(self.statuses, ["tablet"])
+        self.assertIsInstance(self.server._contexts[client_socket], ClientContext)
+
+    def test_close_context(self):
+        """Closed connections are forgotten"""
+        context = self._open("10.0.0.2:5000")
+        self.server._close_context(context)
+        self.assertNotIn(context.client_socket, self.server._contexts)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+"""
+Tests for decoupled dual camera capture
+
+Covers nearest-timestamp pairing of two camera streams, the per-camera
+capture threads, and DualWebcamCapture pairing frames of two synthetic
+cameras.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from webcam.dual_webcam_capture import CameraCaptureThread, DualWebcamCapture, FramePairer
+
+
+class SyntheticCamera:
+    """Free-running camera producing frames at a fixed rate"""
+
+    def __init__(self, fps, phase=0.0, fail_after=None):
+        self.interval = 1.0 / fps
+        self.start = time.time() + phase
+        self.frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        self.fail_after = fail_after
+        self.grabbed = 0
+
+    def grab(self):
+        if self.fail_after is not None and self.grabbed >= self.fail_after:
+            return False
+        ticks = int((time.time() - self.start) / self.interval) + 1
+        time.sleep(max(0.0, self.start + ticks * self.interval - time.time()))
+        self.grabbed += 1
+        return True
+
+    def retrieve(self):
+        return True, self.frame
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class ReadOnlyCamera:
+    """Camera without grab/retrieve"""
+
+    def __init__(self, fps):
+        self.camera = SyntheticCamera(fps)
+
+    def read(self):
+        return self.camera.grab(), self.camera.frame
+
+
+class TestFramePairer(unittest.TestCase):
+    """Test nearest-timestamp pairing"""
+
+    def _push(self, pairer, camera, fps, count, base, phase=0.0):
+        for index in range(count):
+            pairer.push(camera, None, base + phase + index / fps, index)
+
+    def test_30_60_fps_pairs_each_frame_once(self):
+        """The slower camera's frames each pair with the nearest frame of the faster one"""
+        pairer = FramePairer(ring_size=200)
+        base = time.time() - 10
+        self._push(pairer, 1, 30, 30, base, phase=0.004)
+        self._push(pairer, 2, 60, 60, base)
+
+        pairs = []
+        while True:
+            pair = pairer.next_pair(timeout=0)
+            if pair is None:
+                break
+            pairs.append(pair)
+
+        self.assertEqual(len(pairs), 30)
+        self.assertEqual(len({frame2.sequence for _, frame2 in pairs}), 30)
+        for frame1, frame2 in pairs:
+            self.assertLessEqual(abs(frame1.timestamp - frame2.timestamp), 1 / 120 + 1e-6)
+
+        stats = pairer.get_statistics()
+        self.assertEqual(stats['pairs'], 30)
+        self.assertAlmostEqual(stats['skew_ms_max'], 4.0, places=3)
+        self.assertEqual(stats['unmatched_frames'][1], 0)
+        self.assertGreaterEqual(stats['unmatched_frames'][2], 29)
+
+    def test_waits_for_closer_frame(self):
+        """A fresh frame is not paired while a closer frame may still arrive"""
+        pairer = FramePairer(max_wait_s=0.5)
+        now = time.time()
+        pairer.push(1, None, now - 0.03, 0)
+        pairer.push(2, None, now, 0)
+        self.assertIsNone(pairer.next_pair(timeout=0))
+
+        threading.Timer(0.05, pairer.push, args=(1, None, now + 0.001, 1)).start()
+        frame1, frame2 = pairer.next_pair(timeout=1.0)
+        self.assertEqual((frame1.sequence, frame2.sequence), (1, 0))
+
+    def test_max_skew(self):
+        """Frames further apart than max_skew_ms are dropped instead of paired"""
+        pairer = FramePairer(max_skew_ms=50)
+        base = time.time() - 10
+        pairer.push(1, None, base, 0)
+        pairer.push(2, None, base + 1.0, 0)
+        self.assertIsNone(pairer.next_pair(timeout=0))
+        self.assertEqual(pairer.get_statistics()['unmatched_frames'][1], 1)
+
+    def test_ring_overwrite(self):
+        """Frames pushed into a full ring buffer overwrite the oldest"""
+        pairer = FramePairer(ring_size=4)
+        self._push(pairer, 1, 30, 10, time.time())
+        self.assertEqual(len(pairer.buffers[1]), 4)
+        self.assertEqual(pairer.get_statistics()['overwritten_frames'][1], 6)
+
+
+class TestCameraCaptureThread(unittest.TestCase):
+    """Test per-camera capture threads"""
+
+    def test_grab_and_read_cameras(self):
+        """Both grab/retrieve and read-only cameras are captured concurrently"""
+        pairer = FramePairer()
+        threads = [
+            CameraCaptureThread(1, SyntheticCamera(60), pairer),
+            CameraCaptureThread(2, ReadOnlyCamera(60), pairer),
+        ]
+        self.assertTrue(threads[0].use_grab)
+        self.assertFalse(threads[1].use_grab)
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 0.3
+        while time.time() < deadline:
+            pairer.next_pair(timeout=0.05)
+        for thread in threads:
+            thread.stop()
+
+        self.assertGreater(threads[0].frames_captured, 5)
+        self.assertGreater(threads[1].frames_captured, 5)
+        self.assertGreater(pairer.get_statistics()['pairs'], 0)
+
+    def test_camera_failure(self):
+        """Repeated capture failures stop the thread with an error"""
+        thread = CameraCaptureThread(1, SyntheticCamera(100, fail_after=2), FramePairer(), max_failures=3)
+        thread.start()
+        thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(thread.frames_captured, 2)
+        self.assertIn("camera 1", thread.error)
+
+
+class TestDualWebcamCapturePairing(unittest.TestCase):
+    """Test the DualWebcamCapture pairing loop"""
+
+    def test_run_pairs_synthetic_cameras(self):
+        """run() processes paired frames of a 30 and a 60 FPS camera"""
+        # Face detection models are not needed to pair frames
+        with patch("webcam.dual_webcam_capture.AdvancedROIDetector"):
+            capture = DualWebcamCapture(preview_fps=30)
+        capture.cap1 = SyntheticCamera(30)
+        capture.cap2 = SyntheticCamera(60, phase=0.003)
+        capture.running = True
+
+        loop = threading.Thread(target=capture.run)
+        loop.start()
+        time.sleep(1.0)
+        capture.running = False
+        loop.join(timeout=2)
+
+        self.assertFalse(loop.is_alive())
+        self.assertEqual(capture.capture_threads, [])
+        stats = capture.get_pairing_statistics()
+        self.assertGreater(stats['pairs'], 20)
+        self.assertLess(stats['skew_ms_p50'], 1000 / 60)
+        self.assertEqual(capture.get_performance_stats()['frames_processed'], stats['pairs'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
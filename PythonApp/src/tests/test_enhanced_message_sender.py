@@ -0,0 +1,88 @@
+"""
+Tests for the EnhancedDeviceServer outbound message writer
+
+Covers coalescing queued messages into one vectored send, priority order
+within a batch, and the sender metrics in the device status summary.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+
+from PyQt5.QtCore import Qt
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network.enhanced_device_server import (
+    ConnectionState,
+    EnhancedDeviceServer,
+    EnhancedRemoteDevice,
+    MessagePriority,
+    NetworkMessage,
+)
+from network.framing import FrameReader
+from protocol.wire_encoding import decode_message
+
+
+class TestCoalescedSender(unittest.TestCase):
+    """Test message_sender_loop of EnhancedDeviceServer"""
+
+    def setUp(self):
+        self.server = EnhancedDeviceServer(host="127.0.0.1", port=0)
+        self.server.running = True
+        self.device_socket, self.server_socket = socket.socketpair()
+        self.device = EnhancedRemoteDevice(
+            "phone", [], self.server_socket, ("127.0.0.1", 5000)
+        )
+        self.sent = []
+        self.server.message_sent.connect(
+            lambda device_id, payload: self.sent.append(payload), Qt.DirectConnection
+        )
+
+    def tearDown(self):
+        self.server.running = False
+        self.device.state = ConnectionState.DISCONNECTED
+        self.device_socket.close()
+        self.server_socket.close()
+
+    def test_batch_in_priority_order(self):
+        """Queued messages go out in one send, highest priority first"""
+        for i in range(10):
+            self.device.queue_message(NetworkMessage(
+                "heartbeat", {"type": "heartbeat", "seq": i}, MessagePriority.HIGH
+            ))
+        self.device.queue_message(NetworkMessage(
+            "command", {"type": "command", "command": "start_recording"}, MessagePriority.CRITICAL
+        ))
+
+        sender = threading.Thread(
+            target=self.server.message_sender_loop, args=(self.device,), daemon=True
+        )
+        sender.start()
+
+        reader = FrameReader(self.device_socket)
+        self.device_socket.settimeout(5)
+        received = [decode_message(reader.read_frame()) for _ in range(11)]
+        self.assertEqual(received[0]["command"], "start_recording")
+        self.assertEqual([message["seq"] for message in received[1:]], list(range(10)))
+
+        deadline = time.time() + 5
+        while len(self.sent) < 11 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.sent), 11)
+        self.assertEqual(self.device.frame_writer.syscalls, 1)
+        summary = self.device.get_status_summary()
+        self.assertEqual(summary["stats"]["messages_sent"], 11)
+        self.assertAlmostEqual(summary["sender"]["syscalls_per_message"], 1 / 11, places=3)
+        self.assertEqual(set(summary["sender"]["queue_latency_ms"]), {"CRITICAL", "HIGH"})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,141 @@
+"""
+Tests for EnhancedDeviceServer preview frame handling
+
+Covers recognising preview frames before decoding, dropping over-rate frames
+without decoding them, and the per-device latest-frame slot.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import base64
+import os
+import socket
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+from PyQt5.QtCore import QCoreApplication, Qt
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network import enhanced_device_server
+from network.enhanced_device_server import (
+    EnhancedDeviceServer,
+    EnhancedRemoteDevice,
+    is_preview_frame,
+)
+from network.framing import pack_frame
+from protocol.wire_encoding import available_encodings, encode_message
+
+
+def _preview(index):
+    return {
+        "type": "preview_frame",
+        "frame_type": "rgb",
+        "image_data": base64.b64encode(b"jpeg-%d" % index).decode("ascii"),
+        "timestamp": 0,
+    }
+
+
+class TestPreviewFramePeek(unittest.TestCase):
+    """Test is_preview_frame on undecoded frames"""
+
+    def test_every_encoding(self):
+        """Preview frames are recognised in each wire encoding"""
+        for encoding in available_encodings():
+            with self.subTest(encoding=encoding):
+                self.assertTrue(is_preview_frame(encode_message(_preview(0), encoding)))
+                self.assertFalse(
+                    is_preview_frame(encode_message({"type": "status", "battery": 50}, encoding))
+                )
+
+    def test_type_value_only(self):
+        """A preview_frame string outside the type field is not a match"""
+        self.assertFalse(is_preview_frame(b'{"type": "ack", "cmd": "preview_frame"}'))
+        self.assertTrue(is_preview_frame(memoryview(b'{"type":"preview_frame","image_data":""}')))
+
+
+class TestPreviewFrameDropping(unittest.TestCase):
+    """Test rate limiting and the latest-frame slot of EnhancedDeviceServer"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    def setUp(self):
+        self.server = EnhancedDeviceServer(host="127.0.0.1", port=0)
+        self.server.running = True
+        self.device_socket, self.server_socket = socket.socketpair()
+        self.device = EnhancedRemoteDevice(
+            "phone", [], self.server_socket, ("127.0.0.1", 5000)
+        )
+        self.server.devices["phone"] = self.device
+        self.ready = []
+        self.server.preview_frame_ready.connect(self.ready.append, Qt.DirectConnection)
+
+    def tearDown(self):
+        self.server.running = False
+        self.device_socket.close()
+        self.server_socket.close()
+
+    def _receive(self, messages):
+        for message in messages:
+            self.device_socket.sendall(pack_frame(encode_message(message)))
+        self.device_socket.shutdown(socket.SHUT_WR)
+        receiver = threading.Thread(target=self.server.message_receiver_loop, args=(self.device,))
+        receiver.start()
+        receiver.join(timeout=5)
+
+    def test_over_rate_frames_are_not_decoded(self):
+        """Frames over max_frame_rate are counted as dropped and never decoded"""
+        self.device.max_frame_rate = 1
+        with patch.object(
+            enhanced_device_server, "decode_message", wraps=enhanced_device_server.decode_message
+        ) as decode:
+            self._receive([_preview(i) for i in range(10)] + [{"type": "status"}])
+
+        stats = self.server.get_preview_statistics()["phone"]
+        self.assertEqual(stats, {"dropped": 9, "decoded": 1, "rendered": 0})
+        self.assertEqual(decode.call_count, 2)
+        self.assertEqual(self.device.get_status_summary()["preview"]["frames_dropped"], 9)
+
+    def test_latest_frame_slot(self):
+        """The GUI is notified once and takes only the newest frame"""
+        self.device.max_frame_rate = 1000000
+        self.device.adapt_streaming_quality = lambda latency, error_rate: None
+        self._receive([_preview(i) for i in range(3)])
+
+        self.assertEqual(self.ready, ["phone"])
+        frame_type, image_bytes, metadata = self.server.take_preview_frame("phone")
+        self.assertEqual((frame_type, image_bytes), ("rgb", b"jpeg-2"))
+        self.assertIsNone(self.server.take_preview_frame("phone"))
+        self.assertEqual(
+            self.server.get_preview_statistics()["phone"],
+            {"dropped": 0, "decoded": 3, "rendered": 1},
+        )
+
+    def test_received_signal_gets_newest_frame(self):
+        """preview_frame_received carries the newest frame taken from the slot"""
+        self.device.max_frame_rate = 1000000
+        self.device.adapt_streaming_quality = lambda latency, error_rate: None
+        received = []
+        self.server.preview_frame_received.connect(
+            lambda *args: received.append(args), Qt.DirectConnection
+        )
+        self._receive([_preview(i) for i in range(3)])
+        # Deliver the notification queued from the receiver thread
+        self.app.processEvents()
+
+        self.assertEqual(len(received), 1)
+        device_id, frame_type, image_bytes, metadata = received[0]
+        self.assertEqual((device_id, frame_type, image_bytes), ("phone", "rgb", b"jpeg-2"))
+        self.assertEqual(metadata["frame_type"], "rgb")
+        self.assertIsNone(self.server.take_preview_frame("phone"))
+        self.assertEqual(self.server.get_preview_statistics()["phone"]["rendered"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
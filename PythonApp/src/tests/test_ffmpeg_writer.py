@@ -0,0 +1,246 @@
+"""
+Tests for the ffmpeg recording backend
+
+Covers the ffmpeg command line for each codec, selecting the backend through
+WebcamConfigManager, writer creation for both backends, and recording
+through an ffmpeg subprocess when ffmpeg is installed.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config.webcam_config import (
+    CodecValidator,
+    FFmpegCodec,
+    RecordingBackend,
+    RecordingConfig,
+    WebcamConfigManager,
+)
+from webcam.ffmpeg_writer import FFmpegVideoWriter, build_ffmpeg_command, create_video_writer
+from webcam.video_encoder import AsyncVideoEncoder, QueuePolicy
+
+FFMPEG = shutil.which("ffmpeg")
+
+
+class TestFFmpegCommand(unittest.TestCase):
+    """Test the ffmpeg command line"""
+
+    def _command(self, codec, **kwargs):
+        return build_ffmpeg_command("ffmpeg", "out.mp4", 30, (3840, 2160), codec, **kwargs)
+
+    def test_raw_input(self):
+        """Raw BGR frames of the recording resolution are read from stdin"""
+        command = " ".join(self._command(FFmpegCodec.LIBX264))
+        self.assertIn("-f rawvideo -pix_fmt bgr24 -s 3840x2160 -r 30 -i -", command)
+        self.assertTrue(command.endswith("out.mp4"))
+
+    def test_software_encoders(self):
+        """libx264 and libx265 take preset, CRF and threads"""
+        command = " ".join(self._command(FFmpegCodec.LIBX265, preset="fast", crf=28, threads=4))
+        self.assertIn("-c:v libx265 -preset fast -crf 28 -pix_fmt yuv420p", command)
+        self.assertIn("-threads 4", command)
+        self.assertNotIn("-threads", " ".join(self._command(FFmpegCodec.LIBX264)))
+
+    def test_lossless(self):
+        """Lossless mode ignores CRF and keeps full chroma"""
+        command = " ".join(self._command(FFmpegCodec.LIBX264, crf=30, lossless=True))
+        self.assertIn("-qp 0 -pix_fmt yuv444p", command)
+        self.assertNotIn("-crf", command)
+        command = " ".join(self._command(FFmpegCodec.LIBX265, lossless=True))
+        self.assertIn("lossless=1", command)
+
+        with self.assertRaises(ValueError):
+            self._command(FFmpegCodec.H264_NVENC, lossless=True)
+
+    def test_hardware_encoders(self):
+        """Hardware encoders use their own quality settings"""
+        self.assertIn("-cq", self._command(FFmpegCodec.H264_NVENC))
+        self.assertIn("-global_quality", self._command(FFmpegCodec.H264_QSV))
+        self.assertIn("format=nv12,hwupload", self._command(FFmpegCodec.H264_VAAPI))
+        self.assertTrue(FFmpegCodec.HEVC_NVENC.is_hardware)
+        self.assertFalse(FFmpegCodec.LIBX265.is_hardware)
+
+    def test_encoder_presets(self):
+        """x264 preset names are translated for encoders that do not take them"""
+        default = RecordingConfig().preset
+        for codec in (FFmpegCodec.H264_NVENC, FFmpegCodec.HEVC_NVENC):
+            command = " ".join(self._command(codec, preset=default))
+            self.assertIn("-preset p2", command)
+            self.assertNotIn(default, command)
+            self.assertIn("-preset p6", " ".join(self._command(codec, preset="p6")))
+        self.assertIn("-preset veryfast", " ".join(self._command(FFmpegCodec.H264_QSV, preset="ultrafast")))
+        self.assertNotIn("-preset", self._command(FFmpegCodec.H264_VAAPI, preset=default))
+        self.assertIn("-preset veryfast", " ".join(self._command(FFmpegCodec.LIBX264, preset=default)))
+
+        with self.assertRaises(ValueError):
+            self._command(FFmpegCodec.LIBX264, preset="p4")
+        with self.assertRaises(ValueError):
+            self._command(FFmpegCodec.H264_NVENC, preset="turbo")
+
+
+class TestRecordingBackendConfig(unittest.TestCase):
+    """Test selecting the backend through WebcamConfigManager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, "webcam_config.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch.object(CodecValidator, "test_ffmpeg_codec", return_value=True)
+    @patch.object(CodecValidator, "find_ffmpeg", return_value="/usr/bin/ffmpeg")
+    def test_settings_saved_and_loaded(self, *_):
+        """ffmpeg settings round-trip through the configuration file"""
+        manager = WebcamConfigManager(self.config_file)
+        self.assertTrue(manager.set_recording_config(
+            backend="ffmpeg", ffmpeg_codec="libx265", preset="slow", crf=60, threads=8, lossless=True
+        ))
+
+        recording = WebcamConfigManager(self.config_file).get_config().recording
+        self.assertEqual(recording.backend, RecordingBackend.FFMPEG)
+        self.assertEqual(recording.ffmpeg_codec, FFmpegCodec.LIBX265)
+        self.assertEqual((recording.preset, recording.crf, recording.threads), ("slow", 51, 8))
+        self.assertTrue(recording.lossless)
+
+    @patch.object(CodecValidator, "test_ffmpeg_codec", return_value=True)
+    @patch.object(CodecValidator, "find_ffmpeg", return_value="/usr/bin/ffmpeg")
+    def test_codec_tested_with_preset(self, _, test_ffmpeg_codec):
+        """Encoders are tested with the preset they will record with"""
+        manager = WebcamConfigManager(self.config_file)
+        self.assertTrue(manager.set_recording_config(ffmpeg_codec="h264_nvenc"))
+        test_ffmpeg_codec.assert_called_with(FFmpegCodec.H264_NVENC, preset="veryfast")
+        self.assertTrue(manager.set_recording_config(ffmpeg_codec="hevc_nvenc", preset="p7"))
+        test_ffmpeg_codec.assert_called_with(FFmpegCodec.HEVC_NVENC, preset="p7")
+
+        # A preset the encoder does not have is rejected
+        self.assertFalse(manager.set_recording_config(preset="p7", ffmpeg_codec="libx264"))
+        self.assertFalse(manager.set_recording_config(preset="turbo"))
+        recording = manager.get_config().recording
+        self.assertEqual((recording.ffmpeg_codec, recording.preset), (FFmpegCodec.HEVC_NVENC, "p7"))
+
+    @patch.object(CodecValidator, "test_ffmpeg_codec", return_value=True)
+    @patch.object(CodecValidator, "find_ffmpeg", return_value="/usr/bin/ffmpeg")
+    def test_lossless_hardware_rejected(self, *_):
+        """Lossless mode cannot be combined with a hardware encoder"""
+        manager = WebcamConfigManager(self.config_file)
+        self.assertFalse(manager.set_recording_config(ffmpeg_codec="h264_nvenc", lossless=True))
+        self.assertTrue(manager.set_recording_config(lossless=True))
+        self.assertFalse(manager.set_recording_config(ffmpeg_codec="h264_qsv", crf=10))
+        self.assertTrue(manager.set_recording_config(ffmpeg_codec="h264_qsv", lossless=False))
+
+        recording = WebcamConfigManager(self.config_file).get_config().recording
+        self.assertEqual(recording.ffmpeg_codec, FFmpegCodec.H264_QSV)
+        self.assertFalse(recording.lossless)
+        self.assertEqual(recording.crf, 23)
+
+    @patch.object(CodecValidator, "find_ffmpeg", return_value=None)
+    def test_fallback_without_ffmpeg(self, _):
+        """Without ffmpeg the OpenCV backend stays selected"""
+        manager = WebcamConfigManager(self.config_file)
+        self.assertTrue(manager.set_recording_config(backend="ffmpeg", ffmpeg_codec="libx265"))
+        recording = manager.get_config().recording
+        self.assertEqual(recording.backend, RecordingBackend.OPENCV)
+        self.assertEqual(recording.ffmpeg_codec, FFmpegCodec.LIBX264)
+
+        writer = create_video_writer(
+            os.path.join(self.temp_dir, "out.avi"), 0, 30, (64, 48),
+            RecordingConfig(backend=RecordingBackend.FFMPEG),
+        )
+        self.assertNotIsInstance(writer, FFmpegVideoWriter)
+        writer.release()
+
+    def test_missing_executable(self):
+        """A writer without an ffmpeg executable reports it is not opened"""
+        writer = FFmpegVideoWriter(
+            os.path.join(self.temp_dir, "out.mp4"), 30, (64, 48), ffmpeg_path="no-such-ffmpeg"
+        )
+        self.assertFalse(writer.isOpened())
+        self.assertIn("not found", writer.error)
+        with self.assertRaises(IOError):
+            writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+        writer.release()
+
+
+@unittest.skipUnless(FFMPEG, "ffmpeg is not installed")
+class TestFFmpegRecording(unittest.TestCase):
+    """Test recording through an ffmpeg subprocess"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _frames(self, count, shape=(120, 160, 3)):
+        return [np.full(shape, index * 10 % 256, dtype=np.uint8) for index in range(count)]
+
+    def test_record_read_only_frames(self):
+        """Read-only and non-contiguous frames are encoded to a playable file"""
+        filepath = os.path.join(self.temp_dir, "out.mp4")
+        config = RecordingConfig(backend=RecordingBackend.FFMPEG, preset="ultrafast", threads=1)
+        writer = create_video_writer(filepath, 0, 30, (160, 120), config)
+        self.assertIsInstance(writer, FFmpegVideoWriter)
+        self.assertTrue(writer.isOpened())
+
+        for frame in self._frames(10):
+            frame.flags.writeable = False
+            writer.write(frame)
+        writer.write(np.zeros((120, 320, 3), dtype=np.uint8)[:, ::2])
+        writer.write(np.zeros((240, 320, 3), dtype=np.uint8))
+        writer.release()
+
+        stats = writer.get_statistics()
+        self.assertIsNone(stats['error'])
+        self.assertEqual(stats['frames_written'], 12)
+        self.assertEqual(stats['frames_resized'], 1)
+        self.assertEqual(stats['bytes_written'], 12 * 160 * 120 * 3)
+        self.assertGreater(os.path.getsize(filepath), 0)
+
+    def test_lossless_through_encoder(self):
+        """The writer plugs into AsyncVideoEncoder and reports its statistics"""
+        filepath = os.path.join(self.temp_dir, "lossless.mp4")
+        writer = FFmpegVideoWriter(filepath, 30, (160, 120), preset="ultrafast", lossless=True)
+        encoder = AsyncVideoEncoder(writer, max_queue_size=4, policy=QueuePolicy.BLOCK)
+        encoder.start()
+        for frame in self._frames(20):
+            encoder.submit(frame)
+        encoder.close()
+
+        stats = encoder.get_statistics()
+        self.assertEqual(stats['frames_encoded'], 20)
+        self.assertEqual(stats['writer']['frames_written'], 20)
+        self.assertIsNone(stats['writer']['error'])
+        self.assertFalse(writer.isOpened())
+
+    def test_codec_test_uses_preset(self):
+        """The codec test runs the encoder with the given preset"""
+        self.assertTrue(CodecValidator.test_ffmpeg_codec(FFmpegCodec.LIBX264, preset=RecordingConfig().preset))
+        self.assertFalse(CodecValidator.test_ffmpeg_codec(FFmpegCodec.LIBX264, preset="p4"))
+
+    def test_encoder_failure(self):
+        """An ffmpeg error is reported by release"""
+        writer = FFmpegVideoWriter(os.path.join(self.temp_dir, "missing", "out.mp4"), 30, (160, 120))
+        try:
+            for frame in self._frames(200):
+                writer.write(frame)
+        except IOError:
+            pass
+        writer.release()
+        self.assertIsNotNone(writer.error)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,322 @@
+"""
+Tests for session file collection
+
+Covers resuming interrupted transfers from the partial file, per-chunk and
+whole-file checksums, and the scheduler's concurrency limits, retries and
+signals.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-05
+"""
+
+import base64
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import zlib
+from unittest.mock import Mock, patch
+
+from PyQt5.QtCore import Qt
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network.device_server import JsonSocketServer, RemoteDevice
+from network.file_collection import (
+    JOB_ACTIVE,
+    JOB_FAILED,
+    BandwidthLimiter,
+    FileCollectionScheduler,
+    partial_file_path,
+)
+
+
+class TestResumableTransfers(unittest.TestCase):
+    """Test resumable and checksummed transfers in JsonSocketServer"""
+
+    def setUp(self):
+        self.server = JsonSocketServer(host="localhost", port=9001)
+        self.test_dir = tempfile.mkdtemp()
+        self.device_id = "device_1"
+        self.socket = Mock()
+        self.device = RemoteDevice(self.device_id, ["rgb_video"], self.socket)
+        self.server.devices[self.device_id] = self.device
+        self.content = os.urandom(10000)
+        self.final_path = os.path.join(self.test_dir, f"{self.device_id}_video.mp4")
+
+        patcher = patch.object(
+            self.server, "get_session_directory", return_value=self.test_dir
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.send_command = patch.object(self.server, "send_command").start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        self.server.cleanup()
+
+    def send(self, message):
+        self.server.process_json_message(self.socket, "client", message)
+
+    def send_chunks(self, data, start, chunk_size=1000, crc=True):
+        for i in range(0, len(data), chunk_size):
+            chunk = data[i : i + chunk_size]
+            message = {
+                "type": "file_chunk",
+                "seq": (start + i) // chunk_size + 1,
+                "data": base64.b64encode(chunk).decode("ascii"),
+            }
+            if crc:
+                message["crc32"] = zlib.crc32(chunk)
+            self.send(message)
+
+    def file_info(self, offset=0):
+        self.send(
+            {
+                "type": "file_info",
+                "name": "video.mp4",
+                "size": len(self.content),
+                "offset": offset,
+            }
+        )
+
+    def last_ack_status(self):
+        return self.send_command.call_args[0][1]["status"]
+
+    def test_resume_after_disconnect(self):
+        """An interrupted transfer resumes from the partial file and verifies"""
+        self.file_info()
+        self.send_chunks(self.content[:4000], 0)
+        self.server._interrupt_file_transfer(self.device_id, self.device)
+
+        self.assertFalse(os.path.exists(self.final_path))
+        self.assertTrue(os.path.exists(partial_file_path(self.final_path)))
+        self.assertEqual(self.server.get_resume_offset(self.device_id, "video.mp4"), 4000)
+
+        self.file_info(offset=4000)
+        self.send_chunks(self.content[4000:], 4000)
+        self.send(
+            {
+                "type": "file_end",
+                "name": "video.mp4",
+                "sha256": hashlib.sha256(self.content).hexdigest(),
+            }
+        )
+
+        self.assertEqual(self.last_ack_status(), "ok")
+        with open(self.final_path, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(os.listdir(self.test_dir), [os.path.basename(self.final_path)])
+
+    def test_chunk_checksum_mismatch_keeps_verified_data(self):
+        """A corrupt chunk fails the transfer but keeps the data before it"""
+        self.file_info()
+        self.send_chunks(self.content[:3000], 0)
+        self.send(
+            {
+                "type": "file_chunk",
+                "seq": 4,
+                "data": base64.b64encode(self.content[3000:4000]).decode(),
+                "crc32": zlib.crc32(b"something else"),
+            }
+        )
+        self.send_chunks(self.content[4000:], 4000)
+        self.send({"type": "file_end", "name": "video.mp4"})
+
+        self.assertEqual(self.last_ack_status(), "error")
+        self.assertFalse(os.path.exists(self.final_path))
+        self.assertEqual(self.server.get_resume_offset(self.device_id, "video.mp4"), 3000)
+
+    def test_file_checksum_mismatch_discards_partial(self):
+        """A file failing the SHA-256 check is discarded"""
+        self.file_info()
+        self.send_chunks(self.content, 0, crc=False)
+        self.send({"type": "file_end", "name": "video.mp4", "sha256": "0" * 64})
+
+        self.assertEqual(self.last_ack_status(), "error")
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_resume_beyond_partial_file_fails(self):
+        """A resume offset past the received data is rejected"""
+        self.file_info(offset=5000)
+        self.send_chunks(self.content[5000:], 5000)
+        self.send({"type": "file_end", "name": "video.mp4"})
+
+        self.assertEqual(self.last_ack_status(), "error")
+        self.assertEqual(self.server.get_resume_offset(self.device_id, "video.mp4"), 0)
+
+
+class TestFileCollectionScheduler(unittest.TestCase):
+    """Test suite for FileCollectionScheduler"""
+
+    def setUp(self):
+        self.server = Mock()
+        self.server.devices = {f"device_{i}": Mock() for i in range(3)}
+        self.server.get_resume_offset.return_value = 0
+        self.server.request_file_from_device.return_value = True
+        self.scheduler = FileCollectionScheduler(
+            self.server,
+            max_concurrent_transfers=2,
+            max_transfers_per_device=1,
+            bandwidth_limit_mbps=0,
+            max_retries=1,
+            reconnect_timeout=0.1,
+        )
+        self.finished = []
+        self.collections = []
+        self.scheduler.transfer_finished.connect(
+            lambda *args: self.finished.append(args), Qt.DirectConnection
+        )
+        self.scheduler.collection_finished.connect(
+            lambda *args: self.collections.append(args), Qt.DirectConnection
+        )
+
+    def requested(self):
+        return [c[0][:2] for c in self.server.request_file_from_device.call_args_list]
+
+    def test_concurrency_limits(self):
+        """Transfers respect the global and per-device limits"""
+        for device_id in ("device_0", "device_1", "device_2"):
+            for name in ("a.mp4", "b.mp4"):
+                self.scheduler.add_job(device_id, f"/sessions/{name}")
+
+        self.assertEqual(self.scheduler.schedule(), 2)
+        self.assertEqual(
+            self.requested(),
+            [("device_0", "/sessions/a.mp4"), ("device_1", "/sessions/a.mp4")],
+        )
+
+        self.scheduler.on_transfer_finished("device_0", "a.mp4", True)
+        self.assertEqual(self.requested()[-1], ("device_0", "/sessions/b.mp4"))
+        self.assertEqual(self.scheduler.get_status()[JOB_ACTIVE], 2)
+
+        for device_id, name in [
+            ("device_1", "a.mp4"),
+            ("device_0", "b.mp4"),
+            ("device_2", "a.mp4"),
+            ("device_1", "b.mp4"),
+            ("device_2", "b.mp4"),
+        ]:
+            self.scheduler.on_transfer_finished(device_id, name, True)
+
+        self.assertEqual(len(self.finished), 6)
+        self.assertEqual(self.collections, [(6, 0)])
+
+    def test_interrupted_transfer_resumes_on_reconnect(self):
+        """An interrupted job is requested again at its offset when the device returns"""
+        job = self.scheduler.add_job("device_0", "/sessions/a.mp4")
+        self.scheduler.schedule()
+        self.scheduler.on_device_disconnected("device_0")
+        del self.server.devices["device_0"]
+        self.assertEqual(self.server.request_file_from_device.call_count, 1)
+
+        self.server.devices["device_0"] = Mock()
+        self.server.get_resume_offset.return_value = 4096
+        self.scheduler.on_device_connected("device_0")
+
+        self.server.request_file_from_device.assert_called_with(
+            "device_0", "/sessions/a.mp4", None, offset=4096
+        )
+        self.assertEqual(job.status, JOB_ACTIVE)
+
+    def test_device_not_returning_fails_jobs(self):
+        """Jobs of a device that does not reconnect in time fail and the collection finishes"""
+        self.scheduler.add_job("device_0", "/sessions/a.mp4")
+        self.scheduler.add_job("device_0", "/sessions/b.mp4")
+        self.scheduler.add_job("device_1", "/sessions/a.mp4")
+        self.scheduler.schedule()
+        self.scheduler.on_device_disconnected("device_0")
+        del self.server.devices["device_0"]
+        self.scheduler.on_transfer_finished("device_1", "a.mp4", True)
+        self.assertEqual(self.collections, [])
+
+        time.sleep(0.3)
+        self.assertEqual(
+            sorted(name for _, name, success, _ in self.finished if not success),
+            ["a.mp4", "b.mp4"],
+        )
+        self.assertEqual(self.collections, [(1, 2)])
+
+    def test_interruptions_count_as_attempts(self):
+        """A device dropping every transfer fails it after max_retries restarts"""
+        job = self.scheduler.add_job("device_0", "/sessions/a.mp4")
+        self.scheduler.schedule()
+        self.scheduler.on_device_disconnected("device_0")
+        self.scheduler.on_device_connected("device_0")
+        self.assertEqual((job.status, job.attempts), (JOB_ACTIVE, 2))
+
+        self.scheduler.on_device_disconnected("device_0")
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertEqual(self.collections, [(0, 1)])
+        time.sleep(0.2)
+        self.assertEqual(len(self.finished), 1)
+
+    def test_absent_device_fails_jobs(self):
+        """Jobs queued for a device that is not connected do not wait forever"""
+        self.scheduler.add_job("device_9", "/sessions/a.mp4")
+        self.assertEqual(self.scheduler.schedule(), 0)
+        time.sleep(0.3)
+        self.assertEqual(self.collections, [(0, 1)])
+
+    def test_retries_then_fails(self):
+        """Failed transfers are retried up to max_retries"""
+        job = self.scheduler.add_job("device_0", "/sessions/a.mp4")
+        self.scheduler.schedule()
+        self.scheduler.on_transfer_finished("device_0", "a.mp4", False, "mismatch")
+        self.assertEqual(job.status, JOB_ACTIVE)
+        self.assertEqual(job.attempts, 2)
+
+        self.scheduler.on_transfer_finished("device_0", "a.mp4", False, "mismatch")
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertEqual(self.finished, [("device_0", "a.mp4", False, "mismatch")])
+        self.assertEqual(self.collections, [(0, 1)])
+
+    def test_rejected_request_is_not_retried(self):
+        """A send_file error from the device fails the job at once"""
+        job = self.scheduler.add_job("device_0", "/sessions/a.mp4")
+        self.scheduler.add_job("device_0", "/sessions/b.mp4")
+        self.scheduler.schedule()
+        self.scheduler.on_request_failed("device_0", "File not found")
+
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertEqual(self.requested()[-1], ("device_0", "/sessions/b.mp4"))
+
+    def test_progress_signals(self):
+        """Progress is reported per transfer and completion always reported"""
+        progress = []
+        self.scheduler.transfer_progress.connect(
+            lambda *args: progress.append(args), Qt.DirectConnection
+        )
+        self.scheduler.add_job("device_0", "/sessions/a.mp4")
+        self.scheduler.schedule()
+        self.scheduler.on_transfer_started("device_0", "a.mp4", 0, 3 * 2**30)
+        for i in range(1, 4):
+            self.scheduler.on_chunk_received("device_0", "a.mp4", i * 2**30, 3 * 2**30, 2**30)
+        self.scheduler.on_transfer_finished("device_0", "a.mp4", True)
+
+        self.assertEqual(progress[0], ("device_0", "a.mp4", 2**30, 3 * 2**30))
+        self.assertEqual(progress[-1], ("device_0", "a.mp4", 3 * 2**30, 3 * 2**30))
+        self.assertEqual(self.scheduler.get_status(), {})
+
+
+class TestBandwidthLimiter(unittest.TestCase):
+    """Test suite for BandwidthLimiter"""
+
+    def test_unlimited(self):
+        """A zero cap never delays"""
+        self.assertEqual(BandwidthLimiter(0).reserve(10**9), 0.0)
+
+    def test_delay_matches_cap(self):
+        """Reserved bytes beyond the burst are delayed at the capped rate"""
+        limiter = BandwidthLimiter(1000.0, burst_seconds=0.0)
+        self.assertAlmostEqual(limiter.reserve(500), 0.5, delta=0.05)
+        self.assertAlmostEqual(limiter.reserve(500), 1.0, delta=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
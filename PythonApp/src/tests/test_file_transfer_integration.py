@@ -6,6 +6,7 @@ Tests the complete file transfer system including:
 - Message processing for file transfer types
 - Session directory management
 - Multi-device file collection
+- Binary transfer mode
 - Error handling and validation
 """
 
@@ -20,7 +21,11 @@ from unittest.mock import Mock, patch
 # Add the src directory to the path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from network.device_server import JsonSocketServer, RemoteDevice
+from network.device_server import (
+    BINARY_FILE_TRANSFER_CAPABILITY,
+    JsonSocketServer,
+    RemoteDevice,
+)
 
 
 class TestFileTransferIntegration(unittest.TestCase):
@@ -402,6 +407,60 @@ class TestFileTransferIntegration(unittest.TestCase):
                 )
 
 
+    def test_request_file_offers_binary_mode(self):
+        """Devices with the capability are offered the binary transfer mode"""
+        self.test_device.capabilities.append(BINARY_FILE_TRANSFER_CAPABILITY)
+
+        with patch.object(self.server, "send_command", return_value=True) as mock_send:
+            self.server.request_file_from_device(self.device_id, "/storage/test/file.mp4")
+
+            command = mock_send.call_args[0][1]
+            self.assertEqual(command["transfer_mode"], "binary")
+
+    def test_binary_file_transfer_workflow(self):
+        """Binary chunks are written straight to disk and acknowledged on file_end"""
+        with patch.object(
+            self.server, "get_session_directory", return_value=self.test_dir
+        ):
+            self.server.process_json_message(
+                self.mock_socket,
+                "test_client",
+                {
+                    "type": "file_info",
+                    "name": self.test_file_name,
+                    "size": len(self.test_file_content),
+                    "transfer_mode": "binary",
+                },
+            )
+
+            chunk_size = 1000
+            for i in range(0, len(self.test_file_content), chunk_size):
+                chunk = memoryview(self.test_file_content)[i : i + chunk_size]
+                self.assertTrue(
+                    self.server.process_binary_chunk(self.mock_socket, "test_client", chunk)
+                )
+
+            with patch.object(self.server, "send_command") as mock_send:
+                self.server.process_json_message(
+                    self.mock_socket,
+                    "test_client",
+                    {"type": "file_end", "name": self.test_file_name},
+                )
+                self.assertEqual(mock_send.call_args[0][1]["status"], "ok")
+
+        test_file_path = os.path.join(
+            self.test_dir, f"{self.device_id}_{self.test_file_name}"
+        )
+        with open(test_file_path, "rb") as f:
+            self.assertEqual(f.read(), self.test_file_content)
+
+    def test_binary_chunk_without_binary_file_info(self):
+        """Binary chunks are rejected unless file_info accepted the binary mode"""
+        self.assertFalse(
+            self.server.process_binary_chunk(self.mock_socket, "test_client", b"data")
+        )
+
+
 if __name__ == "__main__":
     # Configure logging for tests
     import logging
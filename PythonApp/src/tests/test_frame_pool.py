@@ -0,0 +1,203 @@
+"""
+Tests for the capture frame buffer pool
+
+Covers reading frames in place into pooled buffers, reference counting of
+buffers shared by the encoder, the pairing stage and the capture loops, and
+buffers returning to the pool once released.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from webcam.dual_webcam_capture import CameraCaptureThread, FramePairer
+from webcam.frame_pool import FramePool
+from webcam.video_encoder import AsyncVideoEncoder
+from webcam.webcam_capture import WebcamCapture
+
+
+class InPlaceCamera:
+    """Camera filling the image it is given, like cv2.VideoCapture.read"""
+
+    def __init__(self, fps=200, shape=(8, 8, 3)):
+        self.interval = 1.0 / fps
+        self.shape = shape
+        self.count = 0
+
+    def read(self, image=None):
+        self.grab()
+        return self.retrieve(image)
+
+    def grab(self):
+        time.sleep(self.interval)
+        return True
+
+    def retrieve(self, image=None):
+        self.count += 1
+        if image is None or image.shape != self.shape:
+            image = np.empty(self.shape, dtype=np.uint8)
+        image[...] = self.count % 256
+        return True, image
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class AllocatingCamera:
+    """Camera without an image argument"""
+
+    def read(self):
+        return True, np.zeros((8, 8, 3), dtype=np.uint8)
+
+
+class ListWriter:
+    """Video writer recording the first pixel of every frame"""
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(int(frame[0, 0, 0]))
+
+    def release(self):
+        pass
+
+
+class TestFramePool(unittest.TestCase):
+    """Test FramePool and FrameBuffer"""
+
+    def test_read_in_place(self):
+        """Released buffers are refilled in place instead of reallocated"""
+        pool = FramePool()
+        camera = InPlaceCamera()
+        arrays = set()
+        for _ in range(10):
+            ok, buffer = pool.read(camera)
+            self.assertTrue(ok)
+            arrays.add(id(buffer.array))
+            buffer.release()
+
+        stats = pool.get_statistics()
+        self.assertEqual(len(arrays), 1)
+        self.assertEqual((stats['allocations'], stats['reuses']), (1, 9))
+        self.assertEqual((stats['in_use'], stats['free']), (0, 1))
+        self.assertTrue(stats['in_place'])
+
+    def test_shared_buffer(self):
+        """A buffer returns to the pool only after its last holder releases it"""
+        pool = FramePool()
+        ok, buffer = pool.read(InPlaceCamera())
+        self.assertFalse(buffer.frame.flags.writeable)
+        with self.assertRaises(ValueError):
+            buffer.frame[0, 0, 0] = 0
+
+        buffer.retain()
+        buffer.release()
+        self.assertEqual(pool.get_statistics()['free'], 0)
+        buffer.release()
+        self.assertEqual(pool.get_statistics()['free'], 1)
+        with self.assertRaises(RuntimeError):
+            buffer.release()
+
+    def test_capture_without_image_argument(self):
+        """Captures whose read() takes no image still work, allocating each frame"""
+        pool = FramePool()
+        for _ in range(3):
+            ok, buffer = pool.read(AllocatingCamera())
+            self.assertTrue(ok)
+            buffer.release()
+
+        stats = pool.get_statistics()
+        self.assertEqual(stats['allocations'], 3)
+        self.assertFalse(stats['in_place'])
+
+    def test_encoder_releases_buffers(self):
+        """Buffers submitted to an encoder are released once written or dropped"""
+        pool = FramePool()
+        camera = InPlaceCamera()
+        writer = ListWriter()
+        encoder = AsyncVideoEncoder(writer, max_queue_size=4)
+        for _ in range(10):
+            ok, buffer = pool.read(camera)
+            encoder.submit(buffer)
+            buffer.release()
+        self.assertEqual(pool.get_statistics()['in_use'], 4)
+
+        encoder.start()
+        encoder.close()
+        self.assertEqual(writer.frames, [7, 8, 9, 10])
+        self.assertEqual(pool.get_statistics()['in_use'], 0)
+
+
+class TestCaptureLoopsUsePool(unittest.TestCase):
+    """Test the capture loops reading into pooled buffers"""
+
+    def test_capture_threads_and_pairer(self):
+        """Frames dropped or consumed by the pairing stage go back to their pools"""
+        pairer = FramePairer()
+        pools = [FramePool(), FramePool()]
+        threads = [
+            CameraCaptureThread(1, InPlaceCamera(fps=30), pairer, pool=pools[0]),
+            CameraCaptureThread(2, InPlaceCamera(fps=60), pairer, pool=pools[1]),
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 1.0
+        while time.time() < deadline:
+            pair = pairer.next_pair(timeout=0.05)
+            if pair:
+                for captured in pair:
+                    captured.release()
+        for thread in threads:
+            thread.stop()
+        pairer.clear()
+
+        self.assertGreater(pairer.get_statistics()['pairs'], 10)
+        for pool in pools:
+            stats = pool.get_statistics()
+            self.assertEqual(stats['in_use'], 0)
+            self.assertLessEqual(stats['allocations'], 4)
+            self.assertGreater(stats['reuses'], stats['allocations'])
+
+    def test_webcam_capture_loop(self):
+        """WebcamCapture keeps the current frame without copying it"""
+        capture = WebcamCapture(preview_fps=30)
+        capture.cap = InPlaceCamera(fps=100)
+        writer = ListWriter()
+        capture.video_encoder = AsyncVideoEncoder(writer, max_queue_size=8)
+        capture.video_encoder.start()
+        capture.is_recording = True
+        capture.running = True
+
+        loop = threading.Thread(target=capture.run)
+        loop.start()
+        time.sleep(0.5)
+        capture.running = False
+        loop.join(timeout=2)
+        capture.is_recording = False
+        capture.video_encoder.close()
+
+        stats = capture.get_performance_stats()['frame_pool']
+        self.assertFalse(capture.last_frame.flags.writeable)
+        self.assertTrue(capture.get_current_frame().flags.writeable)
+        self.assertEqual(stats['in_use'], 1)
+        self.assertLessEqual(stats['allocations'], 3)
+        self.assertGreater(stats['reuses'], 10)
+        self.assertEqual(len(writer.frames), capture.performance_stats['frames_captured'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,133 @@
+"""
+Tests for streaming GSR feature extraction
+
+Checks the streaming extractor against the batch reference implementation on
+a synthetic recording with known skin conductance responses.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-03
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from gsr_features import (
+    StreamingGSRFeatureExtractor,
+    extract_gsr_features_batch,
+    load_gsr_csv,
+)
+
+SAMPLING_RATE = 128.0
+SCR_ONSETS = range(10, 120, 20)
+
+
+def _synthetic_gsr(duration=120.0, noise=0.002, seed=0):
+    """Slowly drifting SCL with a 0.3 uS response every 20 seconds"""
+    t = np.arange(0.0, duration, 1.0 / SAMPLING_RATE)
+    gsr = 5.0 + 0.002 * t + np.random.default_rng(seed).normal(0.0, noise, len(t))
+    for onset in SCR_ONSETS:
+        mask = t >= onset
+        tt = t[mask] - onset
+        gsr[mask] += 0.3 * (1.0 - np.exp(-tt / 0.75)) * np.exp(-tt / 4.0)
+    return t + 1722300000.0, gsr
+
+
+def _run_streaming(timestamps, gsr, **kwargs):
+    extractor = StreamingGSRFeatureExtractor(SAMPLING_RATE, **kwargs)
+    published = []
+    tonic = np.empty(len(gsr))
+    for i, (timestamp, value) in enumerate(zip(timestamps, gsr)):
+        features = extractor.update(timestamp, value)
+        tonic[i] = extractor.tonic
+        if features is not None:
+            published.append(features)
+    return extractor, published, tonic
+
+
+class TestStreamingGSRFeatureExtractor(unittest.TestCase):
+    """Test suite for StreamingGSRFeatureExtractor"""
+
+    def test_matches_batch_reference(self):
+        """Streaming decomposition and SCRs match the batch implementation"""
+        timestamps, gsr = _synthetic_gsr()
+        extractor, published, tonic = _run_streaming(timestamps, gsr)
+        reference = extract_gsr_features_batch(timestamps, gsr, SAMPLING_RATE)
+
+        np.testing.assert_allclose(tonic, reference["tonic"], atol=1e-9)
+        self.assertAlmostEqual(extractor.phasic, reference["phasic"][-1], places=9)
+
+        events = [e for f in published for e in f.scr_events]
+        events.extend(extractor._interval_events)
+        self.assertEqual(len(events), len(reference["scr_events"]))
+        for event, expected in zip(events, reference["scr_events"]):
+            self.assertEqual(event.onset_time, expected.onset_time)
+            self.assertEqual(event.peak_time, expected.peak_time)
+            self.assertAlmostEqual(event.amplitude, expected.amplitude, places=9)
+
+    def test_detects_responses(self):
+        """Each synthetic response is detected once near its onset"""
+        timestamps, gsr = _synthetic_gsr(noise=0.0)
+        _, published, _ = _run_streaming(timestamps, gsr)
+
+        events = [e for f in published for e in f.scr_events]
+        self.assertEqual(len(events), len(SCR_ONSETS))
+        for event, onset in zip(events, SCR_ONSETS):
+            self.assertAlmostEqual(event.onset_time - timestamps[0], onset, delta=0.1)
+            self.assertGreater(event.amplitude, 0.1)
+            self.assertGreater(event.rise_time, 0.5)
+
+    def test_publish_interval(self):
+        """Features are published once per interval of sample time"""
+        timestamps, gsr = _synthetic_gsr(duration=30.0)
+        _, published, _ = _run_streaming(timestamps, gsr, publish_interval=2.0)
+
+        self.assertEqual(len(published), 14)
+        self.assertTrue(all(abs(f.interval_seconds - 2.0) < 0.01 for f in published))
+        self.assertEqual(sum(f.samples for f in published[1:]), 13 * 256)
+
+    def test_missing_samples_skipped(self):
+        """None and NaN conductance values leave the state unchanged"""
+        extractor = StreamingGSRFeatureExtractor(SAMPLING_RATE)
+        extractor.update(0.0, 5.0)
+        extractor.update(0.01, None)
+        extractor.update(0.02, float("nan"))
+        self.assertEqual(extractor.samples_processed, 1)
+        self.assertEqual(extractor.tonic, 5.0)
+
+
+class TestGSRCsvLoading(unittest.TestCase):
+    """Test loading GSR data from Shimmer CSV recordings"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_load_gsr_csv(self):
+        """Empty conductance cells are loaded as NaN"""
+        csv_path = self.temp_dir / "shimmer_00_06_66_66_66_66_data.csv"
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "system_time", "gsr_conductance"])
+            writer.writerow([1.0, "", 5.5])
+            writer.writerow([2.0, "", ""])
+
+        timestamps, gsr = load_gsr_csv(csv_path)
+        np.testing.assert_array_equal(timestamps, [1.0, 2.0])
+        self.assertEqual(gsr[0], 5.5)
+        self.assertTrue(np.isnan(gsr[1]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -229,8 +229,8 @@ class TestHardwareFailureRecovery(unittest.TestCase):
 
         # Verify cleanup state
         self.assertEqual(len(self.shimmer_manager.connected_devices), 0)
-        self.assertEqual(len(self.shimmer_manager.csv_writers), 0)
-        self.assertEqual(len(self.shimmer_manager.csv_files), 0)
+        self.assertIsNone(self.shimmer_manager.recording_writer)
+        self.assertEqual(len(self.shimmer_manager.pending_records), 0)
 
     def test_thread_safety_under_failure(self):
         """Test thread safety when failures occur during concurrent operations"""
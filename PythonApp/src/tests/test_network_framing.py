@@ -0,0 +1,167 @@
+"""
+Tests for the length-prefixed framing shared by the device servers
+
+Covers frame reassembly across partial receives, buffer reuse, oversized
+frames, invalid lengths, connection close, resuming after a timeout and
+binary frames, and FrameWriter coalescing and back-pressure.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-04
+"""
+
+import os
+import socket
+import sys
+import threading
+import unittest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network.framing import (
+    FRAME_HEADER,
+    FrameReader,
+    FrameWriter,
+    InvalidFrameError,
+    pack_binary_frame_header,
+    pack_frame,
+    recv_exact,
+)
+
+
+class TestFrameReader(unittest.TestCase):
+    """Test suite for FrameReader"""
+
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def send_async(self, data):
+        thread = threading.Thread(target=self.sender.sendall, args=(data,))
+        thread.start()
+        return thread
+
+    def test_frames_of_mixed_sizes(self):
+        """Small, retained and oversized frames are reassembled intact"""
+        payloads = [b"x" * 10, os.urandom(64 * 1024), os.urandom(3 * 1024 * 1024), b"{}"]
+        reader = FrameReader(self.receiver, retain_size=1024 * 1024)
+        thread = self.send_async(b"".join(pack_frame(p) for p in payloads))
+        for payload in payloads:
+            self.assertEqual(bytes(reader.read_frame()), payload)
+        thread.join()
+
+    def test_buffer_is_reused(self):
+        """Consecutive small frames are received into the same buffer"""
+        reader = FrameReader(self.receiver)
+        self.sender.sendall(pack_frame(b"first") + pack_frame(b"second"))
+        first = reader.read_frame()
+        self.assertEqual(bytes(first), b"first")
+        second = reader.read_frame()
+        self.assertEqual(bytes(second), b"second")
+        self.assertIs(first.obj, second.obj)
+
+    def test_invalid_length(self):
+        """Zero and oversized lengths raise InvalidFrameError"""
+        reader = FrameReader(self.receiver, max_frame_size=100)
+        self.sender.sendall(FRAME_HEADER.pack(101))
+        with self.assertRaises(InvalidFrameError):
+            reader.read_frame()
+        self.sender.sendall(FRAME_HEADER.pack(0))
+        with self.assertRaises(InvalidFrameError):
+            reader.read_frame()
+
+    def test_binary_frames(self):
+        """Binary frames are flagged when allowed and rejected otherwise"""
+        chunk = os.urandom(1000)
+        reader = FrameReader(self.receiver, allow_binary=True)
+        self.sender.sendall(
+            pack_frame(b"{}") + pack_binary_frame_header(len(chunk)) + chunk + pack_frame(b"[]")
+        )
+        self.assertEqual(bytes(reader.read_frame()), b"{}")
+        self.assertFalse(reader.binary)
+        self.assertEqual(bytes(reader.read_frame()), chunk)
+        self.assertTrue(reader.binary)
+        self.assertEqual(bytes(reader.read_frame()), b"[]")
+        self.assertFalse(reader.binary)
+
+        reader = FrameReader(self.receiver)
+        self.sender.sendall(pack_binary_frame_header(10))
+        with self.assertRaises(InvalidFrameError):
+            reader.read_frame()
+
+    def test_close_mid_frame(self):
+        """A connection closed inside a frame returns None and marks the reader closed"""
+        reader = FrameReader(self.receiver)
+        self.sender.sendall(FRAME_HEADER.pack(10) + b"abc")
+        self.sender.close()
+        self.assertIsNone(reader.read_frame())
+        self.assertTrue(reader.closed)
+
+    def test_resume_after_timeout(self):
+        """A frame interrupted by a socket timeout continues on the next call"""
+        reader = FrameReader(self.receiver)
+        self.receiver.settimeout(0.05)
+        self.sender.sendall(pack_frame(b"hello world")[:7])
+        with self.assertRaises(socket.timeout):
+            reader.read_frame()
+        self.sender.sendall(pack_frame(b"hello world")[7:])
+        self.assertEqual(bytes(reader.read_frame()), b"hello world")
+
+    def test_recv_exact(self):
+        """recv_exact returns the requested bytes or None on close"""
+        self.sender.sendall(b"abcdef")
+        self.assertEqual(recv_exact(self.receiver, 4), b"abcd")
+        self.sender.close()
+        self.assertIsNone(recv_exact(self.receiver, 4))
+
+
+class TestFrameWriter(unittest.TestCase):
+    """Test suite for FrameWriter"""
+
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def test_frames_coalesced(self):
+        """Frames queued before a flush are written with one system call"""
+        writer = FrameWriter(self.sender)
+        payloads = [b"ack-%d" % i for i in range(20)]
+        for payload in payloads:
+            writer.add(payload)
+        self.assertTrue(writer.flush(timeout=1.0))
+        self.assertEqual((writer.syscalls, writer.frames_written, writer.pending_bytes), (1, 20, 0))
+
+        reader = FrameReader(self.receiver)
+        self.assertEqual([bytes(reader.read_frame()) for _ in payloads], payloads)
+
+    def test_backpressure(self):
+        """A full send buffer leaves the rest queued instead of blocking"""
+        self.sender.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        writer = FrameWriter(self.sender)
+        payloads = [bytes([i]) * 100000 for i in range(1, 5)]
+        for payload in payloads:
+            writer.add(payload)
+        self.assertFalse(writer.flush(timeout=0.05))
+        self.assertGreater(writer.pending_bytes, 0)
+        self.assertLess(writer.frames_written, len(payloads))
+
+        reader = FrameReader(self.receiver)
+        received = []
+        reader_thread = threading.Thread(
+            target=lambda: received.extend(bytes(reader.read_frame()) for _ in payloads)
+        )
+        reader_thread.start()
+        self.assertTrue(writer.flush(timeout=1.0))
+        reader_thread.join(timeout=5)
+        self.assertEqual(received, payloads)
+        self.assertEqual(writer.frames_written, len(payloads))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
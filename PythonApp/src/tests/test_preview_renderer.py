@@ -0,0 +1,250 @@
+"""
+Tests for the preview renderer
+
+Covers resizing before colour conversion into reused buffers, the preview
+worker keeping only the latest frames, and the capture loops handing
+preview frames to the worker instead of converting them.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    from PyQt5.QtGui import QImage
+    from PyQt5.QtWidgets import QApplication
+
+    PYQT_AVAILABLE = True
+except ImportError:
+    PYQT_AVAILABLE = False
+
+if PYQT_AVAILABLE:
+    from webcam.dual_webcam_capture import DualWebcamCapture
+    from webcam.frame_pool import FramePool
+    from webcam.preview_renderer import PreviewRenderer, PreviewWorker
+    from webcam.webcam_capture import WebcamCapture
+
+
+def _bgr_frame(width=1920, height=1080, blue=255, green=0, red=0):
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[...] = (blue, green, red)
+    return frame
+
+
+class FakeCamera:
+    """Camera returning frames at a fixed rate, into the image it is given"""
+
+    def __init__(self, fps=60, width=320, height=240):
+        self.interval = 1.0 / fps
+        self.shape = (height, width, 3)
+
+    def read(self, image=None):
+        time.sleep(self.interval)
+        if image is None:
+            image = np.empty(self.shape, dtype=np.uint8)
+        image[...] = (255, 0, 0)
+        return True, image
+
+    def grab(self):
+        time.sleep(self.interval)
+        return True
+
+    def retrieve(self, image=None):
+        if image is None:
+            image = np.empty(self.shape, dtype=np.uint8)
+        image[...] = (255, 0, 0)
+        return True, image
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+@unittest.skipUnless(PYQT_AVAILABLE, "PyQt5 not available")
+class TestPreviewRenderer(unittest.TestCase):
+    """Test PreviewRenderer"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def test_resize_and_convert(self):
+        """Frames are shrunk to fit, keeping aspect ratio, and converted to RGB"""
+        renderer = PreviewRenderer(max_width=640, max_height=480)
+        image = renderer.render(_bgr_frame(3840, 2160))
+
+        self.assertEqual((image.width(), image.height()), (640, 360))
+        self.assertEqual(image.format(), QImage.Format_RGB888)
+        color = image.pixelColor(10, 10)
+        self.assertEqual((color.red(), color.green(), color.blue()), (0, 0, 255))
+
+        pixmap = renderer.render_pixmap(_bgr_frame(3840, 2160))
+        self.assertEqual((pixmap.width(), pixmap.height()), (640, 360))
+
+    def test_buffers_reused(self):
+        """The same QImage and buffers are reused until the frame size changes"""
+        renderer = PreviewRenderer(max_width=640, max_height=480)
+        first = renderer.render(_bgr_frame())
+        second = renderer.render(_bgr_frame(red=255))
+        self.assertIs(first, second)
+        self.assertEqual(second.pixelColor(0, 0).red(), 255)
+        self.assertEqual(renderer.get_statistics()['buffer_allocations'], 1)
+
+        small = renderer.render(_bgr_frame(320, 240))
+        self.assertEqual((small.width(), small.height()), (320, 240))
+        stats = renderer.get_statistics()
+        self.assertEqual((stats['frames_rendered'], stats['buffer_allocations']), (3, 2))
+
+    def test_read_only_frame(self):
+        """Read-only pooled frames are rendered without copying them first"""
+        frame = _bgr_frame()
+        frame.flags.writeable = False
+        image = PreviewRenderer().render(frame)
+        self.assertEqual(image.pixelColor(0, 0).blue(), 255)
+
+        with self.assertRaises(ValueError):
+            PreviewRenderer().render(np.zeros((480, 640), dtype=np.uint8))
+
+
+@unittest.skipUnless(PYQT_AVAILABLE, "PyQt5 not available")
+class TestPreviewWorker(unittest.TestCase):
+    """Test PreviewWorker"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def test_latest_frames_rendered(self):
+        """Frames submitted while rendering replace the pending frames"""
+        received = []
+        rendering = threading.Event()
+        proceed = threading.Event()
+
+        def callback(pixmap1, pixmap2):
+            rendering.set()
+            proceed.wait(2)
+            received.append((pixmap1.width(), pixmap2.width()))
+
+        worker = PreviewWorker([PreviewRenderer(), PreviewRenderer()], callback)
+        worker.start()
+        worker.submit(_bgr_frame(), _bgr_frame())
+        self.assertTrue(rendering.wait(2))
+        for _ in range(5):
+            self.assertTrue(worker.submit(_bgr_frame(320, 240), _bgr_frame(320, 240)))
+        proceed.set()
+        time.sleep(0.2)
+        worker.stop()
+
+        self.assertEqual(received, [(640, 640), (320, 320)])
+        stats = worker.get_statistics()
+        self.assertEqual((stats['frames_submitted'], stats['frames_rendered'], stats['frames_skipped']),
+                         (6, 2, 4))
+        self.assertFalse(worker.submit(_bgr_frame(), _bgr_frame()))
+        with self.assertRaises(ValueError):
+            worker.submit(_bgr_frame())
+
+    def test_pooled_buffers_released(self):
+        """Pooled buffers are held until rendered or replaced"""
+        pool = FramePool()
+        camera = FakeCamera(fps=1000)
+        worker = PreviewWorker([PreviewRenderer()], lambda pixmap: None)
+        for _ in range(3):
+            _, buffer = pool.read(camera)
+            worker.submit(buffer)
+            buffer.release()
+        self.assertEqual(pool.get_statistics()['in_use'], 1)
+
+        worker.start()
+        time.sleep(0.2)
+        self.assertEqual(pool.get_statistics()['in_use'], 0)
+        _, buffer = pool.read(camera)
+        worker.stop()
+        worker.submit(buffer)
+        buffer.release()
+        self.assertEqual(pool.get_statistics()['in_use'], 0)
+
+
+@unittest.skipUnless(PYQT_AVAILABLE, "PyQt5 not available")
+class TestCaptureLoopPreview(unittest.TestCase):
+    """Test the capture loops rendering previews on the worker"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def _run(self, capture, seconds=0.5):
+        capture.running = True
+        capture.is_previewing = True
+        loop = threading.Thread(target=capture.run)
+        loop.start()
+        time.sleep(seconds)
+        capture.running = False
+        loop.join(timeout=2)
+        self.assertFalse(loop.is_alive())
+        # Deliver the previews emitted from the capture threads
+        self.app.processEvents()
+
+    def test_webcam_capture(self):
+        """WebcamCapture emits previews rendered by the worker"""
+        capture = WebcamCapture(preview_fps=30)
+        capture.cap = FakeCamera()
+        previews = []
+        capture.frame_ready.connect(lambda pixmap: previews.append(pixmap.size()))
+        self._run(capture)
+
+        stats = capture.get_performance_stats()['preview']
+        self.assertGreater(stats['frames_rendered'], 5)
+        self.assertEqual(stats['renderers'][0]['buffer_allocations'], 1)
+        self.assertEqual(len(previews), stats['frames_rendered'])
+        self.assertFalse(capture.preview_worker.is_alive())
+        self.assertEqual(capture.frame_pool.get_statistics()['in_use'], 1)
+
+    def test_webcam_capture_inline(self):
+        """With threaded preview disabled the loop renders into the reused buffers"""
+        capture = WebcamCapture(preview_fps=30)
+        capture.cap = FakeCamera()
+        capture.threaded_preview = False
+        previews = []
+        capture.frame_ready.connect(lambda pixmap: previews.append(pixmap.size()))
+        self._run(capture)
+
+        stats = capture.get_performance_stats()['preview']
+        self.assertGreater(stats['frames_rendered'], 5)
+        self.assertEqual(stats['buffer_allocations'], 1)
+        self.assertEqual(len(previews), stats['frames_rendered'])
+
+    def test_dual_capture(self):
+        """DualWebcamCapture emits both cameras' previews rendered by the worker"""
+        # Face detection models are not needed to preview
+        with patch("webcam.dual_webcam_capture.AdvancedROIDetector"):
+            capture = DualWebcamCapture(preview_fps=30)
+        capture.cap1 = FakeCamera(fps=30, width=640, height=480)
+        capture.cap2 = FakeCamera(fps=30, width=640, height=480)
+        previews = []
+        capture.dual_frame_ready.connect(
+            lambda pixmap1, pixmap2: previews.append((pixmap1.height(), pixmap2.height()))
+        )
+        self._run(capture, seconds=1.0)
+
+        stats = capture.get_performance_stats()['preview']
+        self.assertGreater(stats['frames_rendered'], 5)
+        self.assertEqual(set(previews), {(360, 360)})
+        for pool in capture.frame_pools.values():
+            self.assertLessEqual(pool.get_statistics()['in_use'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,107 @@
+"""
+Tests for per message type schema validation
+
+Covers the validators compiled for each message type, validation selected by
+the type field, and sample validation of high-rate message types.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocol.schema_utils import JSONSCHEMA_AVAILABLE, SchemaManager
+
+
+@unittest.skipUnless(JSONSCHEMA_AVAILABLE, "jsonschema is not installed")
+class TestTypeValidators(unittest.TestCase):
+    """Test validation dispatched on the message type"""
+
+    def setUp(self):
+        self.schema_manager = SchemaManager()
+
+    def test_validator_per_message_type(self):
+        """Every message type in the schema gets its own validator"""
+        self.assertEqual(
+            sorted(self.schema_manager.type_validators),
+            sorted(self.schema_manager.get_valid_message_types()),
+        )
+
+    def test_only_own_type_is_checked(self):
+        """A message is validated by its type's validator, not the whole schema"""
+        message = {"type": "ack", "timestamp": 1, "message_id": "m1", "success": True}
+        with patch.object(self.schema_manager, "validator") as full_validator:
+            self.assertTrue(self.schema_manager.validate_message(message))
+        full_validator.validate.assert_not_called()
+
+    def test_invalid_messages_rejected(self):
+        """Missing fields, wrong types and unknown message types fail validation"""
+        self.assertTrue(self.schema_manager.validate_message(
+            {"type": "stop_record", "timestamp": 1, "session_id": "s1"}
+        ))
+        self.assertFalse(self.schema_manager.validate_message(
+            {"type": "start_record", "timestamp": 1}
+        ))
+        self.assertFalse(self.schema_manager.validate_message(
+            {"type": "stop_record", "timestamp": "now", "session_id": "s1"}
+        ))
+        self.assertFalse(self.schema_manager.validate_message(
+            {"type": "not_a_message", "timestamp": 1}
+        ))
+
+    def test_unknown_and_non_string_types(self):
+        """Unknown and non-string types are rejected and share one statistics entry"""
+        for index in range(20):
+            self.assertFalse(self.schema_manager.validate_message(
+                {"type": f"junk_{index}", "timestamp": 1}
+            ))
+        self.assertFalse(self.schema_manager.validate_message({"type": ["x"], "timestamp": 1}))
+        self.assertFalse(self.schema_manager.validate_message({"type": {"a": 1}, "timestamp": 1}))
+
+        stats = self.schema_manager.get_validation_statistics()
+        self.assertEqual(list(stats), [SchemaManager.UNKNOWN_TYPE_KEY])
+        self.assertEqual(stats[SchemaManager.UNKNOWN_TYPE_KEY], {"validated": 22, "skipped": 0})
+
+
+@unittest.skipUnless(JSONSCHEMA_AVAILABLE, "jsonschema is not installed")
+class TestSampleValidation(unittest.TestCase):
+    """Test sampling of high-rate message types"""
+
+    def setUp(self):
+        self.schema_manager = SchemaManager()
+        self.invalid_frame = {"type": "preview_frame", "timestamp": 1}
+
+    def test_one_in_n_validated(self):
+        """Only every Nth message of a sampled type is validated"""
+        self.schema_manager.set_sample_rate("preview_frame", 4)
+        results = [self.schema_manager.validate_message(self.invalid_frame) for _ in range(8)]
+
+        self.assertEqual(results, [False, True, True, True] * 2)
+        self.assertEqual(
+            self.schema_manager.get_validation_statistics()["preview_frame"],
+            {"validated": 2, "skipped": 6},
+        )
+        self.assertFalse(self.schema_manager.validate_message(
+            {"type": "start_record", "timestamp": 1}
+        ))
+
+    def test_sampling_disabled(self):
+        """A sample rate of 1 validates every message again"""
+        self.schema_manager.set_sample_rate("preview_frame", 4)
+        self.schema_manager.set_sample_rate("preview_frame", 1)
+        self.assertNotIn("preview_frame", self.schema_manager.sample_rates)
+        self.assertFalse(any(
+            self.schema_manager.validate_message(self.invalid_frame) for _ in range(4)
+        ))
+        with self.assertRaises(ValueError):
+            self.schema_manager.set_sample_rate("preview_frame", 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
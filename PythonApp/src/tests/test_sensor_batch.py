@@ -0,0 +1,203 @@
+"""
+Tests for batched sensor_batch messages
+
+Covers building and decoding columnar batches, their schema entry, and the
+JsonSocketServer, PCServer and AndroidDeviceManager handling one batch as a
+single message.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import unittest
+
+from PyQt5.QtCore import Qt
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network.android_device_manager import AndroidDevice, AndroidDeviceManager
+from network.device_server import (
+    SERVER_MODE_ASYNCIO,
+    SERVER_MODE_THREADED,
+    JsonSocketServer,
+)
+from network.pc_server import JsonMessage, SensorBatchMessage
+from protocol.schema_utils import get_schema_manager
+from protocol.sensor_batch import (
+    SensorBatchError,
+    create_sensor_batch,
+    decode_sensor_batch,
+    iter_sensor_batch,
+)
+from protocol.wire_encoding import available_encodings, decode_message, encode_message
+
+TIMESTAMPS = [1722300000000.0, 1722300000002.0, 1722300000004.0]
+CHANNELS = {"gsr": [5.0, 5.1, None], "accelerometer_x": [0.1, 0.2, 0.3]}
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _send(sock, message):
+    payload = encode_message(message)
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+class TestSensorBatchMessages(unittest.TestCase):
+    """Test suite for create_sensor_batch and decode_sensor_batch"""
+
+    def test_round_trip(self):
+        """Timestamps and channels survive every wire encoding"""
+        message = create_sensor_batch(TIMESTAMPS, CHANNELS, sample_rate=500.0)
+        self.assertEqual(message["base_timestamp"], TIMESTAMPS[0])
+        self.assertEqual(message["timestamp_deltas"], [0.0, 2.0, 4.0])
+        self.assertEqual(message["timestamp"], TIMESTAMPS[-1])
+
+        for encoding in available_encodings():
+            with self.subTest(encoding=encoding):
+                decoded = decode_message(encode_message(message, encoding))
+                timestamps, channels = decode_sensor_batch(decoded)
+                self.assertEqual(timestamps, TIMESTAMPS)
+                self.assertEqual(channels, CHANNELS)
+
+    def test_schema_validation(self):
+        """Batches built by create_sensor_batch satisfy message_schema.json"""
+        schema_manager = get_schema_manager()
+        self.assertIn("sensor_batch", schema_manager.get_valid_message_types())
+        self.assertTrue(schema_manager.validate_message(create_sensor_batch(TIMESTAMPS, CHANNELS)))
+        self.assertFalse(
+            schema_manager.validate_message({"type": "sensor_batch", "timestamp": 1, "channels": {}})
+        )
+
+    def test_inconsistent_lengths(self):
+        """Channels must hold one value per timestamp"""
+        with self.assertRaises(SensorBatchError):
+            create_sensor_batch(TIMESTAMPS, {"gsr": [1.0]})
+        with self.assertRaises(SensorBatchError):
+            create_sensor_batch([], {})
+
+        message = create_sensor_batch(TIMESTAMPS, CHANNELS)
+        message["channels"]["ppg"] = [1.0]
+        with self.assertRaises(SensorBatchError):
+            decode_sensor_batch(message)
+        with self.assertRaises(SensorBatchError):
+            decode_sensor_batch({"type": "sensor_batch", "channels": {}})
+
+    def test_iter_samples(self):
+        """A batch can be consumed one sample at a time"""
+        samples = list(iter_sensor_batch(TIMESTAMPS, CHANNELS))
+        self.assertEqual(len(samples), 3)
+        self.assertEqual(samples[2], (TIMESTAMPS[2], {"gsr": None, "accelerometer_x": 0.3}))
+        self.assertEqual(list(iter_sensor_batch(TIMESTAMPS, {}))[0], (TIMESTAMPS[0], {}))
+
+
+class TestJsonSocketServerSensorBatch(unittest.TestCase):
+    """Test sensor_batch messages sent to JsonSocketServer"""
+
+    server_mode = SERVER_MODE_THREADED
+
+    def setUp(self):
+        self.port = _free_port()
+        self.server = JsonSocketServer(
+            host="127.0.0.1", port=self.port, server_mode=self.server_mode
+        )
+        self.server_thread = threading.Thread(target=self.server.run, daemon=True)
+        self.server_thread.start()
+        self.assertTrue(_wait_for(lambda: self.server.running))
+
+    def tearDown(self):
+        self.server.stop_server()
+        self.server_thread.join(timeout=5)
+
+    def test_one_signal_per_batch(self):
+        """A batch is emitted whole, and an invalid one is reported as an error"""
+        batches = []
+        errors = []
+        self.server.sensor_batch_received.connect(
+            lambda device_id, batch: batches.append((device_id, batch)), Qt.DirectConnection
+        )
+        self.server.error_occurred.connect(
+            lambda device_id, error: errors.append(error), Qt.DirectConnection
+        )
+        with socket.create_connection(("127.0.0.1", self.port)) as sock:
+            _send(sock, {"type": "hello", "device_id": "phone", "capabilities": []})
+            _send(sock, create_sensor_batch(TIMESTAMPS, CHANNELS, sensor_id="shimmer-1"))
+            _send(sock, {"type": "sensor_batch", "base_timestamp": 0,
+                         "timestamp_deltas": [0], "channels": {"gsr": []}})
+            self.assertTrue(_wait_for(lambda: batches and errors))
+
+        device_id, batch = batches[0]
+        self.assertEqual(device_id, "phone")
+        self.assertEqual(batch["timestamps"], TIMESTAMPS)
+        self.assertEqual(batch["channels"], CHANNELS)
+        self.assertEqual(batch["sensor_id"], "shimmer-1")
+        self.assertEqual(len(batches), 1)
+
+
+class TestJsonSocketServerSensorBatchAsyncio(TestJsonSocketServerSensorBatch):
+    """Test sensor_batch messages sent to JsonSocketServer in asyncio mode"""
+
+    server_mode = SERVER_MODE_ASYNCIO
+
+
+class TestAndroidDeviceManagerSensorBatch(unittest.TestCase):
+    """Test AndroidDeviceManager processing of sensor_batch messages"""
+
+    def setUp(self):
+        self.manager = AndroidDeviceManager(server_port=_free_port())
+        self.manager.android_devices["phone"] = AndroidDevice(
+            device_id="phone", capabilities=["shimmer"],
+            connection_time=time.time(), last_heartbeat=time.time(),
+        )
+
+    def tearDown(self):
+        self.manager.thread_pool.shutdown(wait=False)
+
+    def test_batch_and_sample_callbacks(self):
+        """Batch subscribers get the batch once, sample subscribers get every sample"""
+        batches = []
+        samples = []
+        self.manager.add_batch_callback(batches.append)
+        self.manager.add_data_callback(samples.append)
+
+        message = JsonMessage.from_payload(
+            encode_message(create_sensor_batch(TIMESTAMPS, CHANNELS, sensor_id="shimmer-1"))
+        )
+        self.assertIsInstance(message, SensorBatchMessage)
+        self.manager._on_message_received("phone", message)
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].device_id, "phone:shimmer-1")
+        self.assertEqual(batches[0].timestamps, TIMESTAMPS)
+        self.assertEqual(len(samples), 3)
+        self.assertEqual(samples[2].sensor_values, {"accelerometer_x": 0.3})
+        self.assertEqual(self.manager.android_devices["phone"].data_samples_received, 3)
+
+    def test_inconsistent_batch_is_dropped(self):
+        """PCServer does not turn an inconsistent batch into a message"""
+        message = create_sensor_batch(TIMESTAMPS, CHANNELS)
+        message["timestamp_deltas"].append(6.0)
+        self.assertIsNone(JsonMessage.from_payload(encode_message(message)))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
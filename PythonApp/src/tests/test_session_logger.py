@@ -506,6 +506,101 @@ class TestSessionLogger(unittest.TestCase):
         )
 
 
+class TestSessionLoggerJournal(unittest.TestCase):
+    """Test cases for the append-only journal mode of SessionLogger."""
+
+    def setUp(self):
+        """Set up a journal-mode logger in a temporary directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.session_logger = SessionLogger(
+            base_sessions_dir=self.test_dir,
+            journal_mode=True,
+            journal_flush_interval=0.05,
+            journal_batch_size=10,
+        )
+
+    def tearDown(self):
+        """Clean up test environment after each test."""
+        if self.session_logger.is_session_active():
+            self.session_logger.end_session()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_events_appended_to_journal(self):
+        """Events are appended as JSON lines while the log JSON stays untouched."""
+        info = self.session_logger.start_session("JournalTest")
+        for i in range(25):
+            self.session_logger.log_event("journal_event", {"index": i})
+
+        journal_path = self.session_logger.journal_file_path
+        self.assertTrue(journal_path.exists())
+        with open(journal_path, "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        self.assertGreaterEqual(len(lines), 20)  # Two full batches committed
+        self.assertEqual(lines[0]["event"], "session_start")
+
+        # Canonical log only holds what was materialized at session start
+        with open(info["log_file_path"], "r", encoding="utf-8") as f:
+            log_data = json.load(f)
+        self.assertEqual(len(log_data["events"]), 1)
+
+    def test_end_session_materializes_log(self):
+        """end_session writes the full log and removes the journal."""
+        info = self.session_logger.start_session("JournalEnd")
+        journal_path = self.session_logger.journal_file_path
+        for i in range(5):
+            self.session_logger.log_marker(f"marker_{i}")
+        completed = self.session_logger.end_session()
+
+        with open(info["log_file_path"], "r", encoding="utf-8") as f:
+            log_data = json.load(f)
+        self.assertEqual(log_data["status"], "completed")
+        self.assertEqual(len(log_data["events"]), len(completed["events"]))
+        self.assertEqual(len(log_data["events"]), 7)
+        self.assertFalse(journal_path.exists())
+
+    def test_materialize_on_demand(self):
+        """materialize_session_log writes every event logged so far."""
+        self.session_logger.start_session("JournalDemand")
+        self.session_logger.log_event("test_event")
+        log_path = self.session_logger.materialize_session_log()
+
+        with open(log_path, "r", encoding="utf-8") as f:
+            log_data = json.load(f)
+        self.assertEqual(log_data["status"], "active")
+        self.assertEqual(len(log_data["events"]), 2)
+
+    def test_recovery_from_journal_tail(self):
+        """SessionRecoveryManager rebuilds events from a crashed session's journal."""
+        from session.session_recovery import SessionRecoveryManager
+
+        info = self.session_logger.start_session("JournalCrash")
+        self.session_logger.log_calibration_capture("Phone1", "calib_000.png")
+        for i in range(3):
+            self.session_logger.log_event("before_crash", {"index": i})
+        self.session_logger.materialize_session_log()
+        self.session_logger.log_event("after_materialize")
+        self.session_logger._commit_journal()
+
+        # Simulate a torn final write, then abandon the logger (crash)
+        with open(self.session_logger.journal_file_path, "a", encoding="utf-8") as f:
+            f.write('{"event": "torn", "ti')
+        self.session_logger.journal_mode = False
+        self.session_logger.current_session = None
+
+        recovery_manager = SessionRecoveryManager(base_sessions_dir=self.test_dir)
+        recovered = recovery_manager.recover_session(Path(info["log_file_path"]))
+        self.assertIsNotNone(recovered)
+
+        with open(info["log_file_path"], "r", encoding="utf-8") as f:
+            log_data = json.load(f)
+        event_types = [event["event"] for event in log_data["events"]]
+        self.assertEqual(log_data["status"], "recovered")
+        self.assertIn("after_materialize", event_types)
+        self.assertNotIn("torn", event_types)
+        self.assertEqual(event_types[-1], "session_end")
+        self.assertEqual(log_data["calibration_files"], ["calib_000.png"])
+
+
 class TestSessionLoggerIntegration(unittest.TestCase):
     """Integration tests for SessionLogger with other components."""
 
@@ -537,6 +632,7 @@ def run_session_logger_tests():
 
     # Add test cases
     test_suite.addTest(unittest.makeSuite(TestSessionLogger))
+    test_suite.addTest(unittest.makeSuite(TestSessionLoggerJournal))
     test_suite.addTest(unittest.makeSuite(TestSessionLoggerIntegration))
 
     # Run tests
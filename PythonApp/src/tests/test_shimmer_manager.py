@@ -9,19 +9,24 @@ Date: 2025-07-30
 """
 
 import os
+import queue
 import shutil
 import sys
 import tempfile
 import threading
 import time
 import unittest
+from datetime import datetime
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import numpy as np
+
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from shimmer_manager import (
+    ConnectionType,
     ShimmerManager,
     ShimmerStatus,
     ShimmerSample,
@@ -321,9 +326,11 @@ class TestShimmerManager(unittest.TestCase):
         # Wait for some simulated data
         time.sleep(2.0)
 
-        # Check that data queues have samples
-        for device_id, data_queue in self.shimmer_manager.data_queues.items():
-            self.assertGreater(data_queue.qsize(), 0)
+        # Check that every device fed samples into the ingest pipeline
+        ingest_stats = self.shimmer_manager.get_ingest_statistics()
+        self.assertGreater(len(ingest_stats), 0)
+        for device_id, stats in ingest_stats.items():
+            self.assertGreater(stats["enqueued"], 0)
 
         # Stop streaming
         self.shimmer_manager.stop_streaming()
@@ -444,6 +451,219 @@ class TestShimmerManager(unittest.TestCase):
         self.assertIn("GSR", config.enabled_channels)
 
 
+class TestShimmerSample(unittest.TestCase):
+    """Test the compact ShimmerSample representation"""
+
+    def test_slotted_without_instance_dict(self):
+        """Samples use __slots__ and reject unknown attributes"""
+        sample = ShimmerSample(timestamp=1722300000.0, device_id="test_device")
+        self.assertFalse(hasattr(sample, "__dict__"))
+        with self.assertRaises(AttributeError):
+            sample.unknown_field = 1
+
+    def test_lazy_system_time(self):
+        """system_time is formatted from system_timestamp on first access"""
+        timestamp = 1722300000.25
+        sample = ShimmerSample(
+            timestamp=timestamp, system_timestamp=timestamp, device_id="test_device"
+        )
+        self.assertIsNone(sample._system_time)
+        self.assertEqual(
+            sample.system_time, datetime.fromtimestamp(timestamp).isoformat()
+        )
+        self.assertIsNotNone(sample._system_time)
+
+        parsed = ShimmerSample(
+            timestamp=timestamp,
+            system_time=datetime.fromtimestamp(timestamp).isoformat(),
+            device_id="test_device",
+        )
+        self.assertAlmostEqual(parsed.system_timestamp, timestamp, places=6)
+        self.assertEqual(parsed, sample)
+
+    def test_to_dict_and_sensor_values(self):
+        """to_dict keeps the recording field order and sensor names map to fields"""
+        sample = ShimmerSample(timestamp=1722300000.0, device_id="test_device")
+        sample.set_sensor_values(
+            {"gsr_conductance": 4.5, "battery_percentage": 80.0, "unknown": 1}
+        )
+
+        data = sample.to_dict()
+        self.assertEqual(list(data), list(ShimmerSample.FIELDS))
+        self.assertEqual(data["gsr_conductance"], 4.5)
+        self.assertEqual(data["battery_percentage"], 80)
+        self.assertIsInstance(data["battery_percentage"], int)
+
+
+class TestShimmerIngestPipeline(unittest.TestCase):
+    """Test suite for the multiplexed ingest queue of ShimmerManager"""
+
+    def setUp(self):
+        """Set up a manager without Android integration"""
+        self.shimmer_manager = ShimmerManager(
+            logger=Mock(), enable_android_integration=False
+        )
+        self.shimmer_manager.default_sampling_rate = 1000
+        self.shimmer_manager.initialize()
+        self.device_ids = []
+        for mac_address in ("00:06:66:66:66:66", "00:06:66:66:66:67"):
+            self.shimmer_manager._connect_single_device(
+                mac_address, ConnectionType.SIMULATION
+            )
+            self.device_ids.append(f"shimmer_{mac_address.replace(':', '_')}")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.shimmer_manager.cleanup()
+
+    def _wait_for_drain(self, timeout=5.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            stats = self.shimmer_manager.get_ingest_statistics().values()
+            if all(s["backlog"] == 0 for s in stats):
+                return
+            time.sleep(0.01)
+
+    def test_samples_from_all_devices_processed(self):
+        """Samples from several devices are processed through one queue"""
+        received = []
+        self.shimmer_manager.add_data_callback(received.append)
+
+        for i in range(500):
+            for device_id in self.device_ids:
+                sample = self.shimmer_manager._generate_simulated_sample(device_id)
+                self.assertTrue(self.shimmer_manager._enqueue_sample(device_id, sample))
+        self._wait_for_drain()
+
+        self.assertEqual(len(received), 1000)
+        for device_id, stats in self.shimmer_manager.get_ingest_statistics().items():
+            self.assertEqual(stats["processed"], 500)
+            self.assertEqual(stats["dropped"], 0)
+            self.assertEqual(stats["backlog"], 0)
+
+    def test_drop_counter_when_queue_full(self):
+        """Samples beyond the queue capacity are dropped and counted"""
+        self.shimmer_manager.stop_event.set()
+        self.shimmer_manager.data_processing_thread.join(timeout=2.0)
+        self.shimmer_manager.ingest_queue = queue.Queue(maxsize=10)
+
+        device_id = self.device_ids[0]
+        for _ in range(15):
+            sample = self.shimmer_manager._generate_simulated_sample(device_id)
+            self.shimmer_manager._enqueue_sample(device_id, sample)
+
+        status = self.shimmer_manager.get_shimmer_status()[device_id]
+        self.assertEqual(status.ingest_backlog, 10)
+        self.assertEqual(status.samples_dropped, 5)
+
+    def test_unknown_device_rejected(self):
+        """Samples for devices that are not connected are not queued"""
+        sample = self.shimmer_manager._generate_simulated_sample("unknown")
+        self.assertFalse(self.shimmer_manager._enqueue_sample("unknown", sample))
+
+    def test_simulated_streaming_at_1khz_without_drops(self):
+        """Simulated 1 kHz streams are ingested without dropping samples"""
+        for device_id in self.device_ids:
+            self.shimmer_manager.device_status[device_id].is_streaming = True
+            self.shimmer_manager._start_simulated_streaming(device_id)
+        time.sleep(1.0)
+        for device_id in self.device_ids:
+            self.shimmer_manager.device_status[device_id].is_streaming = False
+        time.sleep(0.05)
+        self._wait_for_drain()
+
+        for device_id, stats in self.shimmer_manager.get_ingest_statistics().items():
+            self.assertGreater(stats["processed"], 500)
+            self.assertEqual(stats["dropped"], 0)
+            self.assertEqual(stats["processed"], stats["enqueued"])
+
+
+    def test_batch_callbacks_deliver_channel_arrays(self):
+        """Batch subscribers receive per-device NumPy arrays of max_batch samples"""
+        batches = []
+        self.shimmer_manager.add_batch_callback(
+            batches.append, max_batch=100, max_latency_ms=10000
+        )
+
+        sent = {device_id: [] for device_id in self.device_ids}
+        for i in range(300):
+            for device_id in self.device_ids:
+                sample = self.shimmer_manager._generate_simulated_sample(device_id)
+                sent[device_id].append(sample.gsr_conductance)
+                self.shimmer_manager._enqueue_sample(device_id, sample)
+        self._wait_for_drain()
+
+        self.assertEqual(len(batches), 6)
+        for device_id in self.device_ids:
+            device_batches = [b for b in batches if b.device_id == device_id]
+            self.assertEqual([len(b) for b in device_batches], [100, 100, 100])
+            gsr = np.concatenate([b["gsr_conductance"] for b in device_batches])
+            np.testing.assert_array_equal(gsr, sent[device_id])
+            self.assertTrue(np.isnan(device_batches[0]["ecg"]).all())
+            self.assertEqual(device_batches[0].connection_type, ConnectionType.SIMULATION)
+
+    def test_batch_callback_latency_bound(self):
+        """Partial batches are delivered once max_latency_ms has elapsed"""
+        batches = []
+        self.shimmer_manager.add_batch_callback(
+            batches.append, max_batch=1000, max_latency_ms=50
+        )
+
+        device_id = self.device_ids[0]
+        for _ in range(10):
+            sample = self.shimmer_manager._generate_simulated_sample(device_id)
+            self.shimmer_manager._enqueue_sample(device_id, sample)
+
+        deadline = time.time() + 2.0
+        while not batches and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), 10)
+        self.assertEqual(batches[0].data.shape[1], 10)
+
+    def test_get_window_from_ring_buffer(self):
+        """Processed samples are available per device through get_window"""
+        device_id = self.device_ids[0]
+        sent = []
+        for _ in range(200):
+            sample = self.shimmer_manager._generate_simulated_sample(device_id)
+            sent.append(sample.gsr_conductance)
+            self.shimmer_manager._enqueue_sample(device_id, sample)
+        self._wait_for_drain()
+
+        window = self.shimmer_manager.get_window(device_id, "gsr_conductance", 60.0)
+        np.testing.assert_array_equal(window, sent)
+        self.assertEqual(
+            len(self.shimmer_manager.get_window(self.device_ids[1], "gsr_conductance", 1.0)),
+            0,
+        )
+        with self.assertRaises(ValueError):
+            self.shimmer_manager.get_window(device_id, "unknown", 1.0)
+
+    def test_gsr_features_published(self):
+        """GSR features are published per device at the configured interval"""
+        published = []
+        self.shimmer_manager.add_gsr_feature_callback(
+            lambda device_id, features: published.append((device_id, features))
+        )
+
+        device_id = self.device_ids[0]
+        for i in range(3001):
+            sample = ShimmerSample(
+                timestamp=1722300000.0 + i / 1000.0,
+                device_id=device_id,
+                gsr_conductance=5.0,
+            )
+            self.shimmer_manager._enqueue_sample(device_id, sample)
+        self._wait_for_drain()
+
+        self.assertEqual(len(published), 3)
+        self.assertTrue(all(d == device_id for d, _ in published))
+        self.assertAlmostEqual(published[-1][1].scl, 5.0)
+        self.assertIs(self.shimmer_manager.get_gsr_features(device_id), published[-1][1])
+        self.assertIsNone(self.shimmer_manager.get_gsr_features(self.device_ids[1]))
+
 class TestShimmerManagerIntegration(unittest.TestCase):
     """Integration tests for ShimmerManager with main_backup.py"""
 
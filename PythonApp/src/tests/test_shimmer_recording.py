@@ -0,0 +1,295 @@
+"""
+Tests for the Shimmer recording backends
+
+Covers the chunked columnar writer, its manifest layout, memory-mapped
+loading, conversion back to the CSV recording schema, compressed CSV output
+and the recording writer stage.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-02
+"""
+
+import csv
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from shimmer_manager import ConnectionType, ShimmerManager, ShimmerSample
+from shimmer_recording import (
+    COLUMNAR_NUMERIC_FIELDS,
+    ColumnarSampleWriter,
+    CsvSampleWriter,
+    RecordingWriterStage,
+    SHIMMER_CSV_FIELDNAMES,
+    convert_columnar_to_csv,
+    load_columnar_recording,
+    read_columnar_manifest,
+)
+
+
+def _make_sample(i, device_id="shimmer_00_06_66_66_66_66", session_id="s1"):
+    timestamp = 1722300000.0 + i * 0.001
+    return ShimmerSample(
+        timestamp=timestamp,
+        system_time=datetime.fromtimestamp(timestamp + 0.0123).isoformat(),
+        device_id=device_id,
+        session_id=session_id,
+        gsr_conductance=5.0 + i * 0.25,
+        ppg_a13=2000.0 + i,
+        accel_x=0.1,
+        accel_y=None,
+        accel_z=1.0,
+        battery_percentage=85 - (i % 10),
+    )
+
+
+class TestColumnarSampleWriter(unittest.TestCase):
+    """Test suite for ColumnarSampleWriter"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.recording_dir = self.temp_dir / "shimmer_00_06_66_66_66_66_data_columnar"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_chunks_and_manifest(self):
+        """Full blocks are written as chunks with per-chunk timestamps"""
+        writer = ColumnarSampleWriter(self.recording_dir, chunk_size=100)
+        for i in range(250):
+            writer.append(_make_sample(i))
+
+        manifest = read_columnar_manifest(self.recording_dir)
+        self.assertEqual(len(manifest["chunks"]), 2)
+        self.assertFalse(manifest["complete"])
+
+        writer.close()
+        manifest = read_columnar_manifest(self.recording_dir)
+        self.assertTrue(manifest["complete"])
+        self.assertEqual(manifest["total_rows"], 250)
+        self.assertEqual([c["rows"] for c in manifest["chunks"]], [100, 100, 50])
+        self.assertAlmostEqual(manifest["chunks"][1]["first_timestamp"], 1722300000.1)
+        self.assertEqual(manifest["chunks"][0]["session_id"], "s1")
+
+        chunk = np.load(self.recording_dir / "chunk_000000.npy", mmap_mode="r")
+        self.assertEqual(chunk.shape, (len(COLUMNAR_NUMERIC_FIELDS), 100))
+
+    def test_load_columns(self):
+        """Loaded columns hold the appended values with NaN for missing data"""
+        writer = ColumnarSampleWriter(self.recording_dir, chunk_size=64)
+        for i in range(100):
+            writer.append(_make_sample(i))
+        writer.close()
+
+        columns = load_columnar_recording(self.recording_dir)
+        self.assertEqual(len(columns["gsr_conductance"]), 100)
+        self.assertEqual(columns["gsr_conductance"][10], 7.5)
+        self.assertTrue(np.isnan(columns["accel_y"]).all())
+
+    def test_string_field_change_starts_new_chunk(self):
+        """A change of session id closes the current chunk early"""
+        writer = ColumnarSampleWriter(self.recording_dir, chunk_size=100)
+        for i in range(10):
+            writer.append(_make_sample(i, session_id="a"))
+        for i in range(10):
+            writer.append(_make_sample(i, session_id="b"))
+        writer.close()
+
+        chunks = read_columnar_manifest(self.recording_dir)["chunks"]
+        self.assertEqual([c["session_id"] for c in chunks], ["a", "b"])
+
+    def test_csv_conversion_matches_csv_backend(self):
+        """Converted CSV matches what the CSV backend writes for the same samples"""
+        samples = [_make_sample(i) for i in range(30)]
+
+        writer = ColumnarSampleWriter(self.recording_dir, chunk_size=8)
+        for sample in samples:
+            writer.append(sample)
+        writer.close()
+        converted_path = convert_columnar_to_csv(self.recording_dir)
+        self.assertEqual(converted_path.name, "shimmer_00_06_66_66_66_66_data.csv")
+
+        reference_path = self.temp_dir / "reference.csv"
+        with open(reference_path, "w", newline="") as f:
+            reference_writer = csv.DictWriter(
+                f, fieldnames=SHIMMER_CSV_FIELDNAMES, extrasaction="ignore"
+            )
+            reference_writer.writeheader()
+            for sample in samples:
+                reference_writer.writerow(sample.to_dict())
+
+        with open(converted_path, newline="") as f:
+            converted_rows = list(csv.reader(f))
+        with open(reference_path, newline="") as f:
+            reference_rows = list(csv.reader(f))
+        self.assertEqual(converted_rows, reference_rows)
+
+
+class _BlockingSink:
+    """Sink that blocks every write until released, like a stalled disk"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.samples_written = 0
+        self.bytes_written = 0
+        self.closed = False
+
+    def write_samples(self, samples):
+        self.release.wait()
+        self.samples_written += len(samples)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class TestRecordingWriterStage(unittest.TestCase):
+    """Test suite for CsvSampleWriter and RecordingWriterStage"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_gzip_csv_matches_plain_csv(self):
+        """Compressed CSV output decompresses to the plain CSV output"""
+        samples = [_make_sample(i) for i in range(200)]
+        plain = CsvSampleWriter(self.temp_dir / "plain.csv")
+        compressed = CsvSampleWriter(self.temp_dir / "data.csv.gz", "gzip")
+        for writer in (plain, compressed):
+            writer.write_samples(samples[:100])
+            writer.flush()
+            writer.write_samples(samples[100:])
+            writer.close()
+
+        with gzip.open(self.temp_dir / "data.csv.gz", "rb") as f:
+            decompressed = f.read()
+        self.assertEqual(decompressed, (self.temp_dir / "plain.csv").read_bytes())
+        self.assertLess(compressed.bytes_written, plain.bytes_written)
+        self.assertEqual(len(decompressed.splitlines()), 201)
+
+    def test_stage_writes_blocks_in_order(self):
+        """Blocks are written per device in submission order"""
+        stage = RecordingWriterStage()
+        stage.add_sink("a", CsvSampleWriter(self.temp_dir / "a.csv"))
+        for start in range(0, 100, 10):
+            stage.submit("a", [_make_sample(i) for i in range(start, start + 10)])
+        stage.close()
+
+        with open(self.temp_dir / "a.csv", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([float(r["ppg_a13"]) for r in rows], [2000.0 + i for i in range(100)])
+        metrics = stage.get_metrics()
+        self.assertEqual(metrics["samples_written"], 100)
+        self.assertEqual(metrics["blocks_dropped"], 0)
+        self.assertGreater(metrics["bytes_written"], 0)
+
+    def test_submit_never_blocks_on_stalled_sink(self):
+        """A stalled sink fills the queue and drops blocks instead of blocking"""
+        sink = _BlockingSink()
+        stage = RecordingWriterStage(queue_size=4)
+        stage.add_sink("a", sink)
+
+        start = time.perf_counter()
+        results = [stage.submit("a", [_make_sample(i)]) for i in range(10)]
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertFalse(all(results))
+
+        metrics = stage.get_metrics()
+        self.assertGreater(metrics["blocks_dropped"], 0)
+        self.assertLessEqual(metrics["peak_queue_depth"], 4)
+
+        sink.release.set()
+        stage.close()
+        self.assertTrue(sink.closed)
+        self.assertEqual(sink.samples_written + stage.stats.samples_dropped, 10)
+
+
+class TestShimmerManagerColumnarRecording(unittest.TestCase):
+    """Test ShimmerManager recording through the columnar backend"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.session_manager = Mock()
+        self.session_manager.get_session_directory.return_value = str(self.temp_dir)
+        self.shimmer_manager = ShimmerManager(
+            session_manager=self.session_manager,
+            logger=Mock(),
+            enable_android_integration=False,
+        )
+
+    def tearDown(self):
+        self.shimmer_manager.cleanup()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_default_format_is_csv(self):
+        """CSV stays the default recording format"""
+        self.assertEqual(self.shimmer_manager.recording_format, "csv")
+
+    def test_columnar_recording(self):
+        """Samples are recorded into a columnar directory per device"""
+        self.shimmer_manager.recording_format = "columnar"
+        self.shimmer_manager.initialize()
+        self.shimmer_manager._connect_single_device(
+            "00:06:66:66:66:66", ConnectionType.SIMULATION
+        )
+        device_id = "shimmer_00_06_66_66_66_66"
+
+        self.assertTrue(self.shimmer_manager.start_recording("columnar_session"))
+        for _ in range(20):
+            sample = self.shimmer_manager._generate_simulated_sample(device_id)
+            self.shimmer_manager._process_data_sample(sample)
+        self.shimmer_manager.stop_recording()
+
+        recording_dir = self.temp_dir / f"{device_id}_data_columnar"
+        manifest = read_columnar_manifest(recording_dir)
+        self.assertTrue(manifest["complete"])
+        # The simulator may also have produced samples while recording
+        self.assertGreaterEqual(manifest["total_rows"], 20)
+
+        with open(convert_columnar_to_csv(recording_dir), newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), manifest["total_rows"])
+        self.assertEqual(rows[0]["device_id"], device_id)
+
+
+    def test_gzip_csv_recording(self):
+        """CSV recordings go through the writer stage and can be compressed"""
+        self.shimmer_manager.recording_compression = "gzip"
+        self.shimmer_manager.initialize()
+        self.shimmer_manager._connect_single_device(
+            "00:06:66:66:66:66", ConnectionType.SIMULATION
+        )
+        device_id = "shimmer_00_06_66_66_66_66"
+
+        self.assertTrue(self.shimmer_manager.start_recording("gzip_session"))
+        for _ in range(20):
+            sample = self.shimmer_manager._generate_simulated_sample(device_id)
+            self.shimmer_manager._process_data_sample(sample)
+        self.shimmer_manager.stop_recording()
+
+        with gzip.open(self.temp_dir / f"{device_id}_data.csv.gz", "rt", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertGreaterEqual(len(rows), 20)
+        metrics = self.shimmer_manager.get_recording_statistics()
+        self.assertEqual(metrics["samples_written"], len(rows))
+        self.assertEqual(metrics["samples_dropped"], 0)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+"""
+Tests for the Shimmer sample ring buffer
+
+Covers window selection by time, wrap-around, zero-copy views, and reads
+concurrent with a writer thread.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-03
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from shimmer_ring_buffer import SampleRingBuffer
+
+
+def _fill(buffer, count, rate=100.0):
+    for i in range(count):
+        buffer.append([i / rate, float(i)])
+
+
+class TestSampleRingBuffer(unittest.TestCase):
+    """Test suite for SampleRingBuffer"""
+
+    def test_window_by_seconds(self):
+        """Windows cover samples within the requested seconds of the newest"""
+        buffer = SampleRingBuffer(("timestamp", "gsr_conductance"), capacity=1000)
+        _fill(buffer, 500)
+
+        window = buffer.get_window("gsr_conductance", 1.0)
+        np.testing.assert_array_equal(window, np.arange(400, 500, dtype=float))
+        self.assertEqual(len(buffer.get_window("gsr_conductance", 100.0)), 500)
+        self.assertEqual(buffer.get_latest("gsr_conductance"), 499.0)
+
+    def test_view_until_wrap(self):
+        """Contiguous windows are read-only views; wrapped windows are copies"""
+        buffer = SampleRingBuffer(("timestamp", "gsr_conductance"), capacity=100)
+        _fill(buffer, 50)
+        view = buffer.get_window("gsr_conductance", 0.1)
+        self.assertFalse(view.flags.owndata)
+        self.assertFalse(view.flags.writeable)
+        self.assertTrue(buffer.get_window("gsr_conductance", 0.1, copy=True).flags.owndata)
+
+        _fill(buffer, 130)
+        window = buffer.get_window("gsr_conductance", 100.0)
+        self.assertEqual(len(window), 100)
+        np.testing.assert_array_equal(window, np.arange(30, 130, dtype=float))
+
+    def test_empty_and_unknown_channel(self):
+        """Empty buffers return empty windows and unknown channels raise"""
+        buffer = SampleRingBuffer(("timestamp", "gsr_conductance"), capacity=10)
+        self.assertEqual(len(buffer.get_window("gsr_conductance", 1.0)), 0)
+        self.assertIsNone(buffer.get_latest("gsr_conductance"))
+        with self.assertRaises(ValueError):
+            buffer.get_window("ecg", 1.0)
+
+    def test_concurrent_reader_sees_consecutive_samples(self):
+        """Copies taken while the writer runs never contain torn data"""
+        buffer = SampleRingBuffer(("timestamp", "gsr_conductance"), capacity=256)
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                buffer.append([i / 1000.0, float(i)])
+                i += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                window = buffer.get_window("gsr_conductance", 0.2, copy=True)
+                if len(window) > 1:
+                    self.assertTrue((np.diff(window) == 1.0).all())
+        finally:
+            stop.set()
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
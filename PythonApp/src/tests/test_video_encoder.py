@@ -0,0 +1,226 @@
+"""
+Tests for the asynchronous video encoder stage
+
+Covers the bounded frame queue policies of AsyncVideoEncoder, encoder
+failures, and the WebcamCapture and DualWebcamCapture loops not stalling
+while the encoder falls behind.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-06
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from webcam.video_encoder import AsyncVideoEncoder, QueuePolicy
+from webcam.webcam_capture import WebcamCapture
+from webcam.dual_webcam_capture import DualWebcamCapture
+
+
+class SlowWriter:
+    """Video writer whose write() takes a fixed time, with occasional hiccups"""
+
+    def __init__(self, write_time=0.005, hiccup_every=0, hiccup_time=0.2, fail_at=None):
+        self.write_time = write_time
+        self.hiccup_every = hiccup_every
+        self.hiccup_time = hiccup_time
+        self.fail_at = fail_at
+        self.frames = []
+        self.released = 0
+
+    def write(self, frame):
+        if self.fail_at is not None and len(self.frames) == self.fail_at:
+            raise IOError("disk full")
+        if self.hiccup_every and len(self.frames) % self.hiccup_every == self.hiccup_every - 1:
+            time.sleep(self.hiccup_time)
+        else:
+            time.sleep(self.write_time)
+        self.frames.append(int(frame[0, 0, 0]))
+
+    def release(self):
+        self.released += 1
+
+
+class FakeCamera:
+    """Camera returning numbered frames at a fixed rate"""
+
+    def __init__(self, fps=100):
+        self.interval = 1.0 / fps
+        self.count = 0
+
+    def read(self):
+        time.sleep(self.interval)
+        self.count += 1
+        return True, np.full((8, 8, 3), self.count % 256, dtype=np.uint8)
+
+    def grab(self):
+        time.sleep(self.interval)
+        return True
+
+    def retrieve(self):
+        self.count += 1
+        return True, np.full((8, 8, 3), self.count % 256, dtype=np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+def _frame(value):
+    return np.full((8, 8, 3), value, dtype=np.uint8)
+
+
+class TestQueuePolicies(unittest.TestCase):
+    """Test AsyncVideoEncoder queue policies"""
+
+    def _submit_all(self, encoder, count):
+        results = [encoder.submit(_frame(index)) for index in range(count)]
+        encoder.close()
+        return results
+
+    def test_block_keeps_every_frame(self):
+        """BLOCK waits for queue space and encodes every frame in order"""
+        writer = SlowWriter(write_time=0.002)
+        encoder = AsyncVideoEncoder(writer, max_queue_size=4, policy=QueuePolicy.BLOCK)
+        encoder.start()
+        self.assertTrue(all(self._submit_all(encoder, 50)))
+
+        stats = encoder.get_statistics()
+        self.assertEqual(writer.frames, list(range(50)))
+        self.assertEqual((stats['frames_encoded'], stats['frames_dropped']), (50, 0))
+        self.assertGreater(stats['blocked_submits'], 0)
+        self.assertLessEqual(stats['max_queue_depth'], 4)
+        self.assertEqual(writer.released, 1)
+
+    def test_drop_oldest(self):
+        """DROP_OLDEST keeps the newest frames when the encoder falls behind"""
+        writer = SlowWriter()
+        encoder = AsyncVideoEncoder(writer, max_queue_size=4, policy=QueuePolicy.DROP_OLDEST)
+        self.assertTrue(all(self._submit_all(encoder, 10)))
+        self.assertEqual(writer.frames, [])
+        self.assertEqual(encoder.get_statistics()['frames_dropped'], 10)
+
+        encoder = AsyncVideoEncoder(writer, max_queue_size=4, policy=QueuePolicy.DROP_OLDEST)
+        for index in range(10):
+            encoder.submit(_frame(index))
+        encoder.start()
+        encoder.close()
+        self.assertEqual(writer.frames, [6, 7, 8, 9])
+        self.assertEqual(encoder.get_statistics()['frames_dropped'], 6)
+
+    def test_drop_newest(self):
+        """DROP_NEWEST rejects frames submitted to a full queue"""
+        writer = SlowWriter()
+        encoder = AsyncVideoEncoder(writer, max_queue_size=4, policy=QueuePolicy.DROP_NEWEST)
+        results = [encoder.submit(_frame(index)) for index in range(10)]
+        encoder.start()
+        encoder.close()
+
+        self.assertEqual(results, [True] * 4 + [False] * 6)
+        self.assertEqual(writer.frames, [0, 1, 2, 3])
+        self.assertEqual(encoder.get_statistics()['frames_dropped'], 6)
+
+    def test_close_without_drain(self):
+        """Frames still queued are dropped when closing without draining"""
+        writer = SlowWriter()
+        encoder = AsyncVideoEncoder(writer, max_queue_size=8)
+        for index in range(5):
+            encoder.submit(_frame(index))
+        encoder.close(drain=False)
+        encoder.close()
+
+        self.assertEqual(encoder.get_statistics()['frames_dropped'], 5)
+        self.assertFalse(encoder.submit(_frame(0)))
+        self.assertEqual(writer.released, 1)
+
+    def test_write_failure(self):
+        """A failing writer stops the encoder and rejects further frames"""
+        writer = SlowWriter(write_time=0, fail_at=3)
+        encoder = AsyncVideoEncoder(writer, max_queue_size=100, policy=QueuePolicy.BLOCK)
+        encoder.start()
+        for index in range(5):
+            encoder.submit(_frame(index))
+        encoder.join(timeout=2)
+
+        self.assertIn("disk full", encoder.get_statistics()['error'])
+        self.assertFalse(encoder.submit(_frame(0)))
+        stats = encoder.get_statistics()
+        self.assertEqual(stats['frames_encoded'] + stats['frames_dropped'], 5)
+
+
+class TestCaptureLoopBackpressure(unittest.TestCase):
+    """Test that encoder backpressure never stalls the capture loops"""
+
+    def test_webcam_capture_loop(self):
+        """WebcamCapture keeps capturing while the encoder hiccups"""
+        capture = WebcamCapture(preview_fps=30)
+        capture.cap = FakeCamera(fps=100)
+        writer = SlowWriter(write_time=0.005, hiccup_every=20, hiccup_time=0.25)
+        capture.video_encoder = AsyncVideoEncoder(writer, max_queue_size=8, name="WebcamEncoder")
+        capture.video_encoder.start()
+        capture.is_recording = True
+        capture.running = True
+
+        loop = threading.Thread(target=capture.run)
+        loop.start()
+        time.sleep(2.0)
+        capture.running = False
+        loop.join(timeout=2)
+        capture.is_recording = False
+        capture.video_encoder.close()
+
+        stats = capture.get_performance_stats()
+        encoder = stats['encoder']
+        self.assertEqual(stats['capture_stalls'], 0)
+        self.assertGreater(stats['frames_captured'], 50)
+        self.assertEqual(encoder['frames_submitted'], stats['frames_captured'])
+        self.assertGreater(encoder['frames_dropped'], 0)
+        self.assertEqual(encoder['frames_encoded'] + encoder['frames_dropped'], encoder['frames_submitted'])
+        self.assertLess(encoder['max_submit_ms'], 1000 / 30)
+
+    def test_dual_capture_loop(self):
+        """DualWebcamCapture reports both encoders and no stalls"""
+        # Face detection models are not needed to record
+        with patch("webcam.dual_webcam_capture.AdvancedROIDetector"):
+            capture = DualWebcamCapture(preview_fps=30, recording_fps=30)
+        capture.cap1 = FakeCamera(fps=30)
+        capture.cap2 = FakeCamera(fps=30)
+        writers = [SlowWriter(hiccup_every=5, hiccup_time=0.3) for _ in range(2)]
+        capture.encoder1 = AsyncVideoEncoder(writers[0], max_queue_size=4)
+        capture.encoder2 = AsyncVideoEncoder(writers[1], max_queue_size=4)
+        capture.encoder1.start()
+        capture.encoder2.start()
+        capture.is_recording = True
+        capture.running = True
+
+        loop = threading.Thread(target=capture.run)
+        loop.start()
+        time.sleep(1.5)
+        capture.running = False
+        loop.join(timeout=2)
+        capture.is_recording = False
+        capture._close_encoders()
+
+        stats = capture.get_performance_stats()
+        self.assertEqual(stats['capture_stalls'], 0)
+        for name in ('camera1', 'camera2'):
+            encoder = stats['encoders'][name]
+            self.assertGreater(encoder['frames_submitted'], 20)
+            self.assertGreater(encoder['frames_dropped'], 0)
+            self.assertEqual(encoder['frames_queued'], 0)
+        self.assertEqual([writer.released for writer in writers], [1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
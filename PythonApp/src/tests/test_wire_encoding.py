@@ -0,0 +1,259 @@
+"""
+Tests for the negotiated wire encodings
+
+Covers encoding and decoding every schema message type, schema validation of
+decoded messages, the handshake negotiation and device servers switching a
+connection to MessagePack.
+
+Author: Multi-Sensor Recording System
+Date: 2025-08-05
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import unittest
+
+from PyQt5.QtCore import Qt
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from network.device_server import (
+    SERVER_MODE_ASYNCIO,
+    SERVER_MODE_THREADED,
+    JsonSocketServer,
+)
+from network.pc_server import PCServer, StatusMessage
+from protocol.handshake_manager import HandshakeManager
+from protocol.schema_utils import get_schema_manager
+from protocol.wire_encoding import (
+    ENCODING_CBOR,
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    MSGPACK_AVAILABLE,
+    UnsupportedEncodingError,
+    available_encodings,
+    decode_message,
+    detect_encoding,
+    encode_message,
+)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _send(sock, message, encoding=ENCODING_JSON):
+    payload = encode_message(message, encoding)
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+def _receive(sock):
+    length = struct.unpack(">I", sock.recv(4, socket.MSG_WAITALL))[0]
+    return sock.recv(length, socket.MSG_WAITALL)
+
+
+class TestWireEncoding(unittest.TestCase):
+    """Test suite for encode_message and decode_message"""
+
+    def setUp(self):
+        self.schema_manager = get_schema_manager()
+        self.messages = [
+            dict(self.schema_manager.get_message_template(message_type), timestamp=1722300000123)
+            for message_type in self.schema_manager.get_valid_message_types()
+        ]
+
+    def test_json_is_always_available(self):
+        """JSON is the fallback in every installation"""
+        self.assertEqual(available_encodings()[-1], ENCODING_JSON)
+
+    def test_round_trip_and_validation(self):
+        """Every schema message decodes unchanged and validates alike in each encoding"""
+        for encoding in available_encodings():
+            for message in self.messages:
+                with self.subTest(encoding=encoding, type=message["type"]):
+                    data = encode_message(message, encoding)
+                    self.assertEqual(detect_encoding(data), encoding)
+                    decoded = decode_message(memoryview(data))
+                    self.assertEqual(decoded, message)
+                    self.assertEqual(
+                        self.schema_manager.validate_message(decoded),
+                        self.schema_manager.validate_message(message),
+                    )
+
+    def test_invalid_message_fails_validation_in_every_encoding(self):
+        """Schema violations are caught after decoding binary messages too"""
+        invalid = {"type": "start_record", "timestamp": 1}
+        for encoding in available_encodings():
+            with self.subTest(encoding=encoding):
+                decoded = decode_message(encode_message(invalid, encoding))
+                self.assertFalse(self.schema_manager.validate_message(decoded))
+
+    def test_malformed_messages(self):
+        """Truncated messages raise ValueError in every encoding"""
+        message = {"type": "status", "battery": 80}
+        for encoding in available_encodings():
+            with self.subTest(encoding=encoding):
+                with self.assertRaises(ValueError):
+                    decode_message(encode_message(message, encoding)[:-1])
+
+    def test_unknown_encoding(self):
+        """Encoding in an unknown encoding is rejected"""
+        with self.assertRaises(UnsupportedEncodingError):
+            encode_message({"type": "status"}, "xml")
+
+
+class TestEncodingNegotiation(unittest.TestCase):
+    """Test encoding negotiation in HandshakeManager"""
+
+    def setUp(self):
+        self.manager = HandshakeManager()
+
+    def test_defaults_to_json(self):
+        """Clients that offer nothing or nothing shared get JSON"""
+        self.assertEqual(self.manager.negotiate_encoding(None), ENCODING_JSON)
+        self.assertEqual(self.manager.negotiate_encoding(["xml"]), ENCODING_JSON)
+
+    def test_server_preference_wins(self):
+        """The server's most preferred shared encoding is chosen"""
+        self.manager.encodings = [ENCODING_CBOR, ENCODING_MSGPACK, ENCODING_JSON]
+        self.assertEqual(
+            self.manager.negotiate_encoding([ENCODING_MSGPACK, ENCODING_CBOR]),
+            ENCODING_CBOR,
+        )
+
+    def test_handshake_messages_validate(self):
+        """Handshake and acknowledgment with encodings match the schema"""
+        handshake = self.manager._create_handshake_message()
+        self.assertEqual(handshake["encodings"], self.manager.encodings)
+        self.assertTrue(self.manager.process_handshake(handshake)[0])
+
+        encoding = self.manager.negotiate_encoding(handshake["encodings"])
+        ack = self.manager.create_handshake_ack(True, encoding=encoding)
+        self.assertTrue(self.manager.process_handshake_ack(ack))
+        self.assertEqual(self.manager.get_ack_encoding(ack), encoding)
+        self.assertEqual(self.manager.get_ack_encoding({"type": "handshake_ack"}), ENCODING_JSON)
+
+
+@unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack not installed")
+class TestJsonSocketServerEncoding(unittest.TestCase):
+    """Test MessagePack connections to JsonSocketServer"""
+
+    server_mode = SERVER_MODE_THREADED
+
+    def setUp(self):
+        self.port = _free_port()
+        self.server = JsonSocketServer(
+            host="127.0.0.1", port=self.port, server_mode=self.server_mode
+        )
+        self.server_thread = threading.Thread(target=self.server.run, daemon=True)
+        self.server_thread.start()
+        self.assertTrue(_wait_for(lambda: self.server.running))
+        self.sockets = []
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+        self.server.stop_server()
+        self.server_thread.join(timeout=5)
+
+    def connect(self, device_id, encodings):
+        sock = socket.create_connection(("127.0.0.1", self.port))
+        sock.settimeout(5.0)
+        self.sockets.append(sock)
+        hello = {"type": "hello", "device_id": device_id, "capabilities": []}
+        if encodings is not None:
+            hello["encodings"] = encodings
+        _send(sock, hello)
+        return sock
+
+    def test_msgpack_connection(self):
+        """A device offering MessagePack is acknowledged and then spoken to in it"""
+        statuses = []
+        self.server.status_received.connect(
+            lambda device_id, status: statuses.append(status["battery"]),
+            Qt.DirectConnection,
+        )
+        sock = self.connect("PackedDevice", [ENCODING_MSGPACK, ENCODING_JSON])
+
+        ack = json.loads(_receive(sock))
+        self.assertEqual(ack["type"], "handshake_ack")
+        self.assertEqual(ack["encoding"], ENCODING_MSGPACK)
+
+        _send(sock, {"type": "status", "battery": 42}, ENCODING_MSGPACK)
+        self.assertTrue(_wait_for(lambda: statuses == [42]))
+
+        self.assertTrue(self.server.send_command("PackedDevice", {"type": "start_record"}))
+        payload = _receive(sock)
+        self.assertEqual(detect_encoding(payload), ENCODING_MSGPACK)
+        self.assertEqual(decode_message(payload), {"type": "start_record"})
+
+    def test_legacy_device_stays_json(self):
+        """A device that offers no encodings gets no acknowledgment and JSON"""
+        sock = self.connect("LegacyDevice", None)
+        self.assertTrue(_wait_for(lambda: self.server.is_device_connected("LegacyDevice")))
+        self.assertTrue(self.server.send_command("LegacyDevice", {"type": "start_record"}))
+        self.assertEqual(json.loads(_receive(sock)), {"type": "start_record"})
+
+
+class TestJsonSocketServerEncodingAsyncio(TestJsonSocketServerEncoding):
+    """Test MessagePack connections to JsonSocketServer in asyncio mode"""
+
+    server_mode = SERVER_MODE_ASYNCIO
+
+
+@unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack not installed")
+class TestPCServerEncoding(unittest.TestCase):
+    """Test MessagePack connections to PCServer"""
+
+    def setUp(self):
+        self.port = _free_port()
+        self.server = PCServer(port=self.port)
+        # stop() waits for the heartbeat monitor to wake up
+        self.server.heartbeat_interval = 0.1
+        self.assertTrue(self.server.start())
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_msgpack_connection(self):
+        """Messages in both directions use the negotiated encoding"""
+        received = []
+        self.server.add_message_callback(lambda device_id, message: received.append(message))
+        with socket.create_connection(("127.0.0.1", self.port)) as sock:
+            sock.settimeout(5.0)
+            _send(
+                sock,
+                {"type": "hello", "device_id": "phone", "capabilities": [], "encodings": [ENCODING_MSGPACK]},
+            )
+            self.assertEqual(json.loads(_receive(sock))["encoding"], ENCODING_MSGPACK)
+
+            _send(sock, {"type": "status", "battery": 77}, ENCODING_MSGPACK)
+            self.assertTrue(_wait_for(lambda: len(received) == 2))
+            self.assertIsInstance(received[1], StatusMessage)
+            self.assertEqual(received[1].battery, 77)
+
+            self.assertTrue(self.server.send_message("phone", StatusMessage(battery=5)))
+            payload = _receive(sock)
+            self.assertEqual(detect_encoding(payload), ENCODING_MSGPACK)
+            self.assertEqual(decode_message(payload)["battery"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
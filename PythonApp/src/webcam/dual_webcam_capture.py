@@ -21,17 +21,23 @@ import numpy as np
 import os
 import threading
 import time
+from collections import deque
 from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtGui import QPixmap
 from datetime import datetime
 from typing import Optional, Dict, List, Tuple, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
 
 # Import centralized logging
+from config.webcam_config import RecordingConfig
 from utils.logging_config import get_logger
 from webcam.advanced_sync_algorithms import AdaptiveSynchronizer, SynchronizationStrategy
 from webcam.cv_preprocessing_pipeline import AdvancedROIDetector, PhysiologicalSignalExtractor, ROIDetectionMethod, SignalExtractionMethod
+from webcam.ffmpeg_writer import create_video_writer
+from webcam.frame_pool import FrameBuffer, FramePool
+from webcam.preview_renderer import PreviewRenderer, PreviewWorker
+from webcam.video_encoder import AsyncVideoEncoder, QueuePolicy
 
 # Get logger for this module
 logger = get_logger(__name__)
@@ -63,6 +69,247 @@ class CameraStatus:
     temperature: Optional[float]  # For thermal monitoring if available
 
 
+@dataclass
+class TimestampedFrame:
+    """A frame captured by one camera with its capture timestamp"""
+
+    timestamp: float
+    sequence: int
+    frame: np.ndarray
+    buffer: Optional[FrameBuffer] = None
+
+    def release(self):
+        """Return the frame's pooled buffer, if any."""
+        if self.buffer is not None:
+            self.buffer.release()
+
+
+@dataclass
+class PairingStats:
+    """Statistics of the timestamp pairing stage"""
+
+    pairs: int = 0
+    unmatched: Dict[int, int] = field(default_factory=lambda: {1: 0, 2: 0})
+    overwritten: Dict[int, int] = field(default_factory=lambda: {1: 0, 2: 0})
+    skew_ms: deque = field(default_factory=lambda: deque(maxlen=1000))
+    first_pair_time: Optional[float] = None
+    last_pair_time: Optional[float] = None
+
+
+class FramePairer:
+    """
+    Pairs frames of two independently captured cameras by nearest timestamp.
+
+    Each camera's capture thread pushes frames into its own ring buffer. The
+    oldest frames of both buffers are matched as a merge of two time-ordered
+    streams: the older head is dropped while the next frame of its camera is
+    at least as close to the other head, so every frame is used at most once
+    and the faster camera's surplus frames are dropped.
+    """
+
+    def __init__(self,
+                 ring_size: int = 8,
+                 max_wait_s: float = 0.1,
+                 max_skew_ms: float = 100.0):
+        """
+        Initialize the frame pairer.
+
+        Args:
+            ring_size: Frames buffered per camera before the oldest is overwritten
+            max_wait_s: Longest a frame waits for a closer frame from the other camera
+            max_skew_ms: Frames further apart than this are never paired
+        """
+        self.max_wait_s = max_wait_s
+        self.max_skew_s = max_skew_ms / 1000.0
+        self.buffers = {1: deque(maxlen=ring_size), 2: deque(maxlen=ring_size)}
+        self.condition = threading.Condition()
+        self.stats = PairingStats()
+
+    def push(self, camera: int, frame: np.ndarray, timestamp: float, sequence: int,
+             frame_buffer: Optional[FrameBuffer] = None):
+        """
+        Add a captured frame to a camera's ring buffer (called by capture threads).
+
+        The pairer takes over the reference to frame_buffer and releases it if
+        the frame is dropped; a paired frame's buffer is owned by the caller
+        of next_pair.
+        """
+        with self.condition:
+            buffer = self.buffers[camera]
+            if len(buffer) == buffer.maxlen:
+                self.stats.overwritten[camera] += 1
+                buffer.popleft().release()
+            buffer.append(TimestampedFrame(timestamp, sequence, frame, frame_buffer))
+            self.condition.notify()
+
+    def next_pair(self, timeout: float = 0.1) -> Optional[Tuple[TimestampedFrame, TimestampedFrame]]:
+        """
+        Wait for the next matched pair of frames.
+
+        Args:
+            timeout: Longest time to wait in seconds
+
+        Returns:
+            tuple: (camera1_frame, camera2_frame), or None if no pair is ready
+        """
+        deadline = time.time() + timeout
+        with self.condition:
+            while True:
+                pair, wait = self._match()
+                if pair is not None:
+                    return pair
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(min(remaining, wait) if wait else remaining)
+
+    def _match(self) -> Tuple[Optional[Tuple[TimestampedFrame, TimestampedFrame]], Optional[float]]:
+        """Match the buffer heads; returns the pair or how long to wait for one."""
+        buffer1, buffer2 = self.buffers[1], self.buffers[2]
+        while buffer1 and buffer2:
+            head1, head2 = buffer1[0], buffer2[0]
+            older, newer = (1, head2) if head1.timestamp <= head2.timestamp else (2, head1)
+            older_buffer = self.buffers[older]
+            skew = abs(head1.timestamp - head2.timestamp)
+
+            if len(older_buffer) > 1:
+                # Drop the older head if its camera's next frame is no further away
+                if abs(older_buffer[1].timestamp - newer.timestamp) <= skew:
+                    older_buffer.popleft().release()
+                    self.stats.unmatched[older] += 1
+                    continue
+            else:
+                waited = time.time() - newer.timestamp
+                if waited < self.max_wait_s:
+                    # A closer frame from the older camera may still arrive
+                    return None, self.max_wait_s - waited
+
+            if skew > self.max_skew_s:
+                older_buffer.popleft().release()
+                self.stats.unmatched[older] += 1
+                continue
+
+            buffer1.popleft()
+            buffer2.popleft()
+            self._record_pair(head1, head2)
+            return (head1, head2), None
+
+        return None, None
+
+    def _record_pair(self, frame1: TimestampedFrame, frame2: TimestampedFrame):
+        """Update pairing statistics with a new pair."""
+        now = time.time()
+        self.stats.pairs += 1
+        self.stats.skew_ms.append((frame1.timestamp - frame2.timestamp) * 1000)
+        if self.stats.first_pair_time is None:
+            self.stats.first_pair_time = now
+        self.stats.last_pair_time = now
+
+    def clear(self):
+        """Drop all buffered frames."""
+        with self.condition:
+            for buffer in self.buffers.values():
+                while buffer:
+                    buffer.popleft().release()
+
+    def get_statistics(self) -> Dict:
+        """
+        Get pairing statistics.
+
+        Returns:
+            dict: Pair count, paired FPS, skew distribution and dropped frames
+        """
+        with self.condition:
+            stats = self.stats
+            skews = sorted(abs(skew) for skew in stats.skew_ms)
+            elapsed = ((stats.last_pair_time - stats.first_pair_time)
+                       if stats.pairs > 1 else 0.0)
+
+            def percentile(fraction):
+                return skews[min(int(len(skews) * fraction), len(skews) - 1)] if skews else 0.0
+
+            return {
+                'pairs': stats.pairs,
+                'paired_fps': (stats.pairs - 1) / elapsed if elapsed > 0 else 0.0,
+                'skew_ms_mean': float(np.mean(stats.skew_ms)) if skews else 0.0,
+                'skew_ms_p50': percentile(0.5),
+                'skew_ms_p95': percentile(0.95),
+                'skew_ms_max': skews[-1] if skews else 0.0,
+                'unmatched_frames': dict(stats.unmatched),
+                'overwritten_frames': dict(stats.overwritten),
+            }
+
+
+class CameraCaptureThread(threading.Thread):
+    """
+    Captures frames from one camera into a FramePairer.
+
+    Frames are timestamped as soon as grab() returns, before the slower
+    retrieve() decodes them, so the timestamp is close to the exposure time.
+    Frames are decoded in place into buffers of the camera's FramePool.
+    """
+
+    def __init__(self, camera: int, capture, pairer: FramePairer, max_failures: int = 5,
+                 pool: Optional[FramePool] = None):
+        """
+        Initialize a capture thread.
+
+        Args:
+            camera: Camera number (1 or 2)
+            capture: Opened cv2.VideoCapture, or any object with read()
+            pairer: Frame pairer receiving the captured frames
+            max_failures: Consecutive failed captures before the thread stops
+            pool: Frame buffer pool of the camera
+        """
+        super().__init__(name=f"CameraCapture-{camera}", daemon=True)
+        self.camera = camera
+        self.capture = capture
+        self.pairer = pairer
+        self.pool = pool or FramePool()
+        self.max_failures = max_failures
+        self.use_grab = hasattr(capture, 'grab') and hasattr(capture, 'retrieve')
+        self.frames_captured = 0
+        self.error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """Capture frames until stopped or the camera fails."""
+        failures = 0
+        while not self._stop_event.is_set():
+            try:
+                if self.use_grab:
+                    ok = self.capture.grab()
+                    timestamp = time.time()
+                    frame_buffer = None
+                    if ok:
+                        ok, frame_buffer = self.pool.read(self.capture, retrieve=True)
+                else:
+                    ok, frame_buffer = self.pool.read(self.capture)
+                    timestamp = time.time()
+            except Exception as e:
+                ok, frame_buffer = False, None
+                logger.error(f"Camera {self.camera} capture error: {e}")
+
+            if not ok or frame_buffer is None:
+                failures += 1
+                if failures >= self.max_failures:
+                    self.error = f"Failed to capture frames from camera {self.camera}"
+                    logger.error(self.error)
+                    break
+                continue
+
+            failures = 0
+            self.pairer.push(self.camera, frame_buffer.frame, timestamp,
+                             self.frames_captured, frame_buffer)
+            self.frames_captured += 1
+
+    def stop(self, timeout: float = 1.0):
+        """Stop capturing and wait for the thread to finish."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
 class DualWebcamCapture(QThread):
     """
     Dual webcam capture class for synchronized PC camera recording.
@@ -117,6 +364,8 @@ class DualWebcamCapture(QThread):
         self.cap2: Optional[cv2.VideoCapture] = None
         self.writer1: Optional[cv2.VideoWriter] = None
         self.writer2: Optional[cv2.VideoWriter] = None
+        self.encoder1: Optional[AsyncVideoEncoder] = None
+        self.encoder2: Optional[AsyncVideoEncoder] = None
         
         # State management
         self.is_recording = False
@@ -125,9 +374,13 @@ class DualWebcamCapture(QThread):
         
         # Recording parameters
         self.recording_codec = cv2.VideoWriter_fourcc(*'mp4v')
+        # Backend and ffmpeg encoder settings; None records with cv2.VideoWriter
+        self.recording_config: Optional[RecordingConfig] = None
         self.current_session_id: Optional[str] = None
         self.recording_start_time: Optional[float] = None
         self.output_directory = "recordings/dual_webcam"
+        self.encoder_queue_size = 32
+        self.encoder_policy = QueuePolicy.DROP_OLDEST
         
         # Advanced Synchronization
         self.frame_counter = 0
@@ -135,6 +388,10 @@ class DualWebcamCapture(QThread):
         self.sync_threshold_ms = 16.67  # ~1 frame at 60fps tolerance
         self.frame_sync_buffer: List[DualFrameData] = []
         self.max_sync_buffer_size = 10
+
+        # Per-camera capture threads and timestamp pairing
+        self.frame_pairer = FramePairer(max_wait_s=self.frame_interval)
+        self.capture_threads: List[CameraCaptureThread] = []
         
         # Initialize advanced synchronization algorithms
         self.synchronizer = AdaptiveSynchronizer(
@@ -146,7 +403,17 @@ class DualWebcamCapture(QThread):
         # Frame processing and threading
         self.frame_lock = threading.Lock()
         self.last_frames = {'camera1': None, 'camera2': None}
+        # Pooled frame buffers, shared read-only by preview, recording and physio
+        self.frame_pools = {'camera1': FramePool(), 'camera2': FramePool()}
+        self._last_frame_buffers: Tuple[TimestampedFrame, ...] = ()
         self.last_sync_quality = 1.0
+        # Preview rendering into reused per-camera buffers, on a worker thread unless disabled
+        self.preview_renderers = {
+            'camera1': PreviewRenderer(max_width=640, max_height=360),
+            'camera2': PreviewRenderer(max_width=640, max_height=360),
+        }
+        self.threaded_preview = True
+        self.preview_worker: Optional[PreviewWorker] = None
         
         # Advanced Computer Vision Pipeline
         self.roi_detector = AdvancedROIDetector(
@@ -175,6 +442,7 @@ class DualWebcamCapture(QThread):
             'frames_processed': 0,
             'sync_violations': 0,
             'dropped_frames': 0,
+            'capture_stalls': 0,
             'average_processing_time_ms': 0.0
         }
         
@@ -364,18 +632,32 @@ class DualWebcamCapture(QThread):
             
             # Initialize video writers with identical settings
             resolution = self.camera1_status.resolution
-            self.writer1 = cv2.VideoWriter(
+            self.writer1 = create_video_writer(
                 self.recording_filepath1, self.recording_codec, 
-                self.recording_fps, resolution
+                self.recording_fps, resolution, self.recording_config
             )
-            self.writer2 = cv2.VideoWriter(
+            self.writer2 = create_video_writer(
                 self.recording_filepath2, self.recording_codec,
-                self.recording_fps, resolution
+                self.recording_fps, resolution, self.recording_config
             )
             
             if not (self.writer1.isOpened() and self.writer2.isOpened()):
+                # Stop a writer that did open, e.g. an ffmpeg process
+                self.writer1.release()
+                self.writer2.release()
+                self.writer1 = self.writer2 = None
                 self.error_occurred.emit("Could not initialize video writers")
                 return False
+            
+            # Encode each file on its own worker so a slow write never stalls capture
+            self.encoder1 = AsyncVideoEncoder(
+                self.writer1, self.encoder_queue_size, self.encoder_policy, name="Camera1Encoder"
+            )
+            self.encoder2 = AsyncVideoEncoder(
+                self.writer2, self.encoder_queue_size, self.encoder_policy, name="Camera2Encoder"
+            )
+            self.encoder1.start()
+            self.encoder2.start()
                 
             # Start recording state
             self.is_recording = True
@@ -425,14 +707,8 @@ class DualWebcamCapture(QThread):
             duration = (time.time() - self.recording_start_time 
                        if self.recording_start_time else 0)
             
-            # Release video writers
-            if self.writer1:
-                self.writer1.release()
-                self.writer1 = None
-                
-            if self.writer2:
-                self.writer2.release()
-                self.writer2 = None
+            # Write queued frames and release video writers
+            self._close_encoders()
                 
             # Store filepaths before clearing
             filepath1 = self.recording_filepath1
@@ -459,91 +735,136 @@ class DualWebcamCapture(QThread):
             return None, None
 
     def run(self):
-        """Main thread loop for synchronized dual camera capture."""
+        """Main thread loop pairing frames of the per-camera capture threads."""
         last_preview_time = 0
         last_recording_time = 0
         
         logger.info("Starting dual camera capture thread")
+        self._start_capture_threads()
+        if self.threaded_preview:
+            self.preview_worker = PreviewWorker(
+                [self.preview_renderers['camera1'], self.preview_renderers['camera2']],
+                self.dual_frame_ready.emit, name="DualPreview"
+            )
+            self.preview_worker.start()
         
-        while self.running:
-            try:
-                current_time = time.time()
-                process_start_time = current_time
-                
-                # Capture frames from both cameras simultaneously
-                ret1, frame1 = self.cap1.read()
-                capture_timestamp1 = time.time()
-                
-                ret2, frame2 = self.cap2.read()
-                capture_timestamp2 = time.time()
-                
-                if not (ret1 and ret2):
-                    self.error_occurred.emit("Failed to capture frames from one or both cameras")
-                    break
-                
-                # Use advanced synchronization processing
-                frame_data = self._process_advanced_synchronization(
-                    frame1, frame2, capture_timestamp1, capture_timestamp2
-                )
-                
-                # Update sync quality and statistics
-                sync_quality = frame_data.sync_quality
-                if sync_quality < 0.8:
-                    self.performance_stats['sync_violations'] += 1
+        try:
+            while self.running:
+                try:
+                    pair = self.frame_pairer.next_pair(timeout=0.1)
+                    if pair is None:
+                        failed = [thread.error for thread in self.capture_threads if thread.error]
+                        if failed:
+                            self.error_occurred.emit(failed[0])
+                            break
+                        continue
                     
-                self.last_sync_quality = sync_quality
-                self.sync_status_changed.emit(sync_quality)
-                
-                # Store frames for preview
-                with self.frame_lock:
-                    self.last_frames['camera1'] = frame_data.camera1_frame.copy()
-                    self.last_frames['camera2'] = frame_data.camera2_frame.copy()
-                
-                # Write frames to video files if recording
-                if (self.is_recording and self.writer1 and self.writer2 and
-                    (current_time - last_recording_time) >= self.recording_interval):
+                    current_time = time.time()
+                    process_start_time = current_time
+                    captured1, captured2 = pair
                     
-                    self.writer1.write(frame_data.camera1_frame)
-                    self.writer2.write(frame_data.camera2_frame)
-                    last_recording_time = current_time
+                    # Use advanced synchronization processing
+                    frame_data = self._process_advanced_synchronization(
+                        captured1.frame, captured2.frame,
+                        captured1.timestamp, captured2.timestamp
+                    )
                     
-                    # Update frame counters
-                    self.camera1_status.frames_captured += 1
-                    self.camera2_status.frames_captured += 1
-                    self.frame_counter += 1
-                
-                # Emit preview frames at specified FPS
-                if (self.is_previewing and 
-                    (current_time - last_preview_time) >= self.frame_interval):
+                    # Update sync quality and statistics
+                    sync_quality = frame_data.sync_quality
+                    if sync_quality < 0.8:
+                        self.performance_stats['sync_violations'] += 1
+                        
+                    self.last_sync_quality = sync_quality
+                    self.sync_status_changed.emit(sync_quality)
                     
-                    pixmap1 = self._frame_to_pixmap(frame_data.camera1_frame)
-                    pixmap2 = self._frame_to_pixmap(frame_data.camera2_frame)
+                    # Keep the pair's buffers for preview instead of copying the frames
+                    with self.frame_lock:
+                        previous = self._last_frame_buffers
+                        self._last_frame_buffers = pair
+                        self.last_frames['camera1'] = frame_data.camera1_frame
+                        self.last_frames['camera2'] = frame_data.camera2_frame
+                    for captured in previous:
+                        captured.release()
                     
-                    if pixmap1 and pixmap2:
-                        self.dual_frame_ready.emit(pixmap1, pixmap2)
+                    # Queue frames for the encoders if recording
+                    encoder1, encoder2 = self.encoder1, self.encoder2
+                    if (self.is_recording and encoder1 and encoder2 and
+                        (current_time - last_recording_time) >= self.recording_interval):
                         
-                    last_preview_time = current_time
-                
-                # Update performance statistics
-                processing_time_ms = (time.time() - process_start_time) * 1000
-                self.performance_stats['frames_processed'] += 1
-                self.performance_stats['average_processing_time_ms'] = (
-                    (self.performance_stats['average_processing_time_ms'] * 
-                     (self.performance_stats['frames_processed'] - 1) + processing_time_ms) /
-                    self.performance_stats['frames_processed']
-                )
-                
-                # Small delay to prevent excessive CPU usage
-                time.sleep(0.001)
-                
-            except Exception as e:
-                error_msg = f"Error in dual camera capture loop: {str(e)}"
-                self.error_occurred.emit(error_msg)
-                logger.error(error_msg)
-                break
+                        encoder1.submit(captured1.buffer or frame_data.camera1_frame)
+                        encoder2.submit(captured2.buffer or frame_data.camera2_frame)
+                        last_recording_time = current_time
+                        
+                        # Update frame counters
+                        self.camera1_status.frames_captured += 1
+                        self.camera2_status.frames_captured += 1
+                        self.frame_counter += 1
+                    
+                    # Emit preview frames at specified FPS
+                    if (self.is_previewing and 
+                        (current_time - last_preview_time) >= self.frame_interval):
+                        
+                        if self.preview_worker:
+                            self.preview_worker.submit(
+                                captured1.buffer or frame_data.camera1_frame,
+                                captured2.buffer or frame_data.camera2_frame
+                            )
+                        else:
+                            pixmap1 = self._render_preview('camera1', frame_data.camera1_frame)
+                            pixmap2 = self._render_preview('camera2', frame_data.camera2_frame)
+                            
+                            if pixmap1 and pixmap2:
+                                self.dual_frame_ready.emit(pixmap1, pixmap2)
+                            
+                        last_preview_time = current_time
+                    
+                    # Update performance statistics
+                    processing_time_ms = (time.time() - process_start_time) * 1000
+                    if processing_time_ms > self.recording_interval * 1000:
+                        self.performance_stats['capture_stalls'] += 1
+                    self.performance_stats['frames_processed'] += 1
+                    self.performance_stats['average_processing_time_ms'] = (
+                        (self.performance_stats['average_processing_time_ms'] * 
+                         (self.performance_stats['frames_processed'] - 1) + processing_time_ms) /
+                        self.performance_stats['frames_processed']
+                    )
+                    self.performance_stats['dropped_frames'] = sum(
+                        self.frame_pairer.stats.unmatched.values()
+                    )
+                    
+                except Exception as e:
+                    error_msg = f"Error in dual camera capture loop: {str(e)}"
+                    self.error_occurred.emit(error_msg)
+                    logger.error(error_msg)
+                    break
+        finally:
+            self._stop_capture_threads()
+            if self.preview_worker:
+                self.preview_worker.stop()
                 
         logger.info("Dual camera capture thread ended")
 
+    def _start_capture_threads(self):
+        """Start one capture thread per camera feeding the frame pairer."""
+        self.frame_pairer.clear()
+        self.capture_threads = [
+            CameraCaptureThread(1, self.cap1, self.frame_pairer, pool=self.frame_pools['camera1']),
+            CameraCaptureThread(2, self.cap2, self.frame_pairer, pool=self.frame_pools['camera2']),
+        ]
+        for thread in self.capture_threads:
+            thread.start()
+
+    def _stop_capture_threads(self):
+        """Stop the per-camera capture threads."""
+        for thread in self.capture_threads:
+            thread.stop()
+        self.capture_threads = []
+        self.frame_pairer.clear()
+
+    def get_pairing_statistics(self) -> Dict:
+        """Get paired frame rate, per-pair skew distribution and dropped frames."""
+        return self.frame_pairer.get_statistics()
+
     def _frame_to_pixmap(self, frame: np.ndarray, max_width: int = 640, max_height: int = 360) -> Optional[QPixmap]:
         """
         Convert OpenCV frame to QPixmap for GUI display.
@@ -557,36 +878,21 @@ class DualWebcamCapture(QThread):
             QPixmap: Converted pixmap for display, or None if conversion fails
         """
         try:
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Get frame dimensions
-            height, width, channels = rgb_frame.shape
-            
-            # Calculate scaling to fit within max dimensions while maintaining aspect ratio
-            scale_w = max_width / width
-            scale_h = max_height / height
-            scale = min(scale_w, scale_h, 1.0)  # Don't upscale
-            
-            if scale < 1.0:
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                rgb_frame = cv2.resize(rgb_frame, (new_width, new_height))
-                height, width = new_height, new_width
-                
-            # Convert to QImage
-            bytes_per_line = channels * width
-            q_image = QImage(
-                rgb_frame.data, width, height, bytes_per_line, QImage.Format_RGB888
-            )
-            
-            # Convert to QPixmap
-            return QPixmap.fromImage(q_image)
+            # Resized before colour conversion, so only preview sized pixels are converted
+            return PreviewRenderer(max_width, max_height).render_pixmap(frame)
             
         except Exception as e:
             logger.error(f"Error converting frame to pixmap: {str(e)}")
             return None
 
+    def _render_preview(self, camera: str, frame: np.ndarray) -> Optional[QPixmap]:
+        """Render a camera's preview pixmap in the capture loop, reusing its preview buffers."""
+        try:
+            return self.preview_renderers[camera].render_pixmap(frame)
+        except Exception as e:
+            logger.error(f"Error converting frame to pixmap: {str(e)}")
+            return None
+
     def get_master_timestamp(self) -> float:
         """Get current master timestamp for synchronization."""
         return time.time()
@@ -596,8 +902,57 @@ class DualWebcamCapture(QThread):
         return self.last_sync_quality
 
     def get_performance_stats(self) -> Dict:
-        """Get performance statistics."""
-        return self.performance_stats.copy()
+        """Get performance statistics, with encoder counters of the current or last recording."""
+        stats = self.performance_stats.copy()
+        stats['frame_pools'] = {
+            camera: pool.get_statistics() for camera, pool in self.frame_pools.items()
+        }
+        if self.preview_worker:
+            stats['preview'] = self.preview_worker.get_statistics()
+        else:
+            stats['preview'] = {
+                camera: renderer.get_statistics() for camera, renderer in self.preview_renderers.items()
+            }
+        if self.encoder1 and self.encoder2:
+            stats['encoders'] = {
+                'camera1': self.encoder1.get_statistics(),
+                'camera2': self.encoder2.get_statistics(),
+            }
+        return stats
+
+    def set_encoder_policy(self, policy: QueuePolicy, max_queue_size: int = 32):
+        """
+        Set how frames are queued for the encoders, applied to the next recording.
+        
+        Args:
+            policy: What to do when an encoder queue is full
+            max_queue_size: Frames queued per encoder before the policy applies
+        """
+        self.encoder_policy = QueuePolicy(policy)
+        self.encoder_queue_size = max_queue_size
+        logger.info(f"Encoder policy set to {self.encoder_policy.value}, queue size {max_queue_size}")
+
+    def set_recording_config(self, recording_config: Optional[RecordingConfig]):
+        """
+        Set the recording backend of both cameras, applied to the next recording.
+        
+        Args:
+            recording_config: Configuration from WebcamConfigManager; None
+                records with cv2.VideoWriter
+        """
+        self.recording_config = recording_config
+        backend = recording_config.backend.value if recording_config else "opencv"
+        logger.info(f"Recording backend set to {backend}")
+
+    def _close_encoders(self, timeout: Optional[float] = None):
+        """Write frames still queued and release both video writers."""
+        for encoder, writer in ((self.encoder1, self.writer1), (self.encoder2, self.writer2)):
+            if encoder:
+                encoder.close(timeout)
+            elif writer:
+                writer.release()
+        self.writer1 = None
+        self.writer2 = None
         
     def get_latest_frame(self) -> Optional[DualFrameData]:
         """Get the latest synchronized frame data."""
@@ -703,13 +1058,7 @@ class DualWebcamCapture(QThread):
                 self.cap2 = None
                 
             # Release video writers
-            if self.writer1:
-                self.writer1.release()
-                self.writer1 = None
-                
-            if self.writer2:
-                self.writer2.release()
-                self.writer2 = None
+            self._close_encoders(timeout=1.0)
                 
             logger.info("DualWebcamCapture cleanup completed")
             
@@ -938,8 +1287,8 @@ class DualWebcamCapture(QThread):
             return DualFrameData(
                 timestamp=min(timestamp1, timestamp2),
                 frame_id=self.frame_counter,
-                camera1_frame=frame1.copy(),
-                camera2_frame=frame2.copy(),
+                camera1_frame=frame1,
+                camera2_frame=frame2,
                 camera1_timestamp=timestamp1,
                 camera2_timestamp=timestamp2,
                 sync_quality=sync_quality
@@ -0,0 +1,335 @@
+"""
+FFmpeg Video Writer for Multi-Sensor Recording System Controller
+
+This module provides a recording backend that pipes raw BGR frames to an
+ffmpeg subprocess instead of encoding them with cv2.VideoWriter. It gives
+control over the encoder (libx264/libx265 or a hardware encoder), preset,
+CRF, thread count and a lossless mode, and keeps the 4K encode out of the
+Python process.
+
+Frames are written from their own memory to the pipe without an
+intermediate copy. FFmpegVideoWriter has the write/isOpened/release
+interface of cv2.VideoWriter, so it plugs into AsyncVideoEncoder unchanged.
+
+Author: Multi-Sensor Recording System Team
+Date: 2025-07-31
+"""
+
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.webcam_config import CodecValidator, FFmpegCodec, RecordingBackend, RecordingConfig
+
+# Import centralized logging
+from utils.logging_config import get_logger
+
+# Get logger for this module
+logger = get_logger(__name__)
+
+try:
+    import fcntl
+
+    F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+except ImportError:
+    fcntl = None
+    F_SETPIPE_SZ = None
+
+# Pipe capacity requested on Linux, so a 4K frame takes few writes (the default is 64 KiB)
+PIPE_SIZE = 1 << 20
+
+
+class FFmpegVideoWriter:
+    """
+    Video writer encoding frames in an ffmpeg subprocess.
+
+    The process is started by the constructor and reads rawvideo bgr24
+    frames of the configured resolution from its stdin.
+    """
+
+    def __init__(self,
+                 filepath: str,
+                 fps: float,
+                 resolution: Tuple[int, int],
+                 codec: FFmpegCodec = FFmpegCodec.LIBX264,
+                 preset: str = "veryfast",
+                 crf: int = 23,
+                 threads: int = 0,
+                 lossless: bool = False,
+                 ffmpeg_path: str = "ffmpeg"):
+        """
+        Start the ffmpeg process.
+
+        Args:
+            filepath: Output video file
+            fps: Recording frame rate
+            resolution: Frame size (width, height)
+            codec: ffmpeg encoder
+            preset: Encoder speed preset
+            crf: Constant rate factor (or the encoder's constant quality setting)
+            threads: Encoder threads, 0 lets the encoder choose
+            lossless: Encode without quality loss, ignoring crf
+            ffmpeg_path: ffmpeg executable
+        """
+        self.filepath = filepath
+        self.fps = fps
+        self.resolution = tuple(resolution)
+        self.codec = FFmpegCodec(codec)
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.lossless = lossless
+        self.frame_shape = (self.resolution[1], self.resolution[0], 3)
+
+        self.command: List[str] = []
+        self.process: Optional[subprocess.Popen] = None
+        self.error: Optional[str] = None
+        self._stderr = None
+
+        # Statistics
+        self.frames_written = 0
+        self.frames_resized = 0
+        self.bytes_written = 0
+        self.total_write_time = 0.0
+
+        executable = CodecValidator.find_ffmpeg(ffmpeg_path)
+        if not executable:
+            self.error = f"ffmpeg executable not found: {ffmpeg_path}"
+            logger.error(self.error)
+            return
+
+        self.command = build_ffmpeg_command(
+            executable, filepath, fps, self.resolution, self.codec,
+            preset, crf, threads, lossless,
+        )
+        try:
+            # ffmpeg output goes to a file so a full stderr pipe can never block it
+            self._stderr = tempfile.TemporaryFile()
+            # Unbuffered stdin: frames go straight from their memory to the pipe
+            self.process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                stderr=self._stderr, bufsize=0,
+            )
+        except OSError as e:
+            self.error = f"Could not start ffmpeg: {e}"
+            logger.error(self.error)
+            self._close_stderr()
+            return
+
+        if fcntl is not None:
+            try:
+                fcntl.fcntl(self.process.stdin.fileno(), F_SETPIPE_SZ, PIPE_SIZE)
+            except OSError:
+                pass
+
+        logger.info(f"ffmpeg recording started: {' '.join(self.command)}")
+
+    def isOpened(self) -> bool:
+        """Whether the ffmpeg process is running and accepting frames."""
+        return self.process is not None and self.process.poll() is None and self.error is None
+
+    def write(self, frame: np.ndarray):
+        """
+        Write a BGR frame to the encoder.
+
+        Frames of another size are resized to the recording resolution, since
+        ffmpeg reads fixed-size raw frames.
+
+        Raises:
+            IOError: If ffmpeg is not running or exited while writing
+        """
+        if not self.isOpened():
+            raise IOError(self.error or "ffmpeg process is not running")
+
+        if frame.shape != self.frame_shape:
+            frame = cv2.resize(frame, self.resolution, interpolation=cv2.INTER_AREA)
+            self.frames_resized += 1
+        if frame.dtype != np.uint8 or not frame.flags.c_contiguous:
+            frame = np.ascontiguousarray(frame, dtype=np.uint8)
+
+        start = time.perf_counter()
+        view = memoryview(frame).cast("B")
+        try:
+            # An unbuffered pipe may accept part of the frame per write
+            while view:
+                written = self.process.stdin.write(view)
+                view = view[written:]
+        except (BrokenPipeError, OSError) as e:
+            self.error = f"ffmpeg stopped accepting frames: {e} {self._read_stderr()}".strip()
+            raise IOError(self.error)
+
+        self.total_write_time += time.perf_counter() - start
+        self.frames_written += 1
+        self.bytes_written += frame.nbytes
+
+    def release(self, timeout: Optional[float] = None):
+        """
+        Finish the video file and wait for ffmpeg to exit.
+
+        Args:
+            timeout: Longest time to wait for ffmpeg to encode the frames it
+                still buffers; by default wait, since a killed ffmpeg leaves
+                an unplayable file
+        """
+        if self.process is None:
+            return
+
+        process, self.process = self.process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+        try:
+            returncode = process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            returncode = process.wait()
+            self.error = f"ffmpeg did not finish within {timeout}s and was killed"
+
+        if returncode != 0 and not self.error:
+            self.error = f"ffmpeg exited with code {returncode}: {self._read_stderr()}"
+        if self.error:
+            logger.error(self.error)
+        else:
+            logger.info(f"ffmpeg recording finished: {self.filepath} ({self.frames_written} frames)")
+        self._close_stderr()
+
+    def _read_stderr(self) -> str:
+        """Get the tail of ffmpeg's error output."""
+        if self._stderr is None:
+            return ""
+        try:
+            self._stderr.seek(0)
+            return self._stderr.read()[-2000:].decode(errors="replace").strip()
+        except (OSError, ValueError):
+            return ""
+
+    def _close_stderr(self):
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+    def get_statistics(self) -> Dict:
+        """
+        Get writer statistics.
+
+        Returns:
+            dict: Written frames and bytes, resized frames and pipe write time
+        """
+        return {
+            'codec': self.codec.value,
+            'preset': self.preset,
+            'crf': None if self.lossless else self.crf,
+            'lossless': self.lossless,
+            'threads': self.threads,
+            'frames_written': self.frames_written,
+            'frames_resized': self.frames_resized,
+            'bytes_written': self.bytes_written,
+            'average_write_ms': (self.total_write_time / self.frames_written * 1000
+                                 if self.frames_written else 0.0),
+            'error': self.error,
+        }
+
+
+def build_ffmpeg_command(executable: str,
+                         filepath: str,
+                         fps: float,
+                         resolution: Tuple[int, int],
+                         codec: FFmpegCodec = FFmpegCodec.LIBX264,
+                         preset: str = "veryfast",
+                         crf: int = 23,
+                         threads: int = 0,
+                         lossless: bool = False) -> List[str]:
+    """
+    Build the ffmpeg command line encoding raw BGR frames from stdin.
+
+    The preset is given by its x264 name and translated for the encoder.
+
+    Raises:
+        ValueError: If the encoder has no such preset, or lossless encoding
+            is requested from a hardware encoder
+    """
+    codec = FFmpegCodec(codec)
+    encoder_preset = codec.encoder_preset(preset)
+    width, height = resolution
+    command = [
+        executable, "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}",
+        "-r", str(fps), "-i", "-",
+    ]
+
+    if codec == FFmpegCodec.H264_VAAPI:
+        # VAAPI encodes surfaces uploaded to the GPU
+        command += ["-vaapi_device", "/dev/dri/renderD128", "-vf", "format=nv12,hwupload"]
+
+    command += ["-c:v", codec.value]
+
+    if codec in (FFmpegCodec.LIBX264, FFmpegCodec.LIBX265):
+        command += ["-preset", encoder_preset]
+        if lossless:
+            # 4:4:4 keeps full chroma resolution, the rest of the loss is the colour conversion
+            if codec == FFmpegCodec.LIBX264:
+                command += ["-qp", "0"]
+            else:
+                command += ["-x265-params", "lossless=1:log-level=error"]
+            command += ["-pix_fmt", "yuv444p"]
+        else:
+            command += ["-crf", str(crf), "-pix_fmt", "yuv420p"]
+            if codec == FFmpegCodec.LIBX265:
+                command += ["-x265-params", "log-level=error"]
+    else:
+        if lossless:
+            raise ValueError(f"Lossless encoding is not supported with {codec.value}")
+        if codec in (FFmpegCodec.H264_NVENC, FFmpegCodec.HEVC_NVENC):
+            command += ["-preset", encoder_preset, "-rc", "vbr", "-cq", str(crf), "-pix_fmt", "yuv420p"]
+        elif codec == FFmpegCodec.H264_QSV:
+            command += ["-preset", encoder_preset, "-global_quality", str(crf), "-pix_fmt", "nv12"]
+        else:
+            command += ["-qp", str(crf)]
+
+    if threads > 0:
+        command += ["-threads", str(threads)]
+
+    command.append(filepath)
+    return command
+
+
+def create_video_writer(filepath: str,
+                        fourcc: int,
+                        fps: float,
+                        resolution: Tuple[int, int],
+                        recording_config: Optional[RecordingConfig] = None):
+    """
+    Create the video writer for a recording.
+
+    Uses FFmpegVideoWriter when the recording configuration selects the ffmpeg
+    backend and ffmpeg is installed, and cv2.VideoWriter otherwise.
+
+    Args:
+        filepath: Output video file
+        fourcc: cv2.VideoWriter codec for the OpenCV backend
+        fps: Recording frame rate
+        resolution: Frame size (width, height)
+        recording_config: Backend and ffmpeg encoder settings
+
+    Returns:
+        cv2.VideoWriter or FFmpegVideoWriter
+    """
+    if recording_config and recording_config.backend == RecordingBackend.FFMPEG:
+        if CodecValidator.find_ffmpeg():
+            return FFmpegVideoWriter(
+                filepath, fps, resolution,
+                codec=recording_config.ffmpeg_codec,
+                preset=recording_config.preset,
+                crf=recording_config.crf,
+                threads=recording_config.threads,
+                lossless=recording_config.lossless,
+            )
+        logger.warning("ffmpeg not found, recording with cv2.VideoWriter")
+
+    return cv2.VideoWriter(filepath, fourcc, fps, resolution)
@@ -0,0 +1,180 @@
+"""
+Frame Buffer Pool for Multi-Sensor Recording System Controller
+
+This module lets the capture loops decode camera frames into reused buffers
+instead of allocating and copying a new array for every frame. A frame is
+read in place into a pooled FrameBuffer, shared read-only with the preview,
+recording and physiological monitoring consumers, and returned to the pool
+when the last of them releases it.
+
+Author: Multi-Sensor Recording System Team
+Date: 2025-07-31
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Import centralized logging
+from utils.logging_config import get_logger
+
+# Get logger for this module
+logger = get_logger(__name__)
+
+
+class FrameBuffer:
+    """
+    Reference-counted frame buffer owned by a FramePool.
+
+    A buffer starts with one reference held by whoever acquired it. Every
+    additional holder calls retain(), and every holder calls release() when
+    done; the last release returns the buffer to its pool.
+    """
+
+    __slots__ = ("pool", "array", "frame", "_refcount")
+
+    def __init__(self, pool: "FramePool", array: Optional[np.ndarray]):
+        self.pool = pool
+        self.array = array
+        self.frame: Optional[np.ndarray] = None
+        self._refcount = 1
+
+    def set_array(self, array: np.ndarray):
+        """Point the buffer at the frame the camera was read into."""
+        self.array = array
+        # Consumers get a read-only view so none of them can modify a shared frame
+        self.frame = array.view()
+        self.frame.flags.writeable = False
+
+    @property
+    def refcount(self) -> int:
+        """Number of holders of the buffer."""
+        return self._refcount
+
+    def retain(self) -> "FrameBuffer":
+        """Add a holder of the buffer."""
+        with self.pool.lock:
+            if self._refcount <= 0:
+                raise RuntimeError("Cannot retain a released frame buffer")
+            self._refcount += 1
+        return self
+
+    def release(self):
+        """Drop a holder; the last release returns the buffer to the pool."""
+        with self.pool.lock:
+            if self._refcount <= 0:
+                raise RuntimeError("Frame buffer released more often than retained")
+            self._refcount -= 1
+            if self._refcount == 0:
+                self.pool._recycle(self)
+
+
+class FramePool:
+    """
+    Pool of preallocated frame buffers for one camera.
+
+    read() fills a pooled buffer in place through the image argument of
+    cv2.VideoCapture.read/retrieve. The first frame, or a frame of a new
+    size, makes OpenCV allocate a new array, which the pool keeps from then on.
+    """
+
+    def __init__(self, max_free: int = 16):
+        """
+        Initialize the pool.
+
+        Args:
+            max_free: Free buffers kept for reuse; further released buffers are discarded
+        """
+        self.max_free = max_free
+        self.lock = threading.Lock()
+        self._free: List[np.ndarray] = []
+        # Whether the capture accepts an image to read into, learned on first read
+        self._in_place: Optional[bool] = None
+
+        # Statistics
+        self.allocations = 0
+        self.reuses = 0
+        self.in_use = 0
+        self.bytes_allocated = 0
+
+    def acquire(self) -> FrameBuffer:
+        """
+        Take a buffer from the pool.
+
+        Returns:
+            FrameBuffer: Buffer with one reference; its array is None until the pool has one
+        """
+        with self.lock:
+            array = self._free.pop() if self._free else None
+            self.in_use += 1
+        return FrameBuffer(self, array)
+
+    def _recycle(self, buffer: FrameBuffer):
+        """Return a buffer's array to the free list (called with the lock held)."""
+        self.in_use -= 1
+        if buffer.array is not None and len(self._free) < self.max_free:
+            self._free.append(buffer.array)
+        buffer.array = None
+        buffer.frame = None
+
+    def read(self, capture, retrieve: bool = False) -> Tuple[bool, Optional[FrameBuffer]]:
+        """
+        Read the next frame of a capture into a pooled buffer.
+
+        Args:
+            capture: cv2.VideoCapture, or any object with read()/retrieve()
+            retrieve: Call retrieve() after a grab() instead of read()
+
+        Returns:
+            tuple: (success, buffer); the caller owns the buffer's reference
+        """
+        buffer = self.acquire()
+        target = buffer.array
+        reader = capture.retrieve if retrieve else capture.read
+
+        try:
+            if target is not None and self._in_place is not False:
+                try:
+                    ok, image = reader(target)
+                    self._in_place = True
+                except TypeError:
+                    if self._in_place:
+                        raise
+                    # Capture without an image argument; read into new arrays
+                    self._in_place = False
+                    ok, image = reader()
+            else:
+                ok, image = reader()
+        except Exception:
+            buffer.release()
+            raise
+
+        if not ok or image is None:
+            buffer.release()
+            return False, None
+
+        if image is target:
+            self.reuses += 1
+        else:
+            self.allocations += 1
+            self.bytes_allocated += image.nbytes
+        buffer.set_array(image)
+        return True, buffer
+
+    def get_statistics(self) -> Dict:
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: Allocated and reused frames, buffers in use and free
+        """
+        with self.lock:
+            return {
+                'allocations': self.allocations,
+                'reuses': self.reuses,
+                'in_use': self.in_use,
+                'free': len(self._free),
+                'bytes_allocated': self.bytes_allocated,
+                'in_place': bool(self._in_place),
+            }
@@ -0,0 +1,235 @@
+"""
+Asynchronous Video Encoder for Multi-Sensor Recording System Controller
+
+This module moves video encoding off the camera capture loops. Each output
+file gets an encoder worker thread fed by a bounded frame queue, so a slow
+cv2.VideoWriter.write call delays the encoder instead of the next capture.
+
+When the queue is full the configured policy decides what happens:
+- BLOCK: the capture loop waits for space, nothing is dropped
+- DROP_OLDEST: the oldest queued frame is discarded for the new one
+- DROP_NEWEST: the new frame is discarded
+
+Author: Multi-Sensor Recording System Team
+Date: 2025-07-31
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+# Import centralized logging
+from utils.logging_config import get_logger
+from webcam.frame_pool import FrameBuffer
+
+# Get logger for this module
+logger = get_logger(__name__)
+
+
+class QueuePolicy(Enum):
+    """Behaviour of AsyncVideoEncoder.submit when the frame queue is full"""
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+class AsyncVideoEncoder(threading.Thread):
+    """
+    Encoder worker writing queued frames to one video writer.
+
+    The encoder keeps a reference to every submitted frame until it is
+    written, so callers must not modify a frame after submitting it. Pooled
+    FrameBuffers are retained while queued and released once written or dropped.
+    """
+
+    def __init__(self,
+                 writer,
+                 max_queue_size: int = 32,
+                 policy: QueuePolicy = QueuePolicy.DROP_OLDEST,
+                 name: str = "VideoEncoder"):
+        """
+        Initialize the encoder.
+
+        Args:
+            writer: Opened cv2.VideoWriter, or any object with write() and release()
+            max_queue_size: Frames queued before the policy applies
+            policy: What submit does when the queue is full
+            name: Thread name, used in log messages
+        """
+        super().__init__(name=name, daemon=True)
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+
+        self.writer = writer
+        self.max_queue_size = max_queue_size
+        self.policy = QueuePolicy(policy)
+
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._closing = False
+        self._released = False
+        self.error: Optional[str] = None
+
+        # Counters
+        self.frames_submitted = 0
+        self.frames_encoded = 0
+        self.frames_dropped = 0
+        self.max_queue_depth = 0
+        self.blocked_submits = 0
+        self.max_submit_ms = 0.0
+        self.total_encode_time = 0.0
+
+    def submit(self, frame: Union[np.ndarray, FrameBuffer]) -> bool:
+        """
+        Queue a frame for encoding.
+
+        Args:
+            frame: Frame to encode, or a pooled buffer holding it
+
+        Returns:
+            bool: True if the frame was queued, False if it was dropped or the encoder is closed
+        """
+        start = time.perf_counter()
+        with self._condition:
+            if self._closing or self.error:
+                return False
+            self.frames_submitted += 1
+
+            if len(self._queue) >= self.max_queue_size:
+                if self.policy == QueuePolicy.BLOCK:
+                    self.blocked_submits += 1
+                    while (len(self._queue) >= self.max_queue_size
+                           and not self._closing and not self.error):
+                        self._condition.wait()
+                    if self._closing or self.error:
+                        self.frames_dropped += 1
+                        return False
+                elif self.policy == QueuePolicy.DROP_OLDEST:
+                    _release_buffer(self._queue.popleft())
+                    self.frames_dropped += 1
+                else:
+                    self.frames_dropped += 1
+                    self._record_submit_time(start)
+                    return False
+
+            if isinstance(frame, FrameBuffer):
+                frame.retain()
+            self._queue.append(frame)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._condition.notify_all()
+            self._record_submit_time(start)
+            return True
+
+    def _record_submit_time(self, start: float):
+        """Track the longest time submit held up the caller."""
+        self.max_submit_ms = max(self.max_submit_ms, (time.perf_counter() - start) * 1000)
+
+    def run(self):
+        """Write queued frames until closed and drained."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._closing:
+                    self._condition.wait()
+                if not self._queue:
+                    break
+                frame = self._queue.popleft()
+                self._condition.notify_all()
+
+            try:
+                start = time.perf_counter()
+                self.writer.write(frame.frame if isinstance(frame, FrameBuffer) else frame)
+                self.total_encode_time += time.perf_counter() - start
+                self.frames_encoded += 1
+            except Exception as e:
+                with self._condition:
+                    self.error = f"{self.name} failed to write frame: {e}"
+                    self.frames_dropped += 1 + len(self._queue)
+                    self._clear_queue()
+                    self._condition.notify_all()
+                logger.error(self.error)
+                break
+            finally:
+                _release_buffer(frame)
+
+    def close(self, timeout: Optional[float] = None, drain: bool = True):
+        """
+        Stop the encoder and release the writer.
+
+        Args:
+            timeout: Longest time to wait for queued frames to be written
+            drain: Write the frames still queued; if False they are dropped
+        """
+        with self._condition:
+            self._closing = True
+            if not drain:
+                self.frames_dropped += len(self._queue)
+                self._clear_queue()
+            self._condition.notify_all()
+
+        if self.is_alive():
+            self.join(timeout)
+        if self.is_alive():
+            logger.warning(f"{self.name} did not finish writing queued frames")
+            return
+        if self._released:
+            return
+
+        with self._condition:
+            # Left behind by an encoder that was never started or failed
+            self.frames_dropped += len(self._queue)
+            self._clear_queue()
+
+        self._released = True
+        try:
+            self.writer.release()
+        except Exception as e:
+            logger.error(f"{self.name} failed to release writer: {e}")
+
+    def _clear_queue(self):
+        """Drop all queued frames (called with the condition held)."""
+        while self._queue:
+            _release_buffer(self._queue.popleft())
+
+    @property
+    def frames_queued(self) -> int:
+        """Number of frames waiting to be encoded."""
+        return len(self._queue)
+
+    def get_statistics(self) -> Dict:
+        """
+        Get encoder counters.
+
+        Returns:
+            dict: Submitted, encoded, dropped and queued frames and timings, and
+                the writer's statistics if it keeps any
+        """
+        with self._condition:
+            stats = {
+                'policy': self.policy.value,
+                'max_queue_size': self.max_queue_size,
+                'frames_submitted': self.frames_submitted,
+                'frames_encoded': self.frames_encoded,
+                'frames_dropped': self.frames_dropped,
+                'frames_queued': len(self._queue),
+                'max_queue_depth': self.max_queue_depth,
+                'blocked_submits': self.blocked_submits,
+                'max_submit_ms': self.max_submit_ms,
+                'average_encode_ms': (self.total_encode_time / self.frames_encoded * 1000
+                                      if self.frames_encoded else 0.0),
+                'error': self.error,
+            }
+        # Writers with their own counters, such as FFmpegVideoWriter
+        if hasattr(self.writer, "get_statistics"):
+            stats['writer'] = self.writer.get_statistics()
+        return stats
+
+
+def _release_buffer(frame):
+    """Release a pooled frame buffer held by the encoder."""
+    if isinstance(frame, FrameBuffer):
+        frame.release()
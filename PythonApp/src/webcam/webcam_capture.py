@@ -15,12 +15,17 @@ import os
 import threading
 import time
 from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtGui import QPixmap
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 # Import centralized logging
+from config.webcam_config import RecordingConfig
 from utils.logging_config import get_logger
+from webcam.ffmpeg_writer import create_video_writer
+from webcam.frame_pool import FrameBuffer, FramePool
+from webcam.preview_renderer import PreviewRenderer, PreviewWorker
+from webcam.video_encoder import AsyncVideoEncoder, QueuePolicy
 
 # Get logger for this module
 logger = get_logger(__name__)
@@ -62,6 +67,7 @@ class WebcamCapture(QThread):
         # Camera and recording state
         self.cap: Optional[cv2.VideoCapture] = None
         self.video_writer: Optional[cv2.VideoWriter] = None
+        self.video_encoder: Optional[AsyncVideoEncoder] = None
         self.is_recording = False
         self.is_previewing = False
         self.running = False
@@ -70,6 +76,12 @@ class WebcamCapture(QThread):
         self.recording_fps = 30
         self.recording_resolution = (1280, 720)  # HD resolution
         self.recording_codec = cv2.VideoWriter_fourcc(*"mp4v")
+        # Backend and ffmpeg encoder settings; None records with cv2.VideoWriter
+        self.recording_config: Optional[RecordingConfig] = None
+
+        # Encoder queue between the capture loop and the video writer
+        self.encoder_queue_size = 32
+        self.encoder_policy = QueuePolicy.DROP_OLDEST
 
         # Session information
         self.current_session_id: Optional[str] = None
@@ -79,6 +91,21 @@ class WebcamCapture(QThread):
         # Frame processing
         self.last_frame: Optional[np.ndarray] = None
         self.frame_lock = threading.Lock()
+        # Frames are read into pooled buffers shared read-only with preview and recording
+        self.frame_pool = FramePool()
+
+        # Preview rendering into reused buffers, on a worker thread unless disabled
+        self.preview_renderer = PreviewRenderer(max_width=640, max_height=480)
+        self.threaded_preview = True
+        self.preview_worker: Optional[PreviewWorker] = None
+        self._last_frame_buffer: Optional[FrameBuffer] = None
+
+        # Performance monitoring
+        self.performance_stats = {
+            "frames_captured": 0,
+            "capture_stalls": 0,
+            "max_processing_time_ms": 0.0,
+        }
 
         print(
             f"[DEBUG_LOG] WebcamCapture initialized with camera {camera_index}, preview FPS: {preview_fps}"
@@ -177,17 +204,28 @@ class WebcamCapture(QThread):
             self.recording_filepath = os.path.join(self.output_directory, filename)
 
             # Initialize video writer
-            self.video_writer = cv2.VideoWriter(
+            self.video_writer = create_video_writer(
                 self.recording_filepath,
                 self.recording_codec,
                 self.recording_fps,
                 self.recording_resolution,
+                self.recording_config,
             )
 
             if not self.video_writer.isOpened():
+                self.video_writer.release()
+                self.video_writer = None
                 self.error_occurred.emit("Could not initialize video writer")
                 return False
 
+            self.video_encoder = AsyncVideoEncoder(
+                self.video_writer,
+                max_queue_size=self.encoder_queue_size,
+                policy=self.encoder_policy,
+                name="WebcamEncoder",
+            )
+            self.video_encoder.start()
+
             self.is_recording = True
             self.current_session_id = session_id
             self.recording_start_time = time.time()
@@ -228,10 +266,12 @@ class WebcamCapture(QThread):
                 else 0
             )
 
-            # Release video writer
-            if self.video_writer:
+            # Write queued frames and release video writer
+            if self.video_encoder:
+                self.video_encoder.close()
+            elif self.video_writer:
                 self.video_writer.release()
-                self.video_writer = None
+            self.video_writer = None
 
             filepath = self.recording_filepath
             self.recording_filepath = None
@@ -255,35 +295,52 @@ class WebcamCapture(QThread):
     def run(self):
         """Main thread loop for frame capture and processing."""
         last_frame_time = 0
+        if self.threaded_preview:
+            self.preview_worker = PreviewWorker(
+                [self.preview_renderer], self.frame_ready.emit, name="WebcamPreview"
+            )
+            self.preview_worker.start()
 
         while self.running:
             try:
                 current_time = time.time()
 
-                # Capture frame
-                ret, frame = self.cap.read()
+                # Capture frame into a pooled buffer
+                ret, frame_buffer = self.frame_pool.read(self.cap)
                 if not ret:
                     self.error_occurred.emit("Failed to capture frame from webcam")
                     break
+                process_start_time = time.time()
+                frame = frame_buffer.frame
 
-                # Store frame for recording
+                # Keep the buffer as the current frame instead of copying it
                 with self.frame_lock:
-                    self.last_frame = frame.copy()
+                    previous_buffer = self._last_frame_buffer
+                    self._last_frame_buffer = frame_buffer
+                    self.last_frame = frame
+                if previous_buffer:
+                    previous_buffer.release()
 
-                # Write frame to video file if recording
-                if self.is_recording and self.video_writer:
-                    self.video_writer.write(frame)
+                # Queue frame for the encoder if recording
+                encoder = self.video_encoder
+                if self.is_recording and encoder:
+                    encoder.submit(frame_buffer)
 
                 # Emit preview frame at specified FPS
                 if (
                     self.is_previewing
                     and (current_time - last_frame_time) >= self.frame_interval
                 ):
-                    preview_pixmap = self.frame_to_pixmap(frame)
-                    if preview_pixmap:
-                        self.frame_ready.emit(preview_pixmap)
+                    if self.preview_worker:
+                        self.preview_worker.submit(frame_buffer)
+                    else:
+                        preview_pixmap = self._render_preview(frame)
+                        if preview_pixmap:
+                            self.frame_ready.emit(preview_pixmap)
                     last_frame_time = current_time
 
+                self._update_performance_stats(time.time() - process_start_time)
+
                 # Small delay to prevent excessive CPU usage
                 time.sleep(0.01)
 
@@ -293,8 +350,58 @@ class WebcamCapture(QThread):
                 print(f"[DEBUG_LOG] {error_msg}")
                 break
 
+        if self.preview_worker:
+            self.preview_worker.stop()
         print("[DEBUG_LOG] Webcam capture thread ended")
 
+    def _update_performance_stats(self, processing_time: float):
+        """
+        Count a captured frame and whether processing it stalled capture.
+
+        Args:
+            processing_time (float): Seconds spent on the frame after it was read
+        """
+        stats = self.performance_stats
+        stats["frames_captured"] += 1
+        stats["max_processing_time_ms"] = max(
+            stats["max_processing_time_ms"], processing_time * 1000
+        )
+        if processing_time > 1.0 / self.recording_fps:
+            stats["capture_stalls"] += 1
+
+    def get_performance_stats(self) -> Dict:
+        """
+        Get capture and encoder statistics.
+
+        Returns:
+            dict: Capture, frame pool and preview counters, with the encoder counters of the current or last recording
+        """
+        stats = self.performance_stats.copy()
+        stats["frame_pool"] = self.frame_pool.get_statistics()
+        stats["preview"] = (
+            self.preview_worker.get_statistics()
+            if self.preview_worker
+            else self.preview_renderer.get_statistics()
+        )
+        if self.video_encoder:
+            stats["encoder"] = self.video_encoder.get_statistics()
+        return stats
+
+    def set_encoder_policy(self, policy: QueuePolicy, max_queue_size: int = 32):
+        """
+        Set how frames are queued for the encoder, applied to the next recording.
+
+        Args:
+            policy (QueuePolicy): What to do when the encoder queue is full
+            max_queue_size (int): Frames queued before the policy applies
+        """
+        self.encoder_policy = QueuePolicy(policy)
+        self.encoder_queue_size = max_queue_size
+
+        print(
+            f"[DEBUG_LOG] Encoder policy updated: {self.encoder_policy.value}, queue size: {max_queue_size}"
+        )
+
     def frame_to_pixmap(
         self, frame: np.ndarray, max_width: int = 640, max_height: int = 480
     ) -> Optional[QPixmap]:
@@ -310,32 +417,17 @@ class WebcamCapture(QThread):
             QPixmap: Converted pixmap for display, or None if conversion fails
         """
         try:
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Get frame dimensions
-            height, width, channels = rgb_frame.shape
-
-            # Calculate scaling to fit within max dimensions while maintaining aspect ratio
-            scale_w = max_width / width
-            scale_h = max_height / height
-            scale = min(scale_w, scale_h, 1.0)  # Don't upscale
-
-            if scale < 1.0:
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                rgb_frame = cv2.resize(rgb_frame, (new_width, new_height))
-                height, width = new_height, new_width
-
-            # Convert to QImage
-            bytes_per_line = channels * width
-            q_image = QImage(
-                rgb_frame.data, width, height, bytes_per_line, QImage.Format_RGB888
-            )
+            # Resized before colour conversion, so only preview sized pixels are converted
+            return PreviewRenderer(max_width, max_height).render_pixmap(frame)
 
-            # Convert to QPixmap
-            return QPixmap.fromImage(q_image)
+        except Exception as e:
+            print(f"[DEBUG_LOG] Error converting frame to pixmap: {str(e)}")
+            return None
 
+    def _render_preview(self, frame: np.ndarray) -> Optional[QPixmap]:
+        """Render a preview pixmap in the capture loop, reusing the preview buffers."""
+        try:
+            return self.preview_renderer.render_pixmap(frame)
         except Exception as e:
             print(f"[DEBUG_LOG] Error converting frame to pixmap: {str(e)}")
             return None
@@ -369,6 +461,19 @@ class WebcamCapture(QThread):
             f"[DEBUG_LOG] Recording parameters updated: {fps} FPS, {resolution}, codec: {codec}"
         )
 
+    def set_recording_config(self, recording_config: Optional[RecordingConfig]):
+        """
+        Set the recording backend, applied to the next recording.
+
+        Args:
+            recording_config (RecordingConfig): Configuration from
+                WebcamConfigManager; None records with cv2.VideoWriter
+        """
+        self.recording_config = recording_config
+        backend = recording_config.backend.value if recording_config else "opencv"
+
+        print(f"[DEBUG_LOG] Recording backend set to: {backend}")
+
     def set_output_directory(self, directory: str):
         """
         Set output directory for recordings.
@@ -398,9 +503,11 @@ class WebcamCapture(QThread):
                 self.cap.release()
                 self.cap = None
 
-            if self.video_writer:
+            if self.video_encoder and self.video_encoder.is_alive():
+                self.video_encoder.close(timeout=1.0)
+            elif self.video_writer:
                 self.video_writer.release()
-                self.video_writer = None
+            self.video_writer = None
 
             print("[DEBUG_LOG] WebcamCapture cleanup completed")
         except Exception as e:
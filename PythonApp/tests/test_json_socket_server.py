@@ -12,17 +12,23 @@ Milestone: 3.2 - Device Connection Manager and Socket Server Testing
 
 import json
 import os
+import shutil
 import socket
+import struct
 import sys
+import tempfile
 import threading
 import time
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 
+from PyQt5.QtCore import Qt
+
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from network.device_server import (
+    SERVER_MODE_ASYNCIO,
     JsonSocketServer,
     create_command_message,
     decode_base64_image,
@@ -418,6 +424,169 @@ class TestIntegrationScenarios(unittest.TestCase):
         self.assertEqual(self.server.get_device_count(), 0)
 
 
+def _frame(message, newline=False):
+    """Encode a message with newline or length-prefixed framing."""
+    payload = json.dumps(message).encode("utf-8")
+    if newline:
+        return payload + b"\n"
+    return struct.pack(">I", len(payload)) + payload
+
+
+def _wait_for(predicate, timeout=5.0):
+    """Poll predicate until it is true or the timeout expires."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class TestAsyncioServerMode(unittest.TestCase):
+    """Test cases for the asyncio server mode."""
+
+    def setUp(self):
+        """Start an asyncio mode server."""
+        self.server = JsonSocketServer(
+            host="127.0.0.1", port=9003, server_mode=SERVER_MODE_ASYNCIO, backlog=256
+        )
+        self.sockets = []
+        self.server_thread = threading.Thread(target=self.server.run, daemon=True)
+        self.server_thread.start()
+        self.assertTrue(_wait_for(lambda: self.server.running))
+
+    def tearDown(self):
+        """Close clients and stop the server."""
+        for sock in self.sockets:
+            sock.close()
+        self.server.stop_server()
+        self.server_thread.join(timeout=5)
+        self.assertFalse(self.server_thread.is_alive())
+
+    def connect_device(self, device_id, newline=False):
+        """Connect a raw client socket and register it with a hello message."""
+        sock = socket.create_connection(("127.0.0.1", 9003))
+        self.sockets.append(sock)
+        sock.sendall(
+            _frame({"type": "hello", "device_id": device_id, "capabilities": []}, newline)
+        )
+        return sock
+
+    def test_mixed_framing_on_one_loop(self):
+        """Length-prefixed and newline clients are served side by side"""
+        statuses = []
+        self.server.status_received.connect(
+            lambda device_id, status: statuses.append(device_id), Qt.DirectConnection
+        )
+        prefixed = self.connect_device("PrefixedDevice")
+        newline = self.connect_device("NewlineDevice", newline=True)
+        self.assertTrue(_wait_for(lambda: self.server.get_device_count() == 2))
+
+        prefixed.sendall(_frame({"type": "status", "battery": 50}))
+        newline.sendall(_frame({"type": "status", "battery": 60}, newline=True))
+        self.assertTrue(_wait_for(lambda: len(statuses) == 2))
+        self.assertEqual(sorted(statuses), ["NewlineDevice", "PrefixedDevice"])
+
+        # Replies use the framing of the receiving client
+        command = create_command_message("start_recording")
+        self.assertTrue(self.server.send_command("PrefixedDevice", command))
+        self.assertTrue(self.server.send_command("NewlineDevice", command))
+        prefixed.settimeout(2.0)
+        newline.settimeout(2.0)
+        length = struct.unpack(">I", prefixed.recv(4))[0]
+        self.assertEqual(json.loads(prefixed.recv(length))["command"], "start_recording")
+        self.assertEqual(
+            json.loads(newline.makefile("rb").readline())["command"], "start_recording"
+        )
+
+    def test_disconnect_and_stop_emit_device_disconnected(self):
+        """Client disconnects and server shutdown both emit device_disconnected"""
+        disconnected = []
+        self.server.device_disconnected.connect(disconnected.append, Qt.DirectConnection)
+        first = self.connect_device("Device1")
+        self.connect_device("Device2", newline=True)
+        self.assertTrue(_wait_for(lambda: self.server.get_device_count() == 2))
+
+        first.close()
+        self.assertTrue(_wait_for(lambda: disconnected == ["Device1"]))
+
+        self.server.stop_server()
+        self.server_thread.join(timeout=5)
+        self.assertEqual(sorted(disconnected), ["Device1", "Device2"])
+        self.assertEqual(self.server.get_device_count(), 0)
+
+    def test_binary_file_transfer(self):
+        """Binary chunks interleave with JSON frames and are written to disk"""
+        session_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, session_dir, ignore_errors=True)
+        content = os.urandom(3 * 1024 * 1024 + 17)
+        chunk_size = 512 * 1024
+
+        sock = self.connect_device("BinaryDevice")
+        self.assertTrue(_wait_for(lambda: self.server.get_device_count() == 1))
+        with patch.object(self.server, "get_session_directory", return_value=session_dir):
+            sock.sendall(
+                _frame(
+                    {
+                        "type": "file_info",
+                        "name": "video.mp4",
+                        "size": len(content),
+                        "transfer_mode": "binary",
+                    }
+                )
+            )
+            for i in range(0, len(content), chunk_size):
+                chunk = content[i : i + chunk_size]
+                sock.sendall(struct.pack(">I", len(chunk) | 0x80000000) + chunk)
+            sock.sendall(_frame({"type": "file_end", "name": "video.mp4"}))
+
+            sock.settimeout(5.0)
+            length = struct.unpack(">I", sock.recv(4))[0]
+            reply = json.loads(sock.recv(length))
+        self.assertEqual(reply["type"], "file_received")
+        self.assertEqual(reply["status"], "ok")
+        with open(os.path.join(session_dir, "BinaryDevice_video.mp4"), "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_load_200_devices_status_at_10hz(self):
+        """200 devices sending status at 10 Hz are served without per-client threads"""
+        device_count = 200
+        rounds = 30
+        received = []
+        lock = threading.Lock()
+
+        def on_status(device_id, status):
+            with lock:
+                received.append(device_id)
+
+        self.server.status_received.connect(on_status, Qt.DirectConnection)
+        threads_before = threading.active_count()
+
+        devices = [
+            self.connect_device(f"LoadDevice{i}", newline=(i % 2 == 1))
+            for i in range(device_count)
+        ]
+        self.assertTrue(
+            _wait_for(lambda: self.server.get_device_count() == device_count, timeout=10)
+        )
+
+        start = time.time()
+        for round_index in range(rounds):
+            for i, sock in enumerate(devices):
+                sock.sendall(
+                    _frame({"type": "status", "battery": round_index}, newline=(i % 2 == 1))
+                )
+            time.sleep(max(0.0, start + (round_index + 1) * 0.1 - time.time()))
+
+        expected = device_count * rounds
+        self.assertTrue(_wait_for(lambda: len(received) == expected, timeout=10))
+        self.assertLessEqual(threading.active_count(), threads_before + 1)
+        self.assertEqual(
+            self.server.devices["LoadDevice7"].connection_stats["messages_received"],
+            rounds,
+        )
+
+
 def run_tests():
     """Run all test suites."""
     # Create test suite
@@ -427,6 +596,7 @@ def run_tests():
     test_suite.addTest(unittest.makeSuite(TestJsonSocketServer))
     test_suite.addTest(unittest.makeSuite(TestUtilityFunctions))
     test_suite.addTest(unittest.makeSuite(TestIntegrationScenarios))
+    test_suite.addTest(unittest.makeSuite(TestAsyncioServerMode))
 
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)